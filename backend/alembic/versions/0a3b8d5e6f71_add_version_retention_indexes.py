@@ -0,0 +1,25 @@
+"""add_version_retention_indexes
+
+Revision ID: 0a3b8d5e6f71
+Revises: f9a2c7d4e560
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0a3b8d5e6f71'
+down_revision = 'f9a2c7d4e560'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Deleting a version sets its children's parent_version_id to NULL,
+    # which needs an index to avoid scanning the table per deleted row
+    op.create_index(op.f('ix_versions_parent_version_id'), 'versions', ['parent_version_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_versions_parent_version_id'), table_name='versions')
@@ -0,0 +1,42 @@
+"""add_project_snapshots
+
+Revision ID: 1b4c9e6f7a82
+Revises: 0a3b8d5e6f71
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1b4c9e6f7a82'
+down_revision = '0a3b8d5e6f71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('project_snapshots',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('author_email', sa.String(length=255), nullable=False),
+    sa.Column('manifest', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('content_hashes', postgresql.ARRAY(sa.String(length=64)), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_snapshots_id'), 'project_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_project_snapshots_project_id'), 'project_snapshots', ['project_id'], unique=False)
+    op.create_index('idx_project_snapshots_hashes', 'project_snapshots', ['content_hashes'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_project_snapshots_hashes', table_name='project_snapshots', postgresql_using='gin')
+    op.drop_index(op.f('ix_project_snapshots_project_id'), table_name='project_snapshots')
+    op.drop_index(op.f('ix_project_snapshots_id'), table_name='project_snapshots')
+    op.drop_table('project_snapshots')
@@ -0,0 +1,37 @@
+"""add_document_provenance
+
+Revision ID: 2c5d0f7a8b93
+Revises: 1b4c9e6f7a82
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2c5d0f7a8b93'
+down_revision = '1b4c9e6f7a82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing documents get their provenance on first blame, or with
+    # `python -m app.services.blame_service`
+    op.create_table('document_provenance',
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('version_id', sa.UUID(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('spans', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('origins', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['version_id'], ['versions.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('document_provenance')
@@ -0,0 +1,38 @@
+"""add_document_revisions_and_operations
+
+Revision ID: 3d6e1a8b9c04
+Revises: 2c5d0f7a8b93
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3d6e1a8b9c04'
+down_revision = '2c5d0f7a8b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('document_operations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('operations', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id', 'revision', name='uq_document_operations_document_revision')
+    )
+    op.create_index(op.f('ix_document_operations_id'), 'document_operations', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_document_operations_id'), table_name='document_operations')
+    op.drop_table('document_operations')
+    op.drop_column('documents', 'revision')
@@ -0,0 +1,60 @@
+"""add_document_word_count
+
+Revision ID: 4e7f2b9c0d15
+Revises: 3d6e1a8b9c04
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7f2b9c0d15'
+down_revision = '3d6e1a8b9c04'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('word_count', sa.Integer(), nullable=True))
+    
+    # Counted in Python, like the application does (content_raw may already
+    # be compressed, and str.split() is what defines a word), in batches so
+    # large projects are never loaded whole
+    from app.core.compression import decompress_text
+    
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Uuid()),
+        sa.column('content_raw'),
+        sa.column('word_count', sa.Integer()),
+    )
+    bind = op.get_bind()
+    update = (
+        documents.update()
+        .where(documents.c.id == sa.bindparam('document_id'))
+        .values(word_count=sa.bindparam('count'))
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(documents.c.id, documents.c.content_raw)
+            .where(documents.c.word_count.is_(None))
+            .order_by(documents.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        counts = []
+        for document_id, content in rows:
+            if isinstance(content, (bytes, memoryview)):
+                content = decompress_text(content)
+            counts.append({'document_id': document_id, 'count': len(content.split()) if content else 0})
+        bind.execute(update, counts)
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'word_count')
@@ -0,0 +1,43 @@
+"""add_document_blocks
+
+Revision ID: 5f8a3c0d1e26
+Revises: 4e7f2b9c0d15
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f8a3c0d1e26'
+down_revision = '4e7f2b9c0d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('block_storage', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('document_blocks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('word_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_document_blocks_id'), 'document_blocks', ['id'], unique=False)
+    op.create_index('ix_document_blocks_document_position', 'document_blocks', ['document_id', 'position'], unique=False)
+
+
+def downgrade() -> None:
+    # Documents stored as blocks must be converted back first (their content_raw may be stale)
+    op.drop_index('ix_document_blocks_document_position', table_name='document_blocks')
+    op.drop_index(op.f('ix_document_blocks_id'), table_name='document_blocks')
+    op.drop_table('document_blocks')
+    op.drop_column('documents', 'block_storage')
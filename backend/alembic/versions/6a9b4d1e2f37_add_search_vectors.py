@@ -0,0 +1,35 @@
+"""add_search_vectors
+
+Revision ID: 6a9b4d1e2f37
+Revises: 5f8a3c0d1e26
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '6a9b4d1e2f37'
+down_revision = '5f8a3c0d1e26'
+branch_labels = None
+depends_on = None
+
+
+SEARCHABLE_TABLES = ('documents', 'entities', 'pyramid_nodes')
+
+
+def upgrade() -> None:
+    # Left empty here: index existing items with `python -m app.services.search_service`
+    for table in SEARCHABLE_TABLES:
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.add_column(table, sa.Column('search_indexed_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in SEARCHABLE_TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_using='gin')
+        op.drop_column(table, 'search_indexed_at')
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,29 @@
+"""cascade_version_delta_base
+
+Revision ID: 7b0c5e2f3a48
+Revises: 6a9b4d1e2f37
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b0c5e2f3a48'
+down_revision = '6a9b4d1e2f37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Deleting a document or node deletes its versions row by row in any
+    # order: a delta deleted after its base must not block the delete
+    op.drop_constraint('fk_versions_delta_base_id', 'versions', type_='foreignkey')
+    op.create_foreign_key(
+        'fk_versions_delta_base_id', 'versions', 'versions', ['delta_base_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_versions_delta_base_id', 'versions', type_='foreignkey')
+    op.create_foreign_key('fk_versions_delta_base_id', 'versions', 'versions', ['delta_base_id'], ['id'])
@@ -0,0 +1,27 @@
+"""add_pyramid_expansion_request_type
+
+Revision ID: 7c1e4a9b2d10
+Revises: auth_models_001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4a9b2d10'
+down_revision = 'auth_models_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Structured pyramid expansion is logged under its own request type
+    op.execute("ALTER TYPE llmrequesttype ADD VALUE IF NOT EXISTS 'pyramid_expansion'")
+
+
+def downgrade() -> None:
+    # Note: PostgreSQL doesn't support removing enum values directly
+    # This would require recreating the enum type
+    pass
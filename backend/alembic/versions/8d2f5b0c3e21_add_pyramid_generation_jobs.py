@@ -0,0 +1,49 @@
+"""add_pyramid_generation_jobs
+
+Revision ID: 8d2f5b0c3e21
+Revises: 7c1e4a9b2d10
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f5b0c3e21'
+down_revision = '7c1e4a9b2d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pyramid_generation_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('root_node_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('fan_out', sa.Integer(), nullable=False),
+    sa.Column('target_length', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'INTERRUPTED', 'COMPLETED', 'FAILED', name='pyramidjobstatus'), nullable=False),
+    sa.Column('completed_depth', sa.Integer(), nullable=False),
+    sa.Column('nodes_created', sa.Integer(), nullable=False),
+    sa.Column('error_message', sa.String(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['root_node_id'], ['pyramid_nodes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pyramid_generation_jobs_id'), 'pyramid_generation_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_pyramid_generation_jobs_project_id'), 'pyramid_generation_jobs', ['project_id'], unique=False)
+    op.create_index(op.f('ix_pyramid_generation_jobs_root_node_id'), 'pyramid_generation_jobs', ['root_node_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pyramid_generation_jobs_root_node_id'), table_name='pyramid_generation_jobs')
+    op.drop_index(op.f('ix_pyramid_generation_jobs_project_id'), table_name='pyramid_generation_jobs')
+    op.drop_index(op.f('ix_pyramid_generation_jobs_id'), table_name='pyramid_generation_jobs')
+    op.drop_table('pyramid_generation_jobs')
+    op.execute("DROP TYPE IF EXISTS pyramidjobstatus")
@@ -0,0 +1,25 @@
+"""add_project_pyramid_revision
+
+Revision ID: 9e3a6c1d4f32
+Revises: 8d2f5b0c3e21
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3a6c1d4f32'
+down_revision = '8d2f5b0c3e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bumped on every pyramid node change; used as the pyramid tree ETag
+    op.add_column('projects', sa.Column('pyramid_revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'pyramid_revision')
@@ -0,0 +1,47 @@
+"""add_pyramid_coherence_results
+
+Revision ID: a4b7d2e9f015
+Revises: 9e3a6c1d4f32
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4b7d2e9f015'
+down_revision = '9e3a6c1d4f32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Coherence checks are logged under their own request type (lowercase value)
+    op.execute("ALTER TYPE llmrequesttype ADD VALUE IF NOT EXISTS 'coherence_check'")
+    
+    op.create_table('pyramid_coherence_results',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('node_id', sa.UUID(), nullable=False),
+    sa.Column('context_hash', sa.String(length=64), nullable=False),
+    sa.Column('is_coherent', sa.Boolean(), nullable=False),
+    sa.Column('issues', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('suggestions', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('llm_request_id', sa.UUID(), nullable=True),
+    sa.Column('checked_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['llm_request_id'], ['llm_requests.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['node_id'], ['pyramid_nodes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('node_id')
+    )
+    op.create_index(op.f('ix_pyramid_coherence_results_id'), 'pyramid_coherence_results', ['id'], unique=False)
+    op.create_index(op.f('ix_pyramid_coherence_results_project_id'), 'pyramid_coherence_results', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pyramid_coherence_results_project_id'), table_name='pyramid_coherence_results')
+    op.drop_index(op.f('ix_pyramid_coherence_results_id'), table_name='pyramid_coherence_results')
+    op.drop_table('pyramid_coherence_results')
@@ -0,0 +1,38 @@
+"""add_version_delta_storage
+
+Revision ID: b5c8e3f0a126
+Revises: a4b7d2e9f015
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c8e3f0a126'
+down_revision = 'a4b7d2e9f015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows stay full keyframes; convert them with
+    # `python -m app.services.version_storage_service`
+    op.add_column('versions', sa.Column('content_delta', sa.Text(), nullable=True))
+    op.add_column('versions', sa.Column('delta_base_id', sa.UUID(), nullable=True))
+    op.add_column('versions', sa.Column('delta_depth', sa.Integer(), server_default='0', nullable=False))
+    op.create_foreign_key('fk_versions_delta_base_id', 'versions', 'versions', ['delta_base_id'], ['id'])
+    op.create_index(op.f('ix_versions_delta_base_id'), 'versions', ['delta_base_id'], unique=False)
+    op.alter_column('versions', 'content_snapshot', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    # Delta rows must be expanded first:
+    # `python -m app.services.version_storage_service --expand`
+    op.alter_column('versions', 'content_snapshot', existing_type=sa.Text(), nullable=False)
+    op.drop_index(op.f('ix_versions_delta_base_id'), table_name='versions')
+    op.drop_constraint('fk_versions_delta_base_id', 'versions', type_='foreignkey')
+    op.drop_column('versions', 'delta_depth')
+    op.drop_column('versions', 'content_delta')
+    op.drop_column('versions', 'delta_base_id')
@@ -0,0 +1,30 @@
+"""add_version_autosave_coalescing
+
+Revision ID: c6d9f4a1b237
+Revises: b5c8e3f0a126
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d9f4a1b237'
+down_revision = 'b5c8e3f0a126'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('versions', sa.Column('is_autosave', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('versions', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Auto-saves were only recognisable by their commit message until now
+    op.execute("UPDATE versions SET is_autosave = true WHERE commit_message LIKE 'Auto-save:%'")
+    op.execute("UPDATE versions SET updated_at = created_at")
+    op.alter_column('versions', 'updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('versions', 'updated_at')
+    op.drop_column('versions', 'is_autosave')
@@ -0,0 +1,50 @@
+"""add_content_blobs
+
+Revision ID: d7e0a5b2c348
+Revises: c6d9f4a1b237
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e0a5b2c348'
+down_revision = 'c6d9f4a1b237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('content_blobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'content_hash', name='uq_content_blobs_project_hash')
+    )
+    op.create_index(op.f('ix_content_blobs_id'), 'content_blobs', ['id'], unique=False)
+    
+    op.add_column('versions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('idx_versions_project_hash', 'versions', ['project_id', 'content_hash'], unique=False)
+    # Inline snapshots can be hashed in SQL (PostgreSQL 11+); deltas get their
+    # hash from `python -m app.services.version_storage_service`, which also
+    # moves inline snapshots into blobs
+    op.execute(
+        "UPDATE versions SET content_hash = encode(sha256(convert_to(content_snapshot, 'UTF8')), 'hex') "
+        "WHERE content_snapshot IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    # Blob keyframes must be expanded first:
+    # `python -m app.services.version_storage_service --expand`
+    op.drop_index('idx_versions_project_hash', table_name='versions')
+    op.drop_column('versions', 'content_hash')
+    op.drop_index(op.f('ix_content_blobs_id'), table_name='content_blobs')
+    op.drop_table('content_blobs')
@@ -0,0 +1,35 @@
+"""add_version_history_stats
+
+Revision ID: f9a2c7d4e560
+Revises: d7e0a5b2c348
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9a2c7d4e560'
+down_revision = 'd7e0a5b2c348'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stats of existing versions are filled in by `python -m app.services.version_storage_service`
+    op.add_column('versions', sa.Column('content_size', sa.Integer(), nullable=True))
+    op.add_column('versions', sa.Column('words_added', sa.Integer(), nullable=True))
+    op.add_column('versions', sa.Column('words_removed', sa.Integer(), nullable=True))
+    op.create_index('idx_versions_document_created', 'versions', ['document_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_versions_node_created', 'versions', ['pyramid_node_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_versions_project_created', 'versions', ['project_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_versions_project_created', table_name='versions')
+    op.drop_index('idx_versions_node_created', table_name='versions')
+    op.drop_index('idx_versions_document_created', table_name='versions')
+    op.drop_column('versions', 'words_removed')
+    op.drop_column('versions', 'words_added')
+    op.drop_column('versions', 'content_size')
@@ -2,7 +2,7 @@
 API v1 router.
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, projects, documents, entities, arcs, timeline, tags, llm, pyramid, versions, analytics, export, semantic_tags, health, config
+from app.api.v1.endpoints import auth, projects, documents, entities, arcs, timeline, tags, llm, pyramid, versions, analytics, export, semantic_tags, health, config, search
 
 api_router = APIRouter()
 
@@ -21,3 +21,4 @@ api_router.include_router(versions.router, prefix="/versions", tags=["versions"]
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(export.router, prefix="/export", tags=["export"])
 api_router.include_router(semantic_tags.router, prefix="/semantic-tags", tags=["semantic-tags"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
@@ -1,20 +1,108 @@
 """
 Document endpoints.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import tempfile
+from pathlib import PurePath
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
+from app.core.config import settings
 from app.core.deps import get_db, get_current_user
+from app.core.etag import etag_matches, etag_matches_strong, make_etag
+from app.core.text_operations import OperationConflict
 from app.crud.crud_document import document as document_crud
 from app.crud.crud_project import project as project_crud
 from app.models.user import User
-from app.schemas.document import Document, DocumentCreate, DocumentUpdate
+from app.schemas.document import (
+    Document,
+    DocumentCreate,
+    DocumentUpdate,
+    DocumentPatch,
+    DocumentPatchResult,
+    DocumentSummary,
+    DocumentStorageUpdate,
+    DocumentBlock,
+    DocumentBlockCreate,
+    DocumentBlockUpdate,
+    DocumentBlockPage,
+    DocumentReorderRequest,
+    DocumentMoveRequest,
+)
+from app.schemas.search import SearchItemType
+from app.services.manuscript_import_service import manuscript_import_service
+from app.services.search_service import search_service
 
 router = APIRouter()
 
+# Manuscript files accepted whatever their declared content type
+IMPORT_SUFFIXES = {".md", ".markdown", ".txt", ".text"}
+# Uploads are copied in chunks, in memory up to IMPORT_SPOOL_SIZE then to a temporary file
+IMPORT_CHUNK_SIZE = 1024 * 1024
+IMPORT_SPOOL_SIZE = 4 * 1024 * 1024
 
-@router.get("/", response_model=List[Document])
+
+def _check_if_match(if_match: Optional[str], document, required: bool = False) -> None:
+    """Reject a write without If-Match when required (428), or made against another revision (412)."""
+    etag = make_etag(document.id, document.revision)
+    if if_match is None and required:
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="If-Match header required (the document's ETag)",
+            headers={"ETag": etag}
+        )
+    if if_match is not None and not etag_matches_strong(if_match, etag):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Document was modified (current revision is {document.revision})",
+            headers={"ETag": etag}
+        )
+
+
+def _record_autosave(db: Session, document, author_email: str) -> None:
+    """Record an auto-save version of a document (coalesced with recent auto-saves)."""
+    from app.crud import version as version_crud
+    from app.schemas.version import VersionCreate
+    
+    version_in = VersionCreate(
+        project_id=document.project_id,
+        document_id=document.id,
+        commit_message="Auto-save: Updated document",
+        author_email=author_email,
+        content_snapshot=document.content_raw,
+        metadata_snapshot=None
+    )
+    version_crud.create_autosave(db, obj_in=version_in)
+
+
+def _get_block_document(db: Session, document_id: UUID, current_user: User, if_match: Optional[str]):
+    """Lock a document stored as blocks for a block edit (If-Match required), without loading its text."""
+    document = document_crud.get_for_update(db, id=document_id, with_content=False)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Verify project ownership
+    project = project_crud.get(db, id=document.project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    _check_if_match(if_match, document, required=True)
+    if not document.block_storage:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document is not stored as blocks"
+        )
+    return document
+
+
+@router.get("/", response_model=List[DocumentSummary])
 def get_documents(
     project_id: UUID,
     skip: int = 0,
@@ -23,7 +111,9 @@ def get_documents(
     db: Session = Depends(get_db)
 ):
     """
-    Get all documents for a project.
+    Get all documents for a project, without their content.
+    
+    Fetch a document's content with GET /documents/{document_id}.
     
     Args:
         project_id: Project ID
@@ -33,7 +123,7 @@ def get_documents(
         db: Database session
         
     Returns:
-        List of documents
+        List of document summaries
         
     Raises:
         HTTPException: If project not found or user doesn't have access
@@ -51,45 +141,65 @@ def get_documents(
             detail="Not enough permissions"
         )
     
-    documents = document_crud.get_by_project(db, project_id=project_id, skip=skip, limit=limit)
+    documents = document_crud.get_summaries_by_project(db, project_id=project_id, skip=skip, limit=limit)
     return documents
 
 
 @router.get("/{document_id}", response_model=Document)
 def get_document(
     document_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get a specific document.
     
+    The ETag identifies the document's revision; send it back in
+    If-None-Match to get a 304 (without loading the body) when nothing
+    changed, and in If-Match when updating it.
+    
     Args:
         document_id: Document ID
+        response: Response (for the ETag header)
+        if_none_match: If-None-Match header
         current_user: Current authenticated user
         db: Database session
         
     Returns:
-        Document
+        Document, or an empty 304 response
         
     Raises:
         HTTPException: If document not found or user doesn't have access
     """
-    document = document_crud.get(db, id=document_id)
-    if not document:
+    current = document_crud.get_revision(db, id=document_id)
+    if not current:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
     # Verify project ownership
-    project = project_crud.get(db, id=document.project_id)
+    project = project_crud.get(db, id=current.project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
+    etag = make_etag(document_id, current.revision)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    document = document_crud.get_with_content(db, id=document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    response.headers["ETag"] = make_etag(document.id, document.revision)
+    response.headers["Cache-Control"] = "no-cache"
     return document
 
 
@@ -97,15 +207,19 @@ def get_document(
 def create_document(
     project_id: UUID,
     document_in: DocumentCreate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Create a new document.
     
+    The ETag of the new document is returned for its first update.
+    
     Args:
         project_id: Project ID
         document_in: Document creation data
+        response: Response (for the ETag header)
         current_user: Current authenticated user
         db: Database session
         
@@ -143,7 +257,9 @@ def create_document(
         metadata_snapshot=None
     )
     version_crud.create(db, obj_in=version_in)
+    search_service.index_items(db, project_id=project_id, items=[(SearchItemType.DOCUMENT, document.id)])
     
+    response.headers["ETag"] = make_etag(document.id, document.revision)
     return document
 
 
@@ -151,15 +267,23 @@ def create_document(
 def update_document(
     document_id: UUID,
     document_in: DocumentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Update a document.
     
+    If-Match (the ETag from GET or from the last update) is required: the
+    update is rejected with 412 if the document changed since, instead of
+    overwriting the other change.
+    
     Args:
         document_id: Document ID
         document_in: Document update data
+        response: Response (for the ETag header)
+        if_match: If-Match header
         current_user: Current authenticated user
         db: Database session
         
@@ -167,9 +291,11 @@ def update_document(
         Updated document
         
     Raises:
-        HTTPException: If document not found or user doesn't have access
+        HTTPException: If document not found, user doesn't have access,
+            If-Match is missing (428) or the document changed since the
+            If-Match revision (412)
     """
-    document = document_crud.get(db, id=document_id)
+    document = document_crud.get_for_update(db, id=document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -184,6 +310,8 @@ def update_document(
             detail="Not enough permissions"
         )
     
+    _check_if_match(if_match, document, required=True)
+    
     # Store old content for versioning
     old_content = document.content_raw
     
@@ -194,24 +322,503 @@ def update_document(
     # Update the document
     document = document_crud.update(db, db_obj=document, obj_in=document_in)
     
-    # Create automatic version if content changed
+    # Record an auto-save version if content changed (coalesced with recent auto-saves)
     if document.content_raw != old_content:
-        from app.crud import version as version_crud
-        from app.schemas.version import VersionCreate
+        _record_autosave(db, document, current_user.email)
+    search_service.index_items(db, project_id=document.project_id, items=[(SearchItemType.DOCUMENT, document.id)])
+    
+    response.headers["ETag"] = make_etag(document.id, document.revision)
+    return document
+
+
+@router.patch("/{document_id}", response_model=DocumentPatchResult)
+def patch_document(
+    document_id: UUID,
+    patch_in: DocumentPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Edit a document's text with operations made against a revision.
+    
+    Only the operations are sent: the server applies them, records an
+    auto-save version and returns the new revision without the body. A
+    patch made against an older revision is rebased on the edits made
+    since, which are returned so the client can apply them as well.
+    If-Match is required: send the ETag of the base revision to have any
+    change since rejected with 412 instead, or "*" to allow the rebase.
+    
+    Args:
+        document_id: Document ID
+        patch_in: Base revision and text operations
+        response: Response (for the ETag header)
+        if_match: If-Match header
+        current_user: Current authenticated user
+        db: Database session
         
-        version_in = VersionCreate(
-            project_id=document.project_id,
-            document_id=document_id,
-            commit_message="Auto-save: Updated document",
-            author_email=current_user.email,
-            content_snapshot=document.content_raw,
-            metadata_snapshot=None
+    Returns:
+        New revision and the operations the client missed
+        
+    Raises:
+        HTTPException: If document not found, user doesn't have access,
+            If-Match is missing (428), an operation is out of range (422),
+            the edits conflict (409) or the document changed since the
+            If-Match revision (412)
+    """
+    document = document_crud.get_for_update(db, id=document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
         )
-        version_crud.create(db, obj_in=version_in)
     
+    # Verify project ownership
+    project = project_crud.get(db, id=document.project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    _check_if_match(if_match, document, required=True)
+    
+    try:
+        missed = document_crud.apply_patch(
+            db,
+            db_obj=document,
+            base_revision=patch_in.base_revision,
+            operations=[operation.model_dump() for operation in patch_in.operations]
+        )
+    except OperationConflict as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    _record_autosave(db, document, current_user.email)
+    
+    result = DocumentPatchResult(
+        id=document.id,
+        revision=document.revision,
+        updated_at=document.updated_at,
+        content_size=len(document.content_raw or ""),
+        operations=missed
+    )
+    search_service.index_items(db, project_id=document.project_id, items=[(SearchItemType.DOCUMENT, document.id)])
+    
+    response.headers["ETag"] = make_etag(result.id, result.revision)
+    return result
+
+
+@router.put("/{document_id}/storage", response_model=Document)
+def update_document_storage(
+    document_id: UUID,
+    storage_in: DocumentStorageUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Store a document's text as blocks (one per paragraph), or back as one text.
+    
+    Blocks are read and written with /documents/{document_id}/blocks, so
+    editing a paragraph of a long document only transfers and saves that
+    paragraph. The whole text stays available from GET /documents/{document_id}.
+    Switching bumps the revision, so If-Match is required as for updates.
+    
+    Args:
+        document_id: Document ID
+        storage_in: Storage to use
+        response: Response (for the ETag header)
+        if_match: If-Match header
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Updated document
+        
+    Raises:
+        HTTPException: If document not found, user doesn't have access,
+            If-Match is missing (428) or the document changed since the
+            If-Match revision (412)
+    """
+    document = document_crud.get_for_update(db, id=document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Verify project ownership
+    project = project_crud.get(db, id=document.project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    _check_if_match(if_match, document, required=True)
+    document = document_crud.set_block_storage(db, db_obj=document, block_storage=storage_in.block_storage)
+    response.headers["ETag"] = make_etag(document.id, document.revision)
     return document
 
 
+@router.get("/{document_id}/blocks", response_model=DocumentBlockPage)
+def get_document_blocks(
+    document_id: UUID,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a range of the blocks of a document stored as blocks.
+    
+    Args:
+        document_id: Document ID
+        response: Response (for the ETag header)
+        skip: Number of blocks to skip
+        limit: Maximum number of blocks to return
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Document revision, number of blocks and the requested blocks
+        
+    Raises:
+        HTTPException: If document not found, user doesn't have access or
+            the document is not stored as blocks
+    """
+    current = document_crud.get_revision(db, id=document_id)
+    if not current:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Verify project ownership
+    project = project_crud.get(db, id=current.project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if not current.block_storage:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document is not stored as blocks"
+        )
+    
+    response.headers["ETag"] = make_etag(document_id, current.revision)
+    return DocumentBlockPage(
+        document_id=document_id,
+        revision=current.revision,
+        total=document_crud.count_blocks(db, document_id=document_id),
+        blocks=document_crud.get_blocks(db, document_id=document_id, skip=skip, limit=limit)
+    )
+
+
+@router.post("/{document_id}/blocks", response_model=DocumentBlock, status_code=status.HTTP_201_CREATED)
+def create_document_block(
+    document_id: UUID,
+    block_in: DocumentBlockCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Insert a block into a document stored as blocks.
+    
+    Block edits require If-Match (the ETag from GET /blocks or from the
+    last edit) and bump the document's revision (returned as the new
+    ETag). They are logged like text patches, but do not record auto-save
+    versions: those need the whole text, so create versions explicitly.
+    
+    Args:
+        document_id: Document ID
+        block_in: Block text and position
+        response: Response (for the ETag header)
+        if_match: If-Match header
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Created block
+        
+    Raises:
+        HTTPException: If document not found, user doesn't have access, the
+            document is not stored as blocks, the text contains a blank
+            line (422), If-Match is missing (428) or the document changed
+            since the If-Match revision (412)
+    """
+    document = _get_block_document(db, document_id, current_user, if_match)
+    try:
+        block = document_crud.insert_block(db, db_obj=document, content=block_in.content, position=block_in.position)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    response.headers["ETag"] = make_etag(document.id, document.revision)
+    return block
+
+
+@router.put("/{document_id}/blocks/{block_id}", response_model=DocumentBlock)
+def update_document_block(
+    document_id: UUID,
+    block_id: UUID,
+    block_in: DocumentBlockUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Rewrite one block of a document stored as blocks.
+    
+    Args:
+        document_id: Document ID
+        block_id: Block ID
+        block_in: New block text
+        response: Response (for the ETag header)
+        if_match: If-Match header
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Updated block
+        
+    Raises:
+        HTTPException: If document or block not found, user doesn't have
+            access, the document is not stored as blocks, the text contains
+            a blank line (422), If-Match is missing (428) or the document
+            changed since the If-Match revision (412)
+    """
+    document = _get_block_document(db, document_id, current_user, if_match)
+    block = document_crud.get_block(db, document_id=document_id, block_id=block_id)
+    if not block:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Block not found"
+        )
+    
+    try:
+        block = document_crud.update_block(db, db_obj=document, block=block, content=block_in.content)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    response.headers["ETag"] = make_etag(document.id, document.revision)
+    return block
+
+
+@router.delete("/{document_id}/blocks/{block_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_document_block(
+    document_id: UUID,
+    block_id: UUID,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete one block of a document stored as blocks.
+    
+    Args:
+        document_id: Document ID
+        block_id: Block ID
+        if_match: If-Match header
+        current_user: Current authenticated user
+        db: Database session
+        
+    Raises:
+        HTTPException: If document or block not found, user doesn't have
+            access, the document is not stored as blocks, If-Match is
+            missing (428) or the document changed since the If-Match
+            revision (412)
+    """
+    document = _get_block_document(db, document_id, current_user, if_match)
+    block = document_crud.get_block(db, document_id=document_id, block_id=block_id)
+    if not block:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Block not found"
+        )
+    
+    document_crud.delete_block(db, db_obj=document, block=block)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"ETag": make_etag(document.id, document.revision)})
+
+
+@router.post("/import")
+def import_manuscript(
+    project_id: UUID,
+    file: UploadFile = File(...),
+    scenes: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a Markdown or plain-text manuscript, split into documents.
+    
+    The manuscript is cut at its headings ("# Chapitre 3", or "Chapitre 3"
+    alone on a line), and also at scene breaks ("***") when `scenes` is
+    true. Documents and their initial versions are created in batches
+    after the project's existing documents, and progress is streamed as
+    NDJSON: "started", "batch_imported" per batch, then "completed" (with
+    the new document IDs) or "failed".
+    
+    Args:
+        project_id: Project ID
+        file: Manuscript (UTF-8, .md or .txt)
+        scenes: Split chapters into scenes at scene breaks
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Streamed progress events
+    
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or
+            the file is not a text file or too large
+    """
+    # Verify project ownership
+    project = project_crud.get(db, id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    name = PurePath(file.filename or "")
+    if name.suffix.lower() not in IMPORT_SUFFIXES and not (file.content_type or "").startswith("text/"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Only Markdown and plain-text manuscripts can be imported"
+        )
+    
+    # The upload is closed once this returns: the import reads its own spooled copy
+    max_size = settings.DOCUMENT_IMPORT_MAX_MB * 1024 * 1024
+    manuscript = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+    size = 0
+    while chunk := file.file.read(IMPORT_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            manuscript.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Manuscripts are limited to {settings.DOCUMENT_IMPORT_MAX_MB} MB"
+            )
+        manuscript.write(chunk)
+    manuscript.seek(0)
+    
+    return StreamingResponse(
+        manuscript_import_service.stream_import(
+            manuscript,
+            project_id=project_id,
+            title=name.stem or "Manuscript",
+            author_email=current_user.email,
+            scenes=scenes
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/reorder")
+def reorder_documents(
+    project_id: UUID,
+    reorder_in: DocumentReorderRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Put documents of a project in a given order, in one transaction.
+    
+    Args:
+        project_id: Project ID
+        reorder_in: Document IDs in their new order
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Number of documents updated
+        
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or a document is not in the project
+    """
+    # Verify project ownership
+    project = project_crud.get(db, id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        updated = document_crud.reorder_many(db, project_id=project_id, document_ids=reorder_in.document_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {"updated": updated}
+
+
+@router.post("/{document_id}/move", response_model=Document)
+def move_document(
+    document_id: UUID,
+    move_in: DocumentMoveRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Move a document to a position in its project.
+    
+    Args:
+        document_id: Document ID
+        move_in: New position among the other documents
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Moved document
+        
+    Raises:
+        HTTPException: If document not found or user doesn't have access
+    """
+    document = document_crud.get(db, id=document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Verify project ownership
+    project = project_crud.get(db, id=document.project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return document_crud.move(db, document=document, position=move_in.position)
+
+
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_document(
     document_id: UUID,
@@ -11,6 +11,8 @@ from app.crud.crud_project import project as project_crud
 from app.models.user import User
 from app.models.entity import EntityType
 from app.schemas.entity import Entity, EntityCreate, EntityUpdate
+from app.schemas.search import SearchItemType
+from app.services.search_service import search_service
 
 router = APIRouter()
 
@@ -151,6 +153,7 @@ def create_entity(
         entity_in.slug = f"{entity_in.slug}-{str(uuid.uuid4())[:8]}"
     
     entity = entity_crud.create_with_project(db, obj_in=entity_in, project_id=project_id)
+    search_service.index_items(db, project_id=project_id, items=[(SearchItemType.ENTITY, entity.id)])
     return entity
 
 
@@ -201,6 +204,7 @@ def update_entity(
             )
     
     entity = entity_crud.update(db, db_obj=entity, obj_in=entity_in)
+    search_service.index_items(db, project_id=entity.project_id, items=[(SearchItemType.ENTITY, entity.id)])
     return entity
 
 
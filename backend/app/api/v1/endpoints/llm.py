@@ -78,7 +78,8 @@ def generate_continuation(
         target_length=request.target_length,
         entity_ids=request.entity_ids,
         arc_ids=request.arc_ids,
-        event_ids=request.event_ids
+        event_ids=request.event_ids,
+        candidates=request.candidates
     )
     
     return result
@@ -111,7 +112,8 @@ def rewrite_text(
         project_id=request.project_id,
         text_to_rewrite=request.text_to_rewrite,
         rewriting_goals=request.rewriting_goals,
-        user_instructions=request.user_instructions
+        user_instructions=request.user_instructions,
+        candidates=request.candidates
     )
     
     return result
@@ -146,7 +148,8 @@ def get_suggestions(
         user_question=request.user_question,
         entity_ids=request.entity_ids,
         arc_ids=request.arc_ids,
-        event_ids=request.event_ids
+        event_ids=request.event_ids,
+        candidates=request.candidates
     )
     
     return result
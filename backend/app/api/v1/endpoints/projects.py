@@ -9,6 +9,7 @@ from app.core.deps import get_db, get_current_user
 from app.crud.crud_project import project as project_crud
 from app.models.user import User
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
+from app.services.search_service import search_service
 
 router = APIRouter()
 
@@ -132,7 +133,11 @@ def update_project(
             detail="Not enough permissions"
         )
     
+    language = project.language
     project = project_crud.update(db, db_obj=project, obj_in=project_in)
+    if project.language != language:
+        # Words are stemmed with the project's language
+        search_service.reset_index(db, project_id=project.id)
     return project
 
 
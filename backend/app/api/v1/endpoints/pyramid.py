@@ -1,26 +1,41 @@
 """
 Pyramid endpoints for hierarchical story structure.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core import deps
+from app.core.etag import etag_matches, make_etag
 from app.crud import pyramid_node as crud_pyramid
+from app.crud import pyramid_generation_job as crud_pyramid_job
 from app.crud.crud_project import CRUDProject
 from app.models.project import Project
+from app.schemas.search import SearchItemType
+from app.services.search_service import search_service
 
 crud_project = CRUDProject(Project)
 from app.schemas.pyramid import (
     PyramidNode,
+    PyramidNodeInDB,
+    PyramidTreeNode,
+    PyramidReorderRequest,
+    PyramidMoveRequest,
     PyramidNodeCreate,
     PyramidNodeUpdate,
     PyramidGenerateRequest,
     PyramidGenerateResponse,
-    PyramidCoherenceCheck
+    PyramidGenerationJob,
+    PyramidGenerationJobCreate,
+    PyramidCoherenceCheck,
+    PyramidProjectCoherence
 )
+from app.models.pyramid_generation_job import PyramidJobStatus
 from app.services.pyramid_llm_service import pyramid_llm_service
+from app.services.pyramid_generation_service import pyramid_generation_service
+from app.services.pyramid_tree_service import pyramid_tree_service
 
 router = APIRouter()
 
@@ -36,6 +51,32 @@ def get_project_pyramid_by_path(
     return nodes
 
 
+@router.get("/projects/{project_id}/tree", response_model=List[PyramidTreeNode])
+def get_project_pyramid_tree(
+    project_id: UUID,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Get the whole pyramid of a project as nested trees.
+    
+    The response carries an ETag derived from the project's pyramid
+    revision; send it back in If-None-Match to get a 304 when nothing changed.
+    """
+    revision = crud_project.get_pyramid_revision(db, project_id=project_id)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    etag = make_etag(project_id, revision)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    body = pyramid_tree_service.get_project_tree_snapshot(db, project_id=project_id, revision=revision)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/nodes/", response_model=List[PyramidNode])
 def get_project_pyramid_by_query(
     project_id: UUID,  # Query parameter
@@ -60,6 +101,32 @@ def get_pyramid_node(
     return node
 
 
+@router.get("/nodes/{node_id}/tree", response_model=PyramidTreeNode)
+def get_pyramid_subtree(
+    node_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get a node and all its descendants as a nested tree, loaded in one query."""
+    tree = pyramid_tree_service.get_subtree(db, node_id=node_id)
+    if not tree:
+        raise HTTPException(status_code=404, detail="Pyramid node not found")
+    return tree
+
+
+@router.get("/nodes/{node_id}/ancestors", response_model=List[PyramidNodeInDB])
+def get_pyramid_node_ancestors(
+    node_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get the path from the root down to a node's parent, root first."""
+    node = crud_pyramid.get(db, id=node_id)
+    if not node:
+        raise HTTPException(status_code=404, detail="Pyramid node not found")
+    return crud_pyramid.get_ancestors(db, node_id=node_id)
+
+
 @router.post("/nodes/", response_model=PyramidNode, status_code=201)
 def create_pyramid_node(
     node_in: PyramidNodeCreate,
@@ -72,21 +139,13 @@ def create_pyramid_node(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    node = crud_pyramid.create(db, obj_in=node_in)
-    
-    # Create automatic initial version
-    from app.crud import version as version_crud
-    from app.schemas.version import VersionCreate
-    
-    version_in = VersionCreate(
-        project_id=node.project_id,
-        pyramid_node_id=node.id,
-        commit_message="Initial version: Created pyramid node",
-        author_email=current_user.email if hasattr(current_user, 'email') else "system",
-        content_snapshot=node.content,
-        metadata_snapshot=None
+    # Node and automatic initial version are written in one transaction
+    [node] = crud_pyramid.create_many(
+        db,
+        objs_in=[node_in],
+        author_email=current_user.email if hasattr(current_user, 'email') else "system"
     )
-    version_crud.create(db, obj_in=version_in)
+    search_service.index_items(db, project_id=node.project_id, items=[(SearchItemType.PYRAMID_NODE, node.id)])
     
     return node
 
@@ -112,7 +171,7 @@ def update_pyramid_node(
     # Update the node
     node = crud_pyramid.update(db, db_obj=node, obj_in=node_in)
     
-    # Create automatic version if content changed
+    # Record an auto-save version if content changed (coalesced with recent auto-saves)
     if node.content != old_content:
         from app.crud import version as version_crud
         from app.schemas.version import VersionCreate
@@ -125,7 +184,52 @@ def update_pyramid_node(
             content_snapshot=node.content,
             metadata_snapshot=None
         )
-        version_crud.create(db, obj_in=version_in)
+        version_crud.create_autosave(db, obj_in=version_in)
+    search_service.index_items(db, project_id=node.project_id, items=[(SearchItemType.PYRAMID_NODE, node.id)])
+    
+    return node
+
+
+@router.post("/reorder")
+def reorder_pyramid_nodes(
+    reorder_in: PyramidReorderRequest,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Place nodes under a parent in the given order, in one transaction."""
+    project = crud_project.get(db, id=reorder_in.project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    try:
+        updated = crud_pyramid.reorder_children(
+            db,
+            project_id=reorder_in.project_id,
+            parent_id=reorder_in.parent_id,
+            node_ids=reorder_in.node_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"updated": updated}
+
+
+@router.post("/nodes/{node_id}/move", response_model=PyramidNodeInDB)
+def move_pyramid_node(
+    node_id: UUID,
+    move_in: PyramidMoveRequest,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Move a node to a position among the children of a parent."""
+    node = crud_pyramid.get(db, id=node_id)
+    if not node:
+        raise HTTPException(status_code=404, detail="Pyramid node not found")
+    
+    try:
+        node = crud_pyramid.move(db, node=node, parent_id=move_in.parent_id, position=move_in.position)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return node
 
@@ -140,7 +244,7 @@ def delete_pyramid_node(
     node = crud_pyramid.get(db, id=node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Pyramid node not found")
-    crud_pyramid.remove(db, id=node_id)
+    crud_pyramid.delete(db, id=node_id)
     return {"status": "deleted"}
 
 
@@ -160,11 +264,22 @@ def generate_pyramid_nodes(
         if not parent_node:
             raise HTTPException(status_code=404, detail="Parent node not found")
         
-        generated_nodes = pyramid_llm_service.generate_children(
+        if parent_node.level >= 2:
+            raise HTTPException(status_code=400, detail="Cannot generate children below the lowest pyramid level")
+        
+        try:
+            generated_nodes = pyramid_llm_service.generate_children(
+                db,
+                parent_node=parent_node,
+                user_id=current_user.id,
+                count=request.count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        search_service.index_items(
             db,
-            parent_node=parent_node,
-            user_id=current_user.id,
-            count=request.count
+            project_id=parent_node.project_id,
+            items=[(SearchItemType.PYRAMID_NODE, node.id) for node in generated_nodes]
         )
         
         return PyramidGenerateResponse(
@@ -190,6 +305,9 @@ def generate_pyramid_nodes(
             project_id=node.project_id,
             user_id=current_user.id
         )
+        search_service.index_items(
+            db, project_id=parent_node.project_id, items=[(SearchItemType.PYRAMID_NODE, parent_node.id)]
+        )
         
         return PyramidGenerateResponse(
             generated_nodes=[parent_node],
@@ -200,6 +318,67 @@ def generate_pyramid_nodes(
         raise HTTPException(status_code=400, detail="Invalid direction")
 
 
+@router.post("/jobs", response_model=PyramidGenerationJob, status_code=201)
+def create_pyramid_generation_job(
+    job_in: PyramidGenerationJobCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Create a job expanding a node down to a target depth (run it with /jobs/{job_id}/run)."""
+    root_node = crud_pyramid.get(db, id=job_in.root_node_id)
+    if not root_node:
+        raise HTTPException(status_code=404, detail="Root node not found")
+    
+    try:
+        job = pyramid_generation_service.create_job(
+            db, job_in=job_in, root_node=root_node, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=PyramidGenerationJob)
+def get_pyramid_generation_job(
+    job_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get the status and progress of a pyramid generation job."""
+    job = crud_pyramid_job.get(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/run")
+def run_pyramid_generation_job(
+    job_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Run or resume a pyramid generation job, streaming progress as NDJSON.
+    
+    Interrupted or failed jobs resume from their last completed level.
+    """
+    job = crud_pyramid_job.get(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    
+    if job.status == PyramidJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Generation job already completed")
+    
+    if not pyramid_generation_service.claim_job(db, job=job):
+        raise HTTPException(status_code=409, detail="Generation job is already running")
+    
+    return StreamingResponse(
+        pyramid_generation_service.stream_job(job.id),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.post("/{node_id}/check-coherence", response_model=PyramidCoherenceCheck)
 def check_pyramid_coherence(
     node_id: UUID,
@@ -211,5 +390,30 @@ def check_pyramid_coherence(
     if not node:
         raise HTTPException(status_code=404, detail="Pyramid node not found")
     
-    coherence_check = pyramid_llm_service.check_coherence(db, node=node, user_id=current_user.id)
+    try:
+        coherence_check = pyramid_llm_service.check_coherence(db, node=node, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     return coherence_check
+
+
+@router.post("/projects/{project_id}/check-coherence", response_model=PyramidProjectCoherence)
+def check_project_pyramid_coherence(
+    project_id: UUID,
+    force: bool = False,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Check the coherence of a whole pyramid.
+    
+    Only nodes whose neighbourhood (node, parent, children) changed since
+    their last check are sent to the LLM; pass force=true to recheck all.
+    """
+    project = crud_project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return pyramid_llm_service.check_project_coherence(
+        db, project_id=project_id, user_id=current_user.id, force=force
+    )
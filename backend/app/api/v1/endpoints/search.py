@@ -0,0 +1,82 @@
+"""
+Search endpoints for full-text search across a project.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+from app.core.deps import get_db, get_current_user
+from app.crud.crud_project import project as project_crud
+from app.models.user import User
+from app.schemas.search import SearchItemType, SearchResult
+from app.services.search_service import search_service
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SearchResult])
+def search_project(
+    project_id: UUID,
+    q: str = Query(..., min_length=1, max_length=500),
+    types: Optional[List[SearchItemType]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    after_rank: Optional[float] = None,
+    after_type: Optional[SearchItemType] = None,
+    after_id: Optional[UUID] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Search the documents, entities and pyramid nodes of a project.
+    
+    The query uses web search syntax (words, "quoted phrases", "or",
+    "-word" to exclude) and the project's language for stemming. Results
+    come best first; fetch the next page by passing the rank, item_type and
+    item_id of the last result as after_rank, after_type and after_id.
+    
+    Args:
+        project_id: Project ID
+        q: Search query
+        types: Item types to search (default: all)
+        limit: Maximum number of results
+        after_rank: Rank of the last result of the previous page
+        after_type: Item type of the last result of the previous page
+        after_id: Item ID of the last result of the previous page
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Results with a highlighted snippet of each item's text
+    
+    Raises:
+        HTTPException: If the cursor is incomplete, or project not found
+            or user doesn't have access
+    """
+    cursor = (after_rank, after_type, after_id)
+    if any(value is None for value in cursor) and any(value is not None for value in cursor):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after_rank, after_type and after_id must be given together"
+        )
+    
+    # Verify project ownership
+    project = project_crud.get(db, id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if project.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return search_service.search(
+        db,
+        project_id=project_id,
+        query=q,
+        item_types=types,
+        limit=limit,
+        after=cursor if after_id is not None else None
+    )
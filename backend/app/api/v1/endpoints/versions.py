@@ -1,60 +1,122 @@
 """
 Version endpoints for Git-like versioning.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core import deps
+from app.core.text_diff import DiffGranularity
+from app.crud import project as crud_project
+from app.crud import project_snapshot as crud_project_snapshot
 from app.crud import version as crud_version
+from app.models.document import Document
+from app.schemas.project_snapshot import ProjectSnapshot, ProjectSnapshotCreate, ProjectSnapshotDiff
+from app.schemas.search import SearchItemType
 from app.schemas.version import (
+    DocumentBlame,
     Version,
     VersionCreate,
     VersionDiff,
-    VersionRestore
+    VersionRestore,
+    VersionSummary
 )
+from app.services.blame_service import blame_service
+from app.services.project_snapshot_service import project_snapshot_service
+from app.services.search_service import search_service
 from app.services.versioning_service import versioning_service
 
 router = APIRouter()
 
 
-@router.get("/projects/{project_id}/versions", response_model=List[Version])
+def _history_cursor(before_created_at: Optional[datetime], before_id: Optional[UUID]):
+    """Build the (created_at, id) cursor of a history page from query parameters."""
+    if (before_created_at is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before_created_at and before_id must be given together")
+    return (before_created_at, before_id) if before_id is not None else None
+
+
+def _check_project_access(db: Session, project_id: UUID, current_user) -> None:
+    """Verify that the project exists and belongs to the current user."""
+    project = crud_project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+
+@router.get("/projects/{project_id}/versions", response_model=List[VersionSummary])
 def get_project_versions(
     project_id: UUID,
-    skip: int = 0,
     limit: int = 100,
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ):
-    """Get all versions for a project."""
-    versions = crud_version.get_by_project(db, project_id=project_id, skip=skip, limit=limit)
+    """
+    Get the version history of a project, newest first, without content.
+    
+    The next page starts after the last version of this one: pass its
+    `created_at` and `id` as `before_created_at` and `before_id`.
+    """
+    versions = crud_version.get_by_project(
+        db, project_id=project_id, before=_history_cursor(before_created_at, before_id), limit=limit
+    )
     return versions
 
 
-@router.get("/documents/{document_id}/versions", response_model=List[Version])
+@router.get("/documents/{document_id}/versions", response_model=List[VersionSummary])
 def get_document_versions(
     document_id: UUID,
-    skip: int = 0,
     limit: int = 100,
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ):
-    """Get all versions for a document."""
-    versions = crud_version.get_by_document(db, document_id=document_id, skip=skip, limit=limit)
+    """Get the version history of a document, newest first, without content."""
+    versions = crud_version.get_by_document(
+        db, document_id=document_id, before=_history_cursor(before_created_at, before_id), limit=limit
+    )
     return versions
 
 
-@router.get("/pyramid/{pyramid_node_id}/versions", response_model=List[Version])
+@router.get("/documents/{document_id}/blame", response_model=DocumentBlame)
+def get_document_blame(
+    document_id: UUID,
+    start: int = Query(0, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Get which version, author and date introduced each part of a character range.
+    
+    Offsets refer to the content of the document's latest version
+    (`version_id` in the response); the whole text is covered by default.
+    """
+    try:
+        return blame_service.blame(db, document_id=document_id, start=start, end=end)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/pyramid/{pyramid_node_id}/versions", response_model=List[VersionSummary])
 def get_pyramid_node_versions(
     pyramid_node_id: UUID,
-    skip: int = 0,
     limit: int = 100,
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ):
-    """Get all versions for a pyramid node."""
-    versions = crud_version.get_by_pyramid_node(db, pyramid_node_id=pyramid_node_id, skip=skip, limit=limit)
+    """Get the version history of a pyramid node, newest first, without content."""
+    versions = crud_version.get_by_pyramid_node(
+        db, pyramid_node_id=pyramid_node_id, before=_history_cursor(before_created_at, before_id), limit=limit
+    )
     return versions
 
 
@@ -86,15 +148,17 @@ def get_version(
 def get_version_diff(
     version_a_id: UUID,
     version_b_id: UUID,
+    granularity: DiffGranularity = Query(DiffGranularity.LINE),
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ):
-    """Get diff between two versions."""
+    """Get diff between two versions, at line, word or character granularity."""
     try:
         diff = versioning_service.get_version_diff(
             db,
             version_a_id=version_a_id,
-            version_b_id=version_b_id
+            version_b_id=version_b_id,
+            granularity=granularity
         )
         return diff
     except ValueError as e:
@@ -118,4 +182,68 @@ def restore_version(
     if not result:
         raise HTTPException(status_code=404, detail="Version not found or restore failed")
     
+    item_type = SearchItemType.DOCUMENT if isinstance(result, Document) else SearchItemType.PYRAMID_NODE
+    search_service.index_items(db, project_id=result.project_id, items=[(item_type, result.id)])
+    
     return {"status": "restored", "entity_id": str(result.id)}
+
+
+@router.post("/projects/{project_id}/snapshots", response_model=ProjectSnapshot)
+def create_project_snapshot(
+    project_id: UUID,
+    snapshot_in: ProjectSnapshotCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Snapshot every document and pyramid node of a project.
+    
+    Only a manifest of content hashes is written; texts the project does
+    not already store are added once as shared blobs.
+    """
+    _check_project_access(db, project_id, current_user)
+    snapshot = project_snapshot_service.create_snapshot(
+        db,
+        project_id=project_id,
+        name=snapshot_in.name,
+        author_email=current_user.email
+    )
+    return snapshot
+
+
+@router.get("/projects/{project_id}/snapshots", response_model=List[ProjectSnapshot])
+def get_project_snapshots(
+    project_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get the snapshots of a project, newest first."""
+    _check_project_access(db, project_id, current_user)
+    snapshots = crud_project_snapshot.get_by_project(db, project_id=project_id, skip=skip, limit=limit)
+    return snapshots
+
+
+@router.post("/snapshots/diff", response_model=ProjectSnapshotDiff)
+def get_snapshot_diff(
+    snapshot_a_id: UUID,
+    snapshot_b_id: UUID,
+    granularity: DiffGranularity = Query(DiffGranularity.WORD),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get the items that differ between two snapshots of a project, with their diffs."""
+    snapshot = crud_project_snapshot.get(db, id=snapshot_a_id)
+    if snapshot:
+        _check_project_access(db, snapshot.project_id, current_user)
+    try:
+        diff = project_snapshot_service.diff_snapshots(
+            db,
+            snapshot_a_id=snapshot_a_id,
+            snapshot_b_id=snapshot_b_id,
+            granularity=granularity
+        )
+        return diff
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,121 @@
+"""
+Compression codecs for large text columns and content blobs.
+
+Compressed values start with a 0xFF byte (which never occurs in UTF-8)
+followed by a codec byte, so compressed and plain UTF-8 values can live in
+the same column and be migrated in the background.
+
+zstd needs the optional `zstandard` package; without it, zlib is used.
+"""
+import logging
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b"\xff"
+CODEC_BYTES = {"zlib": b"z", "zstd": b"s"}
+CODEC_NAMES = {value: key for key, value in CODEC_BYTES.items()}
+
+# Values smaller than this are stored plain (compression would not pay off)
+MIN_COMPRESS_BYTES = 256
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def default_codec() -> str:
+    """Get the STORAGE_COMPRESSION codec."""
+    # Imported here so that loading the models does not require the settings
+    from app.core.config import settings
+    return settings.STORAGE_COMPRESSION
+
+
+def compressed_columns() -> bool:
+    """Check whether the large text columns were converted to compressed storage."""
+    from app.core.config import settings
+    return settings.STORAGE_COMPRESSED_COLUMNS
+
+
+def resolve_codec(codec: Optional[str] = None) -> str:
+    """
+    Resolve the codec to write with.
+    
+    Args:
+        codec: "none", "zlib" or "zstd" (defaults to STORAGE_COMPRESSION)
+    
+    Returns:
+        Usable codec name ("zstd" falls back to "zlib" without zstandard)
+    """
+    codec = (codec or default_codec() or "none").lower()
+    if codec == "zstd" and zstandard is None:
+        return "zlib"
+    return codec if codec in CODEC_BYTES else "none"
+
+
+def compress_bytes(data: bytes, codec: Optional[str] = None, min_size: int = MIN_COMPRESS_BYTES) -> bytes:
+    """
+    Compress bytes with a header identifying the codec.
+    
+    Args:
+        data: Raw bytes
+        codec: Codec name (defaults to STORAGE_COMPRESSION)
+        min_size: Values smaller than this are returned uncompressed
+    
+    Returns:
+        Compressed value, or the raw bytes for "none" and small values
+    """
+    codec = resolve_codec(codec)
+    if codec == "none" or len(data) < min_size:
+        return data
+    if codec == "zstd":
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        body = zlib.compress(data, ZLIB_LEVEL)
+    return MAGIC + CODEC_BYTES[codec] + body
+
+
+def decompress_bytes(value: bytes) -> bytes:
+    """
+    Decompress a value written by compress_bytes (plain values pass through).
+    
+    Args:
+        value: Stored value
+    
+    Returns:
+        Raw bytes
+    
+    Raises:
+        RuntimeError: If the value is zstd-compressed and zstandard is missing
+    """
+    if not is_compressed(value):
+        return value
+    codec = CODEC_NAMES.get(value[1:2])
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed value found but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(value[2:])
+    if codec == "zlib":
+        return zlib.decompress(value[2:])
+    raise ValueError(f"Unknown compression codec byte {value[1:2]!r}")
+
+
+def is_compressed(value: bytes) -> bool:
+    """Check whether a stored value carries a compression header."""
+    return value[:1] == MAGIC
+
+
+def compress_text(text: str, codec: Optional[str] = None) -> bytes:
+    """Encode text as UTF-8 and compress it."""
+    return compress_bytes(text.encode("utf-8"), codec)
+
+
+def decompress_text(value: bytes) -> str:
+    """Decompress a stored value and decode it as UTF-8."""
+    return decompress_bytes(bytes(value)).decode("utf-8")
@@ -24,6 +24,28 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     LLM_MOCK_MODE: bool = True
     
+    # LLM provider (empty = "mock" or "openai" depending on LLM_MOCK_MODE)
+    LLM_PROVIDER: str = ""
+    LLM_MODEL: str = "gpt-4.1-mini"
+    LLM_BASE_URL: Optional[str] = None  # OpenAI-compatible endpoint (self-hosted or stand-in server)
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_CONCURRENCY: int = 4  # Parallel LLM calls per batch job (e.g. pyramid generation)
+    
+    # Versioning
+    VERSION_KEYFRAME_INTERVAL: int = 20  # Full snapshot every N versions, deltas in between
+    VERSION_AUTOSAVE_WINDOW_SECONDS: int = 300  # Auto-saves within this window update one version
+    VERSION_AUTOSAVE_MIN_EDIT_CHARS: int = 200  # Smaller accumulated edits also update it in place
+    VERSION_RETENTION_ALL_HOURS: int = 24  # Keep every version this recent
+    VERSION_RETENTION_HOURLY_DAYS: int = 30  # Then one auto-save per hour up to this age, one per day after
+    DOCUMENT_OPERATION_LOG_SIZE: int = 200  # Revisions per document a stale patch can be rebased across
+    DOCUMENT_IMPORT_MAX_MB: int = 20  # Largest manuscript accepted by POST /documents/import
+    
+    # Storage
+    STORAGE_COMPRESSION: str = "none"  # "none", "zlib" or "zstd" (zlib if zstandard is not installed)
+    STORAGE_COMPRESSED_COLUMNS: bool = False  # Large text columns converted to bytea (compression_service convert)
+    
     # API
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "LiterAI - Literary Writing Assistant"
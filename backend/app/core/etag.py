@@ -0,0 +1,68 @@
+"""
+HTTP entity tag helpers for conditional requests.
+"""
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the parts identifying a representation.
+    
+    Args:
+        parts: Values that change whenever the representation changes
+            (e.g. resource ID and revision counter)
+            
+    Returns:
+        Quoted ETag value
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    Uses weak comparison, as RFC 9110 requires for If-None-Match, and
+    supports lists of tags and "*".
+    
+    Args:
+        if_none_match: Raw If-None-Match header value (may be None)
+        etag: Current ETag of the representation
+        
+    Returns:
+        True if the client's cached representation is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def etag_matches_strong(if_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-Match header against an ETag.
+    
+    Uses strong comparison, as RFC 9110 requires for If-Match: weak tags
+    never match. Supports lists of tags and "*".
+    
+    Args:
+        if_match: Raw If-Match header value (may be None)
+        etag: Current (strong) ETag of the resource
+        
+    Returns:
+        True if the client's representation is the current one
+    """
+    if not if_match:
+        return False
+    if if_match.strip() == "*":
+        return True
+    return any(candidate.strip() == etag for candidate in if_match.split(","))
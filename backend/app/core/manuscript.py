@@ -0,0 +1,131 @@
+"""
+Splitting of imported manuscripts into documents.
+
+A manuscript (Markdown or plain text) is read line by line and cut into
+sections at its headings: Markdown ATX headings ("# Chapitre 3"), or in
+plain text a short line such as "Chapitre 3", "CHAPTER THREE" or
+"Prologue" that does not end like a sentence. With scene splitting, scene
+breaks ("***", "* * *"...) cut sections too. Paragraphs are separated by BLOCK_SEPARATOR, so an
+imported document can be switched to block storage as is.
+
+Only the paragraphs of the current section are held in memory.
+"""
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.core.text_blocks import HEADING, SCENE_BREAK, block_kind, join_blocks
+
+# Longest document title (Document.title)
+TITLE_MAX_LENGTH = 255
+
+# Longest plain-text line taken as a heading
+PLAIN_HEADING_MAX_LENGTH = 80
+
+_PLAIN_HEADING = re.compile(
+    r"^(?:chapitre|chapter|chap\.|capítulo|capitulo|kapitel|capitolo|partie|part|livre|book|"
+    r"prologue|prologo|prólogo|prolog|épilogue|epilogue|epilogo|epílogo|epilog|interlude)\b",
+    re.IGNORECASE
+)
+# A line ending like a sentence is text, not a heading ("Chapter 3 was the hardest.")
+_SENTENCE_END = re.compile(r"[.,;:!?…\"»]$")
+
+# (title, content)
+Section = Tuple[str, str]
+
+
+def heading_title(line: str) -> Optional[str]:
+    """
+    Get the title of a heading line.
+    
+    Args:
+        line: Text line
+    
+    Returns:
+        Title, or None if the line is not a heading
+    """
+    line = line.strip()
+    if block_kind(line) == HEADING:
+        return line.strip("#").strip() or None
+    if len(line) <= PLAIN_HEADING_MAX_LENGTH and _PLAIN_HEADING.match(line) and not _SENTENCE_END.search(line):
+        return line
+    return None
+
+
+def paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Group lines into paragraphs.
+    
+    Heading and scene break lines are paragraphs of their own, even
+    without blank lines around them.
+    
+    Args:
+        lines: Text lines, with or without their line endings
+    
+    Yields:
+        Paragraphs (lines separated by blank lines), trailing spaces removed
+    """
+    current: List[str] = []
+    for line in lines:
+        line = line.rstrip()
+        if line and heading_title(line) is None and block_kind(line) != SCENE_BREAK:
+            current.append(line)
+            continue
+        if current:
+            yield "\n".join(current)
+            current = []
+        if line:
+            yield line
+    if current:
+        yield "\n".join(current)
+
+
+def split_manuscript(lines: Iterable[str], *, title: str, scenes: bool = False) -> Iterator[Section]:
+    """
+    Split a manuscript into sections, as it is read.
+    
+    Consecutive headings without text between them (a part followed by its
+    first chapter) give one section, titled with both. Text before the
+    first heading is titled `title`; headings at the very end are dropped.
+    
+    Args:
+        lines: Text lines of the manuscript
+        title: Title of the text before the first heading
+        scenes: Also split on scene breaks, numbering the scenes of each
+            chapter ("Chapitre 3 (2)"); otherwise scene breaks are kept in
+            the text
+    
+    Yields:
+        (title, content) sections, in order
+    """
+    chapter = title
+    headings: List[str] = []  # Headings since the last section
+    blocks: List[str] = []
+    scene = 0
+    
+    def section() -> Section:
+        section_title = f"{chapter} ({scene})" if scenes and scene else chapter
+        return section_title[:TITLE_MAX_LENGTH], join_blocks(blocks)
+    
+    for paragraph in paragraphs(lines):
+        heading = heading_title(paragraph)
+        if heading is not None:
+            if blocks:
+                yield section()
+                blocks = []
+                headings = []
+            headings.append(heading)
+            chapter = " — ".join(headings)
+            scene = 0
+        elif scenes and block_kind(paragraph) == SCENE_BREAK:
+            if blocks:
+                # Numbered once the chapter turns out to have several scenes
+                scene = scene or 1
+                yield section()
+                blocks = []
+                headings = []
+                scene += 1
+        else:
+            blocks.append(paragraph)
+    
+    if blocks:
+        yield section()
@@ -0,0 +1,124 @@
+"""
+Block structure of long documents.
+
+A document stored as blocks (see DocumentBlock) is the list of its
+paragraphs: its text is the blocks joined with BLOCK_SEPARATOR, and
+splitting a text on BLOCK_SEPARATOR gives its blocks back, so the two
+representations convert exactly. A block therefore never contains the
+separator itself.
+
+Editing one block is expressed as text operations (app.core.text_operations)
+on the whole text, given the block's start offset, so patches made against
+the full text can still be rebased on block edits.
+"""
+import re
+from typing import List, Sequence
+
+from app.core.text_diff import DiffGranularity, diff_segments
+from app.core.text_operations import Operation, operations_from_segments
+
+BLOCK_SEPARATOR = "\n\n"
+
+# Block kinds
+PARAGRAPH = "paragraph"
+HEADING = "heading"
+SCENE_BREAK = "scene_break"
+
+# "***", "* * *", "#", "~~~", "---"...
+_SCENE_BREAK = re.compile(r"^\s*(?:(?:[*#~]\s*){1,5}|-{3,}\s*)$")
+# Markdown ATX heading
+_HEADING = re.compile(r"^\s*#{1,6}\s+\S")
+
+
+def split_blocks(text: str) -> List[str]:
+    """
+    Split a text into blocks.
+    
+    Args:
+        text: Document text
+    
+    Returns:
+        Blocks, in order (none for an empty text)
+    """
+    return text.split(BLOCK_SEPARATOR) if text else []
+
+
+def join_blocks(blocks: Sequence[str]) -> str:
+    """Join blocks back into a document text."""
+    return BLOCK_SEPARATOR.join(blocks)
+
+
+def block_kind(text: str) -> str:
+    """
+    Classify a block.
+    
+    Args:
+        text: Block text
+    
+    Returns:
+        SCENE_BREAK, HEADING or PARAGRAPH
+    """
+    if _SCENE_BREAK.match(text):
+        return SCENE_BREAK
+    if _HEADING.match(text):
+        return HEADING
+    return PARAGRAPH
+
+
+def insert_block_operation(start: int, index: int, count: int, text: str) -> Operation:
+    """
+    Operation inserting a block into the text.
+    
+    Args:
+        start: Offset where the block will start (the lengths of the blocks
+            before it, plus one separator each)
+        index: Index of the new block
+        count: Number of blocks before the insertion
+        text: Block text
+    
+    Returns:
+        Insert operation
+    """
+    if index > 0:
+        return {"op": "insert", "offset": start - len(BLOCK_SEPARATOR), "text": BLOCK_SEPARATOR + text}
+    if count > 0:
+        return {"op": "insert", "offset": 0, "text": text + BLOCK_SEPARATOR}
+    return {"op": "insert", "offset": 0, "text": text}
+
+
+def delete_block_operation(start: int, index: int, count: int, length: int) -> Operation:
+    """
+    Operation deleting a block from the text.
+    
+    Args:
+        start: Offset where the block starts
+        index: Index of the block
+        count: Number of blocks, including the deleted one
+        length: Length of the block
+    
+    Returns:
+        Delete operation
+    """
+    if index > 0:
+        return {"op": "delete", "offset": start - len(BLOCK_SEPARATOR), "length": length + len(BLOCK_SEPARATOR)}
+    if count > 1:
+        return {"op": "delete", "offset": 0, "length": length + len(BLOCK_SEPARATOR)}
+    return {"op": "delete", "offset": 0, "length": length}
+
+
+def update_block_operations(start: int, old: str, new: str) -> List[Operation]:
+    """
+    Operations rewriting a block of the text.
+    
+    Args:
+        start: Offset where the block starts
+        old: Current block text
+        new: New block text
+    
+    Returns:
+        Operations (word diff of the block, shifted to its offset)
+    """
+    operations = operations_from_segments(diff_segments(old, new, DiffGranularity.WORD))
+    for operation in operations:
+        operation["offset"] += start
+    return operations
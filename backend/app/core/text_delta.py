@@ -0,0 +1,131 @@
+"""
+Compact text deltas for version storage.
+
+Texts are split into sentence/line tokens; a delta is a JSON list of
+operations applied to the base text's tokens: `[start, end]` copies base
+tokens start..end-1, and a string inserts literal text. Typical autosave
+edits touch a few sentences, so a delta is a tiny fraction of the text.
+"""
+import json
+import re
+from difflib import SequenceMatcher
+from typing import Iterator, List, Tuple, Union
+
+# A token runs up to and including a sentence end (plus trailing spaces) or a line break
+_TOKEN_RE = re.compile(r"[^.!?\n]*(?:[.!?]+[ \t]*|\n+|$)")
+
+DeltaOp = Union[List[int], str]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into sentence/line tokens that concatenate back to the text.
+    
+    Args:
+        text: Text to split
+    
+    Returns:
+        Non-empty tokens
+    """
+    return [token for token in _TOKEN_RE.findall(text) if token]
+
+
+def _token_opcodes(a: List[str], b: List[str]) -> Iterator[Tuple[str, int, int, int, int]]:
+    """
+    Match two token lists, yielding difflib-style opcodes with absolute indices.
+    
+    Edits are usually local, so the common prefix and suffix are trimmed
+    before running the matcher on the middle.
+    """
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < len(a) - prefix and suffix < len(b) - prefix
+        and a[len(a) - 1 - suffix] == b[len(b) - 1 - suffix]
+    ):
+        suffix += 1
+    
+    if prefix:
+        yield "equal", 0, prefix, 0, prefix
+    matcher = SequenceMatcher(None, a[prefix:len(a) - suffix], b[prefix:len(b) - suffix])
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        yield tag, prefix + i1, prefix + i2, prefix + j1, prefix + j2
+    if suffix:
+        yield "equal", len(a) - suffix, len(a), len(b) - suffix, len(b)
+
+
+def make_delta(base: str, target: str) -> str:
+    """
+    Encode the target text as a delta against the base text.
+    
+    Args:
+        base: Base text
+        target: Text to encode
+    
+    Returns:
+        JSON-encoded list of operations
+    """
+    a = tokenize(base)
+    b = tokenize(target)
+    
+    ops: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in _token_opcodes(a, b):
+        if tag == "equal":
+            if ops and isinstance(ops[-1], list) and ops[-1][1] == i1:
+                ops[-1][1] = i2
+            else:
+                ops.append([i1, i2])
+        elif j2 > j1:
+            text = "".join(b[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += text
+            else:
+                ops.append(text)
+    
+    return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+
+def edit_size(base: str, target: str) -> int:
+    """
+    Measure how much a text changed, in characters.
+    
+    Counts the characters of removed and inserted tokens, so it is an
+    upper bound of the character edit distance that is cheap to compute.
+    
+    Args:
+        base: Original text
+        target: Edited text
+    
+    Returns:
+        Number of characters removed plus inserted
+    """
+    a = tokenize(base)
+    b = tokenize(target)
+    return sum(
+        sum(len(token) for token in a[i1:i2]) + sum(len(token) for token in b[j1:j2])
+        for tag, i1, i2, j1, j2 in _token_opcodes(a, b)
+        if tag != "equal"
+    )
+
+
+def apply_delta(base: str, delta: str) -> str:
+    """
+    Rebuild a text from its base text and a delta.
+    
+    Args:
+        base: Base text the delta was made against
+        delta: JSON-encoded operations from make_delta
+    
+    Returns:
+        Reconstructed text
+    """
+    tokens = tokenize(base)
+    parts: List[str] = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(tokens[op[0]:op[1]])
+    return "".join(parts)
@@ -0,0 +1,465 @@
+"""
+Myers diff for version comparison at line, word and character granularity.
+
+Texts are first compared line by line; changed line regions are then
+compared word by word, and changed word regions character by character,
+so each pass runs on small inputs. Matching uses Myers' O(ND) algorithm
+in linear space (middle-snake bisection), after trimming the common prefix
+and suffix. Regions whose edit cost exceeds DIFF_MAX_COST are reported as
+replaced instead of matched, which bounds the worst case.
+"""
+import enum
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class DiffGranularity(str, enum.Enum):
+    """Enum for diff granularities."""
+    LINE = "line"
+    WORD = "word"
+    CHAR = "char"
+
+
+# Words, runs of whitespace and single punctuation marks
+_WORD_RE = re.compile(r"\w+|\s+|[^\w\s]", re.UNICODE)
+
+# Unchanged units shown around each change (lines, words or characters)
+DIFF_CONTEXT = {
+    DiffGranularity.LINE: 3,
+    DiffGranularity.WORD: 8,
+    DiffGranularity.CHAR: 20,
+}
+
+# Share of a replaced word region that must be unchanged to show character edits
+CHAR_MIN_SIMILARITY = 0.5
+
+# Upper bound of D * (N + M) for one bisection before giving up matching
+DIFF_MAX_COST = 20_000_000
+
+# (op, text) with op "equal", "delete" or "insert"
+Segment = Tuple[str, str]
+
+
+def tokenize(text: str, granularity: DiffGranularity) -> List[str]:
+    """
+    Split text into diff units that concatenate back to the text.
+    
+    Args:
+        text: Text to split
+        granularity: Lines, words (words, whitespace runs and punctuation
+            marks) or characters
+    
+    Returns:
+        Tokens
+    """
+    if granularity == DiffGranularity.LINE:
+        return text.splitlines(keepends=True)
+    if granularity == DiffGranularity.WORD:
+        return _WORD_RE.findall(text)
+    return list(text)
+
+
+def _bisect(a: Sequence[int], b: Sequence[int]) -> Optional[Tuple[int, int]]:
+    """
+    Find the middle snake of the shortest edit script between a and b.
+    
+    Runs the forward and reverse Myers searches until they overlap.
+    
+    Returns:
+        Split point (x, y), or None if the cost limit is reached
+    """
+    n, m = len(a), len(b)
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    v1 = [-1] * (2 * max_d + 2)
+    v2 = [-1] * (2 * max_d + 2)
+    v1[offset + 1] = 0
+    v2[offset + 1] = 0
+    delta = n - m
+    # Odd delta: the forward search detects the overlap, otherwise the reverse one
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+    
+    for d in range(max_d):
+        if d * (n + m) > DIFF_MAX_COST:
+            return None
+        
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[x1] == b[y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < len(v2) and v2[k2_offset] != -1 and x1 >= n - v2[k2_offset]:
+                    return x1, y1
+        
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[n - x2 - 1] == b[m - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < len(v1) and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, offset + x1 - k1_offset
+    return None
+
+
+def diff_tokens(a: Sequence[str], b: Sequence[str]) -> List[Tuple[str, int, int, int, int]]:
+    """
+    Compute a shortest edit script between two token lists.
+    
+    Args:
+        a: Original tokens
+        b: New tokens
+    
+    Returns:
+        Opcodes (tag, i1, i2, j1, j2) in order, with tag "equal", "delete"
+        or "insert"; adjacent opcodes never share a tag
+    """
+    # Compare small integers instead of strings
+    ids: Dict[str, int] = {}
+    a_ids = [ids.setdefault(token, len(ids)) for token in a]
+    b_ids = [ids.setdefault(token, len(ids)) for token in b]
+    
+    opcodes: List[Tuple[str, int, int, int, int]] = []
+    
+    def emit(tag: str, i1: int, i2: int, j1: int, j2: int) -> None:
+        if i1 == i2 and j1 == j2:
+            return
+        if opcodes and opcodes[-1][0] == tag:
+            previous = opcodes.pop()
+            i1, j1 = previous[1], previous[3]
+        opcodes.append((tag, i1, i2, j1, j2))
+    
+    # Regions still to compare; the last one pushed is the leftmost, so
+    # opcodes are emitted in order without recursion
+    stack = [(0, len(a_ids), 0, len(b_ids))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        
+        prefix = 0
+        while a_lo + prefix < a_hi and b_lo + prefix < b_hi and a_ids[a_lo + prefix] == b_ids[b_lo + prefix]:
+            prefix += 1
+        suffix = 0
+        while (
+            a_hi - suffix > a_lo + prefix and b_hi - suffix > b_lo + prefix
+            and a_ids[a_hi - 1 - suffix] == b_ids[b_hi - 1 - suffix]
+        ):
+            suffix += 1
+        
+        emit("equal", a_lo, a_lo + prefix, b_lo, b_lo + prefix)
+        a_mid_lo, a_mid_hi = a_lo + prefix, a_hi - suffix
+        b_mid_lo, b_mid_hi = b_lo + prefix, b_hi - suffix
+        
+        split = None
+        if a_mid_lo < a_mid_hi and b_mid_lo < b_mid_hi:
+            split = _bisect(a_ids[a_mid_lo:a_mid_hi], b_ids[b_mid_lo:b_mid_hi])
+        
+        if split is None:
+            emit("delete", a_mid_lo, a_mid_hi, b_mid_lo, b_mid_lo)
+            emit("insert", a_mid_hi, a_mid_hi, b_mid_lo, b_mid_hi)
+            emit("equal", a_mid_hi, a_hi, b_mid_hi, b_hi)
+        else:
+            x, y = split
+            if suffix:
+                stack.append((a_mid_hi, a_hi, b_mid_hi, b_hi))
+            stack.append((a_mid_lo + x, a_mid_hi, b_mid_lo + y, b_mid_hi))
+            stack.append((a_mid_lo, a_mid_lo + x, b_mid_lo, b_mid_lo + y))
+    
+    return opcodes
+
+
+def _append(segments: List[Segment], op: str, text: str) -> None:
+    """Append a segment, merging it with the previous one if they share an op."""
+    if not text:
+        return
+    if segments and segments[-1][0] == op:
+        segments[-1] = (op, segments[-1][1] + text)
+    else:
+        segments.append((op, text))
+
+
+def _normalize(segments: List[Segment]) -> List[Segment]:
+    """Merge each run of changes between unchanged text into one delete and one insert."""
+    normalized: List[Segment] = []
+    deleted: List[str] = []
+    inserted: List[str] = []
+    for op, text in segments + [("equal", "")]:
+        if op == "delete":
+            deleted.append(text)
+        elif op == "insert":
+            inserted.append(text)
+        else:
+            _append(normalized, "delete", "".join(deleted))
+            _append(normalized, "insert", "".join(inserted))
+            _append(normalized, op, text)
+            deleted, inserted = [], []
+    return normalized
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix of two strings (binary search on slices)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str) -> int:
+    """Length of the common suffix of two strings (binary search on slices)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _diff_segments(a: str, b: str, granularity: DiffGranularity) -> List[Segment]:
+    """Diff two texts at one granularity, without refinement."""
+    # Unchanged head and tail are cut off before tokenizing; the tokens
+    # touching the cut may be partial, so they are kept in the middle
+    prefix = _common_prefix(a, b)
+    suffix = _common_suffix(a[prefix:], b[prefix:])
+    head = "".join(tokenize(a[:prefix], granularity)[:-1])
+    tail = "".join(tokenize(a[len(a) - suffix:], granularity)[1:])
+    
+    a_tokens = tokenize(a[len(head):len(a) - len(tail)], granularity)
+    b_tokens = tokenize(b[len(head):len(b) - len(tail)], granularity)
+    segments: List[Segment] = []
+    _append(segments, "equal", head)
+    for tag, i1, i2, j1, j2 in diff_tokens(a_tokens, b_tokens):
+        if tag == "insert":
+            _append(segments, tag, "".join(b_tokens[j1:j2]))
+        else:
+            _append(segments, tag, "".join(a_tokens[i1:i2]))
+    _append(segments, "equal", tail)
+    return _normalize(segments)
+
+
+def _refine(segments: List[Segment], granularity: DiffGranularity, min_similarity: float = 0.0) -> List[Segment]:
+    """
+    Re-diff each replaced region (a delete next to an insert) at a finer granularity.
+    
+    A refinement is kept only if the unchanged part makes up at least
+    `min_similarity` of the longer side, so unrelated words are shown as
+    replaced rather than as scattered single-character matches.
+    """
+    refined: List[Segment] = []
+    i = 0
+    while i < len(segments):
+        op, text = segments[i]
+        if op == "delete" and i + 1 < len(segments) and segments[i + 1][0] == "insert":
+            inserted = segments[i + 1][1]
+            finer = _diff_segments(text, inserted, granularity)
+            unchanged = sum(len(part) for part_op, part in finer if part_op == "equal")
+            if unchanged < min_similarity * max(len(text), len(inserted)):
+                finer = segments[i:i + 2]
+            for segment in finer:
+                _append(refined, *segment)
+            i += 2
+        else:
+            _append(refined, op, text)
+            i += 1
+    return refined
+
+
+def diff_segments(a: str, b: str, granularity: DiffGranularity = DiffGranularity.LINE) -> List[Segment]:
+    """
+    Diff two texts.
+    
+    Args:
+        a: Original text
+        b: New text
+        granularity: Smallest unit of change
+    
+    Returns:
+        Segments (op, text) that rebuild `a` from the "equal" and "delete"
+        segments and `b` from the "equal" and "insert" segments
+    """
+    segments = _diff_segments(a, b, DiffGranularity.LINE)
+    if granularity in (DiffGranularity.WORD, DiffGranularity.CHAR):
+        segments = _refine(segments, DiffGranularity.WORD)
+    if granularity == DiffGranularity.CHAR:
+        segments = _refine(segments, DiffGranularity.CHAR, min_similarity=CHAR_MIN_SIMILARITY)
+    return segments
+
+
+def count_units(text: str, granularity: DiffGranularity) -> int:
+    """
+    Count the units of a text (lines, words and punctuation marks, or characters).
+    
+    Args:
+        text: Text
+        granularity: Unit to count
+    
+    Returns:
+        Number of units
+    """
+    if granularity == DiffGranularity.LINE:
+        return len(text.splitlines())
+    if granularity == DiffGranularity.WORD:
+        return sum(1 for token in _WORD_RE.findall(text) if not token.isspace())
+    return len(text)
+
+
+def word_changes(a: str, b: str, segments: Optional[List[Segment]] = None) -> Tuple[int, int]:
+    """
+    Count the words added and removed between two texts.
+    
+    Args:
+        a: Original text
+        b: New text
+        segments: Word diff segments from a to b, if already computed
+    
+    Returns:
+        (words added, words removed), punctuation marks counting as words
+    """
+    if segments is None:
+        segments = diff_segments(a, b, DiffGranularity.WORD)
+    added = sum(count_units(text, DiffGranularity.WORD) for op, text in segments if op == "insert")
+    removed = sum(count_units(text, DiffGranularity.WORD) for op, text in segments if op == "delete")
+    return added, removed
+
+
+def _context(tokens: List[str], size: int, leading: bool) -> str:
+    """Join the first (leading) or last `size` tokens of an unchanged text."""
+    if size <= 0:
+        return ""
+    return "".join(tokens[:size] if leading else tokens[-size:])
+
+
+def build_hunks(
+    segments: List[Segment], granularity: DiffGranularity, context: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Group changed segments into hunks with surrounding context.
+    
+    Changes separated by at most twice the context share a hunk.
+    
+    Args:
+        segments: Segments from diff_segments
+        granularity: Granularity the segments were computed at
+        context: Unchanged units kept around changes (defaults per granularity)
+    
+    Returns:
+        Hunks with 1-based start lines (`a_start`, `b_start`), numbers of
+        lines spanned (`a_lines`, `b_lines`) and their segments
+    """
+    if context is None:
+        context = DIFF_CONTEXT[granularity]
+    
+    hunks: List[Dict[str, Any]] = []
+    current: Optional[List[Segment]] = None
+    a_line = b_line = 1
+    
+    for index, (op, text) in enumerate(segments):
+        if op == "equal":
+            if current is not None:
+                tokens = tokenize(text, granularity)
+                if index < len(segments) - 1 and len(tokens) <= 2 * context:
+                    _append(current, op, text)
+                else:
+                    _append(current, op, _context(tokens, context, leading=True))
+                    current = None
+            a_line += text.count("\n")
+            b_line += text.count("\n")
+            continue
+        
+        if current is None:
+            lead = ""
+            if index > 0:
+                lead = _context(tokenize(segments[index - 1][1], granularity), context, leading=False)
+            current = []
+            _append(current, "equal", lead)
+            hunks.append({
+                "a_start": a_line - lead.count("\n"),
+                "b_start": b_line - lead.count("\n"),
+                "segments": current,
+            })
+        _append(current, op, text)
+        if op == "delete":
+            a_line += text.count("\n")
+        else:
+            b_line += text.count("\n")
+    
+    for hunk in hunks:
+        a_text = "".join(text for op, text in hunk["segments"] if op != "insert")
+        b_text = "".join(text for op, text in hunk["segments"] if op != "delete")
+        hunk["a_lines"] = len(a_text.splitlines())
+        hunk["b_lines"] = len(b_text.splitlines())
+        hunk["segments"] = [{"op": op, "text": text} for op, text in hunk["segments"]]
+    return hunks
+
+
+def render_hunks(
+    hunks: List[Dict[str, Any]], granularity: DiffGranularity, from_label: str, to_label: str
+) -> str:
+    """
+    Render hunks as text.
+    
+    Line diffs use the unified format; word and character diffs mark
+    changes inline as `[-deleted-]{+inserted+}` under each hunk header.
+    
+    Args:
+        hunks: Hunks from build_hunks
+        granularity: Granularity the hunks were computed at
+        from_label: Name of the original text
+        to_label: Name of the new text
+    
+    Returns:
+        Diff text (empty if there are no changes)
+    """
+    if not hunks:
+        return ""
+    
+    lines = [f"--- {from_label}\n", f"+++ {to_label}\n"]
+    for hunk in hunks:
+        # Unified format: an empty range starts at the line before it
+        a_start = hunk["a_start"] if hunk["a_lines"] else hunk["a_start"] - 1
+        b_start = hunk["b_start"] if hunk["b_lines"] else hunk["b_start"] - 1
+        lines.append(f"@@ -{a_start},{hunk['a_lines']} +{b_start},{hunk['b_lines']} @@\n")
+        
+        if granularity == DiffGranularity.LINE:
+            prefixes = {"equal": " ", "delete": "-", "insert": "+"}
+            for segment in hunk["segments"]:
+                for line in segment["text"].splitlines(keepends=True):
+                    lines.append(prefixes[segment["op"]] + (line if line.endswith("\n") else line + "\n"))
+        else:
+            markers = {"equal": ("", ""), "delete": ("[-", "-]"), "insert": ("{+", "+}")}
+            text = "".join(
+                markers[segment["op"]][0] + segment["text"] + markers[segment["op"]][1]
+                for segment in hunk["segments"]
+            )
+            lines.append(text if text.endswith("\n") else text + "\n")
+    return "".join(lines)
@@ -0,0 +1,159 @@
+"""
+Positional text operations for patch-based document updates.
+
+An operation is `{"op": "insert", "offset": int, "text": str}` or
+`{"op": "delete", "offset": int, "length": int}`; a list of operations
+applies in order, each to the result of the previous one. Offsets count
+Unicode code points.
+
+Operations made concurrently against the same text are rebased on each
+other with operational transformation: inserts at the same offset put the
+server's text first, overlapping deletes are merged, and an insert inside
+a concurrently deleted range is a conflict.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.text_diff import Segment
+
+Operation = Dict[str, Any]
+
+
+class OperationConflict(ValueError):
+    """Raised when concurrent operations cannot be rebased on each other."""
+
+
+def _insert(offset: int, text: str) -> Operation:
+    return {"op": "insert", "offset": offset, "text": text}
+
+
+def _delete(offset: int, length: int) -> Operation:
+    return {"op": "delete", "offset": offset, "length": length}
+
+
+def apply_operations(text: str, operations: Sequence[Operation]) -> str:
+    """
+    Apply operations to a text.
+    
+    Args:
+        text: Original text
+        operations: Operations, in order
+    
+    Returns:
+        Edited text
+    
+    Raises:
+        ValueError: If an operation falls outside the text
+    """
+    result = text
+    for operation in operations:
+        offset = operation["offset"]
+        if operation["op"] == "insert":
+            if offset > len(result):
+                raise ValueError(f"Insert offset {offset} is past the end of the text ({len(result)})")
+            result = result[:offset] + operation["text"] + result[offset:]
+        else:
+            end = offset + operation["length"]
+            if end > len(result):
+                raise ValueError(f"Delete range {offset}-{end} is past the end of the text ({len(result)})")
+            result = result[:offset] + result[end:]
+    return result
+
+
+def operations_from_segments(segments: Sequence[Segment]) -> List[Operation]:
+    """
+    Convert diff segments (see app.core.text_diff) to operations.
+    
+    Args:
+        segments: (op, text) segments from the old text to the new one
+    
+    Returns:
+        Operations turning the old text into the new one
+    """
+    operations: List[Operation] = []
+    offset = 0
+    for op, text in segments:
+        if op == "equal":
+            offset += len(text)
+        elif op == "delete":
+            operations.append(_delete(offset, len(text)))
+        else:
+            operations.append(_insert(offset, text))
+            offset += len(text)
+    return operations
+
+
+def _transform(a: Operation, b: Operation) -> Tuple[Optional[Operation], Optional[Operation]]:
+    """
+    Transform two operations made against the same text.
+    
+    Returns:
+        (a applicable after b, b applicable after a); None for an operation
+        that became a no-op. On equal insert offsets, b goes first.
+    
+    Raises:
+        OperationConflict: If an insert falls strictly inside a range the other deletes
+    """
+    p, q = a["offset"], b["offset"]
+    if a["op"] == "insert" and b["op"] == "insert":
+        if p < q:
+            return a, _insert(q + len(a["text"]), b["text"])
+        return _insert(p + len(b["text"]), a["text"]), b
+    
+    if a["op"] == "insert":
+        m = b["length"]
+        if p <= q:
+            return a, _delete(q + len(a["text"]), m)
+        if p >= q + m:
+            return _insert(p - m, a["text"]), b
+        raise OperationConflict(f"Insert at {p} falls inside a concurrent deletion of {q}-{q + m}")
+    
+    if b["op"] == "insert":
+        b_after_a, a_after_b = _transform(b, a)
+        return a_after_b, b_after_a
+    
+    l, m = a["length"], b["length"]
+    if p + l <= q:
+        return a, _delete(q - l, m)
+    if q + m <= p:
+        return _delete(p - m, l), b
+    # Overlapping deletions: each only deletes what the other did not
+    overlap = min(p + l, q + m) - max(p, q)
+    start = min(p, q)
+    return (
+        _delete(start, l - overlap) if l > overlap else None,
+        _delete(start, m - overlap) if m > overlap else None
+    )
+
+
+def rebase(
+    operations: Sequence[Operation], concurrent: Sequence[Operation]
+) -> Tuple[List[Operation], List[Operation]]:
+    """
+    Rebase operations on concurrent operations made against the same text.
+    
+    Args:
+        operations: Operations to rebase (the client's)
+        concurrent: Operations already applied (the server's)
+    
+    Returns:
+        (operations applicable after `concurrent`, `concurrent` applicable
+        after `operations`)
+    
+    Raises:
+        OperationConflict: If the two edit the same passage incompatibly
+    """
+    rebased = list(operations)
+    transformed: List[Operation] = []
+    for other in concurrent:
+        moved: List[Operation] = []
+        for operation in rebased:
+            if other is None:
+                moved.append(operation)
+                continue
+            operation, other = _transform(operation, other)
+            if operation is not None:
+                moved.append(operation)
+        rebased = moved
+        if other is not None:
+            transformed.append(other)
+    return rebased, transformed
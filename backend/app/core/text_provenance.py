@@ -0,0 +1,126 @@
+"""
+Character provenance of a text across its versions.
+
+Provenance is a list of runs `[length, origin]`: consecutive characters
+introduced by the same origin (an index into a list of versions). A new
+version is applied with the diff segments from the previous text: equal
+text keeps its origins, deleted text drops them and inserted text takes
+the new version's origin. Runs are stored as `[end offset, origin]` so a
+character range is found by bisection.
+"""
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+from app.core.text_diff import Segment
+
+# [length, origin index]
+Run = List[int]
+
+
+def advance(runs: Sequence[Run], segments: Sequence[Segment], origin: int) -> List[Run]:
+    """
+    Carry the provenance of a text over to its next version.
+    
+    Args:
+        runs: Runs of the previous text
+        segments: Diff segments from the previous text to the new one
+        origin: Origin index of the new version
+    
+    Returns:
+        Runs of the new text, adjacent runs of the same origin merged
+    
+    Raises:
+        ValueError: If the segments do not match the runs' length
+    """
+    result: List[Run] = []
+    
+    def emit(length: int, run_origin: int) -> None:
+        if length <= 0:
+            return
+        if result and result[-1][1] == run_origin:
+            result[-1][0] += length
+        else:
+            result.append([length, run_origin])
+    
+    index = 0
+    offset = 0  # Characters of runs[index] already consumed
+    for op, text in segments:
+        if op == "insert":
+            emit(len(text), origin)
+            continue
+        remaining = len(text)
+        while remaining:
+            if index >= len(runs):
+                raise ValueError("Diff segments do not match the provenance runs")
+            length, run_origin = runs[index]
+            take = min(remaining, length - offset)
+            if op == "equal":
+                emit(take, run_origin)
+            remaining -= take
+            offset += take
+            if offset == length:
+                index += 1
+                offset = 0
+    
+    if index < len(runs):
+        raise ValueError("Diff segments do not match the provenance runs")
+    return result
+
+
+def compact(runs: Sequence[Run], origins: Sequence) -> Tuple[List[Run], list]:
+    """
+    Drop the origins no run references any more and renumber the runs.
+    
+    Args:
+        runs: Runs
+        origins: Origins indexed by the runs
+    
+    Returns:
+        (runs, origins), origins kept in their original order
+    """
+    used = sorted({run_origin for _, run_origin in runs})
+    renumber = {old: new for new, old in enumerate(used)}
+    return [[length, renumber[run_origin]] for length, run_origin in runs], [origins[old] for old in used]
+
+
+def to_ends(runs: Sequence[Run]) -> List[Run]:
+    """Convert runs to `[end offset, origin]` pairs."""
+    ends: List[Run] = []
+    end = 0
+    for length, run_origin in runs:
+        end += length
+        ends.append([end, run_origin])
+    return ends
+
+
+def from_ends(ends: Sequence[Run]) -> List[Run]:
+    """Convert `[end offset, origin]` pairs back to runs."""
+    runs: List[Run] = []
+    start = 0
+    for end, run_origin in ends:
+        runs.append([end - start, run_origin])
+        start = end
+    return runs
+
+
+def spans_in_range(ends: Sequence[Run], start: int, end: int) -> List[Tuple[int, int, int]]:
+    """
+    Find the provenance of a character range.
+    
+    Args:
+        ends: `[end offset, origin]` pairs
+        start: First character offset
+        end: Offset after the last character
+    
+    Returns:
+        (start, end, origin) spans covering the range, clipped to it
+    """
+    spans: List[Tuple[int, int, int]] = []
+    index = bisect_right(ends, start, key=lambda pair: pair[0])
+    span_start = ends[index - 1][0] if index else 0
+    while index < len(ends) and span_start < end:
+        run_end, run_origin = ends[index]
+        spans.append((max(span_start, start), min(run_end, end), run_origin))
+        span_start = run_end
+        index += 1
+    return spans
@@ -0,0 +1,246 @@
+"""
+Text search helpers shared by the PostgreSQL and in-process search backends.
+
+PostgreSQL ranks matches with tsvector indexes (see search_service); this
+module maps project languages to text search configurations, highlights
+snippets of the matched texts and provides InvertedIndex, an in-process
+fallback for databases without full-text search.
+
+Without a stemmer, a query term matches the words starting with its
+first letters (minus a short inflection), after case and accent folding:
+"pluie" matches "Pluie" and "pluies", "letters" matches "letter". Terms
+of four letters or less match whole words only.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Project language (ISO 639-1) -> PostgreSQL text search configuration
+SEARCH_CONFIGS = {
+    "da": "danish",
+    "de": "german",
+    "en": "english",
+    "es": "spanish",
+    "fi": "finnish",
+    "fr": "french",
+    "hu": "hungarian",
+    "it": "italian",
+    "nl": "dutch",
+    "no": "norwegian",
+    "pt": "portuguese",
+    "ro": "romanian",
+    "ru": "russian",
+    "sv": "swedish",
+    "tr": "turkish",
+}
+DEFAULT_SEARCH_CONFIG = "simple"
+
+# Characters of context kept around the first match of a snippet
+SNIPPET_SIZE = 160
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# (start, end) character offsets
+Span = Tuple[int, int]
+
+
+def search_config(language: Optional[str]) -> str:
+    """
+    Find the text search configuration of a project language.
+    
+    Args:
+        language: Language code ("fr", "en-GB"...)
+    
+    Returns:
+        PostgreSQL configuration name ("simple" for unknown languages)
+    """
+    code = re.split(r"[-_]", (language or "").lower())[0]
+    return SEARCH_CONFIGS.get(code, DEFAULT_SEARCH_CONFIG)
+
+
+def fold(word: str) -> str:
+    """Lowercase a word and strip its accents."""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def term_prefix(term: str) -> str:
+    """
+    Prefix a word must start with to match a (folded) query term.
+    
+    Terms of four letters or less are matched whole; longer ones drop
+    their last letter, or last two from seven letters, the usual
+    inflections ("pluies", "chantait").
+    """
+    if len(term) <= 4:
+        return term
+    return term[:len(term) - (2 if len(term) >= 7 else 1)]
+
+
+def matches(word: str, term: str) -> bool:
+    """Check whether a (folded) word matches a (folded) query term."""
+    if len(term) <= 4:
+        return word == term
+    return word.startswith(term_prefix(term)) and len(word) <= len(term) + 4
+
+
+def query_terms(query: str) -> Tuple[List[str], List[str]]:
+    """
+    Parse a search query (web search syntax: words, "-word" to exclude).
+    
+    Args:
+        query: Search query
+    
+    Returns:
+        (required terms, excluded terms), folded
+    """
+    required: List[str] = []
+    excluded: List[str] = []
+    for match in re.finditer(r"(-?)(\w+)", query, re.UNICODE):
+        term = fold(match.group(2))
+        if term == "or":
+            continue
+        negated = match.group(1) and (match.start() == 0 or query[match.start() - 1].isspace())
+        target = excluded if negated else required
+        if term not in target:
+            target.append(term)
+    return required, excluded
+
+
+def snippet(text: str, terms: Sequence[str], size: int = SNIPPET_SIZE) -> Tuple[str, List[Span]]:
+    """
+    Cut the passage of a text around its first match, with the matched words.
+    
+    Args:
+        text: Text
+        terms: Folded query terms (see query_terms)
+        size: Approximate snippet length in characters
+    
+    Returns:
+        (snippet, (start, end) offsets of the matched words in the snippet);
+        the start of the text without highlights if nothing matches
+    """
+    def is_hit(word: str) -> bool:
+        word = fold(word)
+        return any(matches(word, term) for term in terms)
+    
+    first = next((match for match in _WORD.finditer(text) if is_hit(match.group())), None)
+    if first is None:
+        return text[:size].strip(), []
+    
+    # From a word boundary a third of the snippet before the first match
+    start = first.start()
+    if start > size // 3:
+        boundary = _WORD.search(text, first.start() - size // 3)
+        start = boundary.start() if boundary else start
+    else:
+        start = 0
+    end = min(len(text), start + size)
+    words = list(_WORD.finditer(text, start, end))
+    if end < len(text) and words and words[-1].end() == end:
+        # Do not cut the last word
+        words.pop()
+        end = words[-1].end() if words else end
+    highlights = [(match.start() - start, match.end() - start) for match in words if is_hit(match.group())]
+    return text[start:end], highlights
+
+
+class InvertedIndex:
+    """
+    In-process full-text index, for databases without full-text search.
+    
+    Items are ranked with BM25 over their body, title words counting
+    TITLE_WEIGHT times. Results are ordered by decreasing score, then key,
+    and paged by passing the last (score, key) as `after`.
+    """
+    
+    TITLE_WEIGHT = 3
+    K1 = 1.2
+    B = 0.75
+    
+    def __init__(self) -> None:
+        # word -> key -> weighted count
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)
+        self._lengths: Dict[Hashable, int] = {}
+        self._vocabulary: Optional[List[str]] = None
+    
+    def add(self, key: Hashable, title: str, body: str) -> None:
+        """
+        Index an item.
+        
+        Args:
+            key: Item key (sortable, e.g. (item type, ID))
+            title: Title
+            body: Text
+        """
+        counts: Dict[str, float] = defaultdict(float)
+        for weight, text in ((self.TITLE_WEIGHT, title or ""), (1, body or "")):
+            for match in _WORD.finditer(text):
+                counts[fold(match.group())] += weight
+        for word, count in counts.items():
+            self._postings[word][key] = count
+        self._lengths[key] = int(sum(counts.values()))
+        self._vocabulary = None
+    
+    def __len__(self) -> int:
+        return len(self._lengths)
+    
+    def _matching(self, term: str) -> Dict[Hashable, float]:
+        """Weighted counts of the words matching a term, by key."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        prefix = term_prefix(term)
+        found: Dict[Hashable, float] = defaultdict(float)
+        for index in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            word = self._vocabulary[index]
+            if not word.startswith(prefix):
+                break
+            if matches(word, term):
+                for key, count in self._postings[word].items():
+                    found[key] += count
+        return found
+    
+    def search(
+        self, query: str, *, limit: int = 20, after: Optional[Tuple[float, Hashable]] = None
+    ) -> List[Tuple[float, Hashable]]:
+        """
+        Find the items matching every term of a query.
+        
+        Args:
+            query: Search query (see query_terms)
+            limit: Maximum number of results
+            after: (score, key) of the last result of the previous page
+        
+        Returns:
+            (score, key) pairs, best first
+        """
+        required, excluded = query_terms(query)
+        if not required or not self._lengths:
+            return []
+        
+        total = len(self._lengths)
+        average = sum(self._lengths.values()) / total or 1
+        scores: Optional[Dict[Hashable, float]] = None
+        for term in required:
+            found = self._matching(term)
+            idf = math.log(1 + (total - len(found) + 0.5) / (len(found) + 0.5))
+            term_scores = {
+                key: idf * count * (self.K1 + 1)
+                / (count + self.K1 * (1 - self.B + self.B * self._lengths[key] / average))
+                for key, count in found.items()
+            }
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+        for term in excluded:
+            for key in self._matching(term):
+                scores.pop(key, None)
+        
+        ranked = sorted(((round(score, 6), key) for key, score in scores.items()), key=lambda hit: (-hit[0], hit[1]))
+        if after is not None:
+            ranked = [hit for hit in ranked if (-hit[0], hit[1]) > (-after[0], after[1])]
+        return ranked[:limit]
@@ -7,7 +7,12 @@ from app.crud.crud_arc import arc
 from app.crud.crud_timeline import timeline_event
 from app.crud.crud_tag_instance import tag_instance
 from app.crud.crud_pyramid import pyramid_node
+from app.crud.crud_pyramid_generation_job import pyramid_generation_job
+from app.crud.crud_pyramid_coherence import pyramid_coherence_result
 from app.crud.crud_version import version
+from app.crud.crud_content_blob import content_blob
+from app.crud.crud_project_snapshot import project_snapshot
+from app.crud.crud_document_provenance import document_provenance
 from app.crud.crud_semantic_tag import tag, entity_resolution
 
 __all__ = [
@@ -19,7 +24,12 @@ __all__ = [
     "timeline_event",
     "tag_instance",
     "pyramid_node",
+    "pyramid_generation_job",
+    "pyramid_coherence_result",
     "version",
+    "content_blob",
+    "project_snapshot",
+    "document_provenance",
     "tag",
     "entity_resolution",
 ]
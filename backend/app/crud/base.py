@@ -74,6 +74,50 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
     
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+        commit: bool = True
+    ) -> List[ModelType]:
+        """
+        Create many records in one flush and one commit.
+        
+        The rows are sent as a single batched INSERT, and after the commit
+        they are reloaded with one SELECT instead of one refresh per row.
+        
+        Args:
+            db: Database session
+            objs_in: Pydantic schemas or dicts with creation data
+            commit: Commit the transaction (False to join the caller's)
+            
+        Returns:
+            Created model instances, in input order
+        """
+        db_objs = [
+            self.model(**(obj_in if isinstance(obj_in, dict) else obj_in.model_dump()))
+            for obj_in in objs_in
+        ]
+        if not db_objs:
+            return []
+        
+        db.add_all(db_objs)
+        db.flush()
+        if commit:
+            ids = [db_obj.id for db_obj in db_objs]
+            db.commit()
+            self._reload(db, ids)
+        return db_objs
+    
+    def _reload(self, db: Session, ids: List[Any]) -> List[ModelType]:
+        """Load many records in one query (refreshes expired instances), in input order."""
+        by_id = {
+            db_obj.id: db_obj
+            for db_obj in db.query(self.model).filter(self.model.id.in_(ids)).all()
+        }
+        return [by_id[id] for id in ids if id in by_id]
+    
     def update(
         self,
         db: Session,
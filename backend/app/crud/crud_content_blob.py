@@ -0,0 +1,179 @@
+"""
+CRUD operations for ContentBlob model.
+"""
+import hashlib
+import zlib
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import delete, exists, func, select, tuple_
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.orm import Session, aliased
+from uuid import UUID
+
+from app.core.compression import compress_bytes, decompress_bytes, is_compressed, resolve_codec
+from app.models.content_blob import ContentBlob
+from app.models.project_snapshot import ProjectSnapshot
+from app.models.version import Version
+
+
+# (project_id, content_hash) identifying a blob
+BlobKey = Tuple[UUID, str]
+
+
+def hash_content(content: str) -> str:
+    """
+    Compute the content address of a text.
+    
+    Args:
+        content: Text
+        
+    Returns:
+        Hex SHA-256 of the UTF-8 text
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CRUDContentBlob:
+    """
+    CRUD operations for ContentBlob model.
+    
+    Blobs are immutable: they are inserted (idempotently), read, and
+    deleted once no version or project snapshot references them. Writers
+    lock the blobs they reference until commit (FOR KEY SHARE) and garbage
+    collection skips locked blobs, so a blob is never collected while
+    being referenced.
+    Writes join the caller's transaction and are not committed here.
+    """
+    
+    def put_many(self, db: Session, *, project_id: UUID, contents: Iterable[str]) -> List[str]:
+        """
+        Store texts in a project, skipping those already stored.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            contents: Texts to store
+            
+        Returns:
+            Content hashes, in input order
+        """
+        # Blobs are always compressed, with zlib if STORAGE_COMPRESSION is "none"
+        codec = resolve_codec()
+        if codec == "none":
+            codec = "zlib"
+        
+        hashes: List[str] = []
+        rows: Dict[str, Dict] = {}
+        for content in contents:
+            content_hash = hash_content(content)
+            hashes.append(content_hash)
+            if content_hash not in rows:
+                data = content.encode("utf-8")
+                rows[content_hash] = {
+                    "project_id": project_id,
+                    "content_hash": content_hash,
+                    "data": compress_bytes(data, codec, min_size=0),
+                    "size": len(data)
+                }
+        
+        if rows:
+            stmt = insert(ContentBlob).values(list(rows.values()))
+            db.execute(stmt.on_conflict_do_nothing(constraint="uq_content_blobs_project_hash"))
+            # Blobs that already existed may have been collected since: store them again
+            missing = set(rows) - self.existing(db, project_id=project_id, content_hashes=rows, lock=True)
+            if missing:
+                stmt = insert(ContentBlob).values([rows[content_hash] for content_hash in missing])
+                db.execute(stmt.on_conflict_do_nothing(constraint="uq_content_blobs_project_hash"))
+        return hashes
+    
+    def existing(
+        self, db: Session, *, project_id: UUID, content_hashes: Iterable[str], lock: bool = False
+    ) -> Set[str]:
+        """
+        Find which hashes are already stored in a project.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            content_hashes: Hashes to look up
+            lock: Keep the found blobs from being collected until commit
+            
+        Returns:
+            Stored hashes
+        """
+        content_hashes = list(set(content_hashes))
+        if not content_hashes:
+            return set()
+        query = db.query(ContentBlob.content_hash).filter(
+            ContentBlob.project_id == project_id,
+            ContentBlob.content_hash.in_(content_hashes)
+        )
+        if lock:
+            query = query.with_for_update(read=True, key_share=True)
+        return {content_hash for (content_hash,) in query}
+    
+    def get_many(self, db: Session, *, keys: Iterable[BlobKey]) -> Dict[BlobKey, str]:
+        """
+        Load and decompress blobs (one query).
+        
+        Args:
+            db: Database session
+            keys: (project_id, content_hash) pairs
+            
+        Returns:
+            Text by key (unknown keys are omitted)
+        """
+        keys = list(set(keys))
+        if not keys:
+            return {}
+        rows = db.query(ContentBlob.project_id, ContentBlob.content_hash, ContentBlob.data).filter(
+            tuple_(ContentBlob.project_id, ContentBlob.content_hash).in_(keys)
+        )
+        return {
+            (row.project_id, row.content_hash): self._decode(row.data)
+            for row in rows
+        }
+    
+    def delete_unreferenced(self, db: Session, *, limit: int) -> Tuple[int, int]:
+        """
+        Delete blobs that no version or snapshot references, skipping locked ones.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of blobs to delete
+            
+        Returns:
+            (blobs deleted, bytes reclaimed)
+        """
+        blob = aliased(ContentBlob)
+        in_versions = exists().where(
+            Version.project_id == blob.project_id,
+            Version.content_hash == blob.content_hash
+        )
+        in_snapshots = exists().where(
+            ProjectSnapshot.project_id == blob.project_id,
+            ProjectSnapshot.content_hashes.contains(array([blob.content_hash]))
+        )
+        candidates = (
+            select(blob.id)
+            .where(~in_versions, ~in_snapshots)
+            .order_by(blob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(ContentBlob)
+            .where(ContentBlob.id.in_(candidates))
+            .returning(func.octet_length(ContentBlob.data))
+            .execution_options(synchronize_session=False)
+        )
+        sizes = db.execute(stmt).scalars().all()
+        return len(sizes), int(sum(sizes))
+    
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        """Decompress blob data (blobs without a codec header are raw zlib streams)."""
+        data = bytes(data)
+        return (decompress_bytes(data) if is_compressed(data) else zlib.decompress(data)).decode("utf-8")
+
+
+content_blob = CRUDContentBlob()
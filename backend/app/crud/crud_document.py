@@ -1,14 +1,78 @@
 """
 CRUD operations for Document model.
+
+Every change to a document (including its position) bumps its revision,
+which is exposed as its ETag. Text changes also log the operations that
+produced them (see DocumentOperation), so patches made against a recent
+revision can be rebased instead of rejected.
+
+Each document also keeps its word count, so project listings can be
+served from a column projection without loading document bodies.
+
+A long document can be stored as blocks (one per paragraph, see
+app.core.text_blocks) instead of one text. Block edits only load and
+save the edited block; they log their operations against the whole text
+like any other edit, and mark content_raw stale. content_raw is then
+rebuilt from the blocks when a consumer needs the whole text (see
+materialize and get_with_content).
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from uuid import UUID
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import func
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, defer, undefer
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
+from uuid import UUID, uuid4
+from app.core.config import settings
+from app.core.text_blocks import (
+    BLOCK_SEPARATOR,
+    block_kind,
+    delete_block_operation,
+    insert_block_operation,
+    join_blocks,
+    split_blocks,
+    update_block_operations,
+)
+from app.core.text_diff import DiffGranularity, diff_segments
+from app.core.text_operations import (
+    Operation,
+    OperationConflict,
+    apply_operations,
+    operations_from_segments,
+    rebase,
+)
 from app.crud.base import CRUDBase
+from app.crud.crud_content_blob import content_blob as crud_content_blob
+from app.crud.crud_document_provenance import document_provenance as crud_document_provenance
+from app.crud.crud_version import version_stats
+from app.crud.ordering import bulk_update_order, key_between, sparse_keys
 from app.models.document import Document
+from app.models.document_block import DocumentBlock
+from app.models.document_operation import DocumentOperation
+from app.models.version import Version
 from app.schemas.document import DocumentCreate, DocumentUpdate
 
 
+def count_words(content: Optional[str]) -> int:
+    """Count the words of a document's text (whitespace-separated, as in analytics)."""
+    return len(content.split()) if content else 0
+
+
+def _fill_block(block: DocumentBlock, content: str) -> None:
+    """Set a block's text and the values derived from it."""
+    block.content = content
+    block.kind = block_kind(content)
+    block.length = len(content)
+    block.word_count = count_words(content)
+
+
+def _check_block_content(content: str) -> None:
+    """Reject block text that would split into several blocks."""
+    if BLOCK_SEPARATOR in content:
+        raise ValueError("A block cannot contain a blank line; insert a new block instead")
+
+
 class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
     """CRUD operations for Document model."""
     
@@ -29,6 +93,44 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         """
         return (
             db.query(Document)
+            .options(undefer(Document.content_raw))
+            .filter(Document.project_id == project_id)
+            .order_by(Document.order_index)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def get_summaries_by_project(
+        self, db: Session, *, project_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[Row]:
+        """
+        Get the documents of a project without their content.
+        
+        Only the listed columns are loaded; this never writes (word counts
+        are stored with each write and were backfilled by migration).
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            Rows with id, title, type, order_index, updated_at, word_count,
+            revision and block_storage
+        """
+        return (
+            db.query(
+                Document.id,
+                Document.title,
+                Document.type,
+                Document.order_index,
+                Document.updated_at,
+                func.coalesce(Document.word_count, 0).label("word_count"),
+                Document.revision,
+                Document.block_storage,
+            )
             .filter(Document.project_id == project_id)
             .order_by(Document.order_index)
             .offset(skip)
@@ -52,11 +154,536 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         """
         obj_in_data = obj_in.model_dump()
         db_obj = Document(**obj_in_data, project_id=project_id)
+        db_obj.word_count = count_words(db_obj.content_raw)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
     
+    def get_last_order_index(self, db: Session, *, project_id: UUID) -> int:
+        """Get the largest order_index of a project's documents (0 if it has none)."""
+        return db.query(func.max(Document.order_index)).filter(Document.project_id == project_id).scalar() or 0
+    
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: List[Union[DocumentCreate, Dict[str, Any]]],
+        project_id: UUID,
+        author_email: str = "system",
+        commit_message: str = "Initial version: Created document",
+        commit: bool = True
+    ) -> List[Document]:
+        """
+        Create many documents of a project together with their initial versions.
+        
+        Documents, versions and provenance rows are inserted in one flush
+        (document IDs are assigned client-side, so versions can reference
+        them), the initial contents are stored as content blobs, and
+        everything is committed once.
+        
+        Args:
+            db: Database session
+            objs_in: Pydantic schemas or dicts with creation data
+            project_id: Project ID
+            author_email: Author recorded on the initial versions
+            commit_message: Message of the initial versions
+            commit: Commit the transaction (False to join the caller's)
+            
+        Returns:
+            Created documents, in input order
+        """
+        documents = [
+            Document(id=uuid4(), project_id=project_id, **(obj_in if isinstance(obj_in, dict) else obj_in.model_dump()))
+            for obj_in in objs_in
+        ]
+        if not documents:
+            return []
+        
+        contents = [document.content_raw or "" for document in documents]
+        for document, content in zip(documents, contents):
+            document.word_count = count_words(content)
+        
+        # Initial versions are keyframes in the project's content blobs (one INSERT)
+        content_hashes = crud_content_blob.put_many(db, project_id=project_id, contents=contents)
+        created_at = datetime.utcnow()
+        versions = [
+            Version(
+                id=uuid4(),
+                project_id=project_id,
+                document_id=document.id,
+                commit_message=commit_message,
+                author_email=author_email,
+                content_hash=content_hash,
+                created_at=created_at,
+                **version_stats("", content)
+            )
+            for document, content, content_hash in zip(documents, contents, content_hashes)
+        ]
+        
+        db.add_all(documents)
+        db.add_all(versions)
+        db.flush()
+        crud_document_provenance.record_first_many(db, versions=versions, contents=contents)
+        if commit:
+            ids = [document.id for document in documents]
+            db.commit()
+            self._reload(db, ids)
+        return documents
+    
+    def get_revision(self, db: Session, *, id: UUID) -> Optional[Row]:
+        """
+        Get what identifies a document's current representation, without loading it.
+        
+        Args:
+            db: Database session
+            id: Document ID
+            
+        Returns:
+            Row with project_id, revision and block_storage, or None if not found
+        """
+        return (
+            db.query(Document.project_id, Document.revision, Document.block_storage)
+            .filter(Document.id == id)
+            .first()
+        )
+    
+    def get_for_update(self, db: Session, *, id: UUID, with_content: bool = True) -> Optional[Document]:
+        """
+        Get a document and lock it until commit, to serialize concurrent edits.
+        
+        Args:
+            db: Database session
+            id: Document ID
+            with_content: Load the text, rebuilt from the blocks if stale
+                (False for block edits, which do not need it)
+                
+        Returns:
+            Document instance or None if not found
+        """
+        query = db.query(Document).filter(Document.id == id)
+        if with_content:
+            query = query.options(undefer(Document.content_raw))
+        else:
+            query = query.options(defer(Document.content_rich))
+        document = query.with_for_update().populate_existing().first()
+        if document and with_content:
+            self._load_block_text(db, document)
+        return document
+    
+    def get_with_content(self, db: Session, *, id: UUID) -> Optional[Document]:
+        """
+        Get a document with its whole text, rebuilding it from its blocks if stale.
+        
+        Args:
+            db: Database session
+            id: Document ID
+            
+        Returns:
+            Document instance or None if not found
+        """
+        self.materialize(db, document_ids=[id])
+        document = self.get(db, id=id)
+        if document:
+            # Edited again since materialize: rebuilt for this read only
+            self._load_block_text(db, document)
+        return document
+    
+    def materialize(
+        self, db: Session, *, project_id: Optional[UUID] = None, document_ids: Optional[Sequence[UUID]] = None
+    ) -> int:
+        """
+        Rebuild the stale content_raw of documents stored as blocks, and commit.
+        
+        Call it before reading content_raw of many documents (exports,
+        analytics, snapshots). Revisions and update times are unchanged.
+        
+        Args:
+            db: Database session
+            project_id: Only the documents of this project
+            document_ids: Only these documents
+            
+        Returns:
+            Number of documents rebuilt
+        """
+        query = db.query(Document.id, Document.revision).filter(
+            Document.block_storage.is_(True), Document.content_raw.is_(None)
+        )
+        if project_id is not None:
+            query = query.filter(Document.project_id == project_id)
+        if document_ids is not None:
+            query = query.filter(Document.id.in_(document_ids))
+        stale = query.all()
+        if not stale:
+            return 0
+        
+        table = Document.__table__
+        for document_id, revision in stale:
+            # Skipped if a block was edited since the revision was read
+            db.execute(
+                table.update()
+                .where(table.c.id == document_id, table.c.revision == revision, table.c.content_raw.is_(None))
+                .values(content_raw=self._block_text(db, document_id), updated_at=table.c.updated_at)
+            )
+        db.commit()
+        return len(stale)
+    
+    def _block_text(self, db: Session, document_id: UUID) -> str:
+        """Join the blocks of a document."""
+        return join_blocks([
+            content
+            for (content,) in db.query(DocumentBlock.content)
+            .filter(DocumentBlock.document_id == document_id)
+            .order_by(DocumentBlock.position)
+        ])
+    
+    def _load_block_text(self, db: Session, document: Document) -> None:
+        """Fill in a loaded document's stale content_raw from its blocks, without saving it."""
+        if document.block_storage and document.content_raw is None:
+            set_committed_value(document, "content_raw", self._block_text(db, document.id))
+    
+    def update(
+        self, db: Session, *, db_obj: Document, obj_in: Union[DocumentUpdate, Dict[str, Any]]
+    ) -> Document:
+        """
+        Update a document, bumping its revision.
+        
+        A new full text is logged as the operations of its diff with the
+        previous text, so stale patches can still be rebased on it. The
+        blocks of a document stored as blocks are rewritten to match,
+        unchanged paragraphs keeping their block.
+        
+        Args:
+            db: Database session
+            db_obj: Document to update (preferably locked, see get_for_update)
+            obj_in: Pydantic schema or dict with update data
+            
+        Returns:
+            Updated document
+        """
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        old_content = db_obj.content_raw or ""
+        for field in update_data:
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, update_data[field])
+        
+        new_content = db_obj.content_raw or ""
+        operations: List[Operation] = []
+        if new_content != old_content:
+            operations = operations_from_segments(diff_segments(old_content, new_content, DiffGranularity.WORD))
+            if db_obj.block_storage:
+                self._sync_blocks(db, document=db_obj, content=new_content)
+        self._log_revision(db, document=db_obj, operations=operations)
+        
+        db.commit()
+        db.refresh(db_obj)
+        self._load_block_text(db, db_obj)
+        return db_obj
+    
+    def apply_patch(
+        self, db: Session, *, db_obj: Document, base_revision: int, operations: Sequence[Operation]
+    ) -> List[Operation]:
+        """
+        Apply text operations made against a revision of a document.
+        
+        Operations made against an older revision are rebased on the
+        operations logged since.
+        
+        Args:
+            db: Database session
+            db_obj: Document to patch (locked, see get_for_update)
+            base_revision: Revision the operations were made against
+            operations: Operations, in order
+            
+        Returns:
+            Operations made since base_revision, rebased to apply after the
+            patch (what the client must apply to catch up; empty if none)
+            
+        Raises:
+            OperationConflict: If the base revision is too old or the edits conflict
+            ValueError: If the base revision is unknown or an operation is out of range
+        """
+        if base_revision > db_obj.revision:
+            raise ValueError(f"Unknown revision {base_revision} (current revision is {db_obj.revision})")
+        
+        missed: List[Operation] = []
+        if base_revision < db_obj.revision:
+            if base_revision < db_obj.revision - settings.DOCUMENT_OPERATION_LOG_SIZE:
+                raise OperationConflict(f"Revision {base_revision} is too old to rebase on")
+            # Revisions without a log entry did not change the text
+            logged = (
+                db.query(DocumentOperation.operations)
+                .filter(
+                    DocumentOperation.document_id == db_obj.id,
+                    DocumentOperation.revision > base_revision
+                )
+                .order_by(DocumentOperation.revision)
+                .all()
+            )
+            concurrent = [operation for (entry,) in logged for operation in entry]
+            operations, missed = rebase(operations, concurrent)
+        
+        db_obj.content_raw = apply_operations(db_obj.content_raw or "", operations)
+        if db_obj.block_storage:
+            self._sync_blocks(db, document=db_obj, content=db_obj.content_raw)
+        self._log_revision(db, document=db_obj, operations=operations)
+        db.commit()
+        db.refresh(db_obj)
+        return missed
+    
+    def _log_revision(
+        self, db: Session, *, document: Document, operations: List[Operation], word_count: Optional[int] = None
+    ) -> None:
+        """
+        Bump a document's revision and log its text operations, pruning old log entries.
+        
+        The word count is recounted from content_raw when the text changed,
+        unless the caller knows it (block edits leave content_raw stale).
+        """
+        document.revision = (document.revision or 0) + 1
+        if word_count is not None:
+            document.word_count = word_count
+        elif operations or document.word_count is None:
+            document.word_count = count_words(document.content_raw)
+        db.add(document)
+        if not operations:
+            return
+        db.add(DocumentOperation(document_id=document.id, revision=document.revision, operations=operations))
+        db.query(DocumentOperation).filter(
+            DocumentOperation.document_id == document.id,
+            DocumentOperation.revision <= document.revision - settings.DOCUMENT_OPERATION_LOG_SIZE
+        ).delete(synchronize_session=False)
+    
+    def set_block_storage(self, db: Session, *, db_obj: Document, block_storage: bool) -> Document:
+        """
+        Store a document's text as blocks, or back as one text.
+        
+        Args:
+            db: Database session
+            db_obj: Document (locked with its content, see get_for_update)
+            block_storage: Store the text as blocks
+            
+        Returns:
+            Updated document
+        """
+        if db_obj.block_storage == block_storage:
+            return db_obj
+        
+        if block_storage:
+            contents = split_blocks(db_obj.content_raw or "")
+            for content, key in zip(contents, sparse_keys(len(contents))):
+                block = DocumentBlock(document_id=db_obj.id, position=key)
+                _fill_block(block, content)
+                db.add(block)
+        else:
+            db.query(DocumentBlock).filter(DocumentBlock.document_id == db_obj.id).delete(synchronize_session=False)
+            # The text may only have been rebuilt in memory (see get_for_update)
+            flag_modified(db_obj, "content_raw")
+        db_obj.block_storage = block_storage
+        self._log_revision(db, document=db_obj, operations=[])
+        
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def count_blocks(self, db: Session, *, document_id: UUID) -> int:
+        """Count the blocks of a document."""
+        return db.query(func.count(DocumentBlock.id)).filter(DocumentBlock.document_id == document_id).scalar()
+    
+    def get_blocks(
+        self, db: Session, *, document_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[DocumentBlock]:
+        """
+        Get a range of a document's blocks, in order.
+        
+        Args:
+            db: Database session
+            document_id: Document ID
+            skip: Number of blocks to skip
+            limit: Maximum number of blocks to return
+            
+        Returns:
+            List of blocks
+        """
+        return (
+            db.query(DocumentBlock)
+            .filter(DocumentBlock.document_id == document_id)
+            .order_by(DocumentBlock.position)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def get_block(self, db: Session, *, document_id: UUID, block_id: UUID) -> Optional[DocumentBlock]:
+        """Get one block of a document."""
+        return (
+            db.query(DocumentBlock)
+            .filter(DocumentBlock.id == block_id, DocumentBlock.document_id == document_id)
+            .first()
+        )
+    
+    def insert_block(
+        self, db: Session, *, db_obj: Document, content: str, position: Optional[int] = None
+    ) -> DocumentBlock:
+        """
+        Insert a block into a document stored as blocks.
+        
+        Args:
+            db: Database session
+            db_obj: Document (locked, see get_for_update)
+            content: Block text
+            position: Index among the blocks (clamped; default: at the end)
+            
+        Returns:
+            Created block
+            
+        Raises:
+            ValueError: If the text contains a blank line
+        """
+        _check_block_content(content)
+        count = self.count_blocks(db, document_id=db_obj.id)
+        index = count if position is None else min(position, count)
+        
+        # Keys only: block contents are never loaded
+        neighbours = [
+            key
+            for (key,) in db.query(DocumentBlock.position)
+            .filter(DocumentBlock.document_id == db_obj.id)
+            .order_by(DocumentBlock.position)
+            .offset(max(index - 1, 0))
+            .limit(2)
+        ]
+        before = neighbours[0] if index > 0 else None
+        after = neighbours[1 if index > 0 else 0] if index < count else None
+        key = key_between(before, after)
+        if key is None:
+            ids = [
+                block_id
+                for (block_id,) in db.query(DocumentBlock.id)
+                .filter(DocumentBlock.document_id == db_obj.id)
+                .order_by(DocumentBlock.position)
+            ]
+            keys = sparse_keys(count + 1)
+            key = keys.pop(index)
+            bulk_update_order(db, model=DocumentBlock, order_column="position", keys=list(zip(ids, keys)))
+        
+        _, start = self._block_start(db, document_id=db_obj.id, position=key)
+        block = DocumentBlock(document_id=db_obj.id, position=key)
+        _fill_block(block, content)
+        db.add(block)
+        self._edit_blocks(
+            db,
+            document=db_obj,
+            operations=[insert_block_operation(start, index, count, content)],
+            word_delta=block.word_count
+        )
+        
+        db.commit()
+        db.refresh(block)
+        return block
+    
+    def update_block(self, db: Session, *, db_obj: Document, block: DocumentBlock, content: str) -> DocumentBlock:
+        """
+        Rewrite one block of a document stored as blocks.
+        
+        Only the block is loaded and saved, whatever the document's length.
+        
+        Args:
+            db: Database session
+            db_obj: Document (locked, see get_for_update)
+            block: Block to rewrite
+            content: New block text
+            
+        Returns:
+            Updated block
+            
+        Raises:
+            ValueError: If the text contains a blank line
+        """
+        _check_block_content(content)
+        if content == block.content:
+            return block
+        
+        _, start = self._block_start(db, document_id=db_obj.id, position=block.position)
+        operations = update_block_operations(start, block.content, content)
+        word_delta = count_words(content) - block.word_count
+        _fill_block(block, content)
+        db.add(block)
+        self._edit_blocks(db, document=db_obj, operations=operations, word_delta=word_delta)
+        
+        db.commit()
+        db.refresh(block)
+        return block
+    
+    def delete_block(self, db: Session, *, db_obj: Document, block: DocumentBlock) -> None:
+        """
+        Delete one block of a document stored as blocks.
+        
+        Args:
+            db: Database session
+            db_obj: Document (locked, see get_for_update)
+            block: Block to delete
+        """
+        count = self.count_blocks(db, document_id=db_obj.id)
+        index, start = self._block_start(db, document_id=db_obj.id, position=block.position)
+        operation = delete_block_operation(start, index, count, block.length)
+        word_delta = -block.word_count
+        db.delete(block)
+        self._edit_blocks(db, document=db_obj, operations=[operation], word_delta=word_delta)
+        db.commit()
+    
+    def _block_start(self, db: Session, *, document_id: UUID, position: int) -> Tuple[int, int]:
+        """Find the index and text offset of the block at an ordering key, from the stored lengths."""
+        index, length = (
+            db.query(func.count(DocumentBlock.id), func.coalesce(func.sum(DocumentBlock.length), 0))
+            .filter(DocumentBlock.document_id == document_id, DocumentBlock.position < position)
+            .one()
+        )
+        return index, int(length) + index * len(BLOCK_SEPARATOR)
+    
+    def _edit_blocks(
+        self, db: Session, *, document: Document, operations: List[Operation], word_delta: int
+    ) -> None:
+        """Record a block edit on its document: stale text, word count, revision and operation log."""
+        document.content_raw = None
+        self._log_revision(
+            db, document=document, operations=operations, word_count=(document.word_count or 0) + word_delta
+        )
+    
+    def _sync_blocks(self, db: Session, *, document: Document, content: str) -> None:
+        """Rewrite a document's blocks to match a new text, keeping the blocks of unchanged paragraphs."""
+        blocks = (
+            db.query(DocumentBlock)
+            .filter(DocumentBlock.document_id == document.id)
+            .order_by(DocumentBlock.position)
+            .all()
+        )
+        contents = split_blocks(content)
+        ordered: List[DocumentBlock] = []
+        inserted = False
+        matcher = SequenceMatcher(None, [block.content for block in blocks], contents, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                ordered.extend(blocks[i1:i2])
+                continue
+            # Rewritten paragraphs keep their blocks; the surplus is inserted or deleted
+            replaced = blocks[i1:i2]
+            for k, new_content in enumerate(contents[j1:j2]):
+                if k < len(replaced):
+                    block = replaced[k]
+                else:
+                    block = DocumentBlock(document_id=document.id)
+                    db.add(block)
+                    inserted = True
+                _fill_block(block, new_content)
+                ordered.append(block)
+            for block in replaced[j2 - j1:]:
+                db.delete(block)
+        
+        if inserted:
+            for block, key in zip(ordered, sparse_keys(len(ordered))):
+                block.position = key
+    
     def reorder(
         self, db: Session, *, document_id: UUID, new_order_index: int
     ) -> Optional[Document]:
@@ -78,6 +705,91 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
             db.commit()
             db.refresh(document)
         return document
-
+    
+    def reorder_many(
+        self, db: Session, *, project_id: UUID, document_ids: List[UUID]
+    ) -> int:
+        """
+        Put documents of a project in the given order, in one statement.
+        
+        Documents get sparse ordering keys; documents missing from the list
+        keep their keys.
+        
+        Args:
+            db: Database session
+            project_id: Project ID (all documents must belong to it)
+            document_ids: Document IDs in their new order
+            
+        Returns:
+            Number of documents updated
+            
+        Raises:
+            ValueError: If a document is unknown, duplicated or in another project
+        """
+        if len(set(document_ids)) != len(document_ids):
+            raise ValueError("Duplicate document IDs")
+        
+        updated = bulk_update_order(
+            db,
+            model=Document,
+            order_column="order_index",
+            keys=list(zip(document_ids, sparse_keys(len(document_ids)))),
+            filters=[Document.project_id == project_id],
+            values_to_set={"revision": Document.revision + 1}
+        )
+        if updated != len(document_ids):
+            db.rollback()
+            raise ValueError("Some documents were not found in this project")
+        
+        db.commit()
+        return updated
+    
+    def move(self, db: Session, *, document: Document, position: int) -> Document:
+        """
+        Move a document to a position in its project.
+        
+        Usually only the moved document is updated; the project's documents
+        are renumbered in one statement only when there is no free key left.
+        
+        Args:
+            db: Database session
+            document: Document to move
+            position: Index among the other documents (clamped to the list)
+            
+        Returns:
+            Moved document
+        """
+        # Keys only: document contents are never loaded
+        siblings = (
+            db.query(Document.id, Document.order_index)
+            .filter(Document.project_id == document.project_id, Document.id != document.id)
+            .order_by(Document.order_index)
+            .all()
+        )
+        position = max(0, min(position, len(siblings)))
+        key = key_between(
+            (siblings[position - 1].order_index or 0) if position > 0 else None,
+            (siblings[position].order_index or 0) if position < len(siblings) else None
+        )
+        
+        if key is None:
+            ids = [sibling.id for sibling in siblings]
+            ids.insert(position, document.id)
+            bulk_update_order(
+                db,
+                model=Document,
+                order_column="order_index",
+                keys=list(zip(ids, sparse_keys(len(ids)))),
+                values_to_set={"revision": Document.revision + 1}
+            )
+        else:
+            document.order_index = key
+            document.revision = (document.revision or 0) + 1
+            db.add(document)
+        
+        db.commit()
+        db.refresh(document)
+        self._load_block_text(db, document)
+        return document
 
 document = CRUDDocument(Document)
@@ -0,0 +1,156 @@
+"""
+CRUD operations for DocumentProvenance model.
+"""
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.text_diff import DiffGranularity, Segment, diff_segments
+from app.core.text_provenance import Run, advance, compact, from_ends, to_ends
+from app.models.document_provenance import DocumentProvenance
+from app.models.version import Version
+
+
+# (version ID, content hash) of the version a new version follows
+PreviousVersion = Tuple[UUID, str]
+
+
+class CRUDDocumentProvenance:
+    """
+    CRUD operations for DocumentProvenance model.
+    
+    Provenance is advanced incrementally by crud_version as versions are
+    written. When a row is missing or does not describe the version a new
+    one follows (history written before provenance existed, failed
+    reconstruction), it is left alone and rebuilt from the history on its
+    next read (see blame_service).
+    Writes join the caller's transaction and are not committed here.
+    """
+    
+    def get(self, db: Session, *, document_id: UUID, lock: bool = False) -> Optional[DocumentProvenance]:
+        """
+        Get the provenance of a document.
+        
+        Args:
+            db: Database session
+            document_id: Document ID
+            lock: Lock the row until commit (FOR UPDATE)
+        
+        Returns:
+            Provenance or None if not recorded yet
+        """
+        query = db.query(DocumentProvenance).filter(DocumentProvenance.document_id == document_id)
+        if lock:
+            query = query.with_for_update()
+        return query.first()
+    
+    def record(
+        self,
+        db: Session,
+        *,
+        version: Version,
+        previous: Optional[PreviousVersion],
+        previous_content: str,
+        content: str,
+        segments: Optional[List[Segment]] = None
+    ) -> None:
+        """
+        Advance a document's provenance with a version that was just written.
+        
+        A coalesced auto-save follows its own row: `previous` is then the
+        version itself before the update, and its new text keeps its origin.
+        
+        Args:
+            db: Database session
+            version: Flushed document version
+            previous: Version the new content follows (None for the first version)
+            previous_content: Content of the previous version
+            content: Content of the new version
+            segments: Word diff segments from previous_content to content, if already computed
+        """
+        row = self.get(db, document_id=version.document_id, lock=True)
+        if row is None and previous is None:
+            runs: List[Run] = []
+            origins: list = []
+        elif row is not None and previous is not None and (row.version_id, row.content_hash) == previous:
+            runs = from_ends(row.spans)
+            origins = list(row.origins)
+        else:
+            return
+        
+        origin = [str(version.id), version.author_email, version.created_at.isoformat()]
+        index = next((i for i, entry in enumerate(origins) if entry[0] == origin[0]), None)
+        if index is None:
+            origins.append(origin)
+            index = len(origins) - 1
+        if segments is None:
+            segments = diff_segments(previous_content, content, DiffGranularity.WORD)
+        runs, origins = compact(advance(runs, segments, index), origins)
+        self.save(
+            db,
+            document_id=version.document_id,
+            version_id=version.id,
+            content_hash=version.content_hash,
+            runs=runs,
+            origins=origins
+        )
+    
+    def record_first_many(self, db: Session, *, versions: Sequence[Version], contents: Sequence[str]) -> None:
+        """
+        Record the provenance of new documents' first versions in one INSERT.
+        
+        Args:
+            db: Database session
+            versions: Flushed first versions of documents without provenance
+            contents: Content of each version, in the same order
+        """
+        rows = []
+        for version, content in zip(versions, contents):
+            runs: List[Run] = [[len(content), 0]] if content else []
+            origins = [[str(version.id), version.author_email, version.created_at.isoformat()]] if content else []
+            rows.append({
+                "document_id": version.document_id,
+                "version_id": version.id,
+                "content_hash": version.content_hash,
+                "spans": to_ends(runs),
+                "origins": origins,
+                "updated_at": datetime.utcnow()
+            })
+        if rows:
+            db.execute(insert(DocumentProvenance).values(rows))
+    
+    def save(
+        self,
+        db: Session,
+        *,
+        document_id: UUID,
+        version_id: UUID,
+        content_hash: str,
+        runs: Sequence[Run],
+        origins: list
+    ) -> None:
+        """
+        Insert or replace the provenance of a document.
+        
+        Args:
+            db: Database session
+            document_id: Document ID
+            version_id: Version the provenance describes
+            content_hash: Content hash of that version
+            runs: `[length, origin index]` runs
+            origins: `[version ID, author email, created_at]` entries
+        """
+        values = {
+            "version_id": version_id,
+            "content_hash": content_hash,
+            "spans": to_ends(runs),
+            "origins": origins,
+            "updated_at": datetime.utcnow()
+        }
+        stmt = insert(DocumentProvenance).values(document_id=document_id, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=[DocumentProvenance.document_id], set_=values))
+
+
+document_provenance = CRUDDocumentProvenance()
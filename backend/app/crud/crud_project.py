@@ -98,5 +98,39 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
             db.refresh(project)
         return project
 
+    
+    def get_pyramid_revision(self, db: Session, *, project_id: UUID) -> Optional[int]:
+        """
+        Get the pyramid revision counter of a project.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            
+        Returns:
+            Revision number, or None if the project does not exist
+        """
+        return (
+            db.query(Project.pyramid_revision)
+            .filter(Project.id == project_id)
+            .scalar()
+        )
+    
+    def bump_pyramid_revision(self, db: Session, *, project_id: UUID) -> None:
+        """
+        Increment the pyramid revision counter of a project.
+        
+        The update joins the caller's transaction and is not committed here,
+        so the new revision becomes visible together with the node changes.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+        """
+        db.query(Project).filter(Project.id == project_id).update(
+            {Project.pyramid_revision: Project.pyramid_revision + 1},
+            synchronize_session=False
+        )
+
 
 project = CRUDProject(Project)
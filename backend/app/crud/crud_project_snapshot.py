@@ -0,0 +1,76 @@
+"""
+CRUD operations for ProjectSnapshot model.
+"""
+from typing import Dict, List
+from sqlalchemy.orm import Session, defer
+from uuid import UUID
+
+from app.crud.base import CRUDBase
+from app.models.project_snapshot import ProjectSnapshot
+from app.schemas.project_snapshot import ProjectSnapshotCreate
+
+
+# Manifest sections: item type -> {item ID: content hash}
+Manifest = Dict[str, Dict[str, str]]
+
+
+class CRUDProjectSnapshot(CRUDBase[ProjectSnapshot, ProjectSnapshotCreate, ProjectSnapshotCreate]):
+    """CRUD operations for ProjectSnapshot model."""
+    
+    def create_with_manifest(
+        self, db: Session, *, project_id: UUID, name: str, author_email: str, manifest: Manifest
+    ) -> ProjectSnapshot:
+        """
+        Create a snapshot from a manifest whose contents are already stored as blobs.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            name: Snapshot name (e.g. "Draft 2")
+            author_email: Email of the user creating the snapshot
+            manifest: {"documents": {ID: hash}, "pyramid_nodes": {ID: hash}}
+        
+        Returns:
+            Created snapshot
+        """
+        hashes = {content_hash for items in manifest.values() for content_hash in items.values()}
+        db_obj = ProjectSnapshot(
+            project_id=project_id,
+            name=name,
+            author_email=author_email,
+            manifest=manifest,
+            content_hashes=sorted(hashes),
+            item_count=sum(len(items) for items in manifest.values())
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def get_by_project(
+        self, db: Session, *, project_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[ProjectSnapshot]:
+        """
+        Get the snapshots of a project, newest first, without their manifests.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+        
+        Returns:
+            List of snapshots
+        """
+        return (
+            db.query(ProjectSnapshot)
+            .options(defer(ProjectSnapshot.manifest), defer(ProjectSnapshot.content_hashes))
+            .filter(ProjectSnapshot.project_id == project_id)
+            .order_by(ProjectSnapshot.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+
+project_snapshot = CRUDProjectSnapshot(ProjectSnapshot)
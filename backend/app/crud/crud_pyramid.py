@@ -1,17 +1,154 @@
 """
 CRUD operations for PyramidNode model.
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import Integer, func, literal_column, select
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.crud.base import CRUDBase
+from app.crud.crud_content_blob import content_blob as crud_content_blob
+from app.crud.crud_project import project as crud_project
+from app.crud.crud_version import version_stats
+from app.crud.ordering import bulk_update_order, key_between, sparse_keys
 from app.models.pyramid_node import PyramidNode
+from app.models.version import Version
 from app.schemas.pyramid import PyramidNodeCreate, PyramidNodeUpdate
 
 
+# Guard against runaway recursion if parent links ever form a cycle
+MAX_TREE_DEPTH = 64
+
+
 class CRUDPyramidNode(CRUDBase[PyramidNode, PyramidNodeCreate, PyramidNodeUpdate]):
-    """CRUD operations for PyramidNode model."""
+    """
+    CRUD operations for PyramidNode model.
+    
+    Every write bumps the project's pyramid revision in the same
+    transaction, so cached pyramid trees can be validated cheaply.
+    """
+    
+    def create(
+        self, db: Session, *, obj_in: Union[PyramidNodeCreate, Dict[str, Any]]
+    ) -> PyramidNode:
+        """
+        Create a pyramid node and bump the project pyramid revision.
+        
+        Args:
+            db: Database session
+            obj_in: Pydantic schema or dict with creation data
+            
+        Returns:
+            Created pyramid node
+        """
+        project_id = obj_in["project_id"] if isinstance(obj_in, dict) else obj_in.project_id
+        crud_project.bump_pyramid_revision(db, project_id=project_id)
+        return super().create(db, obj_in=obj_in)
+    
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: List[Union[PyramidNodeCreate, Dict[str, Any]]],
+        author_email: str = "system",
+        commit_message: str = "Initial version: Created pyramid node",
+        commit: bool = True
+    ) -> List[PyramidNode]:
+        """
+        Create many pyramid nodes together with their initial versions.
+        
+        Nodes and versions are inserted in one flush (node IDs are assigned
+        client-side, so versions can reference them), the initial contents
+        are stored as content blobs, the revision of each touched project
+        is bumped once, and everything is committed once.
+        
+        Args:
+            db: Database session
+            objs_in: Pydantic schemas or dicts with creation data
+            author_email: Author recorded on the initial versions
+            commit_message: Message of the initial versions
+            commit: Commit the transaction (False to join the caller's)
+            
+        Returns:
+            Created pyramid nodes, in input order
+        """
+        nodes = [
+            PyramidNode(id=uuid4(), **(obj_in if isinstance(obj_in, dict) else obj_in.model_dump()))
+            for obj_in in objs_in
+        ]
+        if not nodes:
+            return []
+        
+        # Initial versions are keyframes in the project's content blobs (one INSERT per project)
+        content_hashes = {}
+        for project_id in {node.project_id for node in nodes}:
+            project_nodes = [node for node in nodes if node.project_id == project_id]
+            hashes = crud_content_blob.put_many(
+                db, project_id=project_id, contents=[node.content for node in project_nodes]
+            )
+            content_hashes.update(zip((node.id for node in project_nodes), hashes))
+            crud_project.bump_pyramid_revision(db, project_id=project_id)
+        
+        versions = [
+            Version(
+                project_id=node.project_id,
+                pyramid_node_id=node.id,
+                commit_message=commit_message,
+                author_email=author_email,
+                content_hash=content_hashes[node.id],
+                **version_stats("", node.content or "")
+            )
+            for node in nodes
+        ]
+        
+        db.add_all(nodes)
+        db.add_all(versions)
+        db.flush()
+        if commit:
+            ids = [node.id for node in nodes]
+            db.commit()
+            self._reload(db, ids)
+        return nodes
+    
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: PyramidNode,
+        obj_in: Union[PyramidNodeUpdate, Dict[str, Any]]
+    ) -> PyramidNode:
+        """
+        Update a pyramid node and bump the project pyramid revision.
+        
+        Args:
+            db: Database session
+            db_obj: Existing pyramid node
+            obj_in: Pydantic schema or dict with update data
+            
+        Returns:
+            Updated pyramid node
+        """
+        crud_project.bump_pyramid_revision(db, project_id=db_obj.project_id)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+    
+    def delete(self, db: Session, *, id: Any) -> Optional[PyramidNode]:
+        """
+        Delete a pyramid node and bump the project pyramid revision.
+        
+        Args:
+            db: Database session
+            id: Node ID
+            
+        Returns:
+            Deleted pyramid node or None if not found
+        """
+        node = db.query(PyramidNode).get(id)
+        if not node:
+            return None
+        crud_project.bump_pyramid_revision(db, project_id=node.project_id)
+        db.delete(node)
+        db.commit()
+        return node
     
     def get_by_project(
         self, db: Session, *, project_id: UUID, skip: int = 0, limit: int = 100
@@ -37,6 +174,102 @@ class CRUDPyramidNode(CRUDBase[PyramidNode, PyramidNodeCreate, PyramidNodeUpdate
             .all()
         )
     
+    def get_all_by_project(self, db: Session, *, project_id: UUID) -> List[PyramidNode]:
+        """
+        Get every pyramid node of a project, without pagination.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            
+        Returns:
+            List of pyramid nodes ordered by level and order
+        """
+        return (
+            db.query(PyramidNode)
+            .filter(PyramidNode.project_id == project_id)
+            .order_by(PyramidNode.level, PyramidNode.order)
+            .all()
+        )
+    
+    @staticmethod
+    def _subtree_cte(node_id: UUID):
+        """Recursive CTE of (id, depth) for a node and all its descendants."""
+        subtree = (
+            select(PyramidNode.id, literal_column("0", Integer).label("depth"))
+            .where(PyramidNode.id == node_id)
+            .cte("subtree", recursive=True)
+        )
+        return subtree.union_all(
+            select(PyramidNode.id, (subtree.c.depth + 1).label("depth"))
+            .join(subtree, PyramidNode.parent_id == subtree.c.id)
+            .where(subtree.c.depth < MAX_TREE_DEPTH)
+        )
+    
+    def get_subtree(self, db: Session, *, node_id: UUID) -> List[PyramidNode]:
+        """
+        Get a node and all its descendants in a single query.
+        
+        Args:
+            db: Database session
+            node_id: Root node of the subtree
+            
+        Returns:
+            List of pyramid nodes (root included) ordered by depth and order,
+            empty if the node does not exist
+        """
+        subtree = self._subtree_cte(node_id)
+        return (
+            db.query(PyramidNode)
+            .join(subtree, PyramidNode.id == subtree.c.id)
+            .order_by(subtree.c.depth, PyramidNode.order)
+            .all()
+        )
+    
+    def get_ancestors(self, db: Session, *, node_id: UUID) -> List[PyramidNode]:
+        """
+        Get the path from the root down to a node's parent in a single query.
+        
+        Args:
+            db: Database session
+            node_id: Node ID
+            
+        Returns:
+            List of ancestor nodes, root first (empty for a root node)
+        """
+        ancestors = (
+            select(PyramidNode.parent_id.label("id"), literal_column("1", Integer).label("distance"))
+            .where(PyramidNode.id == node_id, PyramidNode.parent_id.isnot(None))
+            .cte("ancestors", recursive=True)
+        )
+        ancestors = ancestors.union_all(
+            select(PyramidNode.parent_id, (ancestors.c.distance + 1).label("distance"))
+            .join(ancestors, PyramidNode.id == ancestors.c.id)
+            .where(PyramidNode.parent_id.isnot(None), ancestors.c.distance < MAX_TREE_DEPTH)
+        )
+        return (
+            db.query(PyramidNode)
+            .join(ancestors, PyramidNode.id == ancestors.c.id)
+            .order_by(ancestors.c.distance.desc())
+            .all()
+        )
+    
+    def count_descendants(self, db: Session, *, node_id: UUID) -> int:
+        """
+        Count all descendants of a node (at any depth) in a single query.
+        
+        Args:
+            db: Database session
+            node_id: Node ID
+            
+        Returns:
+            Number of descendants
+        """
+        subtree = self._subtree_cte(node_id)
+        return db.execute(
+            select(func.count()).select_from(subtree).where(subtree.c.depth > 0)
+        ).scalar_one()
+    
     def get_by_parent(
         self, db: Session, *, parent_id: UUID
     ) -> List[PyramidNode]:
@@ -57,6 +290,28 @@ class CRUDPyramidNode(CRUDBase[PyramidNode, PyramidNodeCreate, PyramidNodeUpdate
             .all()
         )
     
+    def get_by_parents(
+        self, db: Session, *, parent_ids: List[UUID]
+    ) -> List[PyramidNode]:
+        """
+        Get the children of several parent nodes in one query.
+        
+        Args:
+            db: Database session
+            parent_ids: Parent node IDs
+            
+        Returns:
+            List of child pyramid nodes, ordered by parent then order
+        """
+        if not parent_ids:
+            return []
+        return (
+            db.query(PyramidNode)
+            .filter(PyramidNode.parent_id.in_(parent_ids))
+            .order_by(PyramidNode.parent_id, PyramidNode.order)
+            .all()
+        )
+    
     def get_root_nodes(
         self, db: Session, *, project_id: UUID
     ) -> List[PyramidNode]:
@@ -124,9 +379,142 @@ class CRUDPyramidNode(CRUDBase[PyramidNode, PyramidNodeCreate, PyramidNodeUpdate
         
         node.order = new_order
         db.add(node)
+        crud_project.bump_pyramid_revision(db, project_id=node.project_id)
+        db.commit()
+        db.refresh(node)
+        return node
+    
+    def reorder_children(
+        self,
+        db: Session,
+        *,
+        project_id: UUID,
+        parent_id: Optional[UUID],
+        node_ids: List[UUID]
+    ) -> int:
+        """
+        Place nodes under a parent in the given order, in one statement.
+        
+        Nodes get sparse ordering keys and the new parent; siblings missing
+        from the list keep their keys. Levels are not changed, so every node
+        must sit one level below the new parent (at level 0 for the root).
+        
+        Args:
+            db: Database session
+            project_id: Project ID (all nodes must belong to it)
+            parent_id: New parent (None for root nodes)
+            node_ids: Node IDs in their new order
+            
+        Returns:
+            Number of nodes updated
+            
+        Raises:
+            ValueError: If a node is unknown, duplicated, or at the wrong level
+        """
+        if len(set(node_ids)) != len(node_ids):
+            raise ValueError("Duplicate node IDs")
+        
+        filters = [PyramidNode.project_id == project_id]
+        if parent_id is not None:
+            parent = self.get(db, id=parent_id)
+            if not parent or parent.project_id != project_id:
+                raise ValueError("Parent node not found in this project")
+            if parent_id in node_ids:
+                raise ValueError("A node cannot be its own parent")
+            filters.append(PyramidNode.level == parent.level + 1)
+        else:
+            # Root nodes are at level 0
+            filters.append(PyramidNode.level == 0)
+        
+        updated = bulk_update_order(
+            db,
+            model=PyramidNode,
+            order_column="order",
+            keys=list(zip(node_ids, sparse_keys(len(node_ids)))),
+            filters=filters,
+            values_to_set={"parent_id": parent_id}
+        )
+        if updated != len(node_ids):
+            db.rollback()
+            raise ValueError("Some nodes were not found in this project or are at the wrong level")
+        
+        crud_project.bump_pyramid_revision(db, project_id=project_id)
+        db.commit()
+        return updated
+    
+    def move(
+        self,
+        db: Session,
+        *,
+        node: PyramidNode,
+        parent_id: Optional[UUID],
+        position: int
+    ) -> PyramidNode:
+        """
+        Move a node to a position among the children of a parent.
+        
+        Usually only the moved node is updated (its key is taken between
+        its new neighbours); the siblings are renumbered in one statement
+        only when there is no free key left.
+        
+        Args:
+            db: Database session
+            node: Node to move
+            parent_id: New parent (None for root nodes)
+            position: Index among the new siblings (clamped to the list)
+            
+        Returns:
+            Moved node
+            
+        Raises:
+            ValueError: If the parent is not in the project or not one level
+                above the node, or the node moves to the root without being
+                at level 0
+        """
+        if parent_id is None and node.level != 0:
+            raise ValueError("Only level 0 nodes can move to the root")
+        if parent_id is not None:
+            parent = self.get(db, id=parent_id)
+            if not parent or parent.project_id != node.project_id:
+                raise ValueError("Parent node not found in this project")
+            if parent.level != node.level - 1:
+                raise ValueError("A node can only move under a parent one level above it")
+        
+        # Keys only: sibling contents are never loaded
+        siblings = (
+            db.query(PyramidNode.id, PyramidNode.order)
+            .filter(
+                PyramidNode.project_id == node.project_id,
+                PyramidNode.parent_id == parent_id if parent_id is not None else PyramidNode.parent_id.is_(None),
+                PyramidNode.id != node.id
+            )
+            .order_by(PyramidNode.order)
+            .all()
+        )
+        position = max(0, min(position, len(siblings)))
+        key = key_between(
+            siblings[position - 1].order if position > 0 else None,
+            siblings[position].order if position < len(siblings) else None
+        )
+        
+        if key is None:
+            ids = [sibling.id for sibling in siblings]
+            ids.insert(position, node.id)
+            bulk_update_order(
+                db,
+                model=PyramidNode,
+                order_column="order",
+                keys=list(zip(ids, sparse_keys(len(ids)))),
+                values_to_set={"parent_id": parent_id}
+            )
+        else:
+            node.order = key
+            node.parent_id = parent_id
+            db.add(node)
+        
+        crud_project.bump_pyramid_revision(db, project_id=node.project_id)
         db.commit()
         db.refresh(node)
         return node
-
 
 pyramid_node = CRUDPyramidNode(PyramidNode)
@@ -0,0 +1,88 @@
+"""
+CRUD operations for PyramidCoherenceResult model.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.crud.base import CRUDBase
+from app.models.pyramid_coherence_result import PyramidCoherenceResult
+from app.schemas.pyramid import PyramidCoherenceCheck
+
+
+class CRUDPyramidCoherenceResult(
+    CRUDBase[PyramidCoherenceResult, PyramidCoherenceCheck, PyramidCoherenceCheck]
+):
+    """CRUD operations for PyramidCoherenceResult model."""
+    
+    def get_by_node(self, db: Session, *, node_id: UUID) -> Optional[PyramidCoherenceResult]:
+        """
+        Get the last coherence result of a node.
+        
+        Args:
+            db: Database session
+            node_id: Pyramid node ID
+            
+        Returns:
+            Coherence result or None if the node was never checked
+        """
+        return (
+            db.query(PyramidCoherenceResult)
+            .filter(PyramidCoherenceResult.node_id == node_id)
+            .first()
+        )
+    
+    def get_by_project(
+        self, db: Session, *, project_id: UUID
+    ) -> Dict[UUID, PyramidCoherenceResult]:
+        """
+        Get the last coherence results of all nodes of a project.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            
+        Returns:
+            Results keyed by node ID
+        """
+        results = (
+            db.query(PyramidCoherenceResult)
+            .filter(PyramidCoherenceResult.project_id == project_id)
+            .all()
+        )
+        return {result.node_id: result for result in results}
+    
+    def upsert_many(self, db: Session, *, results: List[Dict[str, Any]]) -> None:
+        """
+        Insert or replace the results of several nodes in one statement.
+        
+        Args:
+            db: Database session
+            results: Dicts with project_id, node_id, context_hash, is_coherent,
+                issues, suggestions and llm_request_id keys
+        """
+        if not results:
+            return
+        
+        now = datetime.utcnow()
+        stmt = insert(PyramidCoherenceResult).values(
+            [{**result, "checked_at": now} for result in results]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PyramidCoherenceResult.node_id],
+            set_={
+                "context_hash": stmt.excluded.context_hash,
+                "is_coherent": stmt.excluded.is_coherent,
+                "issues": stmt.excluded.issues,
+                "suggestions": stmt.excluded.suggestions,
+                "llm_request_id": stmt.excluded.llm_request_id,
+                "checked_at": stmt.excluded.checked_at
+            }
+        )
+        db.execute(stmt)
+        db.commit()
+
+
+pyramid_coherence_result = CRUDPyramidCoherenceResult(PyramidCoherenceResult)
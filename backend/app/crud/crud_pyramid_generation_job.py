@@ -0,0 +1,114 @@
+"""
+CRUD operations for PyramidGenerationJob model.
+"""
+from datetime import datetime
+from typing import List
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.crud.base import CRUDBase
+from app.models.pyramid_generation_job import PyramidGenerationJob, PyramidJobStatus
+from app.schemas.pyramid import PyramidGenerationJobCreate
+
+
+class CRUDPyramidGenerationJob(
+    CRUDBase[PyramidGenerationJob, PyramidGenerationJobCreate, PyramidGenerationJobCreate]
+):
+    """CRUD operations for PyramidGenerationJob model."""
+    
+    def create_for_node(
+        self,
+        db: Session,
+        *,
+        obj_in: PyramidGenerationJobCreate,
+        project_id: UUID,
+        user_id: UUID
+    ) -> PyramidGenerationJob:
+        """
+        Create a pending job for a root node.
+        
+        Args:
+            db: Database session
+            obj_in: Job parameters
+            project_id: Project of the root node
+            user_id: User who started the job
+            
+        Returns:
+            Created job
+        """
+        db_obj = PyramidGenerationJob(
+            **obj_in.model_dump(),
+            project_id=project_id,
+            user_id=user_id,
+            status=PyramidJobStatus.PENDING
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def get_by_project(
+        self, db: Session, *, project_id: UUID, skip: int = 0, limit: int = 20
+    ) -> List[PyramidGenerationJob]:
+        """
+        Get the generation jobs of a project, newest first.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of jobs
+        """
+        return (
+            db.query(PyramidGenerationJob)
+            .filter(PyramidGenerationJob.project_id == project_id)
+            .order_by(PyramidGenerationJob.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def claim(self, db: Session, *, job_id: UUID, stale_before: datetime) -> bool:
+        """
+        Atomically mark a job as running.
+        
+        A job can be claimed unless it is completed or currently running;
+        a running job whose last update is older than `stale_before` is
+        considered abandoned (e.g. the worker died) and can be reclaimed.
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            stale_before: Running jobs not updated since then are reclaimable
+            
+        Returns:
+            True if the job was claimed
+        """
+        claimed = (
+            db.query(PyramidGenerationJob)
+            .filter(
+                PyramidGenerationJob.id == job_id,
+                PyramidGenerationJob.status != PyramidJobStatus.COMPLETED,
+                or_(
+                    PyramidGenerationJob.status != PyramidJobStatus.RUNNING,
+                    PyramidGenerationJob.updated_at < stale_before
+                )
+            )
+            .update(
+                {
+                    PyramidGenerationJob.status: PyramidJobStatus.RUNNING,
+                    PyramidGenerationJob.error_message: None,
+                    PyramidGenerationJob.updated_at: datetime.utcnow()
+                },
+                synchronize_session=False
+            )
+        )
+        db.commit()
+        return claimed == 1
+
+
+pyramid_generation_job = CRUDPyramidGenerationJob(PyramidGenerationJob)
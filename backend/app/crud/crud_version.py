@@ -1,88 +1,441 @@
 """
 CRUD operations for Version model.
+
+Versions are stored as deltas against the previous version of the same
+document or pyramid node, with a full keyframe every
+VERSION_KEYFRAME_INTERVAL versions. Reads reconstruct `content_snapshot`
+transparently, applying at most VERSION_KEYFRAME_INTERVAL - 1 deltas
+loaded in a single query.
+
+Keyframes are stored in the project's content-addressed blobs
+(crud_content_blob), so identical snapshots are stored once per project.
+Every version records the hash of its full content, so equality checks
+never need the text.
+
+Consecutive auto-saves by the same author are coalesced into the latest
+auto-save row; explicit commits always create a new version.
+
+History listings never load content: snapshot and delta columns are
+deferred (and raise if accessed), the size and word changes of each
+version are stored at write time, and pages follow a (created_at, id)
+cursor instead of an offset.
+
+Document versions also advance the document's provenance (which version
+introduced each passage, see crud_document_provenance) in the same
+transaction.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Query, Session, defer
+from sqlalchemy.orm.attributes import set_committed_value
 from uuid import UUID
 
+from app.core.config import settings
+from app.core.text_delta import apply_delta, edit_size, make_delta
+from app.core.text_diff import DiffGranularity, Segment, diff_segments, word_changes
 from app.crud.base import CRUDBase
+from app.crud.crud_content_blob import content_blob as crud_content_blob, hash_content
+from app.crud.crud_document_provenance import document_provenance as crud_document_provenance
 from app.models.version import Version
 from app.schemas.version import VersionCreate, VersionUpdate
 
 
+# A delta is only kept if it is smaller than this fraction of the full text
+DELTA_MAX_RATIO = 0.5
+
+# (id, delta depth, content) of the version a new delta is made against
+DeltaBase = Tuple[UUID, int, str]
+
+# (created_at, id) of the last version of the previous history page
+HistoryCursor = Tuple[datetime, UUID]
+
+
+def version_stats(previous: str, content: str, segments: Optional[List[Segment]] = None) -> Dict[str, int]:
+    """
+    Compute the history stats of a version.
+    
+    Args:
+        previous: Content of the previous version ("" for the first one)
+        content: Content of the version
+        segments: Word diff segments from previous to content, if already computed
+        
+    Returns:
+        Values for content_size, words_added and words_removed
+    """
+    words_added, words_removed = word_changes(previous, content, segments)
+    return {"content_size": len(content), "words_added": words_added, "words_removed": words_removed}
+
+
 class CRUDVersion(CRUDBase[Version, VersionCreate, VersionUpdate]):
     """CRUD operations for Version model."""
     
+    def get(self, db: Session, id: Any) -> Optional[Version]:
+        """
+        Get a version with its content reconstructed.
+        
+        Args:
+            db: Database session
+            id: Version ID
+            
+        Returns:
+            Version or None if not found
+        """
+        version = super().get(db, id=id)
+        if version:
+            self.hydrate(db, [version])
+        return version
+    
+    def create(self, db: Session, *, obj_in: Union[VersionCreate, Dict[str, Any]]) -> Version:
+        """
+        Create a version, stored as a delta against the entity's latest version.
+        
+        Args:
+            db: Database session
+            obj_in: Pydantic schema or dict with creation data
+            
+        Returns:
+            Created version (with its full content_snapshot)
+        """
+        data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.model_dump()
+        content = data.get("content_snapshot") or ""
+        base = self._delta_base(
+            db, document_id=data.get("document_id"), pyramid_node_id=data.get("pyramid_node_id")
+        )
+        previous_content = base[2] if base else ""
+        segments = diff_segments(previous_content, content, DiffGranularity.WORD)
+        data.update(self.storage_fields(db, project_id=data["project_id"], content=content, base=base))
+        data.update(version_stats(previous_content, content, segments))
+        
+        db_obj = Version(**data)
+        db.add(db_obj)
+        if db_obj.document_id:
+            db.flush()
+            crud_document_provenance.record(
+                db,
+                version=db_obj,
+                previous=(base[0], hash_content(previous_content)) if base else None,
+                previous_content=previous_content,
+                content=content,
+                segments=segments
+            )
+        db.commit()
+        db.refresh(db_obj)
+        set_committed_value(db_obj, "content_snapshot", content)
+        return db_obj
+    
+    def create_autosave(self, db: Session, *, obj_in: Union[VersionCreate, Dict[str, Any]]) -> Version:
+        """
+        Record an auto-save, coalescing it with the latest auto-save if possible.
+        
+        The latest version of the entity is updated in place when it is an
+        auto-save by the same author and either started less than
+        VERSION_AUTOSAVE_WINDOW_SECONDS ago or, with this save, differs from
+        the version before it by fewer than VERSION_AUTOSAVE_MIN_EDIT_CHARS
+        characters. Otherwise a new auto-save version is created.
+        
+        Args:
+            db: Database session
+            obj_in: Pydantic schema or dict with creation data
+            
+        Returns:
+            Updated or created version (with its full content_snapshot)
+        """
+        data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.model_dump()
+        data["is_autosave"] = True
+        content = data.get("content_snapshot") or ""
+        
+        if data.get("document_id"):
+            criterion = Version.document_id == data["document_id"]
+        elif data.get("pyramid_node_id"):
+            criterion = Version.pyramid_node_id == data["pyramid_node_id"]
+        else:
+            return self.create(db, obj_in=data)
+        
+        latest = db.query(Version).filter(criterion).order_by(Version.created_at.desc()).first()
+        if not latest or not latest.is_autosave or latest.author_email != data["author_email"]:
+            return self.create(db, obj_in=data)
+        
+        previous = (
+            db.query(Version.id)
+            .filter(criterion, Version.created_at < latest.created_at)
+            .order_by(Version.created_at.desc())
+            .first()
+        )
+        # The latest content is only needed to advance a document's provenance
+        wanted = [
+            version_id
+            for version_id in (latest.delta_base_id, previous and previous.id, data.get("document_id") and latest.id)
+            if version_id
+        ]
+        contents = self.reconstruct(db, wanted)
+        
+        within_window = datetime.utcnow() - latest.created_at < timedelta(
+            seconds=settings.VERSION_AUTOSAVE_WINDOW_SECONDS
+        )
+        previous_content = contents.get(previous.id, "") if previous else ""
+        small_edit = edit_size(previous_content, content) < settings.VERSION_AUTOSAVE_MIN_EDIT_CHARS
+        if not (within_window or small_edit):
+            return self.create(db, obj_in=data)
+        
+        # Rewrite the row against its own delta base (nothing is based on the latest version)
+        base = None
+        if latest.delta_base_id in contents:
+            base = (latest.delta_base_id, latest.delta_depth - 1, contents[latest.delta_base_id])
+        followed = (latest.id, latest.content_hash)
+        fields = self.storage_fields(db, project_id=latest.project_id, content=content, base=base)
+        fields.update(version_stats(previous_content, content))
+        for key, value in fields.items():
+            setattr(latest, key, value)
+        latest.commit_message = data["commit_message"]
+        if data.get("metadata_snapshot") is not None:
+            latest.metadata_snapshot = data["metadata_snapshot"]
+        
+        db.add(latest)
+        if latest.id in contents:
+            db.flush()
+            crud_document_provenance.record(
+                db, version=latest, previous=followed, previous_content=contents[latest.id], content=content
+            )
+        db.commit()
+        db.refresh(latest)
+        set_committed_value(latest, "content_snapshot", content)
+        return latest
+    
+    def storage_fields(
+        self,
+        db: Session,
+        *,
+        project_id: UUID,
+        content: str,
+        base: Optional[DeltaBase],
+        inline: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Decide how a version's content is stored, writing its blob if needed.
+        
+        Content already stored in the project is referenced as a keyframe
+        at no cost. Otherwise a small delta against the base is preferred,
+        and a new blob is written when a keyframe is due.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            content: Full content of the version
+            base: Version to make the delta against (None for a keyframe)
+            inline: Store a keyframe inline in content_snapshot instead of a blob
+            
+        Returns:
+            Values for content_hash, content_snapshot, content_delta,
+            delta_base_id and delta_depth
+        """
+        content_hash = hash_content(content)
+        keyframe = {
+            "content_hash": content_hash,
+            "content_snapshot": None,
+            "content_delta": None,
+            "delta_base_id": None,
+            "delta_depth": 0
+        }
+        if inline:
+            return {**keyframe, "content_snapshot": content}
+        if crud_content_blob.existing(db, project_id=project_id, content_hashes=[content_hash], lock=True):
+            return keyframe
+        
+        if base is not None:
+            base_id, base_depth, base_content = base
+            if base_depth + 1 < settings.VERSION_KEYFRAME_INTERVAL:
+                delta = make_delta(base_content, content)
+                if len(delta) < len(content) * DELTA_MAX_RATIO:
+                    return {
+                        **keyframe,
+                        "content_delta": delta,
+                        "delta_base_id": base_id,
+                        "delta_depth": base_depth + 1
+                    }
+        
+        crud_content_blob.put_many(db, project_id=project_id, contents=[content])
+        return keyframe
+    
+    def _delta_base(
+        self, db: Session, *, document_id: Optional[UUID] = None, pyramid_node_id: Optional[UUID] = None
+    ) -> Optional[DeltaBase]:
+        """Get the latest version of a document or pyramid node as a delta base."""
+        if document_id:
+            criterion = Version.document_id == document_id
+        elif pyramid_node_id:
+            criterion = Version.pyramid_node_id == pyramid_node_id
+        else:
+            return None
+        
+        latest = (
+            db.query(Version.id, Version.delta_depth)
+            .filter(criterion)
+            .order_by(Version.created_at.desc())
+            .first()
+        )
+        if not latest:
+            return None
+        
+        content = self.reconstruct(db, [latest.id]).get(latest.id)
+        return (latest.id, latest.delta_depth, content) if content is not None else None
+    
+    def reconstruct(self, db: Session, ids: List[UUID]) -> Dict[UUID, str]:
+        """
+        Rebuild the content of versions from their keyframes and deltas.
+        
+        The delta chains of all requested versions are loaded with one
+        recursive query.
+        
+        Args:
+            db: Database session
+            ids: Version IDs
+            
+        Returns:
+            Content by version ID (versions that do not exist are omitted)
+        """
+        if not ids:
+            return {}
+        
+        columns = (
+            Version.id,
+            Version.project_id,
+            Version.content_hash,
+            Version.delta_base_id,
+            Version.content_snapshot,
+            Version.content_delta
+        )
+        chain = select(*columns).where(Version.id.in_(ids)).cte("delta_chain", recursive=True)
+        chain = chain.union(select(*columns).join(chain, Version.id == chain.c.delta_base_id))
+        rows = {row.id: row for row in db.execute(select(chain)).all()}
+        blobs = crud_content_blob.get_many(db, keys=[
+            (row.project_id, row.content_hash)
+            for row in rows.values()
+            if row.content_delta is None and row.content_snapshot is None and row.content_hash
+        ])
+        
+        contents: Dict[UUID, str] = {}
+        for version_id in ids:
+            path = []
+            current = rows.get(version_id)
+            while current is not None and current.id not in contents and current.content_delta is not None:
+                path.append(current)
+                current = rows.get(current.delta_base_id)
+            if current is None:
+                continue
+            
+            content = contents.get(current.id)
+            if content is None:
+                content = current.content_snapshot
+            if content is None:
+                content = blobs.get((current.project_id, current.content_hash))
+            if content is None:
+                continue
+            contents[current.id] = content
+            for row in reversed(path):
+                content = apply_delta(content, row.content_delta)
+                contents[row.id] = content
+        
+        return {version_id: contents[version_id] for version_id in ids if version_id in contents}
+    
+    def hydrate(self, db: Session, versions: List[Version]) -> List[Version]:
+        """
+        Fill in content_snapshot for versions stored as deltas.
+        
+        The reconstructed content is set as the loaded value, so it is never
+        written back to the database.
+        
+        Args:
+            db: Database session
+            versions: Loaded versions
+            
+        Returns:
+            The same versions
+        """
+        missing = [version.id for version in versions if version.content_snapshot is None]
+        if missing:
+            contents = self.reconstruct(db, missing)
+            for version in versions:
+                if version.content_snapshot is None and version.id in contents:
+                    set_committed_value(version, "content_snapshot", contents[version.id])
+        return versions
+    
+    def get_content_hashes(self, db: Session, ids: List[UUID]) -> Dict[UUID, Optional[str]]:
+        """
+        Get the content hashes of versions without loading their content.
+        
+        Args:
+            db: Database session
+            ids: Version IDs
+            
+        Returns:
+            Content hash by version ID (None for versions not converted yet)
+        """
+        if not ids:
+            return {}
+        return dict(db.query(Version.id, Version.content_hash).filter(Version.id.in_(ids)).all())
+    
+    def _history(self, query: Query, *, before: Optional[HistoryCursor], limit: int) -> List[Version]:
+        """Load one page of versions, newest first, without their content."""
+        query = query.options(
+            defer(Version.content_snapshot, raiseload=True),
+            defer(Version.content_delta, raiseload=True)
+        )
+        if before is not None:
+            query = query.filter(tuple_(Version.created_at, Version.id) < tuple_(*before))
+        return query.order_by(Version.created_at.desc(), Version.id.desc()).limit(limit).all()
+    
     def get_by_project(
-        self, db: Session, *, project_id: UUID, skip: int = 0, limit: int = 100
+        self, db: Session, *, project_id: UUID, before: Optional[HistoryCursor] = None, limit: int = 100
     ) -> List[Version]:
         """
-        Get all versions for a project.
+        Get the version history of a project, without content.
         
         Args:
             db: Database session
             project_id: Project ID
-            skip: Number of records to skip
+            before: (created_at, id) of the last version of the previous page
             limit: Maximum number of records to return
             
         Returns:
-            List of versions
+            List of versions, newest first (content columns are not loaded)
         """
-        return (
-            db.query(Version)
-            .filter(Version.project_id == project_id)
-            .order_by(Version.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self._history(db.query(Version).filter(Version.project_id == project_id), before=before, limit=limit)
     
     def get_by_document(
-        self, db: Session, *, document_id: UUID, skip: int = 0, limit: int = 100
+        self, db: Session, *, document_id: UUID, before: Optional[HistoryCursor] = None, limit: int = 100
     ) -> List[Version]:
         """
-        Get all versions for a document.
+        Get the version history of a document, without content.
         
         Args:
             db: Database session
             document_id: Document ID
-            skip: Number of records to skip
+            before: (created_at, id) of the last version of the previous page
             limit: Maximum number of records to return
             
         Returns:
-            List of versions
+            List of versions, newest first (content columns are not loaded)
         """
-        return (
-            db.query(Version)
-            .filter(Version.document_id == document_id)
-            .order_by(Version.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self._history(db.query(Version).filter(Version.document_id == document_id), before=before, limit=limit)
     
     def get_by_pyramid_node(
-        self, db: Session, *, pyramid_node_id: UUID, skip: int = 0, limit: int = 100
+        self, db: Session, *, pyramid_node_id: UUID, before: Optional[HistoryCursor] = None, limit: int = 100
     ) -> List[Version]:
         """
-        Get all versions for a pyramid node.
+        Get the version history of a pyramid node, without content.
         
         Args:
             db: Database session
             pyramid_node_id: Pyramid node ID
-            skip: Number of records to skip
+            before: (created_at, id) of the last version of the previous page
             limit: Maximum number of records to return
             
         Returns:
-            List of versions
+            List of versions, newest first (content columns are not loaded)
         """
-        return (
-            db.query(Version)
-            .filter(Version.pyramid_node_id == pyramid_node_id)
-            .order_by(Version.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._history(
+            db.query(Version).filter(Version.pyramid_node_id == pyramid_node_id), before=before, limit=limit
         )
     
     def get_latest(
@@ -108,7 +461,10 @@ class CRUDVersion(CRUDBase[Version, VersionCreate, VersionUpdate]):
         else:
             return None
         
-        return query.order_by(Version.created_at.desc()).first()
+        latest = query.order_by(Version.created_at.desc()).first()
+        if latest:
+            self.hydrate(db, [latest])
+        return latest
 
 
 version = CRUDVersion(Version)
@@ -0,0 +1,95 @@
+"""
+Sparse ordering keys for sibling lists (pyramid nodes, documents).
+
+Items are numbered with gaps of ORDER_GAP, so moving one item between two
+neighbours usually only needs a new key for that item. When a gap is used
+up, the whole list is renumbered in a single `UPDATE ... FROM (VALUES ...)`
+statement.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+
+# Distance between consecutive keys after a renumbering
+ORDER_GAP = 1024
+
+
+def sparse_keys(count: int) -> List[int]:
+    """
+    Evenly spaced keys for a list of items.
+    
+    Args:
+        count: Number of items
+    
+    Returns:
+        Keys ORDER_GAP, 2 * ORDER_GAP, ...
+    """
+    return [(i + 1) * ORDER_GAP for i in range(count)]
+
+
+def key_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """
+    Find a key strictly between two neighbouring keys.
+    
+    Args:
+        before: Key of the previous item (None at the start of the list)
+        after: Key of the next item (None at the end of the list)
+    
+    Returns:
+        New key, or None if there is no free key and the list must be renumbered
+    """
+    if before is None and after is None:
+        return ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    if before is None:
+        # Keys stay non-negative (schemas require order >= 0)
+        return after // 2 if after > 0 else None
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+
+def bulk_update_order(
+    db: Session,
+    *,
+    model: Any,
+    order_column: str,
+    keys: Sequence[Tuple[Any, int]],
+    filters: Sequence[Any] = (),
+    values_to_set: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Set the ordering key of many rows with one UPDATE ... FROM (VALUES ...).
+    
+    The statement joins the caller's transaction and is not committed here.
+    
+    Args:
+        db: Database session
+        model: Model class with a UUID `id` primary key
+        order_column: Name of the ordering column
+        keys: (id, key) pairs
+        filters: Extra WHERE criteria (e.g. restricting to one project)
+        values_to_set: Extra columns to set on every updated row
+    
+    Returns:
+        Number of rows updated
+    """
+    if not keys:
+        return 0
+    
+    new_order = values(
+        column("id", UUID(as_uuid=True)),
+        column("key", Integer),
+        name="new_order"
+    ).data(list(keys))
+    
+    stmt = (
+        update(model)
+        .where(model.id == new_order.c.id, *filters)
+        .values({order_column: new_order.c.key, **(values_to_set or {})})
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
@@ -0,0 +1,71 @@
+"""
+Custom column types.
+"""
+import json
+from typing import Any, Optional, Union
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import LargeBinary, Text, TypeDecorator
+
+from app.core.compression import compress_text, compressed_columns, decompress_text
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text that can be stored compressed in a bytea column.
+    
+    Columns stay plain text until they are converted to bytea (see
+    compression_service convert) and STORAGE_COMPRESSED_COLUMNS is set.
+    Values are then compressed on write with the STORAGE_COMPRESSION codec
+    and decompressed when loaded, so models defer these columns to only
+    decompress the values that are used. Plain UTF-8 values (rows written
+    before the conversion) are read as-is, so a converted column can be
+    compressed in the background. A converted column cannot be searched
+    with SQL text operators.
+    """
+    
+    impl = Text
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        """Use bytea once the columns are converted."""
+        return dialect.type_descriptor(LargeBinary() if compressed_columns() else Text())
+    
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[Union[str, bytes]]:
+        """Compress text before it is sent to the database."""
+        if value is None or not compressed_columns():
+            return value
+        return compress_text(value)
+    
+    def process_result_value(self, value: Optional[Union[str, bytes]], dialect) -> Optional[str]:
+        """Decompress a loaded value."""
+        if value is None or isinstance(value, str):
+            return value
+        return decompress_text(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON document that can be stored compressed in a bytea column.
+    
+    For payloads that are only read back whole (never queried with JSON
+    operators). JSONB until converted, like CompressedText.
+    """
+    
+    impl = JSONB
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        """Use bytea once the columns are converted."""
+        return dialect.type_descriptor(LargeBinary() if compressed_columns() else JSONB())
+    
+    def process_bind_param(self, value: Any, dialect) -> Any:
+        """Serialize and compress a JSON value."""
+        if value is None or not compressed_columns():
+            return value
+        return compress_text(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+    
+    def process_result_value(self, value: Any, dialect) -> Any:
+        """Decompress and parse a loaded value."""
+        if value is None or not isinstance(value, (bytes, memoryview)):
+            return value
+        return json.loads(decompress_text(value))
@@ -6,13 +6,20 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.project import Project, ProjectStatus
 from app.models.document import Document, DocumentType
+from app.models.document_operation import DocumentOperation
+from app.models.document_block import DocumentBlock
 from app.models.entity import Entity, EntityType
 from app.models.tag_instance import TagInstance
 from app.models.arc import Arc, ArcLink
 from app.models.timeline import TimelineEvent, TimelineLink
 from app.models.llm_request import LLMRequest, LLMRequestType, LLMRequestStatus
 from app.models.pyramid_node import PyramidNode
+from app.models.pyramid_generation_job import PyramidGenerationJob, PyramidJobStatus
+from app.models.pyramid_coherence_result import PyramidCoherenceResult
 from app.models.version import Version
+from app.models.content_blob import ContentBlob
+from app.models.project_snapshot import ProjectSnapshot
+from app.models.document_provenance import DocumentProvenance
 from app.models.semantic_tag import Tag, TagType, EntityResolution
 from app.models.refresh_token import RefreshToken
 from app.models.audit_log import AuditLog
@@ -24,6 +31,8 @@ __all__ = [
     "ProjectStatus",
     "Document",
     "DocumentType",
+    "DocumentOperation",
+    "DocumentBlock",
     "Entity",
     "EntityType",
     "TagInstance",
@@ -35,7 +44,13 @@ __all__ = [
     "LLMRequestType",
     "LLMRequestStatus",
     "PyramidNode",
+    "PyramidGenerationJob",
+    "PyramidJobStatus",
+    "PyramidCoherenceResult",
     "Version",
+    "ContentBlob",
+    "ProjectSnapshot",
+    "DocumentProvenance",
     "Tag",
     "TagType",
     "EntityResolution",
@@ -0,0 +1,33 @@
+"""
+ContentBlob model for content-addressed version snapshots.
+"""
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.db.base_class import Base
+
+
+class ContentBlob(Base):
+    """
+    Compressed text stored once per project, addressed by its hash.
+    
+    `content_hash` is the SHA-256 of the UTF-8 text and `data` its
+    compression (app.core.compression). Versions reference blobs by (project_id, content_hash), so
+    identical snapshots (e.g. restored versions) are stored only once.
+    """
+    
+    __tablename__ = "content_blobs"
+    __table_args__ = (
+        UniqueConstraint("project_id", "content_hash", name="uq_content_blobs_project_hash"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed size in bytes
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
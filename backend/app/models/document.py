@@ -1,14 +1,15 @@
 """
 Document model for managing text documents within projects.
 """
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, String, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 import enum
 
 from app.db.base_class import Base
+from app.db.types import CompressedText
 
 
 class DocumentType(str, enum.Enum):
@@ -26,20 +27,33 @@ class Document(Base):
     """Document model representing a text document within a project."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     type = Column(SQLEnum(DocumentType), default=DocumentType.DRAFT, nullable=False)
-    content_raw = Column(Text, default="")  # Raw text with markup tags
+    # Raw text with markup tags (compressible, see STORAGE_COMPRESSED_COLUMNS), loaded
+    # on access. With block storage, a cache of the joined blocks: None until rebuilt
+    # after a block edit
+    content_raw = deferred(Column(CompressedText, default=""))
     content_rich = Column(JSONB)  # Rich editor structure (ProseMirror JSON)
     order_index = Column(Integer, default=0)
+    revision = Column(Integer, default=0, nullable=False)  # Bumped on every update (see crud_document)
+    word_count = Column(Integer, nullable=True)  # Kept in sync with content_raw on every write
+    block_storage = Column(Boolean, default=False, nullable=False)  # Text stored as DocumentBlocks (see crud_document)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Full-text search (see search_service): indexed on write, stale while search_indexed_at != updated_at
+    search_vector = deferred(Column(TSVECTOR))
+    search_indexed_at = Column(DateTime)
     
     # Relationships
     project = relationship("Project", back_populates="documents")
     tag_instances = relationship("TagInstance", back_populates="document", cascade="all, delete-orphan")
     arc_links = relationship("ArcLink", back_populates="document", cascade="all, delete-orphan")
     timeline_links = relationship("TimelineLink", back_populates="document", cascade="all, delete-orphan")
-    versions = relationship("Version", back_populates="document", cascade="all, delete-orphan")
+    # Deleted by the database (ON DELETE CASCADE), which orders delta chains itself
+    versions = relationship("Version", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,37 @@
+"""
+DocumentBlock model for documents stored as blocks.
+"""
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.db.base_class import Base
+
+
+class DocumentBlock(Base):
+    """
+    One paragraph of a document stored as blocks (see app.core.text_blocks).
+    
+    Blocks are loaded and saved individually, so editing a paragraph of a
+    long document does not rewrite the whole text. Their lengths and word
+    counts are stored so the offset of a block and the document's word
+    count are found without loading the other blocks' text.
+    """
+    
+    __tablename__ = "document_blocks"
+    __table_args__ = (
+        Index("ix_document_blocks_document_position", "document_id", "position"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)  # Sparse ordering key (see app.crud.ordering)
+    kind = Column(String(20), default="paragraph", nullable=False)  # paragraph, heading or scene_break
+    
+    content = Column(Text, nullable=False, default="")
+    length = Column(Integer, nullable=False, default=0)  # In Unicode code points
+    word_count = Column(Integer, nullable=False, default=0)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
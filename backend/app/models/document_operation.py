@@ -0,0 +1,33 @@
+"""
+DocumentOperation model for the recent edit log of documents.
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+
+from app.db.base_class import Base
+
+
+class DocumentOperation(Base):
+    """
+    Text operations (app.core.text_operations) that produced one revision of a document.
+    
+    Only revisions that changed the text get an entry, so a patch made
+    against an older revision can be rebased on the operations made since.
+    Entries older than the last DOCUMENT_OPERATION_LOG_SIZE revisions of
+    each document are pruned.
+    """
+    
+    __tablename__ = "document_operations"
+    __table_args__ = (
+        UniqueConstraint("document_id", "revision", name="uq_document_operations_document_revision"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(Integer, nullable=False)
+    
+    operations = Column(JSONB, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,31 @@
+"""
+DocumentProvenance model for incremental blame.
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class DocumentProvenance(Base):
+    """
+    Which version introduced each character of a document's latest version.
+    
+    `spans` holds `[end offset, origin index]` pairs (app.core.text_provenance)
+    and `origins` the `[version ID, author email, created_at]` they point
+    to, so blame survives the deletion of old versions by retention.
+    The row describes the content of `version_id` (hash `content_hash`)
+    and is advanced in the same transaction as each new version.
+    """
+    
+    __tablename__ = "document_provenance"
+    
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    version_id = Column(UUID(as_uuid=True), ForeignKey("versions.id", ondelete="SET NULL"), nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    
+    spans = Column(JSONB, nullable=False)
+    origins = Column(JSONB, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,9 +1,9 @@
 """
 Entity model for managing universe elements (characters, locations, items, etc.).
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 import enum
@@ -24,6 +24,9 @@ class Entity(Base):
     """Entity model representing universe elements (characters, locations, etc.)."""
     
     __tablename__ = "entities"
+    __table_args__ = (
+        Index("ix_entities_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -34,6 +37,9 @@ class Entity(Base):
     data = Column(JSONB, default={})  # Flexible data storage for type-specific attributes
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Full-text search (see search_service): indexed on write, stale while search_indexed_at != updated_at
+    search_vector = deferred(Column(TSVECTOR))
+    search_indexed_at = Column(DateTime)
     
     # Relationships
     project = relationship("Project", back_populates="entities")
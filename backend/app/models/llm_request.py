@@ -3,12 +3,13 @@ LLMRequest model for tracking LLM API calls and costs.
 """
 from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 import enum
 
 from app.db.base_class import Base
+from app.db.types import CompressedJSON
 
 
 class LLMRequestType(str, enum.Enum):
@@ -26,6 +27,7 @@ class LLMRequestType(str, enum.Enum):
     REVIEW_GLOBAL = "review_global"
     COHERENCE_CHECK = "coherence_check"
     EMBEDDING = "embedding"
+    PYRAMID_EXPANSION = "pyramid_expansion"
 
 
 class LLMRequestStatus(str, enum.Enum):
@@ -55,7 +57,7 @@ class LLMRequest(Base):
     
     # Request and response data
     request_payload = Column(JSONB, default={})
-    response_payload = Column(JSONB, default={})
+    response_payload = deferred(Column(CompressedJSON, default={}))  # Never queried, so compressible
     error_message = Column(String(1000))
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
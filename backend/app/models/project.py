@@ -1,7 +1,7 @@
 """
 Project model for managing writing projects.
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -28,6 +28,7 @@ class Project(Base):
     description = Column(Text)
     language = Column(String(10), default="fr")
     status = Column(SQLEnum(ProjectStatus), default=ProjectStatus.ACTIVE, nullable=False)
+    pyramid_revision = Column(Integer, default=0, nullable=False)  # Bumped on every pyramid node change
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
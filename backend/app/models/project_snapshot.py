@@ -0,0 +1,38 @@
+"""
+ProjectSnapshot model for whole-project snapshots.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from datetime import datetime
+import uuid
+
+from app.db.base_class import Base
+
+
+class ProjectSnapshot(Base):
+    """
+    State of every document and pyramid node of a project at one moment.
+    
+    `manifest` maps "documents" and "pyramid_nodes" to {item ID: content
+    hash}; the contents themselves are the project's content blobs, shared
+    with versions, so a snapshot stores no text that is already stored.
+    `content_hashes` lists the distinct hashes (GIN-indexed) so blob
+    garbage collection can tell which blobs snapshots still need.
+    """
+    
+    __tablename__ = "project_snapshots"
+    __table_args__ = (
+        Index('idx_project_snapshots_hashes', 'content_hashes', postgresql_using='gin'),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    name = Column(String(255), nullable=False)
+    author_email = Column(String(255), nullable=False)
+    
+    manifest = Column(JSONB, nullable=False)
+    content_hashes = Column(ARRAY(String(64)), nullable=False)
+    item_count = Column(Integer, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
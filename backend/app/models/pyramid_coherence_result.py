@@ -0,0 +1,33 @@
+"""
+PyramidCoherenceResult model caching coherence checks of pyramid nodes.
+"""
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+
+from app.db.base_class import Base
+
+
+class PyramidCoherenceResult(Base):
+    """
+    Last coherence check of a pyramid node.
+    
+    `context_hash` is the SHA-256 of the neighbourhood sent to the LLM (the
+    node, its parent and its children). A node only needs to be checked
+    again when that hash changes.
+    """
+    
+    __tablename__ = "pyramid_coherence_results"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    node_id = Column(UUID(as_uuid=True), ForeignKey("pyramid_nodes.id", ondelete="CASCADE"), nullable=False, unique=True)
+    
+    context_hash = Column(String(64), nullable=False)
+    is_coherent = Column(Boolean, nullable=False)
+    issues = Column(JSONB, default=list, nullable=False)
+    suggestions = Column(JSONB, default=list, nullable=False)
+    llm_request_id = Column(UUID(as_uuid=True), ForeignKey("llm_requests.id", ondelete="SET NULL"), nullable=True)
+    
+    checked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,54 @@
+"""
+PyramidGenerationJob model for whole-pyramid LLM generation.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+import enum
+
+from app.db.base_class import Base
+
+
+class PyramidJobStatus(str, enum.Enum):
+    """Enum for pyramid generation job status."""
+    PENDING = "pending"
+    RUNNING = "running"
+    INTERRUPTED = "interrupted"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class PyramidGenerationJob(Base):
+    """
+    PyramidGenerationJob model tracking a breadth-first expansion of a pyramid.
+    
+    Each level below the root is persisted in a single transaction together
+    with `completed_depth`, so an interrupted job resumes from the last
+    completed level.
+    """
+    
+    __tablename__ = "pyramid_generation_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    root_node_id = Column(UUID(as_uuid=True), ForeignKey("pyramid_nodes.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    # Requested shape
+    depth = Column(Integer, nullable=False)  # Levels to generate below the root
+    fan_out = Column(Integer, nullable=False)  # Children per node
+    target_length = Column(Integer, nullable=False, default=100)  # Words per child content
+    
+    # Progress
+    status = Column(SQLEnum(PyramidJobStatus), default=PyramidJobStatus.PENDING, nullable=False)
+    completed_depth = Column(Integer, nullable=False, default=0)  # Levels fully persisted
+    nodes_created = Column(Integer, nullable=False, default=0)
+    error_message = Column(String(1000))
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    root_node = relationship("PyramidNode")
@@ -1,9 +1,9 @@
 """
 Pyramid Node model for hierarchical story structure.
 """
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 
@@ -22,6 +22,9 @@ class PyramidNode(Base):
     """
     
     __tablename__ = "pyramid_nodes"
+    __table_args__ = (
+        Index("ix_pyramid_nodes_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -37,10 +40,14 @@ class PyramidNode(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Full-text search (see search_service): indexed on write, stale while search_indexed_at != updated_at
+    search_vector = deferred(Column(TSVECTOR))
+    search_indexed_at = Column(DateTime)
     
     # Relationships
     project = relationship("Project", backref="pyramid_nodes")
     parent = relationship("PyramidNode", remote_side=[id], backref="children")
     
     # NC-005 FIX: Relationship versions décommentée
-    versions = relationship("Version", back_populates="pyramid_node", cascade="all, delete-orphan")
+    # Deleted by the database (ON DELETE CASCADE), which orders delta chains itself
+    versions = relationship("Version", back_populates="pyramid_node", cascade="all, delete-orphan", passive_deletes=True)
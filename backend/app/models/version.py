@@ -1,13 +1,14 @@
 """
 Version model for Git-like versioning system.
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
 from app.db.base_class import Base
+from app.db.types import CompressedText
 
 
 class Version(Base):
@@ -21,6 +22,13 @@ class Version(Base):
     """
     
     __tablename__ = "versions"
+    __table_args__ = (
+        Index('idx_versions_project_hash', 'project_id', 'content_hash'),
+        # History listings page by (created_at, id) within one entity or project
+        Index('idx_versions_document_created', 'document_id', 'created_at', 'id'),
+        Index('idx_versions_node_created', 'pyramid_node_id', 'created_at', 'id'),
+        Index('idx_versions_project_created', 'project_id', 'created_at', 'id'),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -33,17 +41,37 @@ class Version(Base):
     commit_message = Column(String(500), nullable=False)
     author_email = Column(String(255), nullable=False)  # User email at time of commit
     
-    # Snapshot of content
-    content_snapshot = Column(Text, nullable=False)
+    # Inline full text (versions written before content blobs), otherwise NULL
+    content_snapshot = Column(CompressedText, nullable=True)
     metadata_snapshot = Column(Text)  # JSON string of additional metadata
     
+    # SHA-256 of the full content; keyframes read it from content_blobs
+    content_hash = Column(String(64), nullable=True)
+    
+    # Delta storage: content = apply_delta(content of delta_base, content_delta)
+    # (deltas go with their base, so deleting a whole history works in any order;
+    # version_retention_service rebases the deltas it keeps before deleting)
+    content_delta = Column(Text, nullable=True)
+    delta_base_id = Column(UUID(as_uuid=True), ForeignKey("versions.id", ondelete="CASCADE"), nullable=True, index=True)
+    delta_depth = Column(Integer, default=0, nullable=False)  # Deltas since the last keyframe
+    
     # Git-like fields
-    parent_version_id = Column(UUID(as_uuid=True), ForeignKey("versions.id", ondelete="SET NULL"), nullable=True)
+    parent_version_id = Column(UUID(as_uuid=True), ForeignKey("versions.id", ondelete="SET NULL"), nullable=True, index=True)
+    
+    # History stats, computed at write time against the previous version
+    # (NULL for versions written before them, see version_storage_service)
+    content_size = Column(Integer, nullable=True)  # Characters
+    words_added = Column(Integer, nullable=True)
+    words_removed = Column(Integer, nullable=True)
+    
+    # Auto-saves by the same author are coalesced into one row (see crud_version.create_autosave)
+    is_autosave = Column(Boolean, default=False, nullable=False)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     project = relationship("Project", backref="versions")
     document = relationship("Document", back_populates="versions")
     pyramid_node = relationship("PyramidNode", back_populates="versions")
-    parent_version = relationship("Version", remote_side=[id], backref="child_versions")
+    parent_version = relationship("Version", remote_side=[id], foreign_keys=[parent_version_id], backref="child_versions")
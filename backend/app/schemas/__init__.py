@@ -4,7 +4,7 @@ Schemas package initialization.
 from app.schemas.user import User, UserCreate, UserLogin, UserUpdate, UserInDB
 from app.schemas.token import Token, TokenData
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate, ProjectInDB
-from app.schemas.document import Document, DocumentCreate, DocumentUpdate, DocumentInDB
+from app.schemas.document import Document, DocumentCreate, DocumentUpdate, DocumentInDB, DocumentSummary, DocumentReorderRequest, DocumentMoveRequest, DocumentPatch, DocumentPatchResult, TextOperation, DocumentStorageUpdate, DocumentBlock, DocumentBlockCreate, DocumentBlockUpdate, DocumentBlockPage
 from app.schemas.entity import Entity, EntityCreate, EntityUpdate, EntityInDB
 from app.schemas.arc import Arc, ArcCreate, ArcUpdate, ArcInDB, ArcLink, ArcLinkCreate, ArcLinkUpdate, ArcLinkInDB
 from app.schemas.timeline import TimelineEvent, TimelineEventCreate, TimelineEventUpdate, TimelineEventInDB, TimelineLink, TimelineLinkCreate, TimelineLinkUpdate, TimelineLinkInDB
@@ -16,8 +16,10 @@ from app.schemas.llm_request import (
     ReviewRequest, ReviewResponse, ReviewSuggestion,
     GlobalReviewRequest, GlobalReviewResponse, GlobalReviewResult
 )
-from app.schemas.pyramid import PyramidNodeCreate, PyramidNodeUpdate, PyramidNode, PyramidNodeInDB, PyramidGenerateRequest, PyramidGenerateResponse, PyramidCoherenceCheck
-from app.schemas.version import VersionCreate, VersionUpdate, Version, VersionInDB, VersionDiff, VersionRestore
+from app.schemas.pyramid import PyramidNodeCreate, PyramidNodeUpdate, PyramidNode, PyramidNodeInDB, PyramidTreeNode, PyramidReorderRequest, PyramidMoveRequest, PyramidGenerateRequest, PyramidGenerateResponse, PyramidGenerationJobCreate, PyramidGenerationJob, PyramidCoherenceCheck, PyramidProjectCoherence
+from app.schemas.version import VersionCreate, VersionUpdate, Version, VersionInDB, VersionSummary, VersionDiff, VersionRestore, DiffHunk, DiffSegment, BlameSpan, DocumentBlame
+from app.schemas.project_snapshot import ProjectSnapshotCreate, ProjectSnapshot, ProjectSnapshotDiff, SnapshotItemDiff
+from app.schemas.search import SearchItemType, SearchResult
 from app.schemas.semantic_tag import TagCreate, TagUpdate, Tag, TagInDB, EntityResolutionCreate, EntityResolutionUpdate, EntityResolution, EntityResolutionInDB, TagParseRequest, TagParseResponse, TagAutocompleteRequest, TagAutocompleteResponse, TagValidateRequest, TagValidateResponse
 from app.schemas.analytics import ProjectAnalytics, WordCountStats, WritingProgressStats, EntityStats, ArcStats, TimelineStats, AnalyticsExport
 from app.schemas.export import ExportRequest, ExportResponse, ExportFormat, CSVExportRequest, CSVExportResponse
@@ -26,7 +28,7 @@ __all__ = [
     "User", "UserCreate", "UserLogin", "UserUpdate", "UserInDB",
     "Token", "TokenData",
     "Project", "ProjectCreate", "ProjectUpdate", "ProjectInDB",
-    "Document", "DocumentCreate", "DocumentUpdate", "DocumentInDB",
+    "Document", "DocumentCreate", "DocumentUpdate", "DocumentInDB", "DocumentSummary", "DocumentReorderRequest", "DocumentMoveRequest", "DocumentPatch", "DocumentPatchResult", "TextOperation", "DocumentStorageUpdate", "DocumentBlock", "DocumentBlockCreate", "DocumentBlockUpdate", "DocumentBlockPage",
     "Entity", "EntityCreate", "EntityUpdate", "EntityInDB",
     "Arc", "ArcCreate", "ArcUpdate", "ArcInDB",
     "ArcLink", "ArcLinkCreate", "ArcLinkUpdate", "ArcLinkInDB",
@@ -38,8 +40,10 @@ __all__ = [
     "EvaluationRequest", "EvaluationResponse", "EvaluationCriterion",
     "ReviewRequest", "ReviewResponse", "ReviewSuggestion",
     "GlobalReviewRequest", "GlobalReviewResponse", "GlobalReviewResult",
-    "PyramidNodeCreate", "PyramidNodeUpdate", "PyramidNode", "PyramidNodeInDB", "PyramidGenerateRequest", "PyramidGenerateResponse", "PyramidCoherenceCheck",
-    "VersionCreate", "VersionUpdate", "Version", "VersionInDB", "VersionDiff", "VersionRestore",
+    "PyramidNodeCreate", "PyramidNodeUpdate", "PyramidNode", "PyramidNodeInDB", "PyramidTreeNode", "PyramidReorderRequest", "PyramidMoveRequest", "PyramidGenerateRequest", "PyramidGenerateResponse", "PyramidGenerationJobCreate", "PyramidGenerationJob", "PyramidCoherenceCheck", "PyramidProjectCoherence",
+    "VersionCreate", "VersionUpdate", "Version", "VersionInDB", "VersionSummary", "VersionDiff", "VersionRestore", "DiffHunk", "DiffSegment", "BlameSpan", "DocumentBlame",
+    "ProjectSnapshotCreate", "ProjectSnapshot", "ProjectSnapshotDiff", "SnapshotItemDiff",
+    "SearchItemType", "SearchResult",
     "TagCreate", "TagUpdate", "Tag", "TagInDB", "EntityResolutionCreate", "EntityResolutionUpdate", "EntityResolution", "EntityResolutionInDB",
     "TagParseRequest", "TagParseResponse", "TagAutocompleteRequest", "TagAutocompleteResponse", "TagValidateRequest", "TagValidateResponse",
     "ProjectAnalytics", "WordCountStats", "WritingProgressStats", "EntityStats", "ArcStats", "TimelineStats", "AnalyticsExport",
@@ -1,9 +1,9 @@
 """
 Pydantic schemas for Document model.
 """
-from pydantic import BaseModel, UUID4, field_serializer
+from pydantic import BaseModel, UUID4, Field, field_serializer
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Annotated, Optional, Dict, Any, List, Literal, Union
 from app.models.document import DocumentType
 
 
@@ -31,10 +31,107 @@ class DocumentUpdate(BaseModel):
     order_index: Optional[int] = None
 
 
+class DocumentReorderRequest(BaseModel):
+    """Schema for putting documents of a project in a given order."""
+    document_ids: List[UUID4] = Field(..., min_length=1, max_length=5000)
+
+
+class DocumentMoveRequest(BaseModel):
+    """Schema for moving one document within its project."""
+    position: int = Field(..., ge=0)  # Index among the other documents
+
+
+class DocumentSummary(BaseModel):
+    """Schema for listing documents without their content."""
+    id: UUID4
+    title: str
+    type: DocumentType
+    order_index: int = 0
+    updated_at: datetime
+    word_count: int = 0
+    revision: int = 0
+    block_storage: bool = False
+    
+    class Config:
+        from_attributes = True
+
+
+class DocumentStorageUpdate(BaseModel):
+    """Schema for switching a document between whole-text and block storage."""
+    block_storage: bool
+
+
+class DocumentBlockCreate(BaseModel):
+    """Schema for inserting a block (one paragraph, without blank lines)."""
+    content: str = ""
+    position: Optional[int] = Field(None, ge=0)  # Index among the blocks (default: at the end)
+
+
+class DocumentBlockUpdate(BaseModel):
+    """Schema for rewriting a block."""
+    content: str
+
+
+class DocumentBlock(BaseModel):
+    """Schema for block response."""
+    id: UUID4
+    kind: str
+    content: str
+    word_count: int
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class DocumentBlockPage(BaseModel):
+    """Schema for a range of a document's blocks."""
+    document_id: UUID4
+    revision: int
+    total: int  # Number of blocks in the document
+    blocks: List[DocumentBlock]
+
+
+class InsertOperation(BaseModel):
+    """Schema for inserting text at an offset (in Unicode code points)."""
+    op: Literal["insert"]
+    offset: int = Field(..., ge=0)
+    text: str = Field(..., min_length=1)
+
+
+class DeleteOperation(BaseModel):
+    """Schema for deleting text at an offset (in Unicode code points)."""
+    op: Literal["delete"]
+    offset: int = Field(..., ge=0)
+    length: int = Field(..., ge=1)
+
+
+TextOperation = Annotated[Union[InsertOperation, DeleteOperation], Field(discriminator="op")]
+
+
+class DocumentPatch(BaseModel):
+    """Schema for editing a document's text with operations, applied in order."""
+    base_revision: int = Field(..., ge=0)  # Revision the operations were made against
+    operations: List[TextOperation] = Field(..., min_length=1, max_length=1000)
+
+
+class DocumentPatchResult(BaseModel):
+    """Schema for the result of a document patch (no document body)."""
+    id: UUID4
+    revision: int
+    updated_at: datetime
+    content_size: int
+    # Operations made since base_revision, to apply locally after the patch
+    operations: List[TextOperation] = []
+
+
 class DocumentInDB(DocumentBase):
     """Schema for document as stored in database."""
     id: UUID4
     project_id: UUID4
+    revision: int = 0
+    word_count: Optional[int] = None
+    block_storage: bool = False
     created_at: datetime
     updated_at: datetime
     
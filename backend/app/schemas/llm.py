@@ -15,6 +15,7 @@ class ContinuationRequest(BaseModel):
     entity_ids: Optional[List[UUID]] = Field(None, description="Entity IDs for context")
     arc_ids: Optional[List[UUID]] = Field(None, description="Arc IDs for context")
     event_ids: Optional[List[UUID]] = Field(None, description="Timeline event IDs for context")
+    candidates: int = Field(1, ge=1, le=5, description="Number of alternatives to generate in a single request")
 
 
 class RewritingRequest(BaseModel):
@@ -23,6 +24,7 @@ class RewritingRequest(BaseModel):
     text_to_rewrite: str = Field(..., description="The text to rewrite")
     rewriting_goals: str = Field(..., description="Specific goals for rewriting")
     user_instructions: Optional[str] = Field(None, description="Additional instructions")
+    candidates: int = Field(1, ge=1, le=5, description="Number of alternatives to generate in a single request")
 
 
 class SuggestionRequest(BaseModel):
@@ -33,6 +35,7 @@ class SuggestionRequest(BaseModel):
     entity_ids: Optional[List[UUID]] = Field(None, description="Entity IDs for context")
     arc_ids: Optional[List[UUID]] = Field(None, description="Arc IDs for context")
     event_ids: Optional[List[UUID]] = Field(None, description="Timeline event IDs for context")
+    candidates: int = Field(1, ge=1, le=5, description="Number of alternatives to generate in a single request")
 
 
 class AnalysisRequest(BaseModel):
@@ -46,6 +49,7 @@ class AnalysisRequest(BaseModel):
 class LLMResponse(BaseModel):
     """Response schema for LLM requests."""
     text: str = Field(..., description="Generated text")
+    candidates: List[str] = Field(default_factory=list, description="All generated alternatives, first one included")
     request_id: str = Field(..., description="ID of the logged request")
 
 
@@ -0,0 +1,50 @@
+"""
+Pydantic schemas for whole-project snapshots.
+"""
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+
+from app.core.text_diff import DiffGranularity
+from app.schemas.version import DiffHunk
+
+
+class ProjectSnapshotCreate(BaseModel):
+    """Schema for creating a project snapshot."""
+    name: str = Field(..., min_length=1, max_length=255)
+
+
+class ProjectSnapshot(BaseModel):
+    """Schema for a project snapshot (without its manifest)."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    project_id: UUID
+    name: str
+    author_email: str
+    item_count: int
+    created_at: datetime
+
+
+class SnapshotItemDiff(BaseModel):
+    """Schema for one document or pyramid node that differs between snapshots."""
+    item_type: str  # "document" or "pyramid_node"
+    item_id: UUID
+    status: str  # "added", "removed" or "changed"
+    content_hash_a: Optional[str] = None
+    content_hash_b: Optional[str] = None
+    additions: int
+    deletions: int
+    hunks: List[DiffHunk] = []
+
+
+class ProjectSnapshotDiff(BaseModel):
+    """Schema for the diff between two project snapshots."""
+    snapshot_a_id: UUID
+    snapshot_b_id: UUID
+    granularity: DiffGranularity = DiffGranularity.WORD
+    items: List[SnapshotItemDiff]
+    unchanged: int
+    additions: int
+    deletions: int
@@ -6,6 +6,8 @@ from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
 
+from app.models.pyramid_generation_job import PyramidJobStatus
+
 
 class PyramidNodeBase(BaseModel):
     """Base schema for PyramidNode."""
@@ -55,6 +57,28 @@ class PyramidNode(PyramidNodeInDB):
 PyramidNode.model_rebuild()
 
 
+class PyramidTreeNode(PyramidNodeInDB):
+    """Schema for a node of a nested pyramid tree built from a single query."""
+    descendant_count: int = 0
+    children: List["PyramidTreeNode"] = []
+
+
+PyramidTreeNode.model_rebuild()
+
+
+class PyramidReorderRequest(BaseModel):
+    """Request schema for placing nodes under a parent in a given order."""
+    project_id: UUID
+    parent_id: Optional[UUID] = None  # None for root nodes
+    node_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+
+
+class PyramidMoveRequest(BaseModel):
+    """Request schema for moving one node among the children of a parent."""
+    parent_id: Optional[UUID] = None  # None for root nodes
+    position: int = Field(..., ge=0)  # Index among the new siblings
+
+
 class PyramidGenerateRequest(BaseModel):
     """Request schema for generating pyramid nodes."""
     node_id: Optional[UUID] = None  # If None, generate from project description
@@ -68,9 +92,63 @@ class PyramidGenerateResponse(BaseModel):
     parent_node: Optional[PyramidNode] = None
 
 
+class PyramidChildDraft(BaseModel):
+    """Schema for one child node proposed by the LLM."""
+    title: str = Field(..., min_length=1, max_length=500)
+    content: str = Field(..., min_length=1)
+
+
+class PyramidExpansion(BaseModel):
+    """Schema for the structured LLM output of a downward expansion."""
+    children: List[PyramidChildDraft]
+
+
+class PyramidCoherenceVerdict(BaseModel):
+    """Schema for the structured LLM output of a coherence check."""
+    is_coherent: bool
+    issues: List[str] = []
+    suggestions: List[str] = []
+
+
+class PyramidGenerationJobCreate(BaseModel):
+    """Request schema for a whole-pyramid generation job."""
+    root_node_id: UUID
+    depth: int = Field(..., ge=1, le=2)  # Levels to generate below the root
+    fan_out: int = Field(default=3, ge=1, le=10)
+    target_length: int = Field(default=100, ge=20, le=1000)
+
+
+class PyramidGenerationJob(BaseModel):
+    """Schema for a pyramid generation job."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    project_id: UUID
+    root_node_id: UUID
+    depth: int
+    fan_out: int
+    target_length: int
+    status: PyramidJobStatus
+    completed_depth: int
+    nodes_created: int
+    error_message: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class PyramidCoherenceCheck(BaseModel):
     """Schema for pyramid coherence check."""
     node_id: UUID
     issues: List[str] = []
     is_coherent: bool
     suggestions: List[str] = []
+    cached: bool = False  # True if the neighbourhood was unchanged since the last check
+
+
+class PyramidProjectCoherence(BaseModel):
+    """Schema for a project-wide pyramid coherence pass."""
+    project_id: UUID
+    results: List[PyramidCoherenceCheck]
+    checked: int = 0  # Nodes sent to the LLM in this pass
+    cached: int = 0  # Nodes whose previous result was reused
+    failed: int = 0  # Nodes whose check failed (retried on the next pass)
@@ -0,0 +1,24 @@
+"""
+Pydantic schemas for project search.
+"""
+from pydantic import BaseModel
+from typing import List, Tuple
+from uuid import UUID
+import enum
+
+
+class SearchItemType(str, enum.Enum):
+    """Enum for searchable item types."""
+    DOCUMENT = "document"
+    ENTITY = "entity"
+    PYRAMID_NODE = "pyramid_node"
+
+
+class SearchResult(BaseModel):
+    """Schema for one search result."""
+    item_type: SearchItemType
+    item_id: UUID
+    title: str
+    rank: float  # Pass with item_type and item_id as the cursor of the next page
+    snippet: str
+    highlights: List[Tuple[int, int]] = []  # (start, end) of the matched words in the snippet
@@ -2,10 +2,12 @@
 Pydantic schemas for Version (Git-like versioning) operations.
 """
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
+from app.core.text_diff import DiffGranularity
+
 
 class VersionBase(BaseModel):
     """Base schema for Version."""
@@ -41,7 +43,13 @@ class VersionInDB(VersionBase):
     content_snapshot: str
     metadata_snapshot: Optional[str] = None
     parent_version_id: Optional[UUID] = None
+    content_hash: Optional[str] = None
+    content_size: Optional[int] = None
+    words_added: Optional[int] = None
+    words_removed: Optional[int] = None
+    is_autosave: bool = False
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
 
 class Version(VersionInDB):
@@ -49,13 +57,66 @@ class Version(VersionInDB):
     pass
 
 
+class VersionSummary(VersionBase):
+    """Schema for a version in history listings (without content)."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    project_id: UUID
+    document_id: Optional[UUID] = None
+    pyramid_node_id: Optional[UUID] = None
+    author_email: str
+    parent_version_id: Optional[UUID] = None
+    content_hash: Optional[str] = None
+    content_size: Optional[int] = None
+    words_added: Optional[int] = None
+    words_removed: Optional[int] = None
+    is_autosave: bool = False
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class DiffSegment(BaseModel):
+    """Schema for a run of unchanged ("equal"), deleted or inserted text."""
+    op: str
+    text: str
+
+
+class DiffHunk(BaseModel):
+    """Schema for a group of nearby changes with context."""
+    a_start: int
+    a_lines: int
+    b_start: int
+    b_lines: int
+    segments: List[DiffSegment]
+
+
 class VersionDiff(BaseModel):
     """Schema for version diff."""
     version_a_id: UUID
     version_b_id: UUID
+    granularity: DiffGranularity = DiffGranularity.LINE
     diff_text: str
     additions: int
     deletions: int
+    hunks: List[DiffHunk] = []
+
+
+class BlameSpan(BaseModel):
+    """Schema for a range of text introduced by one version."""
+    start: int
+    end: int
+    version_id: UUID  # May no longer exist if retention deleted it
+    author_email: str
+    created_at: datetime
+
+
+class DocumentBlame(BaseModel):
+    """Schema for the provenance of a range of a document's latest version."""
+    document_id: UUID
+    version_id: UUID
+    content_size: int
+    spans: List[BlameSpan]
 
 
 class VersionRestore(BaseModel):
@@ -3,11 +3,12 @@ Analytics service for generating project statistics and insights.
 """
 from typing import Dict, List, Any
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import func
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from app.crud import document as crud_document
 from app.models.document import Document
 from app.models.entity import Entity
 from app.models.arc import Arc
@@ -34,11 +35,17 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Word count statistics
         """
-        documents = db.query(Document).filter(Document.project_id == project_id).all()
+        crud_document.materialize(db, project_id=project_id)
+        documents = (
+            db.query(Document)
+            .options(undefer(Document.content_raw))
+            .filter(Document.project_id == project_id)
+            .all()
+        )
         
         total_words = 0
         total_characters = 0
@@ -74,13 +81,14 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Writing progress statistics
         """
         # Get documents updated in the last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        documents = db.query(Document).filter(
+        crud_document.materialize(db, project_id=project_id)
+        documents = db.query(Document).options(undefer(Document.content_raw)).filter(
             Document.project_id == project_id,
             Document.updated_at >= thirty_days_ago
         ).all()
@@ -116,7 +124,7 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Entity statistics
         """
@@ -148,7 +156,7 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Arc statistics
         """
@@ -178,7 +186,7 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Timeline statistics
         """
@@ -211,7 +219,7 @@ class AnalyticsService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             Complete project analytics
         """
@@ -0,0 +1,180 @@
+"""
+Blame service answering which version introduced a passage of a document.
+
+Provenance is maintained incrementally as versions are written (see
+crud_document_provenance), so a blame query reads one row and bisects its
+spans. Documents whose provenance is missing or stale (history written
+before provenance existed) are rebuilt from their history once, on first
+read, or ahead of time with:
+
+    python -m app.services.blame_service [--batch-size N]
+"""
+import argparse
+import logging
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.core.text_diff import DiffGranularity, diff_segments
+from app.core.text_provenance import Run, advance, compact, spans_in_range
+from app.crud import document_provenance as crud_document_provenance
+from app.crud import version as crud_version
+from app.models.document_provenance import DocumentProvenance
+from app.models.version import Version
+from app.schemas.version import BlameSpan, DocumentBlame
+
+logger = logging.getLogger(__name__)
+
+
+# Versions reconstructed per query while rebuilding a history
+REBUILD_BATCH_SIZE = 200
+
+
+class BlameService:
+    """Service for document provenance (blame)."""
+    
+    @staticmethod
+    def rebuild(
+        db: Session, *, document_id: UUID, batch_size: int = REBUILD_BATCH_SIZE
+    ) -> Optional[DocumentProvenance]:
+        """
+        Rebuild a document's provenance by replaying its whole history.
+        
+        Args:
+            db: Database session
+            document_id: Document ID
+            batch_size: Versions reconstructed per query
+        
+        Returns:
+            Rebuilt provenance, or None if the document has no versions
+        """
+        versions = (
+            db.query(Version.id, Version.author_email, Version.created_at, Version.content_hash)
+            .filter(Version.document_id == document_id)
+            .order_by(Version.created_at, Version.id)
+            .all()
+        )
+        if not versions:
+            return None
+        
+        runs: List[Run] = []
+        origins: list = []
+        previous = ""
+        for start in range(0, len(versions), batch_size):
+            batch = versions[start:start + batch_size]
+            contents = crud_version.reconstruct(db, [version.id for version in batch])
+            for version in batch:
+                content = contents.get(version.id)
+                if content is None:
+                    logger.warning(f"Version {version.id} cannot be reconstructed; skipped in blame")
+                    continue
+                origins.append([str(version.id), version.author_email, version.created_at.isoformat()])
+                runs = advance(runs, diff_segments(previous, content, DiffGranularity.WORD), len(origins) - 1)
+                runs, origins = compact(runs, origins)
+                previous = content
+        
+        latest = versions[-1]
+        crud_document_provenance.save(
+            db,
+            document_id=document_id,
+            version_id=latest.id,
+            content_hash=latest.content_hash or "",
+            runs=runs,
+            origins=origins
+        )
+        db.commit()
+        return crud_document_provenance.get(db, document_id=document_id)
+    
+    @staticmethod
+    def blame(db: Session, *, document_id: UUID, start: int = 0, end: Optional[int] = None) -> DocumentBlame:
+        """
+        Find which versions introduced a character range of a document's latest version.
+        
+        Args:
+            db: Database session
+            document_id: Document ID
+            start: First character offset
+            end: Offset after the last character (defaults to the end of the text)
+        
+        Returns:
+            Spans covering the range, with the version, author and date that introduced each
+        
+        Raises:
+            ValueError: If the document has no versions
+        """
+        latest = (
+            db.query(Version.id, Version.content_hash)
+            .filter(Version.document_id == document_id)
+            .order_by(Version.created_at.desc(), Version.id.desc())
+            .first()
+        )
+        if not latest:
+            raise ValueError("Document has no versions")
+        
+        provenance = crud_document_provenance.get(db, document_id=document_id)
+        if not provenance or (provenance.version_id, provenance.content_hash) != (latest.id, latest.content_hash or ""):
+            provenance = BlameService.rebuild(db, document_id=document_id)
+        
+        content_size = provenance.spans[-1][0] if provenance.spans else 0
+        end = content_size if end is None else min(end, content_size)
+        start = max(0, min(start, end))
+        origins = provenance.origins
+        return DocumentBlame(
+            document_id=document_id,
+            version_id=provenance.version_id,
+            content_size=content_size,
+            spans=[
+                BlameSpan(
+                    start=span_start,
+                    end=span_end,
+                    version_id=origins[origin][0],
+                    author_email=origins[origin][1],
+                    created_at=datetime.fromisoformat(origins[origin][2])
+                )
+                for span_start, span_end, origin in spans_in_range(provenance.spans, start, end)
+            ]
+        )
+    
+    @staticmethod
+    def rebuild_all(db: Session, *, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """
+        Rebuild the provenance of every versioned document, one document per transaction.
+        
+        Args:
+            db: Database session
+            batch_size: Versions reconstructed per query
+        
+        Returns:
+            Number of documents rebuilt
+        """
+        document_ids = [
+            document_id
+            for (document_id,) in db.query(Version.document_id)
+            .filter(Version.document_id.isnot(None))
+            .group_by(Version.document_id)
+            .order_by(Version.document_id)
+        ]
+        for count, document_id in enumerate(document_ids, start=1):
+            BlameService.rebuild(db, document_id=document_id, batch_size=batch_size)
+            if count % 100 == 0:
+                logger.info(f"Rebuilt the provenance of {count} documents")
+        return len(document_ids)
+
+
+blame_service = BlameService()
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Rebuild document provenance (blame) from version histories.")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print({"documents": blame_service.rebuild_all(session, batch_size=args.batch_size)})
+    finally:
+        session.close()
@@ -0,0 +1,306 @@
+"""
+Compression service for converting, migrating and benchmarking compressed columns.
+
+The large columns (see app.db.types) stay text/JSONB until they are
+converted to bytea with `convert`, then STORAGE_COMPRESSED_COLUMNS is
+set. The conversion rewrites the tables under an exclusive lock, so it
+needs a maintenance window. Converted columns accept both plain and
+compressed values, so existing rows are then compressed in the
+background, in small batches, while the application keeps running.
+`revert` decompresses everything and converts the columns back (unset
+STORAGE_COMPRESSED_COLUMNS first).
+
+    python -m app.services.compression_service convert
+    python -m app.services.compression_service migrate [--codec zstd] [--batch-size N]
+    python -m app.services.compression_service revert [--batch-size N]
+    python -m app.services.compression_service benchmark [--sample N] [--file PATH]
+"""
+import argparse
+import logging
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import LargeBinary, bindparam, select, text, type_coerce, update
+from sqlalchemy.orm import Session
+
+from app.core.compression import (
+    CODEC_BYTES,
+    MIN_COMPRESS_BYTES,
+    compress_bytes,
+    compressed_columns,
+    decompress_bytes,
+    is_compressed,
+    resolve_codec,
+)
+from app.models.document import Document
+from app.models.llm_request import LLMRequest
+from app.models.version import Version
+
+logger = logging.getLogger(__name__)
+
+
+# Columns stored with CompressedText / CompressedJSON
+COMPRESSED_COLUMNS: List[Tuple[Any, str]] = [
+    (Document, "content_raw"),
+    (Version, "content_snapshot"),
+    (LLMRequest, "response_payload"),
+]
+
+# Column conversions to bytea and back: (table, column, to bytea, back)
+COLUMN_CONVERSIONS: List[Tuple[str, str, str, str]] = [
+    (
+        "documents",
+        "content_raw",
+        "convert_to(content_raw, 'UTF8')",
+        "text USING convert_from(content_raw, 'UTF8')"
+    ),
+    (
+        "versions",
+        "content_snapshot",
+        "convert_to(content_snapshot, 'UTF8')",
+        "text USING convert_from(content_snapshot, 'UTF8')"
+    ),
+    (
+        "llm_requests",
+        "response_payload",
+        "convert_to(response_payload::text, 'UTF8')",
+        "jsonb USING convert_from(response_payload, 'UTF8')::jsonb"
+    ),
+]
+
+# Rows rewritten per transaction
+MIGRATION_BATCH_SIZE = 500
+
+BENCHMARK_CODECS = ("none", "zlib", "zstd")
+
+
+class CompressionService:
+    """Service for background compression of large columns."""
+    
+    @staticmethod
+    def convert_columns(db: Session, *, compressed: bool) -> None:
+        """
+        Convert the large columns to bytea, or back to text/JSONB.
+        
+        Each table is rewritten under an ACCESS EXCLUSIVE lock, blocking
+        reads and writes until it is done: run it in a maintenance window.
+        Values are kept as plain UTF-8, so converting back requires them to
+        be decompressed first (see revert).
+        
+        Args:
+            db: Database session
+            compressed: True to convert to bytea, False to convert back
+        """
+        for table, column, to_bytes, back in COLUMN_CONVERSIONS:
+            column_type = f"bytea USING {to_bytes}" if compressed else back
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {column_type}"))
+            logger.info(f"{table}.{column} converted to {column_type.split()[0]}")
+        db.commit()
+    
+    @staticmethod
+    def revert(db: Session, *, batch_size: int = MIGRATION_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Decompress every value and convert the columns back to text/JSONB.
+        
+        STORAGE_COMPRESSED_COLUMNS must still be set while the values are
+        decompressed, and unset once the columns are converted back.
+        
+        Args:
+            db: Database session
+            batch_size: Rows read per batch
+        
+        Returns:
+            Rows decompressed per "table.column"
+        """
+        rewritten = CompressionService.migrate_all(db, codec="none", batch_size=batch_size)
+        CompressionService.convert_columns(db, compressed=False)
+        return rewritten
+    
+    @staticmethod
+    def needs_rewrite(raw: bytes, codec: str) -> bool:
+        """
+        Check whether a stored value differs from its encoding with a codec.
+        
+        Args:
+            raw: Stored bytes
+            codec: Resolved target codec
+        
+        Returns:
+            True if the value should be rewritten
+        """
+        if codec == "none":
+            return is_compressed(raw)
+        if is_compressed(raw):
+            return raw[1:2] != CODEC_BYTES[codec]
+        return len(raw) >= MIN_COMPRESS_BYTES
+    
+    @staticmethod
+    def migrate_column(
+        db: Session,
+        *,
+        model: Any,
+        column_name: str,
+        codec: Optional[str] = None,
+        batch_size: int = MIGRATION_BATCH_SIZE
+    ) -> int:
+        """
+        Rewrite a column's existing values with a codec, batch by batch.
+        
+        Values are read and written as raw bytes (no ORM objects), only rows
+        that need it are updated, and each batch is committed, so the
+        migration can run next to live traffic and be resumed.
+        
+        Args:
+            db: Database session
+            model: Model class with a UUID `id` primary key
+            column_name: Compressed column to migrate
+            codec: Target codec (defaults to STORAGE_COMPRESSION)
+            batch_size: Rows read per batch
+        
+        Returns:
+            Number of rows rewritten
+        
+        Raises:
+            ValueError: If the columns are not converted (STORAGE_COMPRESSED_COLUMNS)
+        """
+        if not compressed_columns():
+            raise ValueError("Compressed columns are not enabled, convert them first")
+        codec = resolve_codec(codec)
+        table = model.__table__
+        raw_column = type_coerce(table.c[column_name], LargeBinary)
+        values = {column_name: bindparam("new_value", type_=LargeBinary)}
+        if "updated_at" in table.c:
+            # A storage migration is not a content change
+            values["updated_at"] = table.c.updated_at
+        stmt = update(table).where(table.c.id == bindparam("row_id")).values(values)
+        
+        rewritten = 0
+        last_id = None
+        while True:
+            query = select(table.c.id, raw_column).where(table.c[column_name].isnot(None))
+            if last_id is not None:
+                query = query.where(table.c.id > last_id)
+            rows = db.execute(query.order_by(table.c.id).limit(batch_size)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            params = [
+                {"row_id": row_id, "new_value": compress_bytes(decompress_bytes(bytes(raw)), codec)}
+                for row_id, raw in rows
+                if CompressionService.needs_rewrite(bytes(raw), codec)
+            ]
+            if params:
+                db.execute(stmt, params)
+                db.commit()
+                rewritten += len(params)
+            logger.info(f"{table.name}.{column_name}: {rewritten} rows rewritten")
+        
+        return rewritten
+    
+    @staticmethod
+    def migrate_all(
+        db: Session, *, codec: Optional[str] = None, batch_size: int = MIGRATION_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        Rewrite every compressed column with a codec.
+        
+        Args:
+            db: Database session
+            codec: Target codec (defaults to STORAGE_COMPRESSION)
+            batch_size: Rows read per batch
+        
+        Returns:
+            Rows rewritten per "table.column"
+        """
+        return {
+            f"{model.__tablename__}.{column_name}": CompressionService.migrate_column(
+                db, model=model, column_name=column_name, codec=codec, batch_size=batch_size
+            )
+            for model, column_name in COMPRESSED_COLUMNS
+        }
+    
+    @staticmethod
+    def benchmark(texts: Iterable[str], codecs: Iterable[str] = BENCHMARK_CODECS) -> Dict[str, Dict[str, float]]:
+        """
+        Compare codecs on sample texts.
+        
+        Args:
+            texts: Sample texts (e.g. document contents)
+            codecs: Codecs to compare (unavailable ones fall back as in production)
+        
+        Returns:
+            Per codec: stored bytes, compression ratio, write throughput
+            (MB/s) and read latency per text (p50 and p95, in ms)
+        """
+        samples = [text.encode("utf-8") for text in texts]
+        raw_bytes = sum(len(sample) for sample in samples) or 1
+        
+        results: Dict[str, Dict[str, float]] = {}
+        for codec in codecs:
+            resolved = resolve_codec(codec)
+            start = time.perf_counter()
+            stored = [compress_bytes(sample, resolved) for sample in samples]
+            write_seconds = time.perf_counter() - start
+            
+            read_ms = []
+            for value in stored:
+                start = time.perf_counter()
+                decompress_bytes(value).decode("utf-8")
+                read_ms.append((time.perf_counter() - start) * 1000)
+            read_ms.sort()
+            
+            stored_bytes = sum(len(value) for value in stored)
+            results[codec if codec == resolved else f"{codec} (as {resolved})"] = {
+                "stored_bytes": stored_bytes,
+                "ratio": round(raw_bytes / (stored_bytes or 1), 2),
+                "write_mb_per_s": round(raw_bytes / 1e6 / (write_seconds or 1e-9), 1),
+                "read_p50_ms": round(statistics.median(read_ms), 3) if read_ms else 0.0,
+                "read_p95_ms": round(read_ms[int(len(read_ms) * 0.95)] if read_ms else 0.0, 3),
+            }
+        return results
+
+
+compression_service = CompressionService()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert, migrate or benchmark compressed columns.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("convert", help="convert the columns to bytea (locks and rewrites the tables)")
+    migrate_parser = subparsers.add_parser("migrate", help="rewrite existing rows with a codec")
+    migrate_parser.add_argument("--codec", default=None, help="none, zlib or zstd (default: STORAGE_COMPRESSION)")
+    migrate_parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    revert_parser = subparsers.add_parser("revert", help="decompress and convert the columns back to text")
+    revert_parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    benchmark_parser = subparsers.add_parser("benchmark", help="compare codecs on document contents")
+    benchmark_parser.add_argument("--sample", type=int, default=200, help="documents to sample")
+    benchmark_parser.add_argument("--file", default=None, help="benchmark a text file instead of the database")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "benchmark" and args.file:
+        with open(args.file, encoding="utf-8") as f:
+            # One sample per blank-line separated chapter-sized chunk
+            texts = [chunk for chunk in f.read().split("\n\n\n") if chunk.strip()]
+        print(compression_service.benchmark(texts))
+    else:
+        from app.db.session import SessionLocal
+        
+        session = SessionLocal()
+        try:
+            if args.command == "convert":
+                compression_service.convert_columns(session, compressed=True)
+            elif args.command == "migrate":
+                print(compression_service.migrate_all(session, codec=args.codec, batch_size=args.batch_size))
+            elif args.command == "revert":
+                print(compression_service.revert(session, batch_size=args.batch_size))
+            else:
+                texts = [
+                    content
+                    for (content,) in session.query(Document.content_raw).limit(args.sample)
+                    if content
+                ]
+                print(compression_service.benchmark(texts))
+        finally:
+            session.close()
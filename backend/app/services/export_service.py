@@ -9,7 +9,7 @@ import io
 import csv
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.models.project import Project
 from app.models.document import Document
@@ -32,15 +32,20 @@ class ExportService:
             db: Database session
             project_id: Project ID
             document_ids: Optional list of specific document IDs to export
-            
+        
         Returns:
             Markdown string
         """
         # NC-001 FIX: Structure plate uniquement, pas de hiérarchie
         if document_ids:
-            documents = [db.query(Document).filter(Document.id == doc_id).first() for doc_id in document_ids]
+            crud_document.materialize(db, document_ids=document_ids)
+            documents = [
+                db.query(Document).options(undefer(Document.content_raw)).filter(Document.id == doc_id).first()
+                for doc_id in document_ids
+            ]
             documents = [doc for doc in documents if doc]  # Filter out None
         else:
+            crud_document.materialize(db, project_id=project_id)
             documents = crud_document.get_by_project(db, project_id=project_id)
         
         markdown_parts = []
@@ -60,7 +65,7 @@ class ExportService:
             db: Database session
             project_id: Project ID
             document_ids: Optional list of specific document IDs to export
-            
+        
         Returns:
             PDF bytes
         """
@@ -78,7 +83,7 @@ class ExportService:
             db: Database session
             project_id: Project ID
             document_ids: Optional list of specific document IDs to export
-            
+        
         Returns:
             DOCX bytes
         """
@@ -96,7 +101,7 @@ class ExportService:
             db: Database session
             project_id: Project ID
             document_ids: Optional list of specific document IDs to export
-            
+        
         Returns:
             EPUB bytes
         """
@@ -115,7 +120,7 @@ class ExportService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             CSV string
         """
@@ -146,7 +151,7 @@ class ExportService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             CSV string
         """
@@ -176,7 +181,7 @@ class ExportService:
         Args:
             db: Database session
             project_id: Project ID
-            
+        
         Returns:
             CSV string
         """
@@ -210,7 +215,7 @@ class ExportService:
             project_id: Project ID
             user_id: User ID
             style: Style for enhancement (formal, casual, literary)
-            
+        
         Returns:
             Enhanced text
         """
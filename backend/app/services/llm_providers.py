@@ -0,0 +1,497 @@
+"""
+LLM provider abstraction.
+
+Providers implement a single completion interface (sync, async and
+streaming) and are registered by name, so LLMService never branches on the
+backend in use. Built-in providers:
+
+- "mock": canned responses for tests and local development
+- "openai": any OpenAI-compatible Chat Completions API (OpenAI itself, a
+  self-hosted model server, or the local stand-in server from
+  app.services.llm_standin_server)
+
+Provider instances are cached per name, so HTTP connection pools are shared
+across requests instead of being rebuilt for every LLMService.
+"""
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.models.llm_request import LLMRequestType
+
+
+class LLMCompletion(BaseModel):
+    """Result of a completion request."""
+    texts: List[str]
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        """First (or only) candidate."""
+        return self.texts[0] if self.texts else ""
+
+    @property
+    def total_tokens(self) -> int:
+        """Total tokens billed for the request."""
+        return self.input_tokens + self.output_tokens
+
+
+class LLMProvider(ABC):
+    """
+    Base class for LLM providers.
+
+    Subclasses must implement `complete`, `acomplete` and `stream` (an
+    incomplete provider cannot be instantiated). Every method
+    takes the same arguments:
+
+    - system_prompt / user_prompt: Chat messages
+    - request_type: Type of request (used by providers that specialise output)
+    - candidates: Number of alternatives to sample from one prompt
+    - max_tokens: Output token limit per candidate
+    - stop: Optional stop sequences
+    - response_format: Optional structured output constraint (JSON schema)
+    - hints: Optional provider-specific hints (e.g. expected item count)
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Run a completion and wait for the full result."""
+
+    @abstractmethod
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Run a completion without blocking the event loop."""
+
+    @abstractmethod
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Yield the text of a single completion as it is generated."""
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+_PROVIDER_CLASSES: Dict[str, Type[LLMProvider]] = {}
+_PROVIDER_INSTANCES: Dict[str, LLMProvider] = {}
+
+
+def register_provider(name: str) -> Callable[[Type[LLMProvider]], Type[LLMProvider]]:
+    """
+    Class decorator registering an LLM provider under a name.
+
+    Args:
+        name: Provider name used in LLM_PROVIDER
+
+    Returns:
+        Decorator returning the class unchanged
+    """
+    def decorator(cls: Type[LLMProvider]) -> Type[LLMProvider]:
+        cls.name = name
+        _PROVIDER_CLASSES[name] = cls
+        return cls
+    return decorator
+
+
+def get_provider(name: str) -> LLMProvider:
+    """
+    Get the shared provider instance registered under a name.
+
+    Args:
+        name: Provider name
+
+    Returns:
+        Provider instance (created on first use)
+
+    Raises:
+        ValueError: If no provider is registered under that name
+        TypeError: If the registered provider does not implement every method
+    """
+    if name not in _PROVIDER_INSTANCES:
+        if name not in _PROVIDER_CLASSES:
+            raise ValueError(
+                f"Unknown LLM provider '{name}'. Available: {', '.join(sorted(_PROVIDER_CLASSES))}"
+            )
+        _PROVIDER_INSTANCES[name] = _PROVIDER_CLASSES[name]()
+    return _PROVIDER_INSTANCES[name]
+
+
+def available_providers() -> List[str]:
+    """List registered provider names."""
+    return sorted(_PROVIDER_CLASSES)
+
+
+# ============================================================================
+# MOCK PROVIDER
+# ============================================================================
+
+MOCK_RESPONSES: Dict[LLMRequestType, str] = {
+    LLMRequestType.CONTINUATION: """Elle s'arrêta au seuil de la porte, le cœur battant. La pièce était plongée dans une pénombre épaisse, à peine troublée par la lueur vacillante d'une bougie oubliée sur le manteau de la cheminée. L'air sentait le renfermé et quelque chose d'autre, une odeur métallique qu'elle ne parvenait pas à identifier.
+
+"Il y a quelqu'un ?" murmura-t-elle, sa voix tremblante trahissant sa nervosité.
+
+Seul le silence lui répondit, un silence si profond qu'elle pouvait entendre les battements de son propre cœur. Elle fit un pas en avant, puis un autre, ses yeux s'habituant progressivement à l'obscurité. C'est alors qu'elle le vit : une silhouette immobile, assise dans le fauteuil près de la fenêtre.
+
+"Qui êtes-vous ?" demanda-t-elle, sa main cherchant instinctivement le manche du couteau qu'elle avait glissé dans sa poche avant de partir.
+
+La silhouette ne bougea pas, mais une voix grave s'éleva dans l'obscurité :
+
+"Je vous attendais."
+""",
+    LLMRequestType.REWRITING: """Elle s'immobilisa sur le seuil, le souffle court. Dans la pénombre de la pièce, seule une bougie agonisante jetait des ombres dansantes sur les murs. L'atmosphère était lourde, chargée d'une odeur de renfermé mêlée à quelque chose de plus inquiétant – une senteur métallique qui lui nouait l'estomac.
+
+"Y a-t-il quelqu'un ?" Sa voix n'était qu'un murmure rauque.
+
+Le silence qui suivit était oppressant, presque palpable. Elle avança d'un pas hésitant, puis d'un autre, forçant ses yeux à percer l'obscurité. C'est alors qu'elle distingua la silhouette – une forme humaine, parfaitement immobile, installée dans le fauteuil près de la fenêtre voilée.
+
+Sa main se referma instinctivement sur le manche du couteau dissimulé dans sa poche.
+
+"Qui êtes-vous ?"
+
+La silhouette demeurait figée, mais une voix profonde émergea des ténèbres :
+
+"Je vous attendais."
+""",
+    LLMRequestType.SUGGESTION: """Voici plusieurs suggestions pour développer cette scène :
+
+**Option 1 - Révélation immédiate (approche directe)**
+La silhouette pourrait se révéler être un personnage que le lecteur connaît déjà, créant une surprise ou confirmant des soupçons. Cela permettrait d'avancer rapidement l'intrigue et de créer une confrontation directe.
+
+**Option 2 - Montée de tension (approche suspense)**
+Prolonger le mystère en faisant parler la silhouette sans révéler son identité. Elle pourrait donner des indices cryptiques sur ses motivations, créant une atmosphère de menace psychologique avant toute action physique.
+
+**Option 3 - Retournement de situation (approche audacieuse)**
+La protagoniste pourrait découvrir que la silhouette est en fait une victime ou un allié inattendu, renversant complètement les attentes du lecteur et ouvrant de nouvelles possibilités narratives.
+
+**Option 4 - Escalade du danger (approche action)**
+La silhouette pourrait ne pas être seule. D'autres présences pourraient se révéler dans la pièce, transformant la scène en une situation de danger immédiat nécessitant une réaction rapide de la protagoniste.
+
+Chaque option offre des possibilités différentes pour le développement des personnages et de l'intrigue.
+""",
+    LLMRequestType.ANALYSIS: """**Analyse de la scène**
+
+**Points forts :**
+1. **Atmosphère réussie** : La description crée efficacement une ambiance de suspense et de mystère.
+2. **Rythme maîtrisé** : La progression est bien dosée, avec une montée graduelle de la tension.
+3. **Dialogue efficace** : Les répliques sont courtes et percutantes.
+
+**Axes d'amélioration :**
+1. **Caractérisation** : On pourrait enrichir la scène en révélant davantage sur l'état émotionnel de la protagoniste.
+2. **Détails sensoriels** : Ajouter des éléments tactiles ou auditifs renforcerait l'immersion.
+3. **Voix narrative** : Le style pourrait être plus distinctif pour refléter la personnalité du protagoniste.
+"""
+}
+
+# Simulated API latency of the mock provider
+MOCK_LATENCY_SECONDS = 0.5
+
+
+def build_mock_pyramid_expansion(parent_title: str, count: int) -> str:
+    """
+    Build a mock structured pyramid expansion.
+
+    Args:
+        parent_title: Title of the node being expanded
+        count: Number of children to generate
+
+    Returns:
+        JSON string matching the pyramid expansion schema
+    """
+    children = [
+        {
+            "title": f"{parent_title} - Partie {i + 1}",
+            "content": (
+                f"Développement détaillé de l'élément « {parent_title} », étape {i + 1} sur {count}. "
+                "Les personnages affrontent une nouvelle difficulté qui fait progresser l'intrigue "
+                "et prépare la suite du récit."
+            )
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"children": children}, ensure_ascii=False)
+
+
+def build_mock_coherence_check() -> str:
+    """
+    Build a mock structured coherence check.
+
+    Returns:
+        JSON string matching the pyramid coherence schema
+    """
+    return json.dumps({
+        "is_coherent": True,
+        "issues": [],
+        "suggestions": [
+            "Préciser la motivation du personnage principal pour renforcer le lien avec l'élément parent."
+        ]
+    }, ensure_ascii=False)
+
+
+@register_provider("mock")
+class MockProvider(LLMProvider):
+    """Provider returning realistic canned responses without any network call."""
+
+    model = "mock-model"
+
+    def _mock_text(self, request_type: LLMRequestType, hints: Optional[Dict[str, Any]]) -> str:
+        """Pick the canned response for a request type."""
+        hints = hints or {}
+        if request_type == LLMRequestType.PYRAMID_EXPANSION:
+            return build_mock_pyramid_expansion(hints.get("parent_title", "Élément"), hints.get("count", 3))
+        if request_type == LLMRequestType.COHERENCE_CHECK:
+            return build_mock_coherence_check()
+        return MOCK_RESPONSES.get(request_type, "Mock response for testing purposes.")
+
+    def _completion(self, texts: List[str], user_prompt: str) -> LLMCompletion:
+        """Wrap mock texts with rough token estimates."""
+        return LLMCompletion(
+            texts=texts,
+            model=self.model,
+            input_tokens=len(user_prompt.split()) * 2,
+            output_tokens=sum(len(text.split()) * 2 for text in texts)
+        )
+
+    def _sample(self, request_type: LLMRequestType, hints: Optional[Dict[str, Any]]) -> str:
+        """Generate one mock candidate, simulating API latency."""
+        time.sleep(MOCK_LATENCY_SECONDS)
+        return self._mock_text(request_type, hints)
+
+    def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Generate mock candidates, sampled in parallel when several are requested."""
+        if candidates == 1:
+            texts = [self._sample(request_type, hints)]
+        else:
+            with ThreadPoolExecutor(max_workers=candidates) as executor:
+                texts = list(executor.map(lambda _: self._sample(request_type, hints), range(candidates)))
+        return self._completion(texts, user_prompt)
+
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Generate mock candidates concurrently on the event loop."""
+        async def sample() -> str:
+            await asyncio.sleep(MOCK_LATENCY_SECONDS)
+            return self._mock_text(request_type, hints)
+
+        texts = await asyncio.gather(*(sample() for _ in range(candidates)))
+        return self._completion(list(texts), user_prompt)
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Yield the mock response word by word."""
+        text = self._mock_text(request_type, hints)
+        for word in text.split(" "):
+            time.sleep(MOCK_LATENCY_SECONDS / 100)
+            yield word + " "
+
+
+# ============================================================================
+# OPENAI-COMPATIBLE PROVIDER
+# ============================================================================
+
+@register_provider("openai")
+class OpenAIProvider(LLMProvider):
+    """
+    Provider for OpenAI-compatible Chat Completions APIs.
+
+    LLM_BASE_URL points it at a self-hosted server or the local stand-in
+    server; connection pool size and timeouts come from settings.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[Any] = None,
+        async_http_client: Optional[Any] = None
+    ):
+        """
+        Create pooled sync and async clients.
+        
+        Args:
+            base_url: API base URL (defaults to LLM_BASE_URL, then OpenAI)
+            http_client: Optional preconfigured httpx.Client
+            async_http_client: Optional preconfigured httpx.AsyncClient
+        """
+        try:
+            import httpx
+            from openai import OpenAI, AsyncOpenAI
+        except ImportError:
+            raise ImportError("OpenAI package not installed. Run: pip install openai")
+
+        self.model = settings.LLM_MODEL
+        limits = httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_CONNECTIONS
+        )
+        timeout = httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0)
+        client_options = {
+            "api_key": settings.OPENAI_API_KEY,
+            "base_url": base_url or settings.LLM_BASE_URL,
+            "max_retries": settings.LLM_MAX_RETRIES,
+            "timeout": timeout,
+        }
+        self.client = OpenAI(
+            http_client=http_client or httpx.Client(limits=limits, timeout=timeout),
+            **client_options
+        )
+        self.async_client = AsyncOpenAI(
+            http_client=async_http_client or httpx.AsyncClient(limits=limits, timeout=timeout),
+            **client_options
+        )
+
+    def _params(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        candidates: int,
+        max_tokens: int,
+        stop: Optional[List[str]],
+        response_format: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build Chat Completions request parameters."""
+        params = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "n": candidates,
+        }
+        if stop:
+            params["stop"] = stop
+        if response_format:
+            params["response_format"] = response_format
+        return params
+
+    def _completion(self, response: Any) -> LLMCompletion:
+        """Convert a Chat Completions response."""
+        return LLMCompletion(
+            texts=[choice.message.content or "" for choice in response.choices],
+            model=response.model or self.model,
+            input_tokens=response.usage.prompt_tokens if response.usage else 0,
+            output_tokens=response.usage.completion_tokens if response.usage else 0
+        )
+
+    def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Sample `candidates` completions from one request (the `n` parameter)."""
+        response = self.client.chat.completions.create(
+            **self._params(system_prompt, user_prompt, candidates, max_tokens, stop, response_format)
+        )
+        return self._completion(response)
+
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        candidates: int = 1,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> LLMCompletion:
+        """Async variant of `complete` using the pooled async client."""
+        response = await self.async_client.chat.completions.create(
+            **self._params(system_prompt, user_prompt, candidates, max_tokens, stop, response_format)
+        )
+        return self._completion(response)
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        request_type: LLMRequestType,
+        max_tokens: int = 2000,
+        stop: Optional[List[str]] = None,
+        hints: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Yield content deltas from a streamed completion."""
+        response = self.client.chat.completions.create(
+            stream=True,
+            **self._params(system_prompt, user_prompt, 1, max_tokens, stop, None)
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
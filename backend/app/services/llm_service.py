@@ -1,38 +1,47 @@
 """
 LLM Service for literary writing assistance.
 
-This service handles all interactions with LLM APIs, with support for both
-mock mode (for testing) and production mode (with real API calls).
+This service handles all interactions with LLM APIs through a named provider
+(see llm_providers.py): "mock" for testing, "openai" for any OpenAI-compatible
+API in production.
 
-The service is designed to be easily switchable between modes via environment
-variable, and all prompts are centralized in prompts.py for easy adjustment.
+The provider is selected via environment variables (LLM_PROVIDER, or
+LLM_MOCK_MODE), and all prompts are centralized in prompts.py for easy adjustment.
 """
 import os
 import json
-import time
-from typing import Optional, Dict, Any, List
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Callable, Dict, Any, Iterator, List, Tuple
 from datetime import datetime
 from uuid import UUID
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
 
 from app.core.config import settings
 from app.services import prompts
+from app.services import token_budget
+from app.services.llm_providers import get_provider
+from app.services.token_budget import token_budget_calibrator
 from app.models.llm_request import LLMRequest, LLMRequestType, LLMRequestStatus
 from app.crud.crud_project import project as project_crud
 from app.crud.crud_entity import entity as entity_crud
 from app.crud.crud_arc import arc as arc_crud
 from app.crud.crud_timeline import timeline_event as timeline_event_crud
+from app.schemas.pyramid import PyramidExpansion, PyramidCoherenceVerdict
+
+logger = logging.getLogger(__name__)
 
 
 class LLMService:
     """
-    Service for LLM interactions with mock and production modes.
+    Service for LLM interactions through a pluggable provider.
     
-    Mock mode generates realistic but fake responses for testing.
-    Production mode uses real OpenAI API calls.
+    The mock provider generates realistic but fake responses for testing.
+    The openai provider calls an OpenAI-compatible API.
     """
     
-    def __init__(self, db: Session, user_id: UUID, use_mock: bool = None):
+    def __init__(self, db: Session, user_id: UUID, use_mock: bool = None, provider: Optional[str] = None):
         """
         Initialize LLM service.
         
@@ -40,24 +49,18 @@ class LLMService:
             db: Database session
             user_id: Current user ID
             use_mock: Whether to use mock mode. If None, reads from environment.
+            provider: Provider name. If None, derived from LLM_PROVIDER or the mode.
         """
         self.db = db
         self.user_id = user_id
         
         # Determine mode from parameter or environment
         if use_mock is None:
-            self.use_mock = os.getenv("LLM_MOCK_MODE", "true").lower() == "true"
-        else:
-            self.use_mock = use_mock
+            use_mock = os.getenv("LLM_MOCK_MODE", "true").lower() == "true"
+            provider = provider or os.getenv("LLM_PROVIDER") or settings.LLM_PROVIDER or None
         
-        # Initialize OpenAI client only in production mode
-        self.client = None
-        if not self.use_mock:
-            try:
-                from openai import OpenAI
-                self.client = OpenAI()  # Uses OPENAI_API_KEY from environment
-            except ImportError:
-                raise ImportError("OpenAI package not installed. Run: pip install openai")
+        self.provider = get_provider(provider or ("mock" if use_mock else "openai"))
+        self.use_mock = self.provider.name == "mock"
     
     def _log_request(
         self,
@@ -66,8 +69,12 @@ class LLMService:
         prompt: str,
         response: str,
         model: str,
-        tokens_used: Optional[int] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        metadata: Optional[Dict[str, Any]] = None,
+        status: LLMRequestStatus = LLMRequestStatus.COMPLETED,
+        error_message: Optional[str] = None,
+        candidates: Optional[List[str]] = None
     ) -> LLMRequest:
         """
         Log an LLM request to the database.
@@ -78,22 +85,31 @@ class LLMService:
             prompt: Full prompt sent to LLM
             response: Response from LLM
             model: Model used
-            tokens_used: Number of tokens used
+            input_tokens: Prompt tokens billed
+            output_tokens: Completion tokens billed
             metadata: Additional metadata
+            status: Final status of the request
+            error_message: Error description for failed requests
+            candidates: All alternatives returned when several were requested
             
         Returns:
             Created LLMRequest instance
         """
+        response_payload = {"response": response}
+        if candidates and len(candidates) > 1:
+            response_payload["candidates"] = candidates
+        
         llm_request = LLMRequest(
             project_id=project_id,
             user_id=self.user_id,
             type=request_type,
             model=model,
-            status=LLMRequestStatus.COMPLETED,
-            input_tokens=tokens_used // 2 if tokens_used else 0,
-            output_tokens=tokens_used // 2 if tokens_used else 0,
+            status=status,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
             request_payload={"prompt": prompt, **metadata} if metadata else {"prompt": prompt},
-            response_payload={"response": response}
+            response_payload=response_payload,
+            error_message=error_message[:1000] if error_message else None
         )
         self.db.add(llm_request)
         self.db.commit()
@@ -202,109 +218,507 @@ class LLMService:
         
         return prompts.build_timeline_context(event_dicts)
     
-    def _call_openai(self, system_prompt: str, user_prompt: str, model: str = "gpt-4.1-mini") -> tuple[str, int]:
+    def _output_budget(
+        self, language: Optional[str], request_type: LLMRequestType, target_words: int
+    ) -> tuple[int, Optional[List[str]]]:
         """
-        Call OpenAI API.
+        Compute the output limit and stop sequences for a request.
         
         Args:
-            system_prompt: System prompt
-            user_prompt: User prompt
-            model: Model to use
+            language: Project language code
+            request_type: Type of request
+            target_words: Requested output length in words
             
         Returns:
-            Tuple of (response_text, tokens_used)
+            Tuple of (max_tokens, stop_sequences)
         """
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
+        tokens_per_word = token_budget_calibrator.tokens_per_word(self.db, language)
+        max_tokens = token_budget.compute_max_tokens(target_words, tokens_per_word)
+        return max_tokens, token_budget.get_stop_sequences(request_type)
+    
+    @staticmethod
+    def _length_metadata(
+        request_type: LLMRequestType, target_words: int, max_tokens: int, texts: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Build the length tracking metadata logged with a request.
+        
+        `output_words` covers all candidates so it can be compared with the
+        logged output tokens when calibrating token-per-word ratios.
+        
+        Args:
+            request_type: Type of request
+            target_words: Requested output length in words (per candidate)
+            max_tokens: Output token limit that was applied
+            texts: Generated candidates
+            
+        Returns:
+            Metadata dictionary
+        """
+        output_words = sum(token_budget.count_words(text) for text in texts)
+        ratio = token_budget.report_length_deviation(
+            request_type, target_words, output_words // max(1, len(texts)), max_tokens
         )
+        return {
+            "target_words": target_words,
+            "max_tokens": max_tokens,
+            "output_words": output_words,
+            "length_ratio": ratio
+        }
+    
+    @staticmethod
+    def _strip_code_fence(response_text: str) -> str:
+        """Remove a Markdown code fence the model may wrap around JSON output."""
+        text = response_text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("{"):] if "{" in text else text
+        return text
+    
+    @staticmethod
+    def _parse_pyramid_expansion(response_text: str, count: int) -> PyramidExpansion:
+        """
+        Parse and validate a structured pyramid expansion response.
         
-        response_text = response.choices[0].message.content
-        tokens_used = response.usage.total_tokens
+        Args:
+            response_text: Raw LLM response (JSON, possibly wrapped in a code fence)
+            count: Number of children expected
+            
+        Returns:
+            Validated expansion, truncated to the expected number of children
+            
+        Raises:
+            ValueError: If the response is not valid JSON, does not match the
+                schema, or contains fewer children than expected
+        """
+        text = LLMService._strip_code_fence(response_text)
+        try:
+            expansion = PyramidExpansion.model_validate_json(text)
+        except ValidationError as e:
+            raise ValueError(f"Invalid pyramid expansion output: {e}") from e
         
-        return response_text, tokens_used
+        if len(expansion.children) < count:
+            raise ValueError(
+                f"Expected {count} children, got {len(expansion.children)}"
+            )
+        
+        expansion.children = expansion.children[:count]
+        return expansion
     
-    def _generate_mock_response(self, request_type: LLMRequestType, user_prompt: str) -> tuple[str, int]:
+    def _pyramid_expansion_request(
+        self,
+        project_context: Dict[str, Any],
+        parent_title: str,
+        parent_content: str,
+        count: int,
+        target_length: int
+    ) -> Dict[str, Any]:
         """
-        Generate a mock response for testing.
+        Build the prompt and output budget for a pyramid expansion.
         
         Args:
-            request_type: Type of request
-            user_prompt: User prompt (used to extract context)
+            project_context: Project context from _get_project_context
+            parent_title: Title of the node to expand
+            parent_content: Content of the node to expand
+            count: Number of children to generate
+            target_length: Target length of each child content in words
             
         Returns:
-            Tuple of (mock_response, mock_tokens)
+            Dictionary with 'prompt', 'max_tokens', 'count' and 'hints' keys
         """
-        # Simulate API delay
-        time.sleep(0.5)
+        user_prompt = prompts.PYRAMID_EXPANSION_USER_PROMPT_TEMPLATE.format(
+            project_title=project_context["project_title"],
+            language=project_context["language"],
+            genre=project_context["genre"],
+            parent_title=parent_title,
+            parent_content=parent_content,
+            count=count,
+            target_length=target_length
+        )
+        # JSON keys and titles add roughly 15 words of overhead per child
+        max_tokens, _ = self._output_budget(
+            project_context["language"], LLMRequestType.PYRAMID_EXPANSION, count * (target_length + 15)
+        )
+        return {
+            "prompt": user_prompt,
+            "max_tokens": max_tokens,
+            "count": count,
+            "hints": {"parent_title": parent_title, "count": count}
+        }
+    
+    def _run_pyramid_expansion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call the provider for a pyramid expansion, with one repair attempt.
         
-        mock_responses = {
-            LLMRequestType.CONTINUATION: """Elle s'arrêta au seuil de la porte, le cœur battant. La pièce était plongée dans une pénombre épaisse, à peine troublée par la lueur vacillante d'une bougie oubliée sur le manteau de la cheminée. L'air sentait le renfermé et quelque chose d'autre, une odeur métallique qu'elle ne parvenait pas à identifier.
-
-"Il y a quelqu'un ?" murmura-t-elle, sa voix tremblante trahissant sa nervosité.
-
-Seul le silence lui répondit, un silence si profond qu'elle pouvait entendre les battements de son propre cœur. Elle fit un pas en avant, puis un autre, ses yeux s'habituant progressivement à l'obscurité. C'est alors qu'elle le vit : une silhouette immobile, assise dans le fauteuil près de la fenêtre.
-
-"Qui êtes-vous ?" demanda-t-elle, sa main cherchant instinctivement le manche du couteau qu'elle avait glissé dans sa poche avant de partir.
-
-La silhouette ne bougea pas, mais une voix grave s'éleva dans l'obscurité :
-
-"Je vous attendais."
-""",
-            LLMRequestType.REWRITING: """Elle s'immobilisa sur le seuil, le souffle court. Dans la pénombre de la pièce, seule une bougie agonisante jetait des ombres dansantes sur les murs. L'atmosphère était lourde, chargée d'une odeur de renfermé mêlée à quelque chose de plus inquiétant – une senteur métallique qui lui nouait l'estomac.
-
-"Y a-t-il quelqu'un ?" Sa voix n'était qu'un murmure rauque.
-
-Le silence qui suivit était oppressant, presque palpable. Elle avança d'un pas hésitant, puis d'un autre, forçant ses yeux à percer l'obscurité. C'est alors qu'elle distingua la silhouette – une forme humaine, parfaitement immobile, installée dans le fauteuil près de la fenêtre voilée.
-
-Sa main se referma instinctivement sur le manche du couteau dissimulé dans sa poche.
-
-"Qui êtes-vous ?"
-
-La silhouette demeurait figée, mais une voix profonde émergea des ténèbres :
-
-"Je vous attendais."
-""",
-            LLMRequestType.SUGGESTION: """Voici plusieurs suggestions pour développer cette scène :
-
-**Option 1 - Révélation immédiate (approche directe)**
-La silhouette pourrait se révéler être un personnage que le lecteur connaît déjà, créant une surprise ou confirmant des soupçons. Cela permettrait d'avancer rapidement l'intrigue et de créer une confrontation directe.
-
-**Option 2 - Montée de tension (approche suspense)**
-Prolonger le mystère en faisant parler la silhouette sans révéler son identité. Elle pourrait donner des indices cryptiques sur ses motivations, créant une atmosphère de menace psychologique avant toute action physique.
-
-**Option 3 - Retournement de situation (approche audacieuse)**
-La protagoniste pourrait découvrir que la silhouette est en fait une victime ou un allié inattendu, renversant complètement les attentes du lecteur et ouvrant de nouvelles possibilités narratives.
-
-**Option 4 - Escalade du danger (approche action)**
-La silhouette pourrait ne pas être seule. D'autres présences pourraient se révéler dans la pièce, transformant la scène en une situation de danger immédiat nécessitant une réaction rapide de la protagoniste.
-
-Chaque option offre des possibilités différentes pour le développement des personnages et de l'intrigue.
-""",
-            LLMRequestType.ANALYSIS: """**Analyse de la scène**
-
-**Points forts :**
-1. **Atmosphère réussie** : La description crée efficacement une ambiance de suspense et de mystère.
-2. **Rythme maîtrisé** : La progression est bien dosée, avec une montée graduelle de la tension.
-3. **Dialogue efficace** : Les répliques sont courtes et percutantes.
-
-**Axes d'amélioration :**
-1. **Caractérisation** : On pourrait enrichir la scène en révélant davantage sur l'état émotionnel de la protagoniste.
-2. **Détails sensoriels** : Ajouter des éléments tactiles ou auditifs renforcerait l'immersion.
-3. **Voix narrative** : Le style pourrait être plus distinctif pour refléter la personnalité du protagoniste.
-"""
+        Does not touch the database, so several expansions can run
+        concurrently in worker threads.
+        
+        Args:
+            request: Request built by _pyramid_expansion_request
+            
+        Returns:
+            Dictionary with 'expansion' (None on failure), 'response', 'model',
+            'input_tokens', 'output_tokens', 'attempts' and 'error' keys
+        """
+        user_prompt = request["prompt"]
+        count = request["count"]
+        response_format = prompts.build_pyramid_expansion_schema()
+        
+        completion = self.provider.complete(
+            prompts.PYRAMID_EXPANSION_SYSTEM_PROMPT,
+            user_prompt,
+            request_type=LLMRequestType.PYRAMID_EXPANSION,
+            max_tokens=request["max_tokens"],
+            response_format=response_format,
+            hints=request["hints"]
+        )
+        response_text = completion.text
+        input_tokens, output_tokens = completion.input_tokens, completion.output_tokens
+        
+        attempts = 1
+        error_message = None
+        expansion = None
+        try:
+            expansion = self._parse_pyramid_expansion(response_text, count)
+        except ValueError as e:
+            # One repair attempt, feeding the validation error back to the model
+            attempts += 1
+            repair_prompt = prompts.STRUCTURED_OUTPUT_REPAIR_PROMPT_TEMPLATE.format(
+                error=str(e),
+                previous_output=response_text,
+                count=count
+            )
+            completion = self.provider.complete(
+                prompts.PYRAMID_EXPANSION_SYSTEM_PROMPT,
+                f"{user_prompt}\n\n{repair_prompt}",
+                request_type=LLMRequestType.PYRAMID_EXPANSION,
+                max_tokens=request["max_tokens"],
+                response_format=response_format,
+                hints=request["hints"]
+            )
+            response_text = completion.text
+            input_tokens += completion.input_tokens
+            output_tokens += completion.output_tokens
+            try:
+                expansion = self._parse_pyramid_expansion(response_text, count)
+            except ValueError as repair_error:
+                error_message = str(repair_error)
+        
+        return {
+            "expansion": expansion,
+            "response": response_text,
+            "model": completion.model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "attempts": attempts,
+            "error": error_message
         }
+    
+    def _finish_pyramid_expansion(
+        self, project_id: UUID, request: Dict[str, Any], outcome: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Log a pyramid expansion and shape its result.
         
-        # Get appropriate mock response
-        mock_text = mock_responses.get(request_type, "Mock response for testing purposes.")
-        mock_tokens = len(mock_text.split()) * 2  # Rough token estimate
+        Args:
+            project_id: Project ID
+            request: Request built by _pyramid_expansion_request
+            outcome: Result of _run_pyramid_expansion
+            
+        Returns:
+            Dictionary with 'children' (list of title/content dicts) and 'request_id' keys
+            
+        Raises:
+            ValueError: If the output is still invalid after the repair attempt
+        """
+        expansion = outcome["expansion"]
+        llm_request = self._log_request(
+            project_id=project_id,
+            request_type=LLMRequestType.PYRAMID_EXPANSION,
+            prompt=request["prompt"],
+            response=outcome["response"],
+            model=outcome["model"],
+            input_tokens=outcome["input_tokens"],
+            output_tokens=outcome["output_tokens"],
+            metadata={
+                "count": request["count"],
+                "attempts": outcome["attempts"],
+                "max_tokens": request["max_tokens"]
+            },
+            status=LLMRequestStatus.FAILED if expansion is None else LLMRequestStatus.COMPLETED,
+            error_message=outcome["error"]
+        )
         
-        return mock_text, mock_tokens
+        if expansion is None:
+            raise ValueError(f"Pyramid expansion failed after repair attempt: {outcome['error']}")
+        
+        return {
+            "children": [child.model_dump() for child in expansion.children],
+            "request_id": str(llm_request.id)
+        }
+    
+    def generate_pyramid_children(
+        self,
+        project_id: UUID,
+        parent_title: str,
+        parent_content: str,
+        count: int = 3,
+        target_length: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Generate structured child elements for a pyramid node.
+        
+        The model is constrained to a JSON schema (title and content per child).
+        If its output does not validate, a single repair request is sent with
+        the validation error before giving up.
+        
+        Args:
+            project_id: Project ID
+            parent_title: Title of the node to expand
+            parent_content: Content of the node to expand
+            count: Number of children to generate
+            target_length: Target length of each child content in words
+            
+        Returns:
+            Dictionary with 'children' (list of title/content dicts) and 'request_id' keys
+            
+        Raises:
+            ValueError: If the output is still invalid after the repair attempt
+        """
+        project_context = self._get_project_context(project_id)
+        request = self._pyramid_expansion_request(
+            project_context, parent_title, parent_content, count, target_length
+        )
+        outcome = self._run_pyramid_expansion(request)
+        return self._finish_pyramid_expansion(project_id, request, outcome)
+    
+    def iter_pyramid_children(
+        self,
+        project_id: UUID,
+        parents: List[Tuple[str, str]],
+        count: int = 3,
+        target_length: int = 100,
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Expand several pyramid nodes concurrently.
+        
+        Provider calls run in a thread pool bounded by LLM_MAX_CONCURRENCY;
+        requests are logged on the calling thread, which owns the session.
+        Results are yielded as soon as each expansion finishes.
+        
+        Args:
+            project_id: Project ID
+            parents: (title, content) of each node to expand
+            count: Number of children to generate per node
+            target_length: Target length of each child content in words
+            max_concurrency: Maximum parallel LLM calls (defaults to LLM_MAX_CONCURRENCY)
+            
+        Yields:
+            Tuples of (index in parents, result). The result has the keys of
+            generate_pyramid_children, or a single 'error' key on failure.
+        """
+        if not parents:
+            return
+        
+        project_context = self._get_project_context(project_id)
+        requests = [
+            self._pyramid_expansion_request(project_context, title, content, count, target_length)
+            for title, content in parents
+        ]
+        yield from self._iter_concurrent(
+            project_id, requests, self._run_pyramid_expansion, self._finish_pyramid_expansion, max_concurrency
+        )
+    
+    def _coherence_check_request(
+        self, project_context: Dict[str, Any], neighbourhood: str
+    ) -> Dict[str, Any]:
+        """
+        Build the prompt and output budget for a pyramid coherence check.
+        
+        Args:
+            project_context: Project context from _get_project_context
+            neighbourhood: Node, parent and children description
+            
+        Returns:
+            Dictionary with 'prompt' and 'max_tokens' keys
+        """
+        user_prompt = prompts.PYRAMID_COHERENCE_USER_PROMPT_TEMPLATE.format(
+            project_title=project_context["project_title"],
+            language=project_context["language"],
+            genre=project_context["genre"],
+            neighbourhood=neighbourhood
+        )
+        max_tokens, _ = self._output_budget(
+            project_context["language"],
+            LLMRequestType.COHERENCE_CHECK,
+            token_budget.DEFAULT_TARGET_WORDS[LLMRequestType.COHERENCE_CHECK]
+        )
+        return {"prompt": user_prompt, "max_tokens": max_tokens}
+    
+    def _run_coherence_check(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call the provider for a coherence check (no database access).
+        
+        Args:
+            request: Request built by _coherence_check_request
+            
+        Returns:
+            Dictionary with 'verdict' (None on failure), 'response', 'model',
+            'input_tokens', 'output_tokens' and 'error' keys
+        """
+        completion = self.provider.complete(
+            prompts.PYRAMID_COHERENCE_SYSTEM_PROMPT,
+            request["prompt"],
+            request_type=LLMRequestType.COHERENCE_CHECK,
+            max_tokens=request["max_tokens"],
+            response_format=prompts.build_pyramid_coherence_schema()
+        )
+        
+        verdict = None
+        error_message = None
+        try:
+            verdict = PyramidCoherenceVerdict.model_validate_json(self._strip_code_fence(completion.text))
+        except ValidationError as e:
+            error_message = f"Invalid coherence check output: {e}"
+        
+        return {
+            "verdict": verdict,
+            "response": completion.text,
+            "model": completion.model,
+            "input_tokens": completion.input_tokens,
+            "output_tokens": completion.output_tokens,
+            "error": error_message
+        }
+    
+    def _finish_coherence_check(
+        self, project_id: UUID, request: Dict[str, Any], outcome: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Log a coherence check and shape its result.
+        
+        Args:
+            project_id: Project ID
+            request: Request built by _coherence_check_request
+            outcome: Result of _run_coherence_check
+            
+        Returns:
+            Dictionary with 'is_coherent', 'issues', 'suggestions' and 'request_id' keys
+            
+        Raises:
+            ValueError: If the output could not be validated
+        """
+        verdict = outcome["verdict"]
+        llm_request = self._log_request(
+            project_id=project_id,
+            request_type=LLMRequestType.COHERENCE_CHECK,
+            prompt=request["prompt"],
+            response=outcome["response"],
+            model=outcome["model"],
+            input_tokens=outcome["input_tokens"],
+            output_tokens=outcome["output_tokens"],
+            metadata={"max_tokens": request["max_tokens"]},
+            status=LLMRequestStatus.FAILED if verdict is None else LLMRequestStatus.COMPLETED,
+            error_message=outcome["error"]
+        )
+        
+        if verdict is None:
+            raise ValueError(outcome["error"])
+        
+        return {**verdict.model_dump(), "request_id": str(llm_request.id)}
+    
+    def check_pyramid_coherence(self, project_id: UUID, neighbourhood: str) -> Dict[str, Any]:
+        """
+        Check the coherence of a pyramid node with its parent and children.
+        
+        Args:
+            project_id: Project ID
+            neighbourhood: Node, parent and children description
+            
+        Returns:
+            Dictionary with 'is_coherent', 'issues', 'suggestions' and 'request_id' keys
+            
+        Raises:
+            ValueError: If the output could not be validated
+        """
+        request = self._coherence_check_request(self._get_project_context(project_id), neighbourhood)
+        return self._finish_coherence_check(project_id, request, self._run_coherence_check(request))
+    
+    def iter_pyramid_coherence(
+        self,
+        project_id: UUID,
+        neighbourhoods: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Check the coherence of several pyramid nodes concurrently.
+        
+        Args:
+            project_id: Project ID
+            neighbourhoods: Node, parent and children description of each node
+            max_concurrency: Maximum parallel LLM calls (defaults to LLM_MAX_CONCURRENCY)
+            
+        Yields:
+            Tuples of (index in neighbourhoods, result). The result has the keys
+            of check_pyramid_coherence, or a single 'error' key on failure.
+        """
+        if not neighbourhoods:
+            return
+        
+        project_context = self._get_project_context(project_id)
+        requests = [
+            self._coherence_check_request(project_context, neighbourhood)
+            for neighbourhood in neighbourhoods
+        ]
+        yield from self._iter_concurrent(
+            project_id, requests, self._run_coherence_check, self._finish_coherence_check, max_concurrency
+        )
+    
+    def _iter_concurrent(
+        self,
+        project_id: UUID,
+        requests: List[Dict[str, Any]],
+        run: Callable[[Dict[str, Any]], Dict[str, Any]],
+        finish: Callable[[UUID, Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run provider calls in a thread pool and finish them as they complete.
+        
+        `run` must not touch the database; `finish` (logging) runs on the
+        calling thread, which owns the session. If the consumer stops early,
+        queued calls are cancelled.
+        
+        Args:
+            project_id: Project ID
+            requests: Prepared requests
+            run: Provider call for one request
+            finish: Logging and shaping of one outcome (may raise ValueError)
+            max_concurrency: Maximum parallel LLM calls (defaults to LLM_MAX_CONCURRENCY)
+            
+        Yields:
+            Tuples of (index in requests, result or {'error': message})
+        """
+        workers = max(1, min(max_concurrency or settings.LLM_MAX_CONCURRENCY, len(requests)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run, request): index for index, request in enumerate(requests)}
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        logger.warning(f"Concurrent LLM request failed: {e}")
+                        yield index, {"error": str(e)}
+                        continue
+                    try:
+                        yield index, finish(project_id, requests[index], outcome)
+                    except ValueError as e:
+                        yield index, {"error": str(e)}
+            finally:
+                for future in futures:
+                    future.cancel()
     
     def generate_continuation(
         self,
@@ -314,7 +728,8 @@ Chaque option offre des possibilités différentes pour le développement des pe
         target_length: int = 500,
         entity_ids: Optional[List[UUID]] = None,
         arc_ids: Optional[List[UUID]] = None,
-        event_ids: Optional[List[UUID]] = None
+        event_ids: Optional[List[UUID]] = None,
+        candidates: int = 1
     ) -> Dict[str, Any]:
         """
         Generate a continuation of existing text.
@@ -327,9 +742,10 @@ Chaque option offre des possibilités différentes pour le développement des pe
             entity_ids: Optional entity IDs for context
             arc_ids: Optional arc IDs for context
             event_ids: Optional timeline event IDs for context
+            candidates: Number of alternatives to return from a single request
             
         Returns:
-            Dictionary with 'text' and 'request_id' keys
+            Dictionary with 'text', 'candidates' and 'request_id' keys
         """
         # Get project context
         project_context = self._get_project_context(project_id)
@@ -352,18 +768,22 @@ Chaque option offre des possibilités différentes pour le développement des pe
             target_length=target_length
         )
         
+        target_words = target_length
+        max_tokens, stop = self._output_budget(
+            project_context["language"], LLMRequestType.CONTINUATION, target_words
+        )
+        
         # Generate response
-        if self.use_mock:
-            response_text, tokens_used = self._generate_mock_response(
-                LLMRequestType.CONTINUATION, user_prompt
-            )
-            model = "mock-model"
-        else:
-            response_text, tokens_used = self._call_openai(
-                prompts.CONTINUATION_SYSTEM_PROMPT,
-                user_prompt
-            )
-            model = "gpt-4.1-mini"
+        completion = self.provider.complete(
+            prompts.CONTINUATION_SYSTEM_PROMPT,
+            user_prompt,
+            request_type=LLMRequestType.CONTINUATION,
+            candidates=candidates,
+            max_tokens=max_tokens,
+            stop=stop
+        )
+        candidate_texts = completion.texts
+        response_text = completion.text
         
         # Log request
         llm_request = self._log_request(
@@ -371,16 +791,21 @@ Chaque option offre des possibilités différentes pour le développement des pe
             request_type=LLMRequestType.CONTINUATION,
             prompt=user_prompt,
             response=response_text,
-            model=model,
-            tokens_used=tokens_used,
+            model=completion.model,
+            input_tokens=completion.input_tokens,
+            output_tokens=completion.output_tokens,
             metadata={
                 "target_length": target_length,
-                "existing_text_length": len(existing_text)
-            }
+                "existing_text_length": len(existing_text),
+                "candidates": candidates,
+                **self._length_metadata(LLMRequestType.CONTINUATION, target_words, max_tokens, candidate_texts)
+            },
+            candidates=candidate_texts
         )
         
         return {
             "text": response_text,
+            "candidates": candidate_texts,
             "request_id": str(llm_request.id)
         }
     
@@ -389,7 +814,8 @@ Chaque option offre des possibilités différentes pour le développement des pe
         project_id: UUID,
         text_to_rewrite: str,
         rewriting_goals: str,
-        user_instructions: str = ""
+        user_instructions: str = "",
+        candidates: int = 1
     ) -> Dict[str, Any]:
         """
         Rewrite text with specific goals.
@@ -399,9 +825,10 @@ Chaque option offre des possibilités différentes pour le développement des pe
             text_to_rewrite: The text to rewrite
             rewriting_goals: Specific goals for rewriting
             user_instructions: Additional instructions
+            candidates: Number of alternatives to return from a single request
             
         Returns:
-            Dictionary with 'text' and 'request_id' keys
+            Dictionary with 'text', 'candidates' and 'request_id' keys
         """
         project_context = self._get_project_context(project_id)
         
@@ -414,30 +841,41 @@ Chaque option offre des possibilités différentes pour le développement des pe
             user_instructions=user_instructions or "Improve overall quality while maintaining the core meaning."
         )
         
-        if self.use_mock:
-            response_text, tokens_used = self._generate_mock_response(
-                LLMRequestType.REWRITING, user_prompt
-            )
-            model = "mock-model"
-        else:
-            response_text, tokens_used = self._call_openai(
-                prompts.REWRITING_SYSTEM_PROMPT,
-                user_prompt
-            )
-            model = "gpt-4.1-mini"
+        target_words = max(50, token_budget.count_words(text_to_rewrite))
+        max_tokens, stop = self._output_budget(
+            project_context["language"], LLMRequestType.REWRITING, target_words
+        )
+        
+        completion = self.provider.complete(
+            prompts.REWRITING_SYSTEM_PROMPT,
+            user_prompt,
+            request_type=LLMRequestType.REWRITING,
+            candidates=candidates,
+            max_tokens=max_tokens,
+            stop=stop
+        )
+        candidate_texts = completion.texts
+        response_text = completion.text
         
         llm_request = self._log_request(
             project_id=project_id,
             request_type=LLMRequestType.REWRITING,
             prompt=user_prompt,
             response=response_text,
-            model=model,
-            tokens_used=tokens_used,
-            metadata={"rewriting_goals": rewriting_goals}
+            model=completion.model,
+            input_tokens=completion.input_tokens,
+            output_tokens=completion.output_tokens,
+            metadata={
+                "rewriting_goals": rewriting_goals,
+                "candidates": candidates,
+                **self._length_metadata(LLMRequestType.REWRITING, target_words, max_tokens, candidate_texts)
+            },
+            candidates=candidate_texts
         )
         
         return {
             "text": response_text,
+            "candidates": candidate_texts,
             "request_id": str(llm_request.id)
         }
     
@@ -448,7 +886,8 @@ Chaque option offre des possibilités différentes pour le développement des pe
         user_question: str,
         entity_ids: Optional[List[UUID]] = None,
         arc_ids: Optional[List[UUID]] = None,
-        event_ids: Optional[List[UUID]] = None
+        event_ids: Optional[List[UUID]] = None,
+        candidates: int = 1
     ) -> Dict[str, Any]:
         """
         Get creative suggestions for story development.
@@ -460,9 +899,10 @@ Chaque option offre des possibilités différentes pour le développement des pe
             entity_ids: Optional entity IDs for context
             arc_ids: Optional arc IDs for context
             event_ids: Optional timeline event IDs for context
+            candidates: Number of alternatives to return from a single request
             
         Returns:
-            Dictionary with 'text' and 'request_id' keys
+            Dictionary with 'text', 'candidates' and 'request_id' keys
         """
         project_context = self._get_project_context(project_id)
         entity_context = self._get_entities_context(project_id, entity_ids)
@@ -480,30 +920,41 @@ Chaque option offre des possibilités différentes pour le développement des pe
             user_question=user_question
         )
         
-        if self.use_mock:
-            response_text, tokens_used = self._generate_mock_response(
-                LLMRequestType.SUGGESTION, user_prompt
-            )
-            model = "mock-model"
-        else:
-            response_text, tokens_used = self._call_openai(
-                prompts.SUGGESTION_SYSTEM_PROMPT,
-                user_prompt
-            )
-            model = "gpt-4.1-mini"
+        target_words = token_budget.DEFAULT_TARGET_WORDS[LLMRequestType.SUGGESTION]
+        max_tokens, stop = self._output_budget(
+            project_context["language"], LLMRequestType.SUGGESTION, target_words
+        )
+        
+        completion = self.provider.complete(
+            prompts.SUGGESTION_SYSTEM_PROMPT,
+            user_prompt,
+            request_type=LLMRequestType.SUGGESTION,
+            candidates=candidates,
+            max_tokens=max_tokens,
+            stop=stop
+        )
+        candidate_texts = completion.texts
+        response_text = completion.text
         
         llm_request = self._log_request(
             project_id=project_id,
             request_type=LLMRequestType.SUGGESTION,
             prompt=user_prompt,
             response=response_text,
-            model=model,
-            tokens_used=tokens_used,
-            metadata={"user_question": user_question}
+            model=completion.model,
+            input_tokens=completion.input_tokens,
+            output_tokens=completion.output_tokens,
+            metadata={
+                "user_question": user_question,
+                "candidates": candidates,
+                **self._length_metadata(LLMRequestType.SUGGESTION, target_words, max_tokens, candidate_texts)
+            },
+            candidates=candidate_texts
         )
         
         return {
             "text": response_text,
+            "candidates": candidate_texts,
             "request_id": str(llm_request.id)
         }
     
@@ -537,26 +988,32 @@ Chaque option offre des possibilités différentes pour le développement des pe
             user_instructions=user_instructions or "Provide comprehensive analysis."
         )
         
-        if self.use_mock:
-            response_text, tokens_used = self._generate_mock_response(
-                LLMRequestType.ANALYSIS, user_prompt
-            )
-            model = "mock-model"
-        else:
-            response_text, tokens_used = self._call_openai(
-                prompts.ANALYSIS_SYSTEM_PROMPT,
-                user_prompt
-            )
-            model = "gpt-4.1-mini"
+        target_words = token_budget.DEFAULT_TARGET_WORDS[LLMRequestType.ANALYSIS]
+        max_tokens, stop = self._output_budget(
+            project_context["language"], LLMRequestType.ANALYSIS, target_words
+        )
+        
+        completion = self.provider.complete(
+            prompts.ANALYSIS_SYSTEM_PROMPT,
+            user_prompt,
+            request_type=LLMRequestType.ANALYSIS,
+            max_tokens=max_tokens,
+            stop=stop
+        )
+        response_text = completion.text
         
         llm_request = self._log_request(
             project_id=project_id,
             request_type=LLMRequestType.ANALYSIS,
             prompt=user_prompt,
             response=response_text,
-            model=model,
-            tokens_used=tokens_used,
-            metadata={"analysis_focus": analysis_focus}
+            model=completion.model,
+            input_tokens=completion.input_tokens,
+            output_tokens=completion.output_tokens,
+            metadata={
+                "analysis_focus": analysis_focus,
+                **self._length_metadata(LLMRequestType.ANALYSIS, target_words, max_tokens, [response_text])
+            }
         )
         
         return {
@@ -565,7 +1022,9 @@ Chaque option offre des possibilités différentes pour le développement des pe
         }
 
 
-def get_llm_service(db: Session, user_id: UUID, use_mock: bool = None) -> LLMService:
+def get_llm_service(
+    db: Session, user_id: UUID, use_mock: bool = None, provider: Optional[str] = None
+) -> LLMService:
     """
     Factory function to get LLM service instance.
     
@@ -573,8 +1032,9 @@ def get_llm_service(db: Session, user_id: UUID, use_mock: bool = None) -> LLMSer
         db: Database session
         user_id: Current user ID
         use_mock: Whether to use mock mode. If None, reads from environment.
+        provider: Provider name. If None, derived from LLM_PROVIDER or the mode.
         
     Returns:
         LLMService instance
     """
-    return LLMService(db, user_id, use_mock)
+    return LLMService(db, user_id, use_mock, provider)
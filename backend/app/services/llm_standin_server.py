@@ -0,0 +1,204 @@
+"""
+OpenAI-compatible stand-in LLM server.
+
+A small FastAPI app implementing the subset of the Chat Completions API used
+by the "openai" provider (n, max_tokens, stop, response_format and
+streaming). It returns deterministic text with configurable latency, so the
+real network code path (HTTP client, connection pooling, timeouts, retries)
+can be exercised in integration and load tests without external services.
+
+Run it locally:
+
+    python -m app.services.llm_standin_server
+
+then point the backend at it:
+
+    LLM_PROVIDER=openai LLM_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=standin
+
+Environment variables:
+    STANDIN_PORT: Port to listen on (default 8001)
+    STANDIN_LATENCY_MS: Delay before the first token (default 200)
+    STANDIN_TOKENS_PER_SECOND: Generation speed, 0 for instant (default 0)
+    STANDIN_COMPLETION_TOKENS: Completion length when max_tokens is larger (default 300)
+
+This module is a development tool and does not import the application
+settings, so it runs without a database or secrets.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+LATENCY_MS = int(os.getenv("STANDIN_LATENCY_MS", "200"))
+TOKENS_PER_SECOND = float(os.getenv("STANDIN_TOKENS_PER_SECOND", "0"))
+COMPLETION_TOKENS = int(os.getenv("STANDIN_COMPLETION_TOKENS", "300"))
+
+CORPUS = (
+    "La pluie battait les vitres de la vieille maison tandis que Claire relisait la lettre "
+    "pour la troisième fois. Rien dans l'écriture serrée de son frère ne laissait deviner "
+    "la peur, et pourtant chaque phrase semblait retenir un secret. Elle posa la feuille, "
+    "écouta le vent dans la cheminée et comprit qu'elle devrait partir avant l'aube."
+).split()
+
+
+class ChatMessage(BaseModel):
+    """Chat message in a completion request."""
+    role: str
+    content: Optional[str] = ""
+
+
+class ChatCompletionRequest(BaseModel):
+    """Subset of the Chat Completions request body."""
+    model: str
+    messages: List[ChatMessage]
+    max_tokens: Optional[int] = None
+    n: int = 1
+    stop: Optional[Union[str, List[str]]] = None
+    stream: bool = False
+    temperature: Optional[float] = None
+    response_format: Optional[Dict[str, Any]] = None
+
+
+app = FastAPI(title="LiterAI LLM stand-in server")
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token count (1.3 tokens per word)."""
+    return int(len(text.split()) * 1.3) + 1
+
+
+def _prose(word_count: int, offset: int = 0) -> str:
+    """Deterministic prose of the requested length."""
+    return " ".join(CORPUS[(offset + i) % len(CORPUS)] for i in range(word_count))
+
+
+def _instance_from_schema(schema: Dict[str, Any], item_count: int, offset: int = 0) -> Any:
+    """Build a value matching a (simple) JSON schema."""
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            key: _instance_from_schema(sub_schema, item_count, offset + i)
+            for i, (key, sub_schema) in enumerate(schema.get("properties", {}).items())
+        }
+    if schema_type == "array":
+        return [
+            _instance_from_schema(schema.get("items", {}), item_count, offset + i * 7)
+            for i in range(item_count)
+        ]
+    if schema_type in ("integer", "number"):
+        return offset
+    if schema_type == "boolean":
+        return True
+    return _prose(12, offset)
+
+
+def _generate(request: ChatCompletionRequest, choice_index: int) -> tuple[str, str]:
+    """
+    Generate one choice.
+
+    Returns:
+        Tuple of (content, finish_reason)
+    """
+    prompt = "\n".join(message.content or "" for message in request.messages)
+    limit = min(request.max_tokens or COMPLETION_TOKENS, COMPLETION_TOKENS)
+
+    response_format = request.response_format or {}
+    if response_format.get("type") == "json_schema":
+        # Honour "exactly N" in the prompt for array lengths, as the pyramid prompts do
+        match = re.search(r"exactly (\d+)", prompt)
+        item_count = int(match.group(1)) if match else 3
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        return json.dumps(_instance_from_schema(schema, item_count, choice_index), ensure_ascii=False), "stop"
+    if response_format.get("type") == "json_object":
+        return json.dumps({"text": _prose(limit, choice_index)}, ensure_ascii=False), "stop"
+
+    content = _prose(max(1, int(limit / 1.3)), choice_index * 11)
+    stops = [request.stop] if isinstance(request.stop, str) else (request.stop or [])
+    for stop in stops:
+        if stop and stop in content:
+            return content[:content.index(stop)], "stop"
+    return content, "length" if limit < COMPLETION_TOKENS else "stop"
+
+
+@app.get("/v1/models")
+def list_models() -> Dict[str, Any]:
+    """List the single stand-in model."""
+    return {"object": "list", "data": [{"id": "standin-model", "object": "model", "owned_by": "literai"}]}
+
+
+@app.post("/v1/chat/completions")
+async def create_chat_completion(request: ChatCompletionRequest):
+    """Chat Completions endpoint (non-streaming and SSE streaming)."""
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    choices = [_generate(request, i) for i in range(max(1, request.n))]
+    prompt_tokens = sum(_count_tokens(message.content or "") for message in request.messages)
+    completion_tokens = sum(_count_tokens(content) for content, _ in choices)
+
+    if request.stream:
+        return StreamingResponse(
+            _stream_chunks(completion_id, created, request.model, choices[0]),
+            media_type="text/event-stream"
+        )
+
+    if TOKENS_PER_SECOND > 0:
+        await asyncio.sleep(completion_tokens / TOKENS_PER_SECOND)
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": request.model,
+        "choices": [
+            {
+                "index": i,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }
+            for i, (content, finish_reason) in enumerate(choices)
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def _stream_chunks(completion_id: str, created: int, model: str, choice: tuple[str, str]):
+    """Yield server-sent events for a streamed completion."""
+    content, finish_reason = choice
+
+    def event(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+        }
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+    yield event({"role": "assistant", "content": ""})
+    for word in content.split(" "):
+        if TOKENS_PER_SECOND > 0:
+            await asyncio.sleep(1.3 / TOKENS_PER_SECOND)
+        yield event({"content": word + " "})
+    yield event({}, finish_reason)
+    yield "data: [DONE]\n\n"
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("STANDIN_PORT", "8001")))
@@ -0,0 +1,165 @@
+"""
+Manuscript import service.
+
+An uploaded manuscript is split into documents as it is read (see
+app.core.manuscript), and the documents are created IMPORT_BATCH_SIZE at
+a time, each batch with its initial versions in one transaction, so a
+whole novel is imported in a few transactions instead of one request per
+chapter. Progress is reported after every batch.
+"""
+import io
+import json
+import logging
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.core.manuscript import split_manuscript
+from app.crud import document as crud_document
+from app.crud.ordering import ORDER_GAP
+from app.models.document import DocumentType
+from app.schemas.search import SearchItemType
+from app.services.search_service import search_service
+
+logger = logging.getLogger(__name__)
+
+
+# Documents created per transaction
+IMPORT_BATCH_SIZE = 50
+
+
+class ManuscriptImportService:
+    """Service for importing manuscripts as documents."""
+    
+    @staticmethod
+    def import_manuscript(
+        db: Session,
+        *,
+        project_id: UUID,
+        lines: Iterable[str],
+        title: str,
+        author_email: str,
+        scenes: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Import a manuscript into a project, yielding progress events.
+        
+        Events have an "event" key: "started", "batch_imported" after each
+        committed batch, then "completed" or "failed". Documents are added
+        after the project's existing ones, as drafts (scenes when splitting
+        on scene breaks). Batches committed before a failure are kept.
+        
+        Args:
+            db: Database session owned by the import
+            project_id: Project ID
+            lines: Text lines of the manuscript
+            title: Title of the text before the first heading
+            author_email: Author recorded on the initial versions
+            scenes: Also split on scene breaks (see split_manuscript)
+        
+        Yields:
+            Progress event dictionaries
+        """
+        document_type = DocumentType.SCENE if scenes else DocumentType.DRAFT
+        order_index = crud_document.get_last_order_index(db, project_id=project_id)
+        document_ids = []
+        words = 0
+        yield {"event": "started", "project_id": str(project_id)}
+        
+        try:
+            sections = split_manuscript(lines, title=title, scenes=scenes)
+            while True:
+                batch = list(islice(sections, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                
+                objs_in = []
+                for section_title, content in batch:
+                    order_index += ORDER_GAP
+                    objs_in.append({
+                        "title": section_title,
+                        "type": document_type,
+                        "content_raw": content,
+                        "order_index": order_index
+                    })
+                documents = crud_document.create_many(
+                    db,
+                    objs_in=objs_in,
+                    project_id=project_id,
+                    author_email=author_email,
+                    commit_message="Initial version: Imported document",
+                    commit=False
+                )
+                # Captured before the commit expires the new documents' attributes
+                batch_ids = [document.id for document in documents]
+                document_ids.extend(str(document_id) for document_id in batch_ids)
+                words += sum(document.word_count for document in documents)
+                db.commit()
+                search_service.index_items(
+                    db,
+                    project_id=project_id,
+                    items=[(SearchItemType.DOCUMENT, document_id) for document_id in batch_ids]
+                )
+                yield {"event": "batch_imported", "documents": len(document_ids), "words": words}
+        
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            logger.error(f"Manuscript import into project {project_id} failed: {e}")
+            db.rollback()
+            yield {"event": "failed", "documents": len(document_ids), "error": str(e)[:1000]}
+            return
+        
+        yield {"event": "completed", "documents": len(document_ids), "words": words, "document_ids": document_ids}
+    
+    @staticmethod
+    def stream_import(
+        upload: BinaryIO,
+        *,
+        project_id: UUID,
+        title: str,
+        author_email: str,
+        scenes: bool = False,
+        session_factory: Callable[[], Session] = None
+    ) -> Iterator[str]:
+        """
+        Run an import in its own session and stream NDJSON progress lines.
+        
+        The request-scoped session and upload are closed before a streaming
+        response is sent, so the import opens a dedicated session and reads
+        its own copy of the upload, which it closes when done.
+        
+        Args:
+            upload: Manuscript file (UTF-8), positioned at its start
+            project_id: Project ID
+            title: Title of the text before the first heading
+            author_email: Author recorded on the initial versions
+            scenes: Also split on scene breaks
+            session_factory: Session factory (defaults to SessionLocal)
+        
+        Yields:
+            One JSON-encoded event per line
+        """
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+        
+        db = session_factory()
+        lines = io.TextIOWrapper(upload, encoding="utf-8-sig", errors="replace")
+        try:
+            for event in ManuscriptImportService.import_manuscript(
+                db,
+                project_id=project_id,
+                lines=lines,
+                title=title,
+                author_email=author_email,
+                scenes=scenes
+            ):
+                yield json.dumps(event) + "\n"
+        finally:
+            lines.close()
+            db.close()
+
+
+manuscript_import_service = ManuscriptImportService()
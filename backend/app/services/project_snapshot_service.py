@@ -0,0 +1,160 @@
+"""
+Project snapshot service for capturing and comparing whole projects.
+
+A snapshot is a manifest of content hashes: creating one reads the
+current documents and pyramid nodes once, stores as blobs only the
+contents the project does not already have, and writes a single row.
+Comparing two snapshots compares hashes and only diffs the items whose
+hashes differ.
+"""
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.core.text_diff import DiffGranularity, build_hunks, count_units, diff_segments
+from app.crud import content_blob as crud_content_blob
+from app.crud import document as crud_document
+from app.crud import project_snapshot as crud_project_snapshot
+from app.crud.crud_content_blob import hash_content
+from app.models.document import Document
+from app.models.project_snapshot import ProjectSnapshot
+from app.models.pyramid_node import PyramidNode
+from app.schemas.project_snapshot import ProjectSnapshotDiff, SnapshotItemDiff
+
+
+# Manifest section -> (model, content column)
+SNAPSHOT_ITEMS = {
+    "documents": (Document, Document.content_raw),
+    "pyramid_nodes": (PyramidNode, PyramidNode.content),
+}
+
+# Item type reported in diffs, by manifest section
+ITEM_TYPES = {"documents": "document", "pyramid_nodes": "pyramid_node"}
+
+
+class ProjectSnapshotService:
+    """Service for whole-project snapshots."""
+    
+    @staticmethod
+    def create_snapshot(db: Session, *, project_id: UUID, name: str, author_email: str) -> ProjectSnapshot:
+        """
+        Capture the current content of every document and pyramid node of a project.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            name: Snapshot name (e.g. "Draft 2")
+            author_email: Email of the user creating the snapshot
+        
+        Returns:
+            Created snapshot
+        """
+        crud_document.materialize(db, project_id=project_id)
+        manifest: Dict[str, Dict[str, str]] = {}
+        contents: Dict[str, str] = {}
+        for section, (model, column) in SNAPSHOT_ITEMS.items():
+            manifest[section] = {}
+            for item_id, content in db.query(model.id, column).filter(model.project_id == project_id):
+                content = content or ""
+                content_hash = hash_content(content)
+                manifest[section][str(item_id)] = content_hash
+                contents[content_hash] = content
+        
+        # Only contents the project has never stored are written (and compressed)
+        stored = crud_content_blob.existing(db, project_id=project_id, content_hashes=contents, lock=True)
+        missing = [content for content_hash, content in contents.items() if content_hash not in stored]
+        if missing:
+            crud_content_blob.put_many(db, project_id=project_id, contents=missing)
+        
+        return crud_project_snapshot.create_with_manifest(
+            db, project_id=project_id, name=name, author_email=author_email, manifest=manifest
+        )
+    
+    @staticmethod
+    def diff_snapshots(
+        db: Session,
+        *,
+        snapshot_a_id: UUID,
+        snapshot_b_id: UUID,
+        granularity: DiffGranularity = DiffGranularity.WORD
+    ) -> ProjectSnapshotDiff:
+        """
+        Compare two snapshots of the same project.
+        
+        Added and removed items count all their units as additions or
+        deletions; changed items are diffed at the given granularity.
+        
+        Args:
+            db: Database session
+            snapshot_a_id: Earlier snapshot ID
+            snapshot_b_id: Later snapshot ID
+            granularity: Smallest unit of change (line, word or char)
+        
+        Returns:
+            Differing items, number of unchanged items and total stats
+        
+        Raises:
+            ValueError: If a snapshot does not exist or they belong to different projects
+        """
+        granularity = DiffGranularity(granularity)
+        snapshot_a = crud_project_snapshot.get(db, id=snapshot_a_id)
+        snapshot_b = crud_project_snapshot.get(db, id=snapshot_b_id)
+        if not snapshot_a or not snapshot_b:
+            raise ValueError("One or both snapshots not found")
+        if snapshot_a.project_id != snapshot_b.project_id:
+            raise ValueError("Snapshots belong to different projects")
+        
+        changes: List[Tuple[str, str, str, str]] = []  # (section, item ID, hash A, hash B)
+        unchanged = 0
+        for section in SNAPSHOT_ITEMS:
+            items_a = snapshot_a.manifest.get(section, {})
+            items_b = snapshot_b.manifest.get(section, {})
+            for item_id in sorted(items_a.keys() | items_b.keys()):
+                hash_a, hash_b = items_a.get(item_id), items_b.get(item_id)
+                if hash_a == hash_b:
+                    unchanged += 1
+                else:
+                    changes.append((section, item_id, hash_a, hash_b))
+        
+        project_id = snapshot_a.project_id
+        texts = crud_content_blob.get_many(db, keys=[
+            (project_id, content_hash)
+            for _, _, hash_a, hash_b in changes
+            for content_hash in (hash_a, hash_b)
+            if content_hash
+        ])
+        
+        items: List[SnapshotItemDiff] = []
+        for section, item_id, hash_a, hash_b in changes:
+            text_a = texts.get((project_id, hash_a), "") if hash_a else ""
+            text_b = texts.get((project_id, hash_b), "") if hash_b else ""
+            if hash_a and hash_b:
+                segments = diff_segments(text_a, text_b, granularity)
+                additions = sum(count_units(text, granularity) for op, text in segments if op == "insert")
+                deletions = sum(count_units(text, granularity) for op, text in segments if op == "delete")
+                hunks = build_hunks(segments, granularity)
+            else:
+                additions, deletions, hunks = count_units(text_b, granularity), count_units(text_a, granularity), []
+            items.append(SnapshotItemDiff(
+                item_type=ITEM_TYPES[section],
+                item_id=UUID(item_id),
+                status="changed" if hash_a and hash_b else ("added" if hash_b else "removed"),
+                content_hash_a=hash_a,
+                content_hash_b=hash_b,
+                additions=additions,
+                deletions=deletions,
+                hunks=hunks
+            ))
+        
+        return ProjectSnapshotDiff(
+            snapshot_a_id=snapshot_a_id,
+            snapshot_b_id=snapshot_b_id,
+            granularity=granularity,
+            items=items,
+            unchanged=unchanged,
+            additions=sum(item.additions for item in items),
+            deletions=sum(item.deletions for item in items)
+        )
+
+
+project_snapshot_service = ProjectSnapshotService()
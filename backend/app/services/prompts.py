@@ -314,6 +314,75 @@ Provide enhanced dialogue in {language} that:
 Enhanced Dialogue:"""
 
 
+# ============================================================================
+# PYRAMID EXPANSION PROMPTS
+# ============================================================================
+
+PYRAMID_EXPANSION_SYSTEM_PROMPT = """You are an expert story architect specialized in hierarchical narrative outlining. Your role is to break a story element down into more detailed sub-elements that together cover the whole of their parent.
+
+Key principles:
+- Every sub-element expands one distinct aspect of the parent element
+- Sub-elements are ordered as they should appear in the story
+- Together, the sub-elements cover the parent without overlapping
+- Each sub-element has a short, evocative title and a self-contained description
+- Respect the established tone, characters and story arcs
+
+You always answer with a single JSON object matching the requested schema, without any commentary or Markdown formatting."""
+
+PYRAMID_EXPANSION_USER_PROMPT_TEMPLATE = """Project Context:
+Title: {project_title}
+Language: {language}
+Genre: {genre}
+
+Story Element to Expand:
+Title: {parent_title}
+{parent_content}
+
+Break this story element down into exactly {count} more detailed sub-elements.
+Each sub-element description should be approximately {target_length} words, written in {language}.
+
+Answer with a JSON object of the form:
+{{"children": [{{"title": "...", "content": "..."}}]}}"""
+
+STRUCTURED_OUTPUT_REPAIR_PROMPT_TEMPLATE = """Your previous answer could not be used because it did not match the expected JSON schema.
+
+Validation error:
+{error}
+
+Previous answer:
+{previous_output}
+
+Answer again with only the corrected JSON object, containing exactly {count} items."""
+
+
+# ============================================================================
+# PYRAMID COHERENCE PROMPTS
+# ============================================================================
+
+PYRAMID_COHERENCE_SYSTEM_PROMPT = """You are an expert story editor reviewing a hierarchical story outline. Each element of the outline is summarized by its parent and detailed by its children.
+
+Check that:
+- The element is consistent with its parent (no contradiction, same characters and stakes)
+- The children together cover the element, in a sensible order, without contradicting it
+- Names, facts and tone stay consistent across the three levels
+
+Report only real problems, each in one sentence, and give concrete suggestions to fix them.
+
+You always answer with a single JSON object matching the requested schema, without any commentary or Markdown formatting."""
+
+PYRAMID_COHERENCE_USER_PROMPT_TEMPLATE = """Project Context:
+Title: {project_title}
+Language: {language}
+Genre: {genre}
+
+{neighbourhood}
+
+Is the current element coherent with its parent and its children? Write issues and suggestions in {language}.
+
+Answer with a JSON object of the form:
+{{"is_coherent": true, "issues": ["..."], "suggestions": ["..."]}}"""
+
+
 # ============================================================================
 # PROMPT BUILDER FUNCTIONS
 # ============================================================================
@@ -352,3 +421,54 @@ def build_timeline_context(events: list) -> str:
         context_parts.append(f"- {event.get('date_display', 'Unknown date')}: {event['title']}")
     
     return "\n".join(context_parts)
+
+
+def build_pyramid_expansion_schema() -> dict:
+    """Build the OpenAI response_format constraining pyramid expansion output."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "pyramid_expansion",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "children": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string"},
+                                "content": {"type": "string"}
+                            },
+                            "required": ["title", "content"],
+                            "additionalProperties": False
+                        }
+                    }
+                },
+                "required": ["children"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def build_pyramid_coherence_schema() -> dict:
+    """Build the OpenAI response_format constraining pyramid coherence check output."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "pyramid_coherence",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "is_coherent": {"type": "boolean"},
+                    "issues": {"type": "array", "items": {"type": "string"}},
+                    "suggestions": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["is_coherent", "issues", "suggestions"],
+                "additionalProperties": False
+            }
+        }
+    }
@@ -0,0 +1,301 @@
+"""
+Pyramid generation service for whole-pyramid LLM jobs.
+
+A job expands a root node breadth-first down to a target depth: all the
+nodes of a level are expanded concurrently (bounded by LLM_MAX_CONCURRENCY),
+then the whole level is persisted in one transaction together with the
+job's progress. An interrupted job therefore resumes from the last
+completed level, and nodes that already have children are never expanded
+twice.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.crud import pyramid_node as crud_pyramid
+from app.crud import user as crud_user
+from app.crud import pyramid_generation_job as crud_job
+from app.models.pyramid_node import PyramidNode
+from app.models.pyramid_generation_job import PyramidGenerationJob, PyramidJobStatus
+from app.schemas.pyramid import PyramidNodeCreate, PyramidGenerationJobCreate
+from app.schemas.search import SearchItemType
+from app.services.llm_service import get_llm_service
+from app.services.search_service import search_service
+
+logger = logging.getLogger(__name__)
+
+
+# Deepest pyramid level (0 = high, 1 = intermediate, 2 = low)
+MAX_PYRAMID_LEVEL = 2
+
+# A running job without progress for this long is considered abandoned
+JOB_STALE_SECONDS = 600
+
+# (id, title, content) of a node waiting to be expanded
+FrontierNode = Tuple[UUID, str, str]
+
+
+class PyramidGenerationService:
+    """Service for breadth-first, resumable pyramid generation jobs."""
+    
+    @staticmethod
+    def create_job(
+        db: Session,
+        *,
+        job_in: PyramidGenerationJobCreate,
+        root_node: PyramidNode,
+        user_id: UUID
+    ) -> PyramidGenerationJob:
+        """
+        Create a pending generation job for a root node.
+        
+        Args:
+            db: Database session
+            job_in: Job parameters (depth, fan-out, target length)
+            root_node: Node to expand
+            user_id: User starting the job
+        
+        Returns:
+            Created job
+        
+        Raises:
+            ValueError: If the requested depth goes below the lowest pyramid level
+        """
+        if root_node.level + job_in.depth > MAX_PYRAMID_LEVEL:
+            raise ValueError(
+                f"A node at level {root_node.level} can be expanded by at most "
+                f"{MAX_PYRAMID_LEVEL - root_node.level} level(s)"
+            )
+        
+        return crud_job.create_for_node(
+            db, obj_in=job_in, project_id=root_node.project_id, user_id=user_id
+        )
+    
+    @staticmethod
+    def claim_job(db: Session, *, job: PyramidGenerationJob) -> bool:
+        """
+        Mark a job as running so that a single worker processes it.
+        
+        Args:
+            db: Database session
+            job: Job to claim
+        
+        Returns:
+            True if the job was claimed, False if it is completed or already running
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        return crud_job.claim(db, job_id=job.id, stale_before=stale_before)
+    
+    @staticmethod
+    def _children_by_parent(
+        db: Session, frontier: List[FrontierNode]
+    ) -> Dict[UUID, List[FrontierNode]]:
+        """Load the existing children of the frontier nodes, grouped by parent."""
+        children: Dict[UUID, List[FrontierNode]] = {}
+        for child in crud_pyramid.get_by_parents(db, parent_ids=[node_id for node_id, _, _ in frontier]):
+            children.setdefault(child.parent_id, []).append((child.id, child.title, child.content))
+        return children
+    
+    @staticmethod
+    def _load_frontier(db: Session, root_node: PyramidNode, completed_depth: int) -> List[FrontierNode]:
+        """
+        Rebuild the list of nodes to expand after `completed_depth` levels.
+        
+        Args:
+            db: Database session
+            root_node: Root node of the job
+            completed_depth: Levels already persisted below the root
+        
+        Returns:
+            Frontier nodes in tree order (one query per completed level)
+        """
+        frontier = [(root_node.id, root_node.title, root_node.content)]
+        for _ in range(completed_depth):
+            children = PyramidGenerationService._children_by_parent(db, frontier)
+            frontier = [child for node_id, _, _ in frontier for child in children.get(node_id, [])]
+        return frontier
+    
+    @staticmethod
+    def run_job(db: Session, *, job_id: UUID) -> Iterator[Dict[str, Any]]:
+        """
+        Run (or resume) a claimed job, yielding progress events.
+        
+        Events have an "event" key: "started", "level_started",
+        "node_expanded", "node_failed", "level_completed", then "completed"
+        or "failed". If the consumer stops iterating (e.g. the client
+        disconnected), the job is marked as interrupted and can be resumed.
+        
+        Args:
+            db: Database session owned by the job
+            job_id: Job ID
+        
+        Yields:
+            Progress event dictionaries
+        """
+        job = crud_job.get(db, id=job_id)
+        if not job:
+            yield {"event": "failed", "job_id": str(job_id), "error": "Job not found"}
+            return
+        
+        root_node = job.root_node
+        llm_service = get_llm_service(db, job.user_id)
+        user = crud_user.get(db, id=job.user_id)
+        author_email = user.email if user else "system"
+        finished = False
+        
+        try:
+            frontier = PyramidGenerationService._load_frontier(db, root_node, job.completed_depth)
+            yield {
+                "event": "started",
+                "job_id": str(job.id),
+                "depth": job.depth,
+                "completed_depth": job.completed_depth,
+                "nodes_created": job.nodes_created
+            }
+            
+            for depth in range(job.completed_depth + 1, job.depth + 1):
+                level = root_node.level + depth
+                # Nodes that already have children (earlier run or manual edits) are kept
+                existing = PyramidGenerationService._children_by_parent(db, frontier)
+                to_expand = [node for node in frontier if node[0] not in existing]
+                yield {
+                    "event": "level_started",
+                    "depth": depth,
+                    "level": level,
+                    "parents": len(frontier),
+                    "to_generate": len(to_expand)
+                }
+                
+                generated: Dict[UUID, List[PyramidNodeCreate]] = {}
+                errors: List[str] = []
+                for index, result in llm_service.iter_pyramid_children(
+                    project_id=job.project_id,
+                    parents=[(title, content) for _, title, content in to_expand],
+                    count=job.fan_out,
+                    target_length=job.target_length
+                ):
+                    parent_id = to_expand[index][0]
+                    if "error" in result:
+                        errors.append(result["error"])
+                        yield {"event": "node_failed", "parent_id": str(parent_id), "error": result["error"]}
+                        continue
+                    
+                    generated[parent_id] = [
+                        PyramidNodeCreate(
+                            project_id=job.project_id,
+                            parent_id=parent_id,
+                            title=draft["title"][:500],
+                            content=draft["content"],
+                            level=level,
+                            order=i,
+                            is_generated=True
+                        )
+                        for i, draft in enumerate(result["children"])
+                    ]
+                    yield {
+                        "event": "node_expanded",
+                        "parent_id": str(parent_id),
+                        "children": len(generated[parent_id])
+                    }
+                
+                # Persist the whole level (nodes and initial versions) at once, with the job progress
+                new_nodes = crud_pyramid.create_many(
+                    db,
+                    objs_in=[child for children in generated.values() for child in children],
+                    author_email=author_email,
+                    commit_message="Initial version: Generated pyramid node",
+                    commit=False
+                )
+                job.nodes_created += len(new_nodes)
+                
+                if errors:
+                    # Successful siblings are kept; a resume only retries the failed ones
+                    job.status = PyramidJobStatus.FAILED
+                    job.error_message = f"{len(errors)} node(s) failed at depth {depth}: {errors[0]}"[:1000]
+                    db.commit()
+                    finished = True
+                    yield {"event": "failed", "depth": depth, "error": job.error_message}
+                    return
+                
+                # Captured before the commit expires the new nodes' attributes
+                created: Dict[UUID, List[FrontierNode]] = {}
+                for node in new_nodes:
+                    created.setdefault(node.parent_id, []).append((node.id, node.title, node.content))
+                frontier = [
+                    child
+                    for node_id, _, _ in frontier
+                    for child in existing.get(node_id) or created.get(node_id, [])
+                ]
+                
+                job.completed_depth = depth
+                db.commit()
+                search_service.index_items(
+                    db,
+                    project_id=job.project_id,
+                    items=[
+                        (SearchItemType.PYRAMID_NODE, node_id)
+                        for children in created.values()
+                        for node_id, _, _ in children
+                    ]
+                )
+                yield {
+                    "event": "level_completed",
+                    "depth": depth,
+                    "level": level,
+                    "nodes_created": len(new_nodes)
+                }
+            
+            job.status = PyramidJobStatus.COMPLETED
+            db.commit()
+            finished = True
+            yield {"event": "completed", "job_id": str(job.id), "nodes_created": job.nodes_created}
+        
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            logger.error(f"Pyramid generation job {job_id} failed: {e}")
+            db.rollback()
+            job.status = PyramidJobStatus.FAILED
+            job.error_message = str(e)[:1000]
+            db.commit()
+            finished = True
+            yield {"event": "failed", "error": job.error_message}
+        
+        finally:
+            if not finished:
+                # Stopped between two events: the current level was not persisted
+                db.rollback()
+                job.status = PyramidJobStatus.INTERRUPTED
+                db.commit()
+    
+    @staticmethod
+    def stream_job(job_id: UUID, session_factory: Callable[[], Session] = None) -> Iterator[str]:
+        """
+        Run a claimed job in its own session and stream NDJSON progress lines.
+        
+        The request-scoped session is closed before a streaming response is
+        sent, so the job opens a dedicated one.
+        
+        Args:
+            job_id: Job ID
+            session_factory: Session factory (defaults to SessionLocal)
+        
+        Yields:
+            One JSON-encoded event per line
+        """
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+        
+        db = session_factory()
+        try:
+            for event in PyramidGenerationService.run_job(db, job_id=job_id):
+                yield json.dumps(event) + "\n"
+        finally:
+            db.close()
+
+
+pyramid_generation_service = PyramidGenerationService()
@@ -1,17 +1,28 @@
 """
 Pyramid LLM service for hierarchical story structure generation.
 """
-from typing import List, Optional
+import hashlib
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
 
 from app.models.pyramid_node import PyramidNode
 from app.models.project import Project
 from app.crud import pyramid_node as crud_pyramid
-from app.schemas.pyramid import PyramidNodeCreate, PyramidCoherenceCheck
+from app.crud import project as crud_project
+from app.crud import user as crud_user
+from app.crud import pyramid_coherence_result as crud_coherence
+from app.schemas.pyramid import PyramidNodeCreate, PyramidCoherenceCheck, PyramidProjectCoherence
 from app.services.llm_service import get_llm_service
 
 
+# Characters of each child's content included in a coherence neighbourhood
+COHERENCE_CHILD_EXCERPT = 300
+
+# Nodes checked per batch of a project-wide pass (results saved after each batch)
+COHERENCE_BATCH_SIZE = 20
+
+
 class PyramidLLMService:
     """Service for LLM-powered pyramid structure generation."""
     
@@ -34,60 +45,42 @@ class PyramidLLMService:
             
         Returns:
             List of generated child nodes
+            
+        Raises:
+            ValueError: If the LLM output cannot be validated
         """
         # Get LLM service
         llm_service = get_llm_service(db, user_id)
         
-        # Use generate_continuation to create children
-        prompt_text = f"{parent_node.title}\n\n{parent_node.content}"
-        instructions = f"Break down this story element into {count} more detailed sub-elements. Each should expand on a specific aspect."
-        
-        result = llm_service.generate_continuation(
+        # Structured output: one title/content pair per child, validated
+        result = llm_service.generate_pyramid_children(
             project_id=parent_node.project_id,
-            existing_text=prompt_text,
-            user_instructions=instructions,
-            target_length=300
+            parent_title=parent_node.title,
+            parent_content=parent_node.content,
+            count=count
         )
         
-        generated_text = result.get("generated_text", "")
-        
-        # Simple parsing: split by double newlines and create nodes
-        parts = [p.strip() for p in generated_text.split("\n\n") if p.strip()]
-        
-        children = []
-        for i in range(min(count, len(parts))):
-            # Try to extract title and content
-            lines = parts[i].split("\n", 1)
-            title = lines[0].strip("# ").strip() if lines else f"Sub-element {i+1}"
-            content = lines[1].strip() if len(lines) > 1 else parts[i]
-            
-            child_create = PyramidNodeCreate(
-                project_id=parent_node.project_id,
-                parent_id=parent_node.id,
-                title=title[:500],  # Limit to max length
-                content=content,
-                level=parent_node.level + 1,
-                order=i,
-                is_generated=True
-            )
-            child = crud_pyramid.create(db, obj_in=child_create)
-            children.append(child)
-        
-        # If not enough parts, create placeholder children
-        for i in range(len(children), count):
-            child_create = PyramidNodeCreate(
+        # Create all children and their initial versions in a single transaction
+        children_in = [
+            PyramidNodeCreate(
                 project_id=parent_node.project_id,
                 parent_id=parent_node.id,
-                title=f"Generated sub-element {i+1}",
-                content=f"Detailed expansion of: {parent_node.title}",
+                title=draft["title"][:500],  # Limit to max length
+                content=draft["content"],
                 level=parent_node.level + 1,
                 order=i,
                 is_generated=True
             )
-            child = crud_pyramid.create(db, obj_in=child_create)
-            children.append(child)
+            for i, draft in enumerate(result["children"])
+        ]
+        user = crud_user.get(db, id=user_id)
         
-        return children
+        return crud_pyramid.create_many(
+            db,
+            objs_in=children_in,
+            author_email=user.email if user else "system",
+            commit_message="Initial version: Generated pyramid node"
+        )
     
     @staticmethod
     def generate_parent(
@@ -127,7 +120,7 @@ class PyramidLLMService:
             target_length=200
         )
         
-        generated_text = result.get("generated_text", "")
+        generated_text = result.get("text", "")
         
         # Extract title and content
         lines = generated_text.split("\n", 1)
@@ -150,10 +143,54 @@ class PyramidLLMService:
         for child in child_nodes:
             child.parent_id = parent.id
             db.add(child)
+        crud_project.bump_pyramid_revision(db, project_id=project_id)
         db.commit()
         
         return parent
     
+    @staticmethod
+    def _coherence_neighbourhood(
+        node: PyramidNode, parent: Optional[PyramidNode], children: List[PyramidNode]
+    ) -> str:
+        """
+        Describe a node with its parent and children for a coherence check.
+        
+        Args:
+            node: Node to check
+            parent: Parent node, if any
+            children: Child nodes in order
+            
+        Returns:
+            Neighbourhood text sent to the LLM (and hashed for caching)
+        """
+        parts = [f"Current Element:\nTitle: {node.title}\n{node.content}"]
+        if parent:
+            parts.append(f"Parent Element:\nTitle: {parent.title}\n{parent.content}")
+        if children:
+            parts.append("Children Elements:\n" + "\n".join(
+                f"{i + 1}. {child.title}: {child.content[:COHERENCE_CHILD_EXCERPT]}"
+                for i, child in enumerate(children)
+            ))
+        return "\n\n".join(parts)
+    
+    @staticmethod
+    def _context_hash(neighbourhood: str) -> str:
+        """SHA-256 of a coherence neighbourhood."""
+        return hashlib.sha256(neighbourhood.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _result_row(project_id: UUID, node_id: UUID, context_hash: str, result: dict) -> dict:
+        """Build a coherence result row from an LLM coherence check."""
+        return {
+            "project_id": project_id,
+            "node_id": node_id,
+            "context_hash": context_hash,
+            "is_coherent": result["is_coherent"],
+            "issues": result["issues"],
+            "suggestions": result["suggestions"],
+            "llm_request_id": UUID(result["request_id"])
+        }
+    
     @staticmethod
     def check_coherence(
         db: Session,
@@ -164,6 +201,9 @@ class PyramidLLMService:
         """
         Check coherence of a pyramid node with its parent and children.
         
+        The previous result is reused if the node, its parent and its
+        children are unchanged since the last check.
+        
         Args:
             db: Database session
             node: Pyramid node to check
@@ -171,44 +211,127 @@ class PyramidLLMService:
             
         Returns:
             Coherence check result
+            
+        Raises:
+            ValueError: If the LLM output cannot be validated
         """
-        # Get LLM service
-        llm_service = get_llm_service(db, user_id)
-        
         # Get parent and children
         parent = db.query(PyramidNode).filter(PyramidNode.id == node.parent_id).first() if node.parent_id else None
         children = crud_pyramid.get_by_parent(db, parent_id=node.id)
         
-        # Build context
-        context_parts = [f"Current: {node.title}\n{node.content}"]
-        if parent:
-            context_parts.append(f"Parent: {parent.title}")
-        if children:
-            context_parts.append(f"Children: {', '.join([c.title for c in children])}")
+        neighbourhood = PyramidLLMService._coherence_neighbourhood(node, parent, children)
+        context_hash = PyramidLLMService._context_hash(neighbourhood)
         
-        context = "\n\n".join(context_parts)
-        instructions = "Analyze this pyramid structure for coherence. List any issues and suggestions."
+        previous = crud_coherence.get_by_node(db, node_id=node.id)
+        if previous and previous.context_hash == context_hash:
+            return PyramidCoherenceCheck(
+                node_id=node.id,
+                is_coherent=previous.is_coherent,
+                issues=previous.issues,
+                suggestions=previous.suggestions,
+                cached=True
+            )
+        
+        llm_service = get_llm_service(db, user_id)
+        result = llm_service.check_pyramid_coherence(node.project_id, neighbourhood)
+        crud_coherence.upsert_many(db, results=[
+            PyramidLLMService._result_row(node.project_id, node.id, context_hash, result)
+        ])
         
-        result = llm_service.analyze_text(
-            project_id=node.project_id,
-            text=context,
-            analysis_type="coherence_check",
-            user_instructions=instructions
+        return PyramidCoherenceCheck(
+            node_id=node.id,
+            is_coherent=result["is_coherent"],
+            issues=result["issues"],
+            suggestions=result["suggestions"]
         )
+    
+    @staticmethod
+    def check_project_coherence(
+        db: Session,
+        *,
+        project_id: UUID,
+        user_id: UUID,
+        force: bool = False
+    ) -> PyramidProjectCoherence:
+        """
+        Check the coherence of every node of a project's pyramid.
+        
+        Each node's neighbourhood (node, parent, children) is hashed and
+        compared with the hash stored with its last result; only nodes whose
+        neighbourhood changed are sent to the LLM, concurrently, in batches
+        whose results are saved as they complete.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            user_id: User ID for LLM service
+            force: Recheck every node, ignoring cached results
+            
+        Returns:
+            Results for all nodes with a valid check, in pyramid order
+        """
+        nodes = crud_pyramid.get_all_by_project(db, project_id=project_id)
+        by_id = {node.id: node for node in nodes}
+        children: Dict[UUID, List[PyramidNode]] = {}
+        for node in nodes:
+            if node.parent_id:
+                children.setdefault(node.parent_id, []).append(node)
         
-        analysis = result.get("analysis", {})
+        # Plain values only: LLM request logging commits and expires the ORM objects
+        previous = crud_coherence.get_by_project(db, project_id=project_id)
+        order: List[UUID] = []
+        neighbourhoods: Dict[UUID, str] = {}
+        results: Dict[UUID, PyramidCoherenceCheck] = {}
+        dirty: List[Tuple[UUID, str]] = []
+        for node in nodes:
+            neighbourhood = PyramidLLMService._coherence_neighbourhood(
+                node, by_id.get(node.parent_id), children.get(node.id, [])
+            )
+            context_hash = PyramidLLMService._context_hash(neighbourhood)
+            order.append(node.id)
+            neighbourhoods[node.id] = neighbourhood
+            
+            cached = previous.get(node.id)
+            if cached and cached.context_hash == context_hash and not force:
+                results[node.id] = PyramidCoherenceCheck(
+                    node_id=node.id,
+                    is_coherent=cached.is_coherent,
+                    issues=cached.issues,
+                    suggestions=cached.suggestions,
+                    cached=True
+                )
+            else:
+                dirty.append((node.id, context_hash))
         
-        # Simple parsing of analysis
-        is_coherent = "coherent" in analysis.get("summary", "").lower()
-        issues = analysis.get("issues", [])
-        suggestions = analysis.get("suggestions", [])
+        cached_count = len(results)
+        failed = 0
+        if dirty:
+            llm_service = get_llm_service(db, user_id)
+            for start in range(0, len(dirty), COHERENCE_BATCH_SIZE):
+                batch = dirty[start:start + COHERENCE_BATCH_SIZE]
+                rows = []
+                for index, result in llm_service.iter_pyramid_coherence(
+                    project_id, [neighbourhoods[node_id] for node_id, _ in batch]
+                ):
+                    node_id, context_hash = batch[index]
+                    if "error" in result:
+                        failed += 1
+                        continue
+                    rows.append(PyramidLLMService._result_row(project_id, node_id, context_hash, result))
+                    results[node_id] = PyramidCoherenceCheck(
+                        node_id=node_id,
+                        is_coherent=result["is_coherent"],
+                        issues=result["issues"],
+                        suggestions=result["suggestions"]
+                    )
+                crud_coherence.upsert_many(db, results=rows)
         
-        return PyramidCoherenceCheck(
-            node_id=node.id,
-            is_coherent=is_coherent,
-            issues=issues if isinstance(issues, list) else [],
-            suggestions=suggestions if isinstance(suggestions, list) else []
+        return PyramidProjectCoherence(
+            project_id=project_id,
+            results=[results[node_id] for node_id in order if node_id in results],
+            checked=len(dirty) - failed,
+            cached=cached_count,
+            failed=failed
         )
 
-
 pyramid_llm_service = PyramidLLMService()
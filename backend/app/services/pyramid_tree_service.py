@@ -0,0 +1,152 @@
+"""
+Pyramid tree service for loading whole pyramids as nested trees.
+
+Nodes are fetched in a single query (a whole project, or a subtree via a
+recursive CTE) and nested in memory, so large pyramids load in one round
+trip instead of one request per node.
+
+Serialized project trees are cached in memory, keyed by the project's
+pyramid revision counter (bumped by every node write), so unchanged
+pyramids are served without touching the nodes table.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.crud import pyramid_node as crud_pyramid
+from app.models.pyramid_node import PyramidNode
+from app.schemas.pyramid import PyramidNodeInDB, PyramidTreeNode
+
+
+# Number of projects whose latest tree snapshot is kept in memory
+TREE_SNAPSHOT_CACHE_SIZE = 256
+
+_tree_adapter = TypeAdapter(List[PyramidTreeNode])
+
+
+class PyramidTreeService:
+    """Service for nested pyramid trees."""
+    
+    _snapshots: "OrderedDict[UUID, Tuple[int, bytes]]" = OrderedDict()
+    _snapshots_lock = threading.Lock()
+    
+    @staticmethod
+    def build_tree(nodes: List[PyramidNode]) -> List[PyramidTreeNode]:
+        """
+        Nest a flat list of nodes into trees.
+        
+        Nodes whose parent is not in the list become roots. Siblings keep
+        their `order`, and each node gets its total number of descendants.
+        The ORM `children` relationship is never touched, so no extra
+        queries are issued.
+        
+        Args:
+            nodes: Pyramid nodes (any order)
+        
+        Returns:
+            Root tree nodes ordered by order
+        """
+        items: Dict[UUID, PyramidTreeNode] = {
+            node.id: PyramidTreeNode(**PyramidNodeInDB.model_validate(node).model_dump())
+            for node in nodes
+        }
+        
+        roots: List[PyramidTreeNode] = []
+        for item in items.values():
+            parent = items.get(item.parent_id) if item.parent_id else None
+            if parent is not None:
+                parent.children.append(item)
+            else:
+                roots.append(item)
+        
+        # Parents before children, so descendant counts can be summed bottom-up
+        ordered: List[PyramidTreeNode] = []
+        roots.sort(key=lambda item: item.order)
+        queue = list(roots)
+        while queue:
+            item = queue.pop()
+            item.children.sort(key=lambda child: child.order)
+            ordered.append(item)
+            queue.extend(item.children)
+        
+        for item in reversed(ordered):
+            item.descendant_count = sum(child.descendant_count + 1 for child in item.children)
+        
+        return roots
+    
+    @staticmethod
+    def get_project_tree(db: Session, *, project_id: UUID) -> List[PyramidTreeNode]:
+        """
+        Load the whole pyramid of a project as nested trees (one query).
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+        
+        Returns:
+            Root tree nodes
+        """
+        nodes = crud_pyramid.get_all_by_project(db, project_id=project_id)
+        return PyramidTreeService.build_tree(nodes)
+    
+    @staticmethod
+    def get_project_tree_snapshot(db: Session, *, project_id: UUID, revision: int) -> bytes:
+        """
+        Get the serialized pyramid tree of a project at a given revision.
+        
+        The revision must be read before calling this, so a snapshot is never
+        cached under a newer revision than the data it contains.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            revision: Current pyramid revision of the project
+            
+        Returns:
+            JSON-encoded list of root tree nodes
+        """
+        cls = PyramidTreeService
+        with cls._snapshots_lock:
+            cached = cls._snapshots.get(project_id)
+            if cached and cached[0] == revision:
+                cls._snapshots.move_to_end(project_id)
+                return cached[1]
+        
+        body = _tree_adapter.dump_json(cls.get_project_tree(db, project_id=project_id))
+        
+        with cls._snapshots_lock:
+            cached = cls._snapshots.get(project_id)
+            if not cached or cached[0] <= revision:
+                cls._snapshots[project_id] = (revision, body)
+                cls._snapshots.move_to_end(project_id)
+            while len(cls._snapshots) > TREE_SNAPSHOT_CACHE_SIZE:
+                cls._snapshots.popitem(last=False)
+        return body
+    
+    @staticmethod
+    def clear_snapshots() -> None:
+        """Drop all cached tree snapshots."""
+        with PyramidTreeService._snapshots_lock:
+            PyramidTreeService._snapshots.clear()
+    
+    @staticmethod
+    def get_subtree(db: Session, *, node_id: UUID) -> Optional[PyramidTreeNode]:
+        """
+        Load a node and all its descendants as a nested tree (one query).
+        
+        Args:
+            db: Database session
+            node_id: Root node of the subtree
+        
+        Returns:
+            Tree rooted at the node, or None if the node does not exist
+        """
+        nodes = crud_pyramid.get_subtree(db, node_id=node_id)
+        roots = PyramidTreeService.build_tree(nodes)
+        return next((root for root in roots if root.id == node_id), None)
+
+
+pyramid_tree_service = PyramidTreeService()
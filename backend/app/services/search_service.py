@@ -0,0 +1,367 @@
+"""
+Search service for full-text search across a project.
+
+Documents, entities (name and summary) and pyramid nodes (title and
+content) are searched with PostgreSQL tsvector indexes, using the text
+search configuration of the project's language. Searches only read the
+vectors already indexed: the write endpoints index the items they write
+(index_items), and items left stale (`search_indexed_at` differs from
+`updated_at`) by other writes, block edits or a language change are
+indexed by a periodic job:
+
+    python -m app.services.search_service [--project ID]
+
+Document texts may be stored compressed, so their vectors are computed
+from text sent by the application; the others are computed in SQL.
+
+On databases without full-text search, the project is searched with an
+in-process inverted index instead (see app.core.text_search).
+"""
+import argparse
+import logging
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import Float, and_, bindparam, cast, func, literal, or_, select, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.core.text_search import InvertedIndex, query_terms, search_config, snippet
+from app.crud import document as crud_document
+from app.models.document import Document
+from app.models.entity import Entity
+from app.models.project import Project
+from app.models.pyramid_node import PyramidNode
+from app.schemas.search import SearchItemType, SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Item type -> (model, title column, text column)
+SEARCH_ITEMS = {
+    SearchItemType.DOCUMENT: (Document, Document.title, Document.content_raw),
+    SearchItemType.ENTITY: (Entity, Entity.name, Entity.summary),
+    SearchItemType.PYRAMID_NODE: (PyramidNode, PyramidNode.title, PyramidNode.content),
+}
+
+# Documents re-indexed per statement (their texts are loaded to compute the vectors)
+INDEX_BATCH_SIZE = 50
+
+# (rank, item type, item ID) of the last result of the previous page
+SearchCursor = Tuple[float, SearchItemType, UUID]
+
+# (item type, item ID, title, rank)
+SearchHit = Tuple[SearchItemType, UUID, str, float]
+
+# (item type, item ID) of a written item
+SearchItem = Tuple[SearchItemType, UUID]
+
+
+def _search_vector(config: str, title, text):
+    """Weighted tsvector of an item: title words rank above text words."""
+    regconfig = cast(literal(config), REGCONFIG)
+    return func.setweight(func.to_tsvector(regconfig, func.coalesce(title, "")), "A").op("||")(
+        func.setweight(func.to_tsvector(regconfig, func.coalesce(text, "")), "B")
+    )
+
+
+class SearchService:
+    """Service for full-text search across a project."""
+    
+    @staticmethod
+    def refresh_index(
+        db: Session, *, project_id: UUID, config: str, items: Optional[Sequence[SearchItem]] = None
+    ) -> int:
+        """
+        Index the items of a project changed since they were last indexed, and commit.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            config: PostgreSQL text search configuration
+            items: Only these items (default: all, after rebuilding the texts
+                of documents stored as blocks)
+        
+        Returns:
+            Number of items indexed
+        """
+        if items is None:
+            crud_document.materialize(db, project_id=project_id)
+        ids = {
+            item_type: [item_id for written_type, item_id in items or () if written_type == item_type]
+            for item_type in SEARCH_ITEMS
+        }
+        indexed = 0
+        
+        documents = Document.__table__
+        statement = (
+            documents.update()
+            .where(documents.c.id == bindparam("item_id"), documents.c.updated_at == bindparam("indexed_at"))
+            .values(
+                search_vector=_search_vector(config, bindparam("item_title"), bindparam("item_text")),
+                search_indexed_at=bindparam("indexed_at"),
+                updated_at=documents.c.updated_at
+            )
+        )
+        while items is None or ids[SearchItemType.DOCUMENT]:
+            query = db.query(Document.id, Document.title, Document.content_raw, Document.updated_at).filter(
+                Document.project_id == project_id,
+                Document.search_indexed_at.is_distinct_from(Document.updated_at),
+                # Texts of block-stored documents edited since materialize wait for the next refresh
+                or_(Document.block_storage.is_(False), Document.content_raw.isnot(None))
+            )
+            if items is not None:
+                query = query.filter(Document.id.in_(ids[SearchItemType.DOCUMENT]))
+            stale = query.limit(INDEX_BATCH_SIZE).all()
+            if not stale:
+                break
+            # Skipped for documents edited since they were read; picked up by the next batch
+            db.execute(statement, [
+                {"item_id": item_id, "item_title": title, "item_text": content or "", "indexed_at": updated_at}
+                for item_id, title, content, updated_at in stale
+            ])
+            db.commit()
+            indexed += len(stale)
+        
+        for item_type in (SearchItemType.ENTITY, SearchItemType.PYRAMID_NODE):
+            if items is not None and not ids[item_type]:
+                continue
+            model, title_column, text_column = SEARCH_ITEMS[item_type]
+            table = model.__table__
+            statement = table.update().where(
+                table.c.project_id == project_id, table.c.search_indexed_at.is_distinct_from(table.c.updated_at)
+            )
+            if items is not None:
+                statement = statement.where(table.c.id.in_(ids[item_type]))
+            result = db.execute(
+                statement.values(
+                    search_vector=_search_vector(config, table.c[title_column.key], table.c[text_column.key]),
+                    search_indexed_at=table.c.updated_at,
+                    updated_at=table.c.updated_at
+                )
+            )
+            indexed += result.rowcount
+        db.commit()
+        return indexed
+    
+    @staticmethod
+    def index_items(db: Session, *, project_id: UUID, items: Sequence[SearchItem]) -> int:
+        """
+        Index items just written, and commit.
+        
+        Called after writes, so that searches only read indexed vectors.
+        A failure is logged and leaves the items stale for the periodic
+        refresh; the write itself is kept.
+        
+        Args:
+            db: Database session
+            project_id: Project of the items
+            items: Written items
+        
+        Returns:
+            Number of items indexed
+        """
+        if not items or db.get_bind().dialect.name != "postgresql":
+            return 0
+        try:
+            language = db.query(Project.language).filter(Project.id == project_id).scalar()
+            return SearchService.refresh_index(db, project_id=project_id, config=search_config(language), items=items)
+        except Exception as e:
+            logger.error(f"Search indexing failed for project {project_id}: {e}")
+            db.rollback()
+            return 0
+    
+    @staticmethod
+    def refresh_all(db: Session, *, project_id: Optional[UUID] = None) -> int:
+        """
+        Index the stale items of every project (or of one), and commit.
+        
+        Args:
+            db: Database session
+            project_id: Only this project
+        
+        Returns:
+            Number of items indexed
+        """
+        stale = union_all(*[
+            select(model.project_id).where(model.search_indexed_at.is_distinct_from(model.updated_at))
+            for model, _, _ in SEARCH_ITEMS.values()
+        ]).subquery()
+        projects = db.query(Project.id, Project.language).filter(Project.id.in_(select(stale.c.project_id)))
+        if project_id is not None:
+            projects = projects.filter(Project.id == project_id)
+        
+        indexed = 0
+        for stale_project_id, language in projects.all():
+            indexed += SearchService.refresh_index(db, project_id=stale_project_id, config=search_config(language))
+            logger.info(f"{indexed} items indexed")
+        return indexed
+    
+    @staticmethod
+    def reset_index(db: Session, *, project_id: UUID) -> None:
+        """
+        Mark every item of a project for re-indexing by the periodic refresh
+        (e.g. after a language change), and commit.
+        
+        Searches use the previous vectors until then.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+        """
+        for model, _, _ in SEARCH_ITEMS.values():
+            table = model.__table__
+            db.execute(
+                table.update()
+                .where(table.c.project_id == project_id)
+                .values(search_indexed_at=None, updated_at=table.c.updated_at)
+            )
+        db.commit()
+    
+    @staticmethod
+    def _search_postgres(
+        db: Session,
+        *,
+        project_id: UUID,
+        config: str,
+        query: str,
+        item_types: Sequence[SearchItemType],
+        limit: int,
+        after: Optional[SearchCursor]
+    ) -> List[SearchHit]:
+        """Rank the items matching a query with their indexed tsvectors."""
+        tsquery = func.websearch_to_tsquery(cast(literal(config), REGCONFIG), query)
+        selects = []
+        for item_type in item_types:
+            model, title_column, _ = SEARCH_ITEMS[item_type]
+            selects.append(
+                select(
+                    literal(item_type.value).label("item_type"),
+                    model.id.label("item_id"),
+                    title_column.label("title"),
+                    cast(func.ts_rank_cd(model.search_vector, tsquery), Float).label("rank")
+                )
+                .where(model.project_id == project_id, model.search_vector.op("@@")(tsquery))
+            )
+        hits = union_all(*selects).subquery()
+        statement = select(hits).order_by(hits.c.rank.desc(), hits.c.item_type, hits.c.item_id)
+        if after:
+            rank, item_type, item_id = after
+            statement = statement.where(or_(
+                hits.c.rank < rank,
+                and_(hits.c.rank == rank, hits.c.item_type > item_type.value),
+                and_(hits.c.rank == rank, hits.c.item_type == item_type.value, hits.c.item_id > item_id)
+            ))
+        return [
+            (SearchItemType(row.item_type), row.item_id, row.title, row.rank)
+            for row in db.execute(statement.limit(limit))
+        ]
+    
+    @staticmethod
+    def _search_in_process(
+        db: Session,
+        *,
+        project_id: UUID,
+        query: str,
+        item_types: Sequence[SearchItemType],
+        limit: int,
+        after: Optional[SearchCursor]
+    ) -> List[SearchHit]:
+        """Rank the items matching a query with an inverted index built for the query."""
+        crud_document.materialize(db, project_id=project_id)
+        
+        index = InvertedIndex()
+        titles = {}
+        for item_type in item_types:
+            model, title_column, text_column = SEARCH_ITEMS[item_type]
+            for item_id, title, text in db.query(model.id, title_column, text_column).filter(model.project_id == project_id):
+                key = (item_type.value, str(item_id))
+                index.add(key, title, text)
+                titles[key] = title
+        
+        cursor = (after[0], (after[1].value, str(after[2]))) if after else None
+        return [
+            (SearchItemType(key[0]), UUID(key[1]), titles[key], score)
+            for score, key in index.search(query, limit=limit, after=cursor)
+        ]
+    
+    @staticmethod
+    def search(
+        db: Session,
+        *,
+        project_id: UUID,
+        query: str,
+        item_types: Optional[Sequence[SearchItemType]] = None,
+        limit: int = 20,
+        after: Optional[SearchCursor] = None
+    ) -> List[SearchResult]:
+        """
+        Search the documents, entities and pyramid nodes of a project.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            query: Search query (web search syntax: words, "quoted phrases",
+                "or", "-word" to exclude)
+            item_types: Item types to search (default: all)
+            limit: Maximum number of results
+            after: (rank, item type, item ID) of the last result of the previous page
+        
+        Returns:
+            Results, best first, with a snippet of each item's text around
+            its first match
+        """
+        language = db.query(Project.language).filter(Project.id == project_id).scalar()
+        item_types = list(item_types or SEARCH_ITEMS)
+        if db.get_bind().dialect.name == "postgresql":
+            hits = SearchService._search_postgres(
+                db,
+                project_id=project_id,
+                config=search_config(language),
+                query=query,
+                item_types=item_types,
+                limit=limit,
+                after=after
+            )
+        else:
+            hits = SearchService._search_in_process(
+                db, project_id=project_id, query=query, item_types=item_types, limit=limit, after=after
+            )
+        
+        # Snippets only load the texts of the page's results
+        texts = {}
+        for item_type in {item_type for item_type, _, _, _ in hits}:
+            model, _, text_column = SEARCH_ITEMS[item_type]
+            ids = [item_id for hit_type, item_id, _, _ in hits if hit_type == item_type]
+            for item_id, text in db.query(model.id, text_column).filter(model.id.in_(ids)):
+                texts[(item_type, item_id)] = text or ""
+        
+        terms, _ = query_terms(query)
+        results = []
+        for item_type, item_id, title, rank in hits:
+            text, highlights = snippet(texts.get((item_type, item_id), ""), terms)
+            results.append(SearchResult(
+                item_type=item_type,
+                item_id=item_id,
+                title=title,
+                rank=rank,
+                snippet=text,
+                highlights=highlights
+            ))
+        return results
+
+
+search_service = SearchService()
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Index the items changed since they were last indexed.")
+    parser.add_argument("--project", type=UUID, default=None, help="only this project")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(search_service.refresh_all(session, project_id=args.project))
+    finally:
+        session.close()
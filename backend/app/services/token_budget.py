@@ -0,0 +1,213 @@
+"""
+Output token budgeting for LLM requests.
+
+Derives `max_tokens` from the requested length in words and the project
+language's token-per-word ratio, and provides stop sequences per request
+type so generations end as soon as the model starts echoing the prompt.
+
+The ratios start from static defaults and are re-estimated from logged
+`LLMRequest` rows (real output tokens vs. words produced), so budgets
+self-tune to the model and languages actually in use.
+"""
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.llm_request import LLMRequest, LLMRequestType, LLMRequestStatus
+from app.models.project import Project
+
+logger = logging.getLogger(__name__)
+
+
+# Typical tokens per word for GPT tokenizers, by project language
+DEFAULT_TOKENS_PER_WORD: Dict[str, float] = {
+    "en": 1.3,
+    "fr": 1.6,
+    "es": 1.5,
+    "it": 1.6,
+    "pt": 1.6,
+    "de": 1.7,
+}
+FALLBACK_TOKENS_PER_WORD = 1.6
+
+# Target lengths (words) for request types without an explicit target
+DEFAULT_TARGET_WORDS: Dict[LLMRequestType, int] = {
+    LLMRequestType.SUGGESTION: 450,
+    LLMRequestType.ANALYSIS: 600,
+    LLMRequestType.COHERENCE_CHECK: 200,
+}
+
+# Stop as soon as the model starts echoing the next prompt section
+STOP_SEQUENCES: Dict[LLMRequestType, List[str]] = {
+    LLMRequestType.CONTINUATION: ["\nExisting Text:", "\nInstructions:", "\nProject Context:"],
+    LLMRequestType.REWRITING: ["\nText to Rewrite:", "\nRewriting Goals:", "\nProject Context:"],
+    LLMRequestType.SUGGESTION: ["\nAuthor's Question/Challenge:", "\nProject Context:"],
+    LLMRequestType.ANALYSIS: ["\nText to Analyze:", "\nProject Context:"],
+}
+
+# Budget = target * ratio * HEADROOM, so a slightly long answer is not cut mid-sentence
+HEADROOM = 1.3
+MIN_MAX_TOKENS = 64
+MAX_MAX_TOKENS = 4000
+
+# Tolerated deviation from the target before it is reported
+OVERSHOOT_THRESHOLD = 1.2
+UNDERSHOOT_THRESHOLD = 0.8
+
+# Self-tuning parameters
+CALIBRATION_SAMPLE_SIZE = 200
+CALIBRATION_MIN_SAMPLES = 20
+CALIBRATION_TTL_SECONDS = 600
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words in text."""
+    return len(text.split()) if text else 0
+
+
+def compute_max_tokens(target_words: int, tokens_per_word: float) -> int:
+    """
+    Compute the output token limit for a target length.
+
+    Args:
+        target_words: Requested output length in words
+        tokens_per_word: Token-per-word ratio of the output language
+
+    Returns:
+        max_tokens value, clamped to sane bounds
+    """
+    budget = math.ceil(target_words * tokens_per_word * HEADROOM)
+    return max(MIN_MAX_TOKENS, min(MAX_MAX_TOKENS, budget))
+
+
+def get_stop_sequences(request_type: LLMRequestType) -> Optional[List[str]]:
+    """Get the stop sequences for a request type (None if there are none)."""
+    return STOP_SEQUENCES.get(request_type)
+
+
+def length_ratio(target_words: int, output_words: int) -> float:
+    """Ratio of produced to requested words (1.0 means on target)."""
+    if target_words <= 0:
+        return 0.0
+    return round(output_words / target_words, 3)
+
+
+def report_length_deviation(
+    request_type: LLMRequestType, target_words: int, output_words: int, max_tokens: int
+) -> float:
+    """
+    Log generations that overshoot or undershoot their target length.
+
+    Args:
+        request_type: Type of request
+        target_words: Requested length in words
+        output_words: Words actually produced
+        max_tokens: Token limit that was applied
+
+    Returns:
+        Length ratio (produced / requested)
+    """
+    ratio = length_ratio(target_words, output_words)
+    if ratio > OVERSHOOT_THRESHOLD:
+        logger.info(
+            f"LLM {request_type.value} overshoot: {output_words} words for a target of "
+            f"{target_words} (ratio {ratio}, max_tokens {max_tokens})"
+        )
+    elif ratio < UNDERSHOOT_THRESHOLD:
+        logger.info(
+            f"LLM {request_type.value} undershoot: {output_words} words for a target of "
+            f"{target_words} (ratio {ratio}, max_tokens {max_tokens})"
+        )
+    return ratio
+
+
+class TokenBudgetCalibrator:
+    """
+    Estimates token-per-word ratios per language from logged requests.
+
+    Estimates are cached in memory for CALIBRATION_TTL_SECONDS; languages with
+    too few real samples fall back to DEFAULT_TOKENS_PER_WORD.
+    """
+
+    def __init__(self):
+        """Initialize an empty calibration cache."""
+        self._cache: Dict[str, Tuple[float, float]] = {}
+
+    def tokens_per_word(self, db: Session, language: Optional[str]) -> float:
+        """
+        Get the token-per-word ratio for a language.
+
+        Args:
+            db: Database session
+            language: Project language code (e.g. "fr")
+
+        Returns:
+            Token-per-word ratio
+        """
+        language = (language or "").lower()
+        default = DEFAULT_TOKENS_PER_WORD.get(language, FALLBACK_TOKENS_PER_WORD)
+
+        cached = self._cache.get(language)
+        if cached and time.monotonic() - cached[1] < CALIBRATION_TTL_SECONDS:
+            return cached[0]
+
+        ratio = default
+        if db is not None:
+            try:
+                # In a savepoint, so a failed query does not abort the caller's transaction
+                with db.begin_nested():
+                    ratio = self._estimate(db, language) or default
+            except Exception as e:
+                logger.warning(f"Token ratio calibration failed for '{language}': {e}")
+
+        self._cache[language] = (ratio, time.monotonic())
+        return ratio
+
+    def _estimate(self, db: Session, language: str) -> Optional[float]:
+        """
+        Estimate the ratio from recent completed, non-mock requests.
+
+        Args:
+            db: Database session
+            language: Project language code
+
+        Returns:
+            Estimated ratio, or None if there are not enough samples
+        """
+        rows = (
+            db.query(LLMRequest.output_tokens, LLMRequest.request_payload)
+            .join(Project, Project.id == LLMRequest.project_id)
+            .filter(
+                Project.language == language,
+                LLMRequest.status == LLMRequestStatus.COMPLETED,
+                LLMRequest.model != "mock-model",
+                LLMRequest.request_payload.has_key("output_words"),
+            )
+            .order_by(LLMRequest.created_at.desc())
+            .limit(CALIBRATION_SAMPLE_SIZE)
+            .all()
+        )
+
+        total_tokens = 0
+        total_words = 0
+        samples = 0
+        for output_tokens, payload in rows:
+            output_words = (payload or {}).get("output_words") or 0
+            if output_tokens and output_words:
+                total_tokens += output_tokens
+                total_words += output_words
+                samples += 1
+
+        if samples < CALIBRATION_MIN_SAMPLES:
+            return None
+        return round(total_tokens / total_words, 3)
+
+    def reset(self) -> None:
+        """Drop all cached estimates."""
+        self._cache.clear()
+
+
+token_budget_calibrator = TokenBudgetCalibrator()
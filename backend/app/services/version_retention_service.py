@@ -0,0 +1,334 @@
+"""
+Version retention service for thinning old auto-saves.
+
+Every version younger than VERSION_RETENTION_ALL_HOURS is kept; older
+auto-saves are thinned to the last one of each hour, and to the last one
+of each day once older than VERSION_RETENTION_HOURLY_DAYS. Explicit
+commits and the latest version of each entity are never deleted.
+
+Compaction runs one document or pyramid node per short transaction with a
+lock timeout, so it backs off instead of blocking editors: deltas based on
+deleted versions are rebased on the previous kept version, parent links
+skip deleted versions, and content blobs no longer referenced are then
+collected in batches. Freed space is reused by autovacuum (no VACUUM FULL,
+which would lock the table). Run it periodically, e.g. from cron:
+
+    python -m app.services.version_retention_service [--dry-run] [--batch-size N]
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import version as crud_version
+from app.crud.crud_content_blob import content_blob as crud_content_blob
+from app.models.version import Version
+
+logger = logging.getLogger(__name__)
+
+
+# Entities listed per query
+COMPACTION_BATCH_SIZE = 100
+
+# Versions deleted per statement, and blobs collected per transaction
+DELETE_BATCH_SIZE = 500
+
+# Give up on an entity rather than wait longer than this for a row lock
+COMPACTION_LOCK_TIMEOUT_MS = 2000
+
+# (id, created_at, is_autosave)
+RetentionRow = Tuple[UUID, datetime, bool]
+
+
+class VersionRetentionService:
+    """Service for applying the version retention policy."""
+    
+    @staticmethod
+    def plan_deletions(versions: Sequence[RetentionRow], *, now: datetime) -> Set[UUID]:
+        """
+        Choose the versions of one entity that the retention policy drops.
+        
+        The latest version does not count toward its period, so the version
+        before it (which auto-saves are coalesced against) is kept too.
+        
+        Args:
+            versions: Versions of a document or pyramid node, oldest first
+            now: Reference time (UTC)
+        
+        Returns:
+            IDs of the versions to delete
+        """
+        keep_all_after = now - timedelta(hours=settings.VERSION_RETENTION_ALL_HOURS)
+        hourly_after = now - timedelta(days=settings.VERSION_RETENTION_HOURLY_DAYS)
+        
+        kept_periods: Set[Tuple[str, Any]] = set()
+        deleted: Set[UUID] = set()
+        # Newest first, so the last auto-save of each period is the one kept
+        for index, (version_id, created_at, is_autosave) in enumerate(reversed(versions)):
+            if index == 0 or not is_autosave or created_at >= keep_all_after:
+                continue
+            if created_at >= hourly_after:
+                period = ("hour", created_at.replace(minute=0, second=0, microsecond=0))
+            else:
+                period = ("day", created_at.date())
+            if period in kept_periods:
+                deleted.add(version_id)
+            else:
+                kept_periods.add(period)
+        return deleted
+    
+    @staticmethod
+    def _entities(
+        db: Session, *, cutoff: datetime, after: Optional[Tuple[str, UUID]], limit: int
+    ) -> List[Tuple[str, UUID]]:
+        """List entities with auto-saves older than the cutoff, in a stable order."""
+        keys: List[Tuple[str, UUID]] = []
+        for kind, column in (("document", Version.document_id), ("pyramid_node", Version.pyramid_node_id)):
+            if after and after[0] == "pyramid_node" and kind == "document":
+                continue
+            query = (
+                db.query(column)
+                .filter(column.isnot(None), Version.is_autosave.is_(True), Version.created_at < cutoff)
+                .group_by(column)
+                .order_by(column)
+            )
+            if after and after[0] == kind:
+                query = query.filter(column > after[1])
+            keys.extend((kind, entity_id) for (entity_id,) in query.limit(limit - len(keys)).all())
+            if len(keys) >= limit:
+                break
+        return keys
+    
+    @staticmethod
+    def _rewrites(
+        db: Session, *, rows: List[Any], deleted: Set[UUID], stats: Dict[str, int]
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Compute the column updates that keep kept versions valid without the deleted ones.
+        
+        Deltas based on deleted versions are rebased on the previous kept
+        version (writing their new storage), the delta depths of later
+        versions follow, and parent links skip deleted versions.
+        
+        Raises:
+            LookupError: If a version to rebase cannot be reconstructed
+        """
+        kept = [row for row in rows if row.id not in deleted]
+        updates: Dict[UUID, Dict[str, Any]] = {}
+        
+        first = next(
+            (index for index, row in enumerate(kept) if row.is_delta and row.delta_base_id in deleted), None
+        )
+        if first is not None:
+            contents = crud_version.reconstruct(db, [row.id for row in kept[max(first - 1, 0):]])
+            depths = {row.id: row.delta_depth for row in kept}
+            for index in range(first, len(kept)):
+                row = kept[index]
+                if not row.is_delta:
+                    continue
+                depth = depths[row.delta_base_id] + 1 if row.delta_base_id in depths else None
+                if depth is not None and depth == row.delta_depth:
+                    continue
+                if depth is not None and depth < settings.VERSION_KEYFRAME_INTERVAL:
+                    fields = {"delta_depth": depth}
+                else:
+                    # Rebased on the previous kept version (or a keyframe if the chain is full)
+                    previous = kept[index - 1] if index and depth is None else None
+                    if row.id not in contents or (previous and previous.id not in contents):
+                        raise LookupError(f"version {row.id} cannot be reconstructed")
+                    base = (previous.id, depths[previous.id], contents[previous.id]) if previous else None
+                    fields = crud_version.storage_fields(
+                        db, project_id=row.project_id, content=contents[row.id], base=base
+                    )
+                    stats["bytes_reclaimed"] += row.stored_bytes - len((fields["content_delta"] or "").encode("utf-8"))
+                depths[row.id] = fields["delta_depth"]
+                updates[row.id] = fields
+        
+        parents = {row.id: row.parent_version_id for row in rows}
+        for row in kept:
+            parent = row.parent_version_id
+            if parent in deleted:
+                while parent in deleted:
+                    parent = parents.get(parent)
+                updates.setdefault(row.id, {})["parent_version_id"] = parent
+        
+        return updates
+    
+    @staticmethod
+    def compact_entity(
+        db: Session, *, kind: str, entity_id: UUID, now: Optional[datetime] = None, dry_run: bool = False
+    ) -> Dict[str, int]:
+        """
+        Apply the retention policy to one document or pyramid node.
+        
+        Args:
+            db: Database session
+            kind: "document" or "pyramid_node"
+            entity_id: Entity ID
+            now: Reference time (defaults to now, UTC)
+            dry_run: Only count what would be deleted
+        
+        Returns:
+            Versions deleted and rewritten, and version bytes reclaimed
+            (keyframe blobs written while rebasing are not subtracted)
+        """
+        now = now or datetime.utcnow()
+        column = Version.document_id if kind == "document" else Version.pyramid_node_id
+        stats = {"versions_deleted": 0, "versions_rewritten": 0, "bytes_reclaimed": 0}
+        
+        db.execute(text(f"SET LOCAL lock_timeout = '{COMPACTION_LOCK_TIMEOUT_MS}ms'"))
+        stored_bytes = (
+            func.coalesce(func.octet_length(Version.content_snapshot), 0)
+            + func.coalesce(func.octet_length(Version.content_delta), 0)
+        )
+        rows = (
+            db.query(
+                Version.id,
+                Version.project_id,
+                Version.created_at,
+                Version.is_autosave,
+                Version.delta_base_id,
+                Version.delta_depth,
+                Version.parent_version_id,
+                Version.content_delta.isnot(None).label("is_delta"),
+                stored_bytes.label("stored_bytes")
+            )
+            .filter(column == entity_id)
+            .order_by(Version.created_at, Version.id)
+            .all()
+        )
+        deleted = VersionRetentionService.plan_deletions(
+            [(row.id, row.created_at, row.is_autosave) for row in rows], now=now
+        )
+        if not deleted:
+            db.rollback()
+            return stats
+        stats["versions_deleted"] = len(deleted)
+        stats["bytes_reclaimed"] = sum(row.stored_bytes for row in rows if row.id in deleted)
+        if dry_run:
+            db.rollback()
+            return stats
+        
+        try:
+            updates = VersionRetentionService._rewrites(db, rows=rows, deleted=deleted, stats=stats)
+            for version_id, fields in updates.items():
+                # A storage change is not a content change
+                db.execute(
+                    update(Version)
+                    .where(Version.id == version_id)
+                    .values(**fields, updated_at=Version.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+            # Newest first: deleted deltas may be based on older deleted versions
+            doomed = [row.id for row in reversed(rows) if row.id in deleted]
+            for start in range(0, len(doomed), DELETE_BATCH_SIZE):
+                db.execute(
+                    delete(Version)
+                    .where(Version.id.in_(doomed[start:start + DELETE_BATCH_SIZE]))
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except OperationalError as e:
+            # Lock timeout: the entity is being edited, try again next run
+            db.rollback()
+            logger.info(f"{kind} {entity_id}: skipped ({e.orig.__class__.__name__})")
+            return {key: 0 for key in stats}
+        except LookupError as e:
+            db.rollback()
+            logger.warning(f"{kind} {entity_id}: skipped ({e})")
+            return {key: 0 for key in stats}
+        
+        stats["versions_rewritten"] = len(updates)
+        return stats
+    
+    @staticmethod
+    def collect_blobs(db: Session, *, batch_size: int = DELETE_BATCH_SIZE) -> Tuple[int, int]:
+        """
+        Delete content blobs that no version references, batch by batch.
+        
+        Args:
+            db: Database session
+            batch_size: Blobs deleted per transaction
+        
+        Returns:
+            (blobs deleted, bytes reclaimed)
+        """
+        blobs = reclaimed = 0
+        while True:
+            count, size = crud_content_blob.delete_unreferenced(db, limit=batch_size)
+            db.commit()
+            blobs += count
+            reclaimed += size
+            if count < batch_size:
+                return blobs, reclaimed
+    
+    @staticmethod
+    def compact_all(
+        db: Session,
+        *,
+        now: Optional[datetime] = None,
+        dry_run: bool = False,
+        batch_size: int = COMPACTION_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        Apply the retention policy to every document and pyramid node.
+        
+        Args:
+            db: Database session
+            now: Reference time (defaults to now, UTC)
+            dry_run: Only count what would be deleted
+            batch_size: Entities listed per query
+        
+        Returns:
+            Counts of entities processed, versions deleted and rewritten,
+            blobs deleted and bytes reclaimed (version rows and blobs)
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(hours=settings.VERSION_RETENTION_ALL_HOURS)
+        stats = {"entities": 0, "versions_deleted": 0, "versions_rewritten": 0, "blobs_deleted": 0, "bytes_reclaimed": 0}
+        
+        after: Optional[Tuple[str, UUID]] = None
+        while True:
+            keys = VersionRetentionService._entities(db, cutoff=cutoff, after=after, limit=batch_size)
+            db.rollback()
+            if not keys:
+                break
+            for kind, entity_id in keys:
+                entity_stats = VersionRetentionService.compact_entity(
+                    db, kind=kind, entity_id=entity_id, now=now, dry_run=dry_run
+                )
+                for key, value in entity_stats.items():
+                    stats[key] += value
+                stats["entities"] += 1
+            after = keys[-1]
+            logger.info(f"Compacted {stats['entities']} entities ({stats['versions_deleted']} versions deleted)")
+        
+        if not dry_run:
+            blobs, reclaimed = VersionRetentionService.collect_blobs(db)
+            stats["blobs_deleted"] = blobs
+            stats["bytes_reclaimed"] += reclaimed
+        return stats
+
+
+version_retention_service = VersionRetentionService()
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Thin old auto-save versions and collect unused blobs.")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(version_retention_service.compact_all(session, dry_run=args.dry_run, batch_size=args.batch_size))
+    finally:
+        session.close()
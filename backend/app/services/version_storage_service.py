@@ -0,0 +1,170 @@
+"""
+Version storage service for converting existing versions to delta storage.
+
+Versions written before delta storage are all inline full snapshots. This
+tool rewrites each document's and pyramid node's history as deltas and
+content-addressed keyframes (see crud_version), one entity per
+transaction, and can expand the history back to inline full snapshots
+(required before downgrading the schema). It also fills in the history
+stats (size and word changes) of versions written before they existed.
+
+Run it after upgrading the database:
+
+    python -m app.services.version_storage_service [--expand] [--batch-size N]
+"""
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.crud import version as crud_version
+from app.crud.crud_version import version_stats
+from app.models.content_blob import ContentBlob
+from app.models.version import Version
+
+logger = logging.getLogger(__name__)
+
+
+# Entities whose histories are loaded per query
+CONVERSION_BATCH_SIZE = 100
+
+# ("document" | "pyramid_node", entity ID)
+EntityKey = Tuple[str, UUID]
+
+
+class VersionStorageService:
+    """Service for converting version histories between storage formats."""
+    
+    @staticmethod
+    def _entities(db: Session, *, after: Optional[EntityKey], limit: int) -> List[EntityKey]:
+        """List versioned entities in a stable order, for batching."""
+        keys: List[EntityKey] = []
+        for kind, column in (("document", Version.document_id), ("pyramid_node", Version.pyramid_node_id)):
+            if after and after[0] == "pyramid_node" and kind == "document":
+                continue
+            query = db.query(column).filter(column.isnot(None)).group_by(column).order_by(column)
+            if after and after[0] == kind:
+                query = query.filter(column > after[1])
+            keys.extend((kind, entity_id) for (entity_id,) in query.limit(limit - len(keys)).all())
+            if len(keys) >= limit:
+                break
+        return keys
+    
+    @staticmethod
+    def convert_entity(db: Session, *, kind: str, entity_id: UUID, expand: bool = False) -> int:
+        """
+        Rewrite the version history of one document or pyramid node.
+        
+        Args:
+            db: Database session
+            kind: "document" or "pyramid_node"
+            entity_id: Entity ID
+            expand: Store every version as a full snapshot instead of deltas
+        
+        Returns:
+            Number of versions whose storage changed
+        """
+        column = Version.document_id if kind == "document" else Version.pyramid_node_id
+        versions = (
+            db.query(Version)
+            .filter(column == entity_id)
+            .order_by(Version.created_at, Version.id)
+            .all()
+        )
+        # Reconstruct everything first: rows are rewritten in chain order below
+        contents = crud_version.reconstruct(db, [version.id for version in versions])
+        
+        changed = 0
+        base = None
+        previous = ""
+        for version in versions:
+            content = contents.get(version.id)
+            if content is None:
+                logger.warning(f"Version {version.id} cannot be reconstructed; left unchanged")
+                base = None
+                continue
+            
+            fields = crud_version.storage_fields(
+                db,
+                project_id=version.project_id,
+                content=content,
+                base=None if expand else base,
+                inline=expand
+            )
+            if version.content_size is None:
+                fields.update(version_stats(previous, content))
+            if any(getattr(version, key) != value for key, value in fields.items()):
+                for key, value in fields.items():
+                    setattr(version, key, value)
+                changed += 1
+            base = (version.id, fields["delta_depth"], content)
+            previous = content
+        
+        db.commit()
+        return changed
+    
+    @staticmethod
+    def convert_all(
+        db: Session, *, expand: bool = False, batch_size: int = CONVERSION_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        Rewrite the version histories of all documents and pyramid nodes.
+        
+        The conversion is idempotent and can be interrupted and re-run.
+        
+        Args:
+            db: Database session
+            expand: Store every version as a full snapshot instead of deltas
+            batch_size: Entities listed per query
+        
+        Returns:
+            Counts of entities processed, versions changed and stored bytes
+            (inline snapshots, deltas and blobs) before and after
+        """
+        def stored_bytes() -> int:
+            versions = db.query(
+                func.coalesce(func.sum(
+                    func.coalesce(func.octet_length(Version.content_snapshot), 0)
+                    + func.coalesce(func.octet_length(Version.content_delta), 0)
+                ), 0)
+            ).scalar()
+            blobs = db.query(func.coalesce(func.sum(func.octet_length(ContentBlob.data)), 0)).scalar()
+            return int(versions) + int(blobs)
+        
+        stats = {"entities": 0, "versions_changed": 0, "bytes_before": int(stored_bytes())}
+        after: Optional[EntityKey] = None
+        while True:
+            keys = VersionStorageService._entities(db, after=after, limit=batch_size)
+            if not keys:
+                break
+            for kind, entity_id in keys:
+                stats["versions_changed"] += VersionStorageService.convert_entity(
+                    db, kind=kind, entity_id=entity_id, expand=expand
+                )
+                stats["entities"] += 1
+            after = keys[-1]
+            logger.info(f"Converted {stats['entities']} entities ({stats['versions_changed']} versions changed)")
+        
+        stats["bytes_after"] = int(stored_bytes())
+        return stats
+
+
+version_storage_service = VersionStorageService()
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Convert version histories to delta storage.")
+    parser.add_argument("--expand", action="store_true", help="store every version as a full snapshot")
+    parser.add_argument("--batch-size", type=int, default=CONVERSION_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(version_storage_service.convert_all(session, expand=args.expand, batch_size=args.batch_size))
+    finally:
+        session.close()
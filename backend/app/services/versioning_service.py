@@ -1,22 +1,41 @@
 """
 Versioning service for Git-like version control.
+
+Diffs between versions are memoized in memory. A version's content only
+changes when an auto-save is coalesced into it, which also changes its
+content hash, so diffs are keyed by version IDs and content hashes.
 """
-from typing import Optional, List
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-import difflib
 import json
 
 from app.models.version import Version
 from app.models.document import Document
 from app.models.pyramid_node import PyramidNode
 from app.crud import version as crud_version
+from app.crud import document as crud_document
+from app.crud import project as crud_project
+from app.core.text_diff import DiffGranularity, build_hunks, count_units, diff_segments, render_hunks
 from app.schemas.version import VersionCreate, VersionDiff
 
 
+# Number of version diffs kept in memory
+DIFF_CACHE_SIZE = 512
+
+# (version A, version B, granularity, content hash A, content hash B)
+DiffKey = Tuple[UUID, UUID, DiffGranularity, str, str]
+
+
 class VersioningService:
     """Service for managing Git-like versioning."""
     
+    _diffs: "OrderedDict[DiffKey, VersionDiff]" = OrderedDict()
+    _diffs_lock = threading.Lock()
+    
     @staticmethod
     def create_version(
         db: Session,
@@ -46,7 +65,7 @@ class VersioningService:
         # Get content snapshot
         content_snapshot = ""
         if document_id:
-            document = db.query(Document).filter(Document.id == document_id).first()
+            document = crud_document.get_with_content(db, id=document_id)
             if document:
                 content_snapshot = document.content_raw or ""
         elif pyramid_node_id:
@@ -80,46 +99,79 @@ class VersioningService:
         db: Session,
         *,
         version_a_id: UUID,
-        version_b_id: UUID
+        version_b_id: UUID,
+        granularity: DiffGranularity = DiffGranularity.LINE
     ) -> VersionDiff:
         """
         Get diff between two versions.
         
+        Additions and deletions count lines, words (and punctuation marks)
+        or characters, depending on the granularity.
+        
         Args:
             db: Database session
             version_a_id: First version ID
             version_b_id: Second version ID
+            granularity: Smallest unit of change (line, word or char)
             
         Returns:
             Version diff
         """
-        version_a = crud_version.get(db, id=version_a_id)
-        version_b = crud_version.get(db, id=version_b_id)
+        granularity = DiffGranularity(granularity)
         
-        if not version_a or not version_b:
+        # Identical contents have identical hashes: no need to load the texts
+        hashes = crud_version.get_content_hashes(db, [version_a_id, version_b_id])
+        if version_a_id not in hashes or version_b_id not in hashes:
             raise ValueError("One or both versions not found")
+        hash_a, hash_b = hashes[version_a_id], hashes[version_b_id]
+        if hash_a and hash_a == hash_b:
+            return VersionDiff(
+                version_a_id=version_a_id,
+                version_b_id=version_b_id,
+                granularity=granularity,
+                diff_text="",
+                additions=0,
+                deletions=0
+            )
         
-        # Generate diff
-        diff = difflib.unified_diff(
-            version_a.content_snapshot.splitlines(keepends=True),
-            version_b.content_snapshot.splitlines(keepends=True),
-            fromfile=f"Version {version_a_id}",
-            tofile=f"Version {version_b_id}"
-        )
+        cls = VersioningService
+        key = (version_a_id, version_b_id, granularity, hash_a, hash_b) if hash_a and hash_b else None
+        if key:
+            with cls._diffs_lock:
+                cached = cls._diffs.get(key)
+                if cached is not None:
+                    cls._diffs.move_to_end(key)
+                    return cached
         
-        diff_text = "".join(diff)
-        
-        # Count additions and deletions
-        additions = diff_text.count("\n+") - 1  # -1 for the +++ line
-        deletions = diff_text.count("\n-") - 1  # -1 for the --- line
+        contents = crud_version.reconstruct(db, [version_a_id, version_b_id])
+        if version_a_id not in contents or version_b_id not in contents:
+            raise ValueError("One or both versions not found")
         
-        return VersionDiff(
+        segments = diff_segments(contents[version_a_id], contents[version_b_id], granularity)
+        hunks = build_hunks(segments, granularity)
+        diff = VersionDiff(
             version_a_id=version_a_id,
             version_b_id=version_b_id,
-            diff_text=diff_text,
-            additions=max(0, additions),
-            deletions=max(0, deletions)
+            granularity=granularity,
+            diff_text=render_hunks(hunks, granularity, f"Version {version_a_id}", f"Version {version_b_id}"),
+            additions=sum(count_units(text, granularity) for op, text in segments if op == "insert"),
+            deletions=sum(count_units(text, granularity) for op, text in segments if op == "delete"),
+            hunks=hunks
         )
+        
+        if key:
+            with cls._diffs_lock:
+                cls._diffs[key] = diff
+                cls._diffs.move_to_end(key)
+                while len(cls._diffs) > DIFF_CACHE_SIZE:
+                    cls._diffs.popitem(last=False)
+        return diff
+    
+    @staticmethod
+    def clear_diff_cache() -> None:
+        """Drop all memoized version diffs."""
+        with VersioningService._diffs_lock:
+            VersioningService._diffs.clear()
     
     @staticmethod
     def restore_version(
@@ -147,12 +199,10 @@ class VersioningService:
         
         # Restore to document or pyramid node
         if version.document_id:
-            document = db.query(Document).filter(Document.id == version.document_id).first()
+            document = crud_document.get_for_update(db, id=version.document_id)
             if document:
-                document.content_raw = version.content_snapshot
-                db.add(document)
-                db.commit()
-                db.refresh(document)
+                # Through crud_document so the revision, operation log and word count follow
+                document = crud_document.update(db, db_obj=document, obj_in={"content_raw": version.content_snapshot})
                 
                 # Create new version if requested
                 if create_new_version:
@@ -171,6 +221,7 @@ class VersioningService:
             if pyramid_node:
                 pyramid_node.content = version.content_snapshot
                 db.add(pyramid_node)
+                crud_project.bump_pyramid_revision(db, project_id=pyramid_node.project_id)
                 db.commit()
                 db.refresh(pyramid_node)
                 
@@ -194,24 +245,26 @@ class VersioningService:
         *,
         document_id: Optional[UUID] = None,
         pyramid_node_id: Optional[UUID] = None,
+        before: Optional[Tuple[datetime, UUID]] = None,
         limit: int = 50
     ) -> List[Version]:
         """
-        Get version history for a document or pyramid node.
+        Get version history for a document or pyramid node, without content.
         
         Args:
             db: Database session
             document_id: Document ID (optional)
             pyramid_node_id: Pyramid node ID (optional)
+            before: (created_at, id) of the last version of the previous page
             limit: Maximum number of versions to return
             
         Returns:
-            List of versions
+            List of versions, newest first
         """
         if document_id:
-            return crud_version.get_by_document(db, document_id=document_id, limit=limit)
+            return crud_version.get_by_document(db, document_id=document_id, before=before, limit=limit)
         elif pyramid_node_id:
-            return crud_version.get_by_pyramid_node(db, pyramid_node_id=pyramid_node_id, limit=limit)
+            return crud_version.get_by_pyramid_node(db, pyramid_node_id=pyramid_node_id, before=before, limit=limit)
         else:
             return []
 
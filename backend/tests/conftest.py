@@ -98,6 +98,7 @@ def test_document(db: Session, test_project):
         title="Chapter 1",
         type=DocumentType.DRAFT,
         content_raw="This is a test document content.",
+        word_count=6,
         order_index=0
     )
     db.add(document)
@@ -20,6 +20,20 @@ def test_get_documents_by_project(client, test_user, test_user_token, test_proje
     assert data[0]["title"] == test_document.title
 
 
+def test_get_documents_summaries(client, test_user, test_user_token, test_project, test_document, db):
+    """Test GET /api/v1/documents?project_id={id} - Liste sans le contenu, avec le nombre de mots"""
+    response = client.get(
+        f"/api/v1/documents/?project_id={test_project.id}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    
+    assert response.status_code == 200
+    summary = response.json()[0]
+    assert "content_raw" not in summary
+    assert summary["word_count"] == len((test_document.content_raw or "").split())
+    assert summary["revision"] == test_document.revision
+
+
 def test_get_document_detail(client, test_user, test_user_token, test_document):
     """Test GET /api/v1/documents/{id} - Détail d'un document"""
     response = client.get(
@@ -54,6 +68,7 @@ def test_create_document(client, test_user, test_user_token, test_project, db):
     assert data["content_raw"] == document_data["content_raw"]
     assert data["type"] == document_data["type"]
     assert "id" in data
+    assert response.headers["ETag"]  # If-Match de la première mise à jour
     
     # Vérifier en DB
     doc = crud_document.get(db, id=data["id"])
@@ -70,10 +85,13 @@ def test_update_document(client, test_user, test_user_token, test_document, db):
         "type": "scene"
     }
     
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    etag = client.get(f"/api/v1/documents/{test_document.id}", headers=headers).headers["ETag"]
+    
     response = client.put(
         f"/api/v1/documents/{test_document.id}",
         json=update_data,
-        headers={"Authorization": f"Bearer {test_user_token}"}
+        headers={**headers, "If-Match": etag}
     )
     
     assert response.status_code == 200
@@ -133,3 +151,175 @@ def test_create_document_with_parent(client, test_user, test_user_token, test_pr
     doc = crud_document.get(db, id=data["id"])
     assert doc is not None
     assert doc.title == document_data["title"]
+
+
+def test_patch_document_rebases_stale_operations(client, test_user, test_user_token, test_document, db):
+    """Test PATCH /api/v1/documents/{id} - Opérations texte rebasées sur une révision plus récente"""
+    # "*" : les opérations faites sur une ancienne révision sont rebasées
+    headers = {"Authorization": f"Bearer {test_user_token}", "If-Match": "*"}
+    text = test_document.content_raw  # "This is a test document content."
+    
+    # Premier onglet : insertion contre la révision 0
+    first = client.patch(
+        f"/api/v1/documents/{test_document.id}",
+        json={"base_revision": 0, "operations": [{"op": "insert", "offset": 0, "text": "Well. "}]},
+        headers=headers
+    )
+    assert first.status_code == 200
+    assert first.json()["revision"] == 1
+    assert first.json()["operations"] == []
+    
+    # Second onglet, encore sur la révision 0 : rebasé sur la première insertion
+    offset = text.index("test")
+    second = client.patch(
+        f"/api/v1/documents/{test_document.id}",
+        json={"base_revision": 0, "operations": [{"op": "delete", "offset": offset, "length": len("test ")}]},
+        headers=headers
+    )
+    assert second.status_code == 200
+    data = second.json()
+    assert data["revision"] == 2
+    assert data["operations"] == [{"op": "insert", "offset": 0, "text": "Well. "}]
+    
+    db.refresh(test_document)
+    assert test_document.content_raw == "Well. This is a document content."
+    assert data["content_size"] == len(test_document.content_raw)
+    
+    # Insertion dans un passage supprimé entre-temps : conflit
+    conflict = client.patch(
+        f"/api/v1/documents/{test_document.id}",
+        json={"base_revision": 1, "operations": [{"op": "insert", "offset": offset + 8, "text": "x"}]},
+        headers=headers
+    )
+    assert conflict.status_code == 409
+    
+    out_of_range = client.patch(
+        f"/api/v1/documents/{test_document.id}",
+        json={"base_revision": 2, "operations": [{"op": "delete", "offset": 1000, "length": 1}]},
+        headers=headers
+    )
+    assert out_of_range.status_code == 422
+
+
+def test_document_conditional_requests(client, test_user, test_user_token, test_document, db):
+    """Test ETag, If-None-Match (304) et If-Match (412) sur /api/v1/documents/{id}"""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    url = f"/api/v1/documents/{test_document.id}"
+    
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    # Rien n'a changé : 304 sans corps
+    not_modified = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    
+    # Premier onglet : mise à jour conditionnelle acceptée, nouvel ETag
+    updated = client.put(url, json={"title": "Onglet 1"}, headers={**headers, "If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    
+    # Second onglet, encore sur l'ancien ETag : refusé au lieu d'écraser
+    stale = client.put(url, json={"title": "Onglet 2"}, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == updated.headers["ETag"]
+    stale_patch = client.patch(
+        url,
+        json={"base_revision": 0, "operations": [{"op": "insert", "offset": 0, "text": "x"}]},
+        headers={**headers, "If-Match": etag}
+    )
+    assert stale_patch.status_code == 412
+    
+    db.refresh(test_document)
+    assert test_document.title == "Onglet 1"
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_document_update_requires_if_match(client, test_user, test_user_token, test_document, db):
+    """Test PUT / PATCH /api/v1/documents/{id} sans If-Match - Refusés (428)"""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    url = f"/api/v1/documents/{test_document.id}"
+    
+    response = client.put(url, json={"title": "Sans précondition"}, headers=headers)
+    assert response.status_code == 428
+    assert response.headers["ETag"] == client.get(url, headers=headers).headers["ETag"]
+    
+    patched = client.patch(
+        url,
+        json={"base_revision": 0, "operations": [{"op": "insert", "offset": 0, "text": "x"}]},
+        headers=headers
+    )
+    assert patched.status_code == 428
+    
+    db.refresh(test_document)
+    assert test_document.title == "Chapter 1"
+    assert test_document.revision == 0
+
+
+def test_document_block_storage(client, test_user, test_user_token, test_document, db):
+    """Test /api/v1/documents/{id}/blocks - Édition paragraphe par paragraphe d'un document stocké en blocs"""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    url = f"/api/v1/documents/{test_document.id}"
+    
+    etag = client.get(url, headers=headers).headers["ETag"]
+    assert client.put(f"{url}/storage", json={"block_storage": True}, headers=headers).status_code == 428
+    converted = client.put(f"{url}/storage", json={"block_storage": True}, headers={**headers, "If-Match": etag})
+    assert converted.status_code == 200
+    assert converted.json()["block_storage"] is True
+    base_revision = converted.json()["revision"]
+    
+    page_response = client.get(f"{url}/blocks", headers=headers)
+    page = page_response.json()
+    assert page["total"] == 1
+    first = page["blocks"][0]
+    assert first["content"] == "This is a test document content."
+    
+    # Les modifications de blocs exigent l'ETag courant
+    assert client.post(f"{url}/blocks", json={"content": "Second paragraph."}, headers=headers).status_code == 428
+    created = client.post(
+        f"{url}/blocks", json={"content": "Second paragraph."}, headers={**headers, "If-Match": page_response.headers["ETag"]}
+    )
+    assert created.status_code == 201
+    second = created.json()
+    
+    stale = client.put(
+        f"{url}/blocks/{first['id']}",
+        json={"content": "This is an edited document content."},
+        headers={**headers, "If-Match": page_response.headers["ETag"]}
+    )
+    assert stale.status_code == 412
+    edited = client.put(
+        f"{url}/blocks/{first['id']}",
+        json={"content": "This is an edited document content."},
+        headers={**headers, "If-Match": created.headers["ETag"]}
+    )
+    assert edited.status_code == 200
+    
+    # Un patch sur la révision d'avant les modifications de blocs est rebasé dessus
+    patched = client.patch(
+        url,
+        json={"base_revision": base_revision, "operations": [{"op": "insert", "offset": 0, "text": "Well. "}]},
+        headers={**headers, "If-Match": "*"}
+    )
+    assert patched.status_code == 200
+    
+    data = client.get(url, headers=headers).json()
+    assert data["content_raw"] == "Well. This is an edited document content.\n\nSecond paragraph."
+    assert data["word_count"] == 9
+    
+    # Le paragraphe modifié par le patch garde son bloc
+    page = client.get(f"{url}/blocks", headers=headers).json()
+    assert [block["id"] for block in page["blocks"]] == [first["id"], second["id"]]
+    assert page["blocks"][0]["content"] == "Well. This is an edited document content."
+    
+    etag = patched.headers["ETag"]
+    invalid = client.put(
+        f"{url}/blocks/{first['id']}", json={"content": "Deux\n\nparagraphes"}, headers={**headers, "If-Match": etag}
+    )
+    assert invalid.status_code == 422
+    
+    assert client.delete(f"{url}/blocks/{second['id']}", headers={**headers, "If-Match": etag}).status_code == 204
+    data = client.get(url, headers=headers).json()
+    assert data["content_raw"] == "Well. This is an edited document content."
+    assert data["word_count"] == 7
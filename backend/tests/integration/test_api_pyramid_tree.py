@@ -0,0 +1,57 @@
+"""
+Integration tests for the cached pyramid tree endpoint (ETag / If-None-Match).
+"""
+import pytest
+
+
+def _create_node(client, token, project_id, title, parent_id=None, level=0):
+    response = client.post(
+        "/api/v1/pyramid/nodes/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "project_id": str(project_id),
+            "parent_id": str(parent_id) if parent_id else None,
+            "level": level,
+            "title": title,
+            "content": f"{title} content"
+        }
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_tree_is_nested_with_etag(client, test_user_token, test_project, db):
+    """Test that the tree endpoint returns nested nodes and an ETag."""
+    root = _create_node(client, test_user_token, test_project.id, "Root")
+    _create_node(client, test_user_token, test_project.id, "Child", parent_id=root["id"], level=1)
+    
+    response = client.get(
+        f"/api/v1/pyramid/projects/{test_project.id}/tree",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    data = response.json()
+    assert [node["title"] for node in data] == ["Root"]
+    assert data[0]["children"][0]["title"] == "Child"
+    assert data[0]["descendant_count"] == 1
+
+
+def test_tree_conditional_get(client, test_user_token, test_project, db):
+    """Test that an unchanged pyramid answers 304 and a change gives a new ETag."""
+    _create_node(client, test_user_token, test_project.id, "Root")
+    url = f"/api/v1/pyramid/projects/{test_project.id}/tree"
+    auth = {"Authorization": f"Bearer {test_user_token}"}
+    
+    etag = client.get(url, headers=auth).headers["ETag"]
+    
+    not_modified = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    
+    _create_node(client, test_user_token, test_project.id, "Second root")
+    
+    changed = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
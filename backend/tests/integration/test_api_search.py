@@ -0,0 +1,85 @@
+"""
+Integration tests for search endpoints.
+"""
+from sqlalchemy.orm import Session
+
+from app.services.search_service import search_service
+
+
+class TestSearchAPI:
+    """Test search API endpoints."""
+    
+    def test_search_project(self, client, db: Session, test_project, test_document, test_entity, test_user_token):
+        """Test full-text search with stemming, snippets and exclusions."""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        # Fixtures are written without the API, so they are indexed as by the periodic refresh
+        assert search_service.refresh_all(db, project_id=test_project.id) == 2
+        
+        response = client.get(
+            "/api/v1/search/",
+            params={"project_id": str(test_project.id), "q": "documents"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert [result["item_id"] for result in results] == [str(test_document.id)]
+        result = results[0]
+        assert result["item_type"] == "document"
+        assert result["title"] == "Chapter 1"
+        start, end = result["highlights"][0]
+        assert result["snippet"][start:end] == "document"
+        
+        response = client.get(
+            "/api/v1/search/",
+            params={"project_id": str(test_project.id), "q": "test -character"},
+            headers=headers
+        )
+        assert [result["item_id"] for result in response.json()] == [str(test_document.id)]
+        
+        response = client.get(
+            "/api/v1/search/",
+            params={"project_id": str(test_project.id), "q": "test", "types": ["entity"]},
+            headers=headers
+        )
+        assert [result["item_id"] for result in response.json()] == [str(test_entity.id)]
+    
+    def test_search_project_pages(self, client, db: Session, test_project, test_document, test_entity, test_user_token):
+        """Test that search results are paged by cursor without repeats."""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        search_service.refresh_all(db, project_id=test_project.id)
+        params = {"project_id": str(test_project.id), "q": "test", "limit": 1}
+        
+        seen = []
+        while True:
+            page = client.get("/api/v1/search/", params=params, headers=headers).json()
+            if not page:
+                break
+            seen.append(page[0]["item_id"])
+            params.update(after_rank=page[0]["rank"], after_type=page[0]["item_type"], after_id=page[0]["item_id"])
+        assert sorted(seen) == sorted([str(test_document.id), str(test_entity.id)])
+        
+        incomplete = client.get(
+            "/api/v1/search/",
+            params={"project_id": str(test_project.id), "q": "test", "after_rank": 0.5},
+            headers=headers
+        )
+        assert incomplete.status_code == 400
+    
+    def test_search_reads_indexed_items_only(self, client, db: Session, test_project, test_document, test_user_token):
+        """Test that searches do not index, and that writes index the written item."""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        params = {"project_id": str(test_project.id), "q": "lighthouse"}
+        
+        url = f"/api/v1/documents/{test_document.id}"
+        etag = client.get(url, headers=headers).headers["ETag"]
+        client.put(url, json={"content": "The old lighthouse."}, headers={**headers, "If-Match": etag})
+        results = client.get("/api/v1/search/", params=params, headers=headers).json()
+        assert [result["item_id"] for result in results] == [str(test_document.id)]
+        
+        # Written without the API: found once the periodic refresh indexed it
+        test_document.content_raw = "The new lighthouse keeper."
+        db.commit()
+        params["q"] = "keeper"
+        assert client.get("/api/v1/search/", params=params, headers=headers).json() == []
+        search_service.refresh_all(db)
+        assert len(client.get("/api/v1/search/", params=params, headers=headers).json()) == 1
@@ -0,0 +1,74 @@
+"""
+Unit tests for compression codecs and compressed column types.
+"""
+from app.core import compression
+from app.core.compression import compress_bytes, compress_text, decompress_text, is_compressed, resolve_codec
+from app.db import types
+from app.db.types import CompressedJSON, CompressedText
+
+
+PROSE = "La pluie battait les vitres de la vieille maison. " * 40
+
+
+class TestCompression:
+    """Test codec selection, headers and round trips."""
+    
+    def test_round_trip_with_each_codec(self):
+        """Test that every codec decompresses to the original text."""
+        for codec in ("none", "zlib", "zstd"):
+            assert decompress_text(compress_text(PROSE, codec)) == PROSE
+    
+    def test_compressed_values_are_smaller_and_tagged(self):
+        """Test that prose shrinks and carries a header."""
+        value = compress_text(PROSE, "zlib")
+        assert is_compressed(value)
+        assert len(value) < len(PROSE.encode("utf-8")) / 3
+    
+    def test_plain_and_small_values_pass_through(self):
+        """Test that plain UTF-8 (existing rows) and small values are stored as-is."""
+        assert compress_text(PROSE, "none") == PROSE.encode("utf-8")
+        assert compress_text("Short.", "zlib") == b"Short."
+        assert decompress_text("Déjà écrit.".encode("utf-8")) == "Déjà écrit."
+        assert is_compressed(compress_bytes(b"Short.", "zlib", min_size=0))
+    
+    def test_zstd_falls_back_to_zlib(self, monkeypatch):
+        """Test that zstd is replaced by zlib when zstandard is missing."""
+        monkeypatch.setattr(compression, "zstandard", None)
+        assert resolve_codec("zstd") == "zlib"
+        assert resolve_codec("unknown") == "none"
+
+
+class TestCompressedTypes:
+    """Test the column type conversions."""
+    
+    def test_compressed_text(self, monkeypatch):
+        """Test that CompressedText compresses on bind and decompresses on load."""
+        monkeypatch.setattr(compression, "default_codec", lambda: "zlib")
+        monkeypatch.setattr(types, "compressed_columns", lambda: True)
+        column_type = CompressedText()
+        stored = column_type.process_bind_param(PROSE, None)
+        
+        assert is_compressed(stored)
+        assert column_type.process_result_value(stored, None) == PROSE
+        assert column_type.process_bind_param(None, None) is None
+    
+    def test_compressed_json(self, monkeypatch):
+        """Test that CompressedJSON round-trips payloads and reads plain JSON rows."""
+        monkeypatch.setattr(compression, "default_codec", lambda: "zlib")
+        monkeypatch.setattr(types, "compressed_columns", lambda: True)
+        column_type = CompressedJSON()
+        payload = {"response": PROSE, "candidates": ["a", "b"]}
+        
+        assert column_type.process_result_value(column_type.process_bind_param(payload, None), None) == payload
+        assert column_type.process_result_value(b'{"response": "ok"}', None) == {"response": "ok"}
+    
+    def test_unconverted_columns_pass_through(self, monkeypatch):
+        """Test that values are stored as-is while the columns are text/JSONB."""
+        monkeypatch.setattr(compression, "default_codec", lambda: "zlib")
+        monkeypatch.setattr(types, "compressed_columns", lambda: False)
+        payload = {"response": PROSE}
+        
+        assert CompressedText().process_bind_param(PROSE, None) == PROSE
+        assert CompressedText().process_result_value(PROSE, None) == PROSE
+        assert CompressedJSON().process_bind_param(payload, None) == payload
+        assert CompressedJSON().process_result_value(payload, None) == payload
@@ -0,0 +1,37 @@
+"""
+Unit tests for ETag helpers.
+"""
+from app.core.etag import etag_matches, etag_matches_strong, make_etag
+
+
+class TestETag:
+    """Test ETag building and If-None-Match matching."""
+    
+    def test_make_etag_is_quoted(self):
+        """Test that ETags are quoted strong tags."""
+        assert make_etag("abc", 3) == '"abc-3"'
+    
+    def test_matches_exact_tag(self):
+        """Test matching a single tag."""
+        assert etag_matches('"abc-3"', '"abc-3"')
+        assert not etag_matches('"abc-2"', '"abc-3"')
+    
+    def test_matches_tag_list_and_weak_tags(self):
+        """Test matching within a list and ignoring the weak prefix."""
+        assert etag_matches('"x", W/"abc-3"', '"abc-3"')
+    
+    def test_matches_wildcard(self):
+        """Test that * matches any representation."""
+        assert etag_matches("*", '"abc-3"')
+    
+    def test_missing_header(self):
+        """Test that an absent header never matches."""
+        assert not etag_matches(None, '"abc-3"')
+        assert not etag_matches("", '"abc-3"')
+    
+    def test_if_match_uses_strong_comparison(self):
+        """Test that If-Match ignores weak tags and supports lists and *."""
+        assert etag_matches_strong('"x", "abc-3"', '"abc-3"')
+        assert not etag_matches_strong('W/"abc-3"', '"abc-3"')
+        assert etag_matches_strong("*", '"abc-3"')
+        assert not etag_matches_strong(None, '"abc-3"')
@@ -0,0 +1,59 @@
+"""
+Unit tests for splitting imported manuscripts into documents.
+"""
+import io
+
+from app.core.manuscript import heading_title, split_manuscript
+
+
+MANUSCRIPT = """Avant-propos.
+
+# Partie 1
+
+## Chapitre 1
+Il pleuvait sur Nantes.
+
+***
+
+Claire lisait la lettre.
+Chapitre 2
+Le soleil revint.
+Chapter 3 was the hardest to write.
+* * *
+Fin.
+"""
+
+
+class TestManuscript:
+    """Test heading detection and manuscript splitting."""
+    
+    def test_heading_title(self):
+        """Test that Markdown and plain-text headings are recognized, not sentences."""
+        assert heading_title("## Chapitre 1 ##") == "Chapitre 1"
+        assert heading_title("CHAPTER THREE") == "CHAPTER THREE"
+        assert heading_title("Prologue") == "Prologue"
+        assert heading_title("Chapter 3 was the hardest to write.") is None
+        assert heading_title("#hashtag") is None
+        assert heading_title("Il pleuvait.") is None
+    
+    def test_split_on_headings(self):
+        """Test that chapters become sections, stacked headings sharing one."""
+        sections = list(split_manuscript(io.StringIO(MANUSCRIPT), title="Roman"))
+        assert sections == [
+            ("Roman", "Avant-propos."),
+            ("Partie 1 — Chapitre 1", "Il pleuvait sur Nantes.\n\n***\n\nClaire lisait la lettre."),
+            ("Chapitre 2", "Le soleil revint.\nChapter 3 was the hardest to write.\n\n* * *\n\nFin."),
+        ]
+    
+    def test_split_on_scene_breaks(self):
+        """Test that scene breaks cut chapters into numbered scenes."""
+        sections = list(split_manuscript(io.StringIO(MANUSCRIPT), title="Roman", scenes=True))
+        assert [title for title, _ in sections] == [
+            "Roman",
+            "Partie 1 — Chapitre 1 (1)",
+            "Partie 1 — Chapitre 1 (2)",
+            "Chapitre 2 (1)",
+            "Chapitre 2 (2)",
+        ]
+        assert sections[2][1] == "Claire lisait la lettre."
+        assert list(split_manuscript(io.StringIO("# Seul\n\n***\n"), title="Roman", scenes=True)) == []
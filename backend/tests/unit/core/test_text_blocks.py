@@ -0,0 +1,70 @@
+"""
+Unit tests for the block structure of documents.
+"""
+import random
+
+from app.core.text_blocks import (
+    BLOCK_SEPARATOR,
+    HEADING,
+    PARAGRAPH,
+    SCENE_BREAK,
+    block_kind,
+    delete_block_operation,
+    insert_block_operation,
+    join_blocks,
+    split_blocks,
+    update_block_operations,
+)
+from app.core.text_operations import apply_operations
+
+
+def _start(blocks, index):
+    return sum(len(block) + len(BLOCK_SEPARATOR) for block in blocks[:index])
+
+
+class TestTextBlocks:
+    """Test splitting texts into blocks and block edits as text operations."""
+    
+    def test_split_and_join_round_trip(self):
+        """Test that splitting and joining give the same text back."""
+        for text in ["", "One paragraph.", "A.\n\nB.", "A.\n\n\nB.\n", "\n\nA.\n\n", "Line 1\nLine 2\n\n***\n\nC."]:
+            assert join_blocks(split_blocks(text)) == text
+        assert split_blocks("") == []
+        assert split_blocks("A.\n\nB.") == ["A.", "B."]
+    
+    def test_block_kind(self):
+        """Test that headings and scene breaks are recognized."""
+        assert block_kind("# Chapitre 1") == HEADING
+        assert block_kind("## Scène 2") == HEADING
+        assert block_kind("***") == SCENE_BREAK
+        assert block_kind("* * *") == SCENE_BREAK
+        assert block_kind("#") == SCENE_BREAK
+        assert block_kind("---") == SCENE_BREAK
+        assert block_kind("#hashtag in a sentence") == PARAGRAPH
+        assert block_kind("Il pleuvait sur Nantes.") == PARAGRAPH
+    
+    def test_block_edits_match_text_edits(self):
+        """Test that block inserts, updates and deletes are the right operations on the whole text."""
+        rng = random.Random(7)
+        words = ["rain", "fell", "Claire", "read", "the", "letter", "***", "# Title"]
+        blocks = []
+        for _ in range(500):
+            text = join_blocks(blocks)
+            action = rng.choice(["insert", "update", "delete"]) if blocks else "insert"
+            if action == "insert":
+                index = rng.randint(0, len(blocks))
+                content = " ".join(rng.choices(words, k=rng.randint(0, 4)))
+                operation = insert_block_operation(_start(blocks, index), index, len(blocks), content)
+                blocks.insert(index, content)
+                operations = [operation]
+            elif action == "update":
+                index = rng.randrange(len(blocks))
+                content = " ".join(rng.choices(words, k=rng.randint(0, 4)))
+                operations = update_block_operations(_start(blocks, index), blocks[index], content)
+                blocks[index] = content
+            else:
+                index = rng.randrange(len(blocks))
+                operation = delete_block_operation(_start(blocks, index), index, len(blocks), len(blocks[index]))
+                del blocks[index]
+                operations = [operation]
+            assert apply_operations(text, operations) == join_blocks(blocks)
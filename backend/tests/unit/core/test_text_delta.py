@@ -0,0 +1,37 @@
+"""
+Unit tests for text deltas.
+"""
+from app.core.text_delta import apply_delta, edit_size, make_delta, tokenize
+
+
+class TestTextDelta:
+    """Test delta encoding and reconstruction."""
+    
+    def test_tokens_concatenate_to_text(self):
+        """Test that tokenizing never loses characters."""
+        text = "First sentence. Second one!  Third?\n\nNew paragraph without end"
+        assert "".join(tokenize(text)) == text
+        assert tokenize("") == []
+    
+    def test_round_trip(self):
+        """Test that applying a delta rebuilds the target text."""
+        base = "The rain fell. Claire read the letter.\nShe left at dawn."
+        target = "The rain fell hard. Claire read the letter.\nShe left at dawn. Nobody saw her."
+        assert apply_delta(base, make_delta(base, target)) == target
+        assert apply_delta(base, make_delta(base, "")) == ""
+        assert apply_delta("", make_delta("", target)) == target
+    
+    def test_local_edit_gives_small_delta(self):
+        """Test that a one-sentence edit in a long text stays small."""
+        base = " ".join(f"Sentence number {i} of the chapter." for i in range(5000))
+        target = base.replace("Sentence number 2500 of", "A rewritten sentence 2500 of")
+        delta = make_delta(base, target)
+        
+        assert apply_delta(base, delta) == target
+        assert len(delta) < 100
+    
+    def test_edit_size(self):
+        """Test that edit size counts removed and inserted characters."""
+        assert edit_size("Same text.", "Same text.") == 0
+        assert edit_size("One. Two.", "One. Three.") == len("Two.") + len("Three.")
+        assert edit_size("", "Added.") == len("Added.")
@@ -0,0 +1,86 @@
+"""
+Unit tests for the text diff engine.
+"""
+from app.core.text_diff import (
+    DiffGranularity,
+    build_hunks,
+    count_units,
+    diff_segments,
+    diff_tokens,
+    render_hunks,
+)
+
+
+def _sides(segments):
+    """Rebuild both texts from diff segments."""
+    a = "".join(text for op, text in segments if op != "insert")
+    b = "".join(text for op, text in segments if op != "delete")
+    return a, b
+
+
+class TestTextDiff:
+    """Test diffs, hunks and rendering."""
+    
+    def test_diff_tokens_is_minimal(self):
+        """Test that the edit script keeps a longest common subsequence."""
+        opcodes = diff_tokens(list("ABCABBA"), list("CBABAC"))
+        kept = sum(i2 - i1 for tag, i1, i2, j1, j2 in opcodes if tag == "equal")
+        
+        assert kept == 4
+        assert diff_tokens([], []) == []
+        assert diff_tokens(["a"], []) == [("delete", 0, 1, 0, 0)]
+    
+    def test_segments_rebuild_both_texts(self):
+        """Test that segments rebuild both texts at every granularity."""
+        a = "The rain fell.\nClaire read the letter.\n\nShe left at dawn."
+        b = "The rain fell hard.\nClaire read the old letter.\n\nShe left."
+        for granularity in DiffGranularity:
+            assert _sides(diff_segments(a, b, granularity)) == (a, b)
+        assert diff_segments("", "", DiffGranularity.CHAR) == []
+    
+    def test_word_and_char_granularity(self):
+        """Test that long lines are diffed word by word, and similar words by character."""
+        a = "The cat sat on the mat."
+        b = "The dog sat on the mats."
+        
+        assert diff_segments(a, b, DiffGranularity.LINE) == [("delete", a), ("insert", b)]
+        assert diff_segments(a, b, DiffGranularity.WORD) == [
+            ("equal", "The "), ("delete", "cat"), ("insert", "dog"),
+            ("equal", " sat on the "), ("delete", "mat"), ("insert", "mats"), ("equal", "."),
+        ]
+        # Unrelated words stay replaced; similar words show the character edit
+        assert diff_segments(a, b, DiffGranularity.CHAR) == [
+            ("equal", "The "), ("delete", "cat"), ("insert", "dog"),
+            ("equal", " sat on the mat"), ("insert", "s"), ("equal", "."),
+        ]
+    
+    def test_local_edit_in_long_line(self):
+        """Test that an edit in one long paragraph yields one small hunk."""
+        a = " ".join(f"Sentence number {i} of the chapter." for i in range(5000))
+        b = a.replace("number 2500 of", "rewritten 2500 of")
+        segments = diff_segments(a, b, DiffGranularity.WORD)
+        hunks = build_hunks(segments, DiffGranularity.WORD)
+        
+        assert len(hunks) == 1
+        assert sum(len(segment["text"]) for segment in hunks[0]["segments"]) < 100
+        assert sum(count_units(text, DiffGranularity.WORD) for op, text in segments if op == "insert") == 1
+    
+    def test_hunks_match_unified_format(self):
+        """Test hunk grouping, line numbers and unified rendering."""
+        a = "".join(f"line {i}\n" for i in range(1, 21))
+        b = a.replace("line 2\n", "line two\n").replace("line 18\n", "")
+        hunks = build_hunks(diff_segments(a, b), DiffGranularity.LINE)
+        
+        assert [(h["a_start"], h["a_lines"], h["b_start"], h["b_lines"]) for h in hunks] == [
+            (1, 5, 1, 5), (15, 6, 15, 5),
+        ]
+        text = render_hunks(hunks, DiffGranularity.LINE, "a", "b")
+        assert text.startswith("--- a\n+++ b\n@@ -1,5 +1,5 @@\n line 1\n-line 2\n+line two\n")
+        assert "@@ -15,6 +15,5 @@" in text
+        assert render_hunks([], DiffGranularity.LINE, "a", "b") == ""
+    
+    def test_count_units(self):
+        """Test counting lines, words and characters."""
+        assert count_units("One, two.\nThree", DiffGranularity.LINE) == 2
+        assert count_units("One, two.\nThree", DiffGranularity.WORD) == 5
+        assert count_units("One, two.", DiffGranularity.CHAR) == 9
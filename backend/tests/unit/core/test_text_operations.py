@@ -0,0 +1,72 @@
+"""
+Unit tests for text operations.
+"""
+import random
+
+import pytest
+
+from app.core.text_diff import DiffGranularity, diff_segments
+from app.core.text_operations import (
+    OperationConflict,
+    apply_operations,
+    operations_from_segments,
+    rebase,
+)
+
+
+def _random_operations(rng: random.Random, text: str, count: int):
+    operations = []
+    for _ in range(count):
+        if text and rng.random() < 0.5:
+            offset = rng.randrange(len(text))
+            operation = {"op": "delete", "offset": offset, "length": rng.randint(1, min(4, len(text) - offset))}
+        else:
+            operation = {"op": "insert", "offset": rng.randint(0, len(text)), "text": rng.choice(["x", "yy"])}
+        text = apply_operations(text, [operation])
+        operations.append(operation)
+    return operations
+
+
+class TestTextOperations:
+    """Test applying and rebasing text operations."""
+    
+    def test_apply_and_diff_round_trip(self):
+        """Test that diff segments convert to operations rebuilding the new text."""
+        old = "The rain fell. Claire read the letter."
+        new = "The rain fell hard. Claire burned the letter!"
+        operations = operations_from_segments(diff_segments(old, new, DiffGranularity.WORD))
+        assert apply_operations(old, operations) == new
+        
+        with pytest.raises(ValueError):
+            apply_operations("short", [{"op": "delete", "offset": 3, "length": 5}])
+    
+    def test_rebase_converges(self):
+        """Test that both orders of rebased concurrent edits give the same text."""
+        rng = random.Random(42)
+        for _ in range(2000):
+            base = "".join(rng.choice("abcdef") for _ in range(rng.randint(0, 12)))
+            ours = _random_operations(rng, base, rng.randint(0, 3))
+            theirs = _random_operations(rng, base, rng.randint(0, 3))
+            try:
+                rebased, missed = rebase(ours, theirs)
+            except OperationConflict:
+                continue
+            assert apply_operations(apply_operations(base, theirs), rebased) == (
+                apply_operations(apply_operations(base, ours), missed)
+            )
+    
+    def test_rebase_rules(self):
+        """Test tie-breaking, merged deletions and conflicts."""
+        insert = {"op": "insert", "offset": 2, "text": "ours"}
+        theirs = {"op": "insert", "offset": 2, "text": "theirs"}
+        assert rebase([insert], [theirs]) == ([{**insert, "offset": 8}], [theirs])
+        
+        # Both deleted "cd" of "abcdef": only the rest of each deletion remains
+        ours = {"op": "delete", "offset": 1, "length": 3}
+        other = {"op": "delete", "offset": 2, "length": 3}
+        rebased, missed = rebase([ours], [other])
+        assert apply_operations(apply_operations("abcdef", [other]), rebased) == "af"
+        assert apply_operations(apply_operations("abcdef", [ours]), missed) == "af"
+        
+        with pytest.raises(OperationConflict):
+            rebase([{"op": "insert", "offset": 3, "text": "x"}], [{"op": "delete", "offset": 1, "length": 4}])
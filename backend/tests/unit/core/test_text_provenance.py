@@ -0,0 +1,44 @@
+"""
+Unit tests for text provenance.
+"""
+from app.core.text_diff import DiffGranularity, diff_segments
+from app.core.text_provenance import advance, compact, from_ends, spans_in_range, to_ends
+
+
+def _apply(runs, old, new, origin):
+    return advance(runs, diff_segments(old, new, DiffGranularity.WORD), origin)
+
+
+class TestTextProvenance:
+    """Test provenance runs across versions."""
+    
+    def test_advance_attributes_inserted_text(self):
+        """Test that kept text keeps its origin and inserted text gets the new one."""
+        v0 = "The rain fell. Claire read the letter."
+        v1 = "The rain fell hard. Claire read the letter."
+        v2 = "The rain fell hard. Claire burned the letter."
+        
+        runs = _apply([], "", v0, 0)
+        runs = _apply(runs, v0, v1, 1)
+        runs = _apply(runs, v1, v2, 2)
+        
+        assert sum(length for length, _ in runs) == len(v2)
+        spans = spans_in_range(to_ends(runs), 0, len(v2))
+        assert [(v2[start:end], origin) for start, end, origin in spans] == [
+            ("The rain fell", 0),
+            (" hard", 1),
+            (". Claire ", 0),
+            ("burned", 2),
+            (" the letter.", 0),
+        ]
+    
+    def test_compact_and_range(self):
+        """Test that unused origins are dropped and ranges are clipped."""
+        runs, origins = compact([[4, 2], [3, 0]], ["a", "b", "c"])
+        assert (runs, origins) == ([[4, 1], [3, 0]], ["a", "c"])
+        
+        ends = to_ends(runs)
+        assert from_ends(ends) == runs
+        assert spans_in_range(ends, 2, 6) == [(2, 4, 1), (4, 6, 0)]
+        assert spans_in_range(ends, 4, 4) == []
+        assert spans_in_range([], 0, 0) == []
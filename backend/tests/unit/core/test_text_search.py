@@ -0,0 +1,53 @@
+"""
+Unit tests for the text search helpers and the in-process inverted index.
+"""
+from app.core.text_search import InvertedIndex, query_terms, search_config, snippet
+
+
+class TestTextSearch:
+    """Test query parsing, snippets and in-process ranking."""
+    
+    def test_search_config(self):
+        """Test that project languages map to text search configurations."""
+        assert search_config("fr") == "french"
+        assert search_config("en-GB") == "english"
+        assert search_config("tlh") == "simple"
+        assert search_config(None) == "simple"
+    
+    def test_query_terms(self):
+        """Test that queries are folded and split into required and excluded terms."""
+        assert query_terms('Été "pluie fine" or orage -Nantes') == (["ete", "pluie", "fine", "orage"], ["nantes"])
+        assert query_terms("arc-en-ciel") == (["arc", "en", "ciel"], [])
+    
+    def test_snippet(self):
+        """Test that snippets are cut around the first match, with the matched words."""
+        text = "Prologue. " * 30 + "Il pleuvait sur Nantes. Les Pluies de Nantes ne cessaient pas."
+        cut, highlights = snippet(text, ["pluies"], size=80)
+        assert "pleuvait" in cut
+        assert [cut[start:end] for start, end in highlights] == ["Pluies"]
+        assert snippet("Rien ici.", ["pluie"]) == ("Rien ici.", [])
+    
+    def test_inverted_index(self):
+        """Test ranking, exclusions and paging of the inverted index."""
+        index = InvertedIndex()
+        index.add(("document", "a"), "La pluie", "Il pleuvait sur Nantes.")
+        index.add(("document", "b"), "Chapitre 2", "Claire lisait la lettre sous la pluie.")
+        index.add(("entity", "c"), "Claire", "Une lectrice.")
+        assert len(index) == 3
+        
+        # Title words count more
+        assert [key for _, key in index.search("pluie")] == [("document", "a"), ("document", "b")]
+        assert [key for _, key in index.search("claire -lettre")] == [("entity", "c")]
+        assert index.search("orage") == []
+        
+        assert [key for _, key in index.search("pluie claire")] == [("document", "b")]
+        
+        pages = []
+        after = None
+        while True:
+            page = index.search("claire", limit=1, after=after)
+            if not page:
+                break
+            pages.extend(page)
+            after = page[-1]
+        assert pages == index.search("claire")
@@ -132,3 +132,142 @@ class TestCRUDPyramidNode:
         # Verify deletion
         deleted_node = crud_pyramid.get(db, id=node_id)
         assert deleted_node is None
+    
+    def _create_chain(self, db: Session, project_id):
+        """Create root -> [a -> [a1, a2], b] and return the nodes."""
+        def create(title, parent=None, level=0, order=0):
+            return crud_pyramid.create(db, obj_in=PyramidNodeCreate(
+                project_id=project_id,
+                parent_id=parent.id if parent else None,
+                title=title,
+                content=f"{title} content",
+                level=level,
+                order=order
+            ))
+        
+        root = create("Root")
+        a = create("A", root, 1, 0)
+        b = create("B", root, 1, 1)
+        a1 = create("A1", a, 2, 0)
+        a2 = create("A2", a, 2, 1)
+        return root, a, b, a1, a2
+    
+    def test_get_subtree(self, db: Session, test_project):
+        """Test loading a node and all its descendants."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        assert [n.title for n in crud_pyramid.get_subtree(db, node_id=root.id)] == ["Root", "A", "B", "A1", "A2"]
+        assert [n.title for n in crud_pyramid.get_subtree(db, node_id=a.id)] == ["A", "A1", "A2"]
+        assert crud_pyramid.get_subtree(db, node_id=uuid4()) == []
+    
+    def test_get_ancestors(self, db: Session, test_project):
+        """Test loading the path from the root to a node."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        assert [n.id for n in crud_pyramid.get_ancestors(db, node_id=a2.id)] == [root.id, a.id]
+        assert crud_pyramid.get_ancestors(db, node_id=root.id) == []
+    
+    def test_count_descendants(self, db: Session, test_project):
+        """Test counting descendants at any depth."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        assert crud_pyramid.count_descendants(db, node_id=root.id) == 4
+        assert crud_pyramid.count_descendants(db, node_id=a.id) == 2
+        assert crud_pyramid.count_descendants(db, node_id=b.id) == 0
+    
+    def test_writes_bump_pyramid_revision(self, db: Session, test_project):
+        """Test that create, update and delete bump the project pyramid revision."""
+        from app.crud import project as crud_project
+        
+        start = crud_project.get_pyramid_revision(db, project_id=test_project.id)
+        node = crud_pyramid.create(db, obj_in=PyramidNodeCreate(
+            project_id=test_project.id, title="Node", content="Content", level=0
+        ))
+        crud_pyramid.update(db, db_obj=node, obj_in=PyramidNodeUpdate(title="Renamed"))
+        crud_pyramid.delete(db, id=node.id)
+        
+        assert crud_project.get_pyramid_revision(db, project_id=test_project.id) == start + 3
+    
+    def test_reorder_children(self, db: Session, test_project):
+        """Test placing nodes under a parent in one statement."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        updated = crud_pyramid.reorder_children(
+            db, project_id=test_project.id, parent_id=b.id, node_ids=[a2.id, a1.id]
+        )
+        
+        assert updated == 2
+        children = crud_pyramid.get_by_parent(db, parent_id=b.id)
+        assert [n.id for n in children] == [a2.id, a1.id]
+        assert crud_pyramid.get_by_parent(db, parent_id=a.id) == []
+    
+    def test_reorder_children_rejects_wrong_level(self, db: Session, test_project):
+        """Test that a reorder touching a node at the wrong level changes nothing."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        with pytest.raises(ValueError):
+            crud_pyramid.reorder_children(
+                db, project_id=test_project.id, parent_id=a.id, node_ids=[a2.id, b.id]
+            )
+        
+        assert [n.id for n in crud_pyramid.get_by_parent(db, parent_id=a.id)] == [a1.id, a2.id]
+    
+    def test_reorder_children_keeps_root_at_level_0(self, db: Session, test_project):
+        """Test that only level 0 nodes can be placed at the root."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        with pytest.raises(ValueError):
+            crud_pyramid.reorder_children(
+                db, project_id=test_project.id, parent_id=None, node_ids=[root.id, a.id]
+            )
+        assert [n.id for n in crud_pyramid.get_by_parent(db, parent_id=root.id)] == [a.id, b.id]
+        
+        assert crud_pyramid.reorder_children(db, project_id=test_project.id, parent_id=None, node_ids=[root.id]) == 1
+    
+    def test_move(self, db: Session, test_project):
+        """Test moving a node between siblings and under another parent."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        crud_pyramid.move(db, node=a2, parent_id=a.id, position=0)
+        assert [n.id for n in crud_pyramid.get_by_parent(db, parent_id=a.id)] == [a2.id, a1.id]
+        
+        crud_pyramid.move(db, node=a1, parent_id=b.id, position=5)
+        assert [n.id for n in crud_pyramid.get_by_parent(db, parent_id=b.id)] == [a1.id]
+        
+        with pytest.raises(ValueError):
+            crud_pyramid.move(db, node=a1, parent_id=root.id, position=0)
+    
+    def test_move_to_root_requires_level_0(self, db: Session, test_project):
+        """Test that a node below level 0 cannot become a root node."""
+        root, a, b, a1, a2 = self._create_chain(db, test_project.id)
+        
+        with pytest.raises(ValueError):
+            crud_pyramid.move(db, node=a, parent_id=None, position=0)
+        db.refresh(a)
+        assert a.parent_id == root.id
+        
+        assert crud_pyramid.move(db, node=root, parent_id=None, position=0).parent_id is None
+    
+    def test_create_many_with_initial_versions(self, db: Session, test_project):
+        """Test bulk creation of nodes and their initial versions in one commit."""
+        from app.crud import project as crud_project
+        from app.crud import version as crud_version
+        
+        start = crud_project.get_pyramid_revision(db, project_id=test_project.id)
+        nodes = crud_pyramid.create_many(
+            db,
+            objs_in=[
+                PyramidNodeCreate(project_id=test_project.id, title=f"Node {i}", content=f"Content {i}", level=0, order=i)
+                for i in range(5)
+            ],
+            author_email="author@example.com"
+        )
+        
+        assert [node.title for node in nodes] == [f"Node {i}" for i in range(5)]
+        assert all(node.created_at is not None for node in nodes)
+        assert crud_project.get_pyramid_revision(db, project_id=test_project.id) == start + 1
+        for node in nodes:
+            [version] = crud_version.get_by_pyramid_node(db, pyramid_node_id=node.id)
+            assert version.content_snapshot == node.content
+            assert version.author_email == "author@example.com"
+        assert crud_pyramid.create_many(db, objs_in=[]) == []
@@ -64,3 +64,176 @@ class TestCRUDVersion:
         # NC-005: Verify versions relationship works
         assert len(versions) == 2
         assert all(v.document_id == test_document.id for v in versions)
+    
+    def test_history_pages_without_content(self, db: Session, test_project, test_document):
+        """Test keyset pagination, write-time stats and that history never loads content."""
+        from sqlalchemy.exc import InvalidRequestError
+        
+        contents = ["One two three.", "One two three four five.", "One three four five."]
+        for i, content in enumerate(contents):
+            crud_version.create(db, obj_in=VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message=f"Commit {i}",
+                author_email="test@example.com",
+                content_snapshot=content
+            ))
+        db.expunge_all()
+        
+        first_page = crud_version.get_by_document(db, document_id=test_document.id, limit=2)
+        last = first_page[-1]
+        second_page = crud_version.get_by_document(
+            db, document_id=test_document.id, before=(last.created_at, last.id), limit=2
+        )
+        history = first_page + second_page
+        
+        assert [version.commit_message for version in history] == ["Commit 2", "Commit 1", "Commit 0"]
+        assert [(v.content_size, v.words_added, v.words_removed) for v in history] == [
+            (len(contents[2]), 0, 1), (len(contents[1]), 2, 0), (len(contents[0]), 4, 0),
+        ]
+        with pytest.raises(InvalidRequestError):
+            history[0].content_snapshot
+    
+    def test_versions_stored_as_deltas_with_keyframes(self, db: Session, test_project, test_document, monkeypatch):
+        """Test that versions become deltas between keyframes and read back in full."""
+        from app.core.config import settings
+        from app.models.version import Version
+        
+        monkeypatch.setattr(settings, "VERSION_KEYFRAME_INTERVAL", 3)
+        base_text = " ".join(f"Sentence {i} of the chapter." for i in range(200))
+        contents = [base_text + f" Ending number {i}." for i in range(5)]
+        created = [
+            crud_version.create(db, obj_in=VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message=f"Commit {i}",
+                author_email="test@example.com",
+                content_snapshot=content
+            ))
+            for i, content in enumerate(contents)
+        ]
+        
+        assert [version.content_snapshot for version in created] == contents
+        stored = {
+            row.id: row
+            for row in db.query(Version.id, Version.content_snapshot, Version.delta_depth)
+            .filter(Version.document_id == test_document.id)
+        }
+        assert [stored[version.id].delta_depth for version in created] == [0, 1, 2, 0, 1]
+        assert stored[created[1].id].content_snapshot is None
+        
+        db.expire_all()
+        assert crud_version.get(db, id=created[2].id).content_snapshot == contents[2]
+        history = crud_version.get_by_document(db, document_id=test_document.id)
+        assert sorted(crud_version.reconstruct(db, [version.id for version in history]).values()) == sorted(contents)
+    
+    def test_delete_document_with_delta_chain(self, db: Session, test_project, test_document, monkeypatch):
+        """Test that deleting a document removes its whole delta chain whatever the row order."""
+        from app.core.config import settings
+        from app.models.version import Version
+        
+        monkeypatch.setattr(settings, "VERSION_KEYFRAME_INTERVAL", 50)
+        base_text = " ".join(f"Sentence {i} of the chapter." for i in range(200))
+        for i in range(6):
+            crud_version.create(db, obj_in=VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message=f"Commit {i}",
+                author_email="test@example.com",
+                content_snapshot=base_text + f" Ending number {i}."
+            ))
+        document_id = test_document.id
+        assert db.query(Version).filter(
+            Version.document_id == document_id, Version.delta_base_id.isnot(None)
+        ).count() >= 2
+        
+        db.delete(test_document)
+        db.commit()
+        
+        assert db.query(Version).filter(Version.document_id == document_id).count() == 0
+    
+    def test_autosaves_are_coalesced(self, db: Session, test_project, test_document, monkeypatch):
+        """Test that auto-saves update one row until an explicit commit or another author."""
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "VERSION_AUTOSAVE_WINDOW_SECONDS", 300)
+        
+        def save(content, author="test@example.com", autosave=True):
+            version_in = VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message="Auto-save: Updated document" if autosave else "Chapter done",
+                author_email=author,
+                content_snapshot=content
+            )
+            if autosave:
+                return crud_version.create_autosave(db, obj_in=version_in)
+            return crud_version.create(db, obj_in=version_in)
+        
+        first = save("Draft one.")
+        second = save("Draft one, longer.")
+        assert second.id == first.id
+        assert second.is_autosave
+        assert crud_version.get(db, id=first.id).content_snapshot == "Draft one, longer."
+        
+        commit = save("Draft one, longer. Done.", autosave=False)
+        third = save("Draft one, longer. Done. More.")
+        other_author = save("Draft one, longer. Done. More!", author="other@example.com")
+        
+        assert len({first.id, commit.id, third.id, other_author.id}) == 4
+        assert len(crud_version.get_by_document(db, document_id=test_document.id)) == 4
+    
+    def test_autosave_outside_window_with_large_edit_creates_version(
+        self, db: Session, test_project, test_document, monkeypatch
+    ):
+        """Test that a large edit after the window starts a new auto-save version."""
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "VERSION_AUTOSAVE_WINDOW_SECONDS", 0)
+        monkeypatch.setattr(settings, "VERSION_AUTOSAVE_MIN_EDIT_CHARS", 20)
+        
+        def autosave(content):
+            return crud_version.create_autosave(db, obj_in=VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message="Auto-save: Updated document",
+                author_email="test@example.com",
+                content_snapshot=content
+            ))
+        
+        first = autosave("Short.")
+        small = autosave("Short!")
+        large = autosave("Short! " + "A whole new paragraph of text. " * 3)
+        
+        assert small.id == first.id
+        assert large.id != first.id
+    
+    def test_identical_snapshots_stored_once(self, db: Session, test_project, test_document, monkeypatch):
+        """Test that keyframes with the same content share one blob and compare by hash."""
+        from app.core.config import settings
+        from app.models.content_blob import ContentBlob
+        from app.services.versioning_service import versioning_service
+        
+        # Every version is a keyframe
+        monkeypatch.setattr(settings, "VERSION_KEYFRAME_INTERVAL", 1)
+        
+        def commit(content):
+            return crud_version.create(db, obj_in=VersionCreate(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message="Commit",
+                author_email="test@example.com",
+                content_snapshot=content
+            ))
+        
+        first = commit("State A of the chapter.")
+        commit("State B of the chapter.")
+        third = commit("State A of the chapter.")
+        
+        assert third.content_hash == first.content_hash
+        assert db.query(ContentBlob).filter(ContentBlob.project_id == test_project.id).count() == 2
+        
+        db.expire_all()
+        assert crud_version.get(db, id=third.id).content_snapshot == "State A of the chapter."
+        diff = versioning_service.get_version_diff(db, version_a_id=first.id, version_b_id=third.id)
+        assert diff.diff_text == ""
@@ -0,0 +1,75 @@
+"""
+Tests for sparse ordering keys.
+"""
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+
+from app.crud.ordering import ORDER_GAP, bulk_update_order, key_between, sparse_keys
+from app.models.pyramid_node import PyramidNode
+
+
+class TestOrderingKeys:
+    """Test key generation between neighbours."""
+    
+    def test_sparse_keys(self):
+        """Test that keys are evenly spaced by ORDER_GAP."""
+        assert sparse_keys(3) == [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP]
+        assert sparse_keys(0) == []
+    
+    def test_key_between_neighbours(self):
+        """Test keys between, before and after existing keys."""
+        assert key_between(None, None) == ORDER_GAP
+        assert key_between(1024, None) == 2048
+        assert key_between(None, 1024) == 512
+        assert key_between(1024, 2048) == 1536
+    
+    def test_key_between_exhausted_gap(self):
+        """Test that a full gap asks for a renumbering."""
+        assert key_between(5, 6) is None
+        assert key_between(5, 5) is None
+        assert key_between(None, 0) is None
+    
+    def test_repeated_inserts_stay_ordered(self):
+        """Test that inserting at the front keeps keys strictly increasing until renumbering."""
+        keys = sparse_keys(2)
+        while True:
+            key = key_between(None, keys[0])
+            if key is None:
+                break
+            assert 0 <= key < keys[0]
+            keys.insert(0, key)
+        assert keys == sorted(set(keys))
+        assert len(keys) > 2
+
+
+class TestBulkUpdateOrder:
+    """Test the single-statement renumbering."""
+    
+    def test_compiles_to_update_from_values(self):
+        """Test that a renumbering is one UPDATE ... FROM (VALUES ...)."""
+        captured = []
+        
+        class FakeResult:
+            rowcount = 2
+        
+        class FakeSession:
+            def execute(self, stmt):
+                captured.append(stmt)
+                return FakeResult()
+        
+        updated = bulk_update_order(
+            FakeSession(),
+            model=PyramidNode,
+            order_column="order",
+            keys=[(uuid4(), 1024), (uuid4(), 2048)]
+        )
+        
+        sql = str(captured[0].compile(dialect=postgresql.dialect()))
+        assert updated == 2
+        assert len(captured) == 1
+        assert sql.startswith("UPDATE pyramid_nodes")
+        assert "FROM (VALUES" in sql
+    
+    def test_empty_keys_skip_the_statement(self):
+        """Test that nothing is executed for an empty list."""
+        assert bulk_update_order(None, model=PyramidNode, order_column="order", keys=[]) == 0
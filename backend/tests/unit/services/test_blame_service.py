@@ -0,0 +1,73 @@
+"""
+Tests for document provenance (blame).
+"""
+from sqlalchemy.orm import Session
+
+from app.crud import document_provenance as crud_document_provenance
+from app.crud import version as crud_version
+from app.services.blame_service import blame_service
+
+
+class TestBlameService:
+    """Test incremental provenance and blame queries."""
+    
+    def _version(self, db: Session, project, document, content: str, author: str, autosave: bool = False):
+        data = {
+            "project_id": project.id,
+            "document_id": document.id,
+            "commit_message": "Auto-save" if autosave else "Commit",
+            "author_email": author,
+            "content_snapshot": content
+        }
+        if autosave:
+            return crud_version.create_autosave(db, obj_in=data)
+        return crud_version.create(db, obj_in=data)
+    
+    def test_blame_follows_versions_incrementally(self, db: Session, test_project, test_document):
+        """Test that each passage is attributed to the version that wrote it."""
+        first = self._version(db, test_project, test_document, "The rain fell. Claire read.", "a@example.com")
+        second = self._version(db, test_project, test_document, "The rain fell hard. Claire read.", "b@example.com")
+        third = self._version(
+            db, test_project, test_document, "The rain fell hard. Claire read twice.", "b@example.com", autosave=True
+        )
+        # Coalesced into the same auto-save row: its new words keep its origin
+        fourth = self._version(
+            db, test_project, test_document, "The rain fell hard. Claire read it twice.", "b@example.com", autosave=True
+        )
+        assert fourth.id == third.id
+        
+        provenance = crud_document_provenance.get(db, document_id=test_document.id)
+        assert provenance.version_id == third.id
+        
+        text = fourth.content_snapshot
+        blame = blame_service.blame(db, document_id=test_document.id)
+        attributed = [(text[span.start:span.end], span.version_id) for span in blame.spans]
+        assert blame.content_size == len(text)
+        assert "".join(part for part, _ in attributed) == text
+        assert attributed == [
+            ("The rain fell", first.id),
+            (" hard", second.id),
+            (". Claire read", first.id),
+            (" it twice", third.id),
+            (".", first.id),
+        ]
+        
+        # A range only returns the spans it overlaps
+        start = text.index("hard")
+        ranged = blame_service.blame(db, document_id=test_document.id, start=start, end=start + 4)
+        assert [(span.start, span.end, span.author_email) for span in ranged.spans] == [
+            (start, start + 4, "b@example.com")
+        ]
+    
+    def test_missing_provenance_is_rebuilt(self, db: Session, test_project, test_document):
+        """Test that provenance lost or never recorded is rebuilt from the history."""
+        first = self._version(db, test_project, test_document, "One. Two.", "a@example.com")
+        second = self._version(db, test_project, test_document, "One. Two. Three.", "b@example.com")
+        incremental = blame_service.blame(db, document_id=test_document.id)
+        
+        db.delete(crud_document_provenance.get(db, document_id=test_document.id))
+        db.commit()
+        rebuilt = blame_service.blame(db, document_id=test_document.id)
+        
+        assert rebuilt == incremental
+        assert {span.version_id for span in rebuilt.spans} == {first.id, second.id}
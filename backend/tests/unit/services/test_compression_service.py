@@ -0,0 +1,56 @@
+"""
+Tests for background compression and the codec benchmark.
+"""
+import pytest
+from sqlalchemy import LargeBinary, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.compression import compressed_columns, is_compressed
+from app.models.document import Document
+from app.services import compression_service as compression_module
+from app.services.compression_service import compression_service
+
+
+PROSE = "Elle posa la feuille et écouta le vent dans la cheminée. " * 50
+
+
+class TestCompressionBenchmark:
+    """Test the codec benchmark (no database needed)."""
+    
+    def test_benchmark_reports_each_codec(self):
+        """Test that the benchmark reports size, throughput and latency per codec."""
+        results = compression_service.benchmark([PROSE] * 5, codecs=("none", "zlib"))
+        
+        assert set(results) == {"none", "zlib"}
+        assert results["none"]["ratio"] == 1.0
+        assert results["zlib"]["ratio"] > 3
+        assert results["zlib"]["read_p95_ms"] >= results["zlib"]["read_p50_ms"]
+
+
+class TestCompressionMigration:
+    """Test rewriting existing rows in the background."""
+    
+    def test_migrate_requires_converted_columns(self, monkeypatch):
+        """Test that text columns are not rewritten as bytes."""
+        monkeypatch.setattr(compression_module, "compressed_columns", lambda: False)
+        with pytest.raises(ValueError):
+            compression_service.migrate_column(None, model=Document, column_name="content_raw")
+    
+    def test_migrate_and_revert_documents(self, db: Session, test_document):
+        """Test that existing plain rows are compressed and read back unchanged."""
+        if not compressed_columns():
+            pytest.skip("columns not converted (STORAGE_COMPRESSED_COLUMNS)")
+        test_document.content_raw = PROSE
+        db.commit()
+        
+        def stored():
+            raw = type_coerce(Document.content_raw, LargeBinary)
+            return db.execute(select(raw).where(Document.id == test_document.id)).scalar()
+        
+        assert compression_service.migrate_column(db, model=Document, column_name="content_raw", codec="zlib") >= 1
+        assert is_compressed(stored())
+        db.expire_all()
+        assert db.get(Document, test_document.id).content_raw == PROSE
+        
+        compression_service.migrate_column(db, model=Document, column_name="content_raw", codec="none")
+        assert stored() == PROSE.encode("utf-8")
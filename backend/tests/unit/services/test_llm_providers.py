@@ -0,0 +1,162 @@
+"""
+Unit tests for LLM providers (no database, no external network).
+"""
+import asyncio
+import threading
+from uuid import uuid4
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from app.models.llm_request import LLMRequestType
+from app.services import llm_providers, prompts
+from app.services.llm_providers import (
+    LLMProvider,
+    MockProvider,
+    OpenAIProvider,
+    available_providers,
+    get_provider,
+)
+from app.services.llm_service import LLMService
+from app.services.llm_standin_server import app as standin_app
+
+
+class TestProviderRegistry:
+    """Test provider registration and selection."""
+
+    def test_builtin_providers_registered(self):
+        """Test that mock and openai providers are registered by name."""
+        assert {"mock", "openai"} <= set(available_providers())
+
+    def test_unknown_provider(self):
+        """Test that an unknown provider name is rejected."""
+        with pytest.raises(ValueError):
+            get_provider("does-not-exist")
+
+    def test_incomplete_provider_rejected(self, monkeypatch):
+        """Test that a provider missing a required method cannot be instantiated."""
+        monkeypatch.setattr(llm_providers, "_PROVIDER_CLASSES", dict(llm_providers._PROVIDER_CLASSES))
+
+        @llm_providers.register_provider("incomplete")
+        class IncompleteProvider(LLMProvider):
+            def complete(self, system_prompt, user_prompt, **kwargs):
+                return MockProvider().complete(system_prompt, user_prompt, **kwargs)
+
+        with pytest.raises(TypeError, match="acomplete"):
+            get_provider("incomplete")
+        assert "incomplete" not in llm_providers._PROVIDER_INSTANCES
+
+    def test_provider_instances_are_shared(self):
+        """Test that providers (and their connection pools) are reused."""
+        assert get_provider("mock") is get_provider("mock")
+
+    def test_service_uses_mock_provider(self):
+        """Test that mock mode selects the mock provider."""
+        service = LLMService(db=None, user_id=uuid4(), use_mock=True)
+
+        assert service.provider.name == "mock"
+        assert service.use_mock
+
+
+class TestMockProvider:
+    """Test multi-candidate generation with the mock provider."""
+
+    def test_single_candidate(self):
+        """Test that one candidate is returned by default."""
+        completion = MockProvider().complete("system", "prompt", request_type=LLMRequestType.REWRITING)
+
+        assert len(completion.texts) == 1
+        assert completion.output_tokens > 0
+
+    def test_candidates_are_sampled_in_parallel(self, monkeypatch):
+        """Test that several mock candidates are generated concurrently."""
+        monkeypatch.setattr(llm_providers, "MOCK_LATENCY_SECONDS", 0)
+        # Each sample waits for the others: sequential sampling would break the barrier
+        barrier = threading.Barrier(3, timeout=10)
+        sample = MockProvider._sample
+
+        def overlapping_sample(provider, request_type, hints):
+            barrier.wait()
+            return sample(provider, request_type, hints)
+
+        monkeypatch.setattr(MockProvider, "_sample", overlapping_sample)
+        completion = MockProvider().complete(
+            "system", "prompt", request_type=LLMRequestType.SUGGESTION, candidates=3
+        )
+
+        assert len(completion.texts) == 3
+        assert all(completion.texts)
+
+    def test_async_candidates(self):
+        """Test the async interface."""
+        completion = asyncio.run(MockProvider().acomplete(
+            "system", "prompt", request_type=LLMRequestType.CONTINUATION, candidates=2
+        ))
+
+        assert len(completion.texts) == 2
+
+    def test_stream(self):
+        """Test that streamed chunks reassemble into the full response."""
+        chunks = list(MockProvider().stream("system", "prompt", request_type=LLMRequestType.ANALYSIS))
+
+        assert len(chunks) > 1
+        assert "Analyse" in "".join(chunks)
+
+
+class TestOpenAIProviderWithStandinServer:
+    """Test the real OpenAI client code path against the stand-in server."""
+
+    @pytest.fixture
+    def provider(self):
+        """OpenAI provider whose HTTP client talks to the in-process stand-in app."""
+        return OpenAIProvider(
+            base_url="http://testserver/v1",
+            http_client=TestClient(standin_app),
+            async_http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=standin_app))
+        )
+
+    def test_complete_with_candidates(self, provider):
+        """Test that n candidates and usage come back from one request."""
+        completion = provider.complete(
+            "system", "Continue the story.",
+            request_type=LLMRequestType.CONTINUATION, candidates=3, max_tokens=80
+        )
+
+        assert len(completion.texts) == 3
+        assert completion.input_tokens > 0
+        assert 0 < completion.output_tokens <= 3 * 80
+
+    def test_stop_sequence(self, provider):
+        """Test that stop sequences truncate the completion."""
+        completion = provider.complete(
+            "system", "prompt", request_type=LLMRequestType.CONTINUATION, stop=["relisait"]
+        )
+
+        assert "relisait" not in completion.text
+
+    def test_structured_output(self, provider):
+        """Test that the pyramid JSON schema is honoured end to end."""
+        completion = provider.complete(
+            prompts.PYRAMID_EXPANSION_SYSTEM_PROMPT,
+            "Break this story element down into exactly 4 more detailed sub-elements.",
+            request_type=LLMRequestType.PYRAMID_EXPANSION,
+            response_format=prompts.build_pyramid_expansion_schema()
+        )
+
+        expansion = LLMService._parse_pyramid_expansion(completion.text, 4)
+        assert len(expansion.children) == 4
+
+    def test_stream(self, provider):
+        """Test streamed deltas over server-sent events."""
+        chunks = list(provider.stream("system", "prompt", request_type=LLMRequestType.CONTINUATION))
+
+        assert len(chunks) > 1
+
+    def test_async_complete(self, provider):
+        """Test the async client path."""
+        completion = asyncio.run(provider.acomplete(
+            "system", "prompt", request_type=LLMRequestType.REWRITING, candidates=2
+        ))
+
+        assert len(completion.texts) == 2
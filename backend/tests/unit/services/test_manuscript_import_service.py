@@ -0,0 +1,40 @@
+"""
+Tests for manuscript_import_service - batched import of manuscripts as documents.
+"""
+from sqlalchemy.orm import Session
+
+from app.crud import document as crud_document
+from app.crud import version as crud_version
+from app.models.document import DocumentType
+from app.services import manuscript_import_service as import_module
+from app.services.manuscript_import_service import manuscript_import_service
+
+
+class TestManuscriptImportService:
+    """Test manuscript imports."""
+    
+    def test_import_in_batches(self, db: Session, test_project, test_document, test_user, monkeypatch):
+        """Test that chapters are created after existing documents, with initial versions and progress."""
+        monkeypatch.setattr(import_module, "IMPORT_BATCH_SIZE", 2)
+        lines = [f"# Chapitre {i}\n\nLe chapitre {i} commence.\n" for i in range(1, 6)]
+        
+        events = list(manuscript_import_service.import_manuscript(
+            db, project_id=test_project.id, lines=lines, title="Roman", author_email=test_user.email
+        ))
+        assert [event["event"] for event in events] == [
+            "started", "batch_imported", "batch_imported", "batch_imported", "completed"
+        ]
+        assert [event["documents"] for event in events[1:4]] == [2, 4, 5]
+        assert events[-1]["words"] == 20
+        
+        documents = crud_document.get_by_project(db, project_id=test_project.id)
+        assert [document.title for document in documents] == ["Chapter 1"] + [f"Chapitre {i}" for i in range(1, 6)]
+        imported = documents[1:]
+        assert [str(document.id) for document in imported] == events[-1]["document_ids"]
+        assert all(document.type == DocumentType.DRAFT for document in imported)
+        assert imported[0].content_raw == "Le chapitre 1 commence."
+        assert imported[0].word_count == 4
+        
+        [version] = crud_version.get_by_document(db, document_id=imported[0].id)
+        assert crud_version.get(db, id=version.id).content_snapshot == "Le chapitre 1 commence."
+        assert version.words_added == 4
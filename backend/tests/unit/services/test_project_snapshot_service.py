@@ -0,0 +1,63 @@
+"""
+Tests for whole-project snapshots.
+"""
+from sqlalchemy.orm import Session
+
+from app.core.text_diff import DiffGranularity
+from app.crud import content_blob as crud_content_blob
+from app.crud.crud_content_blob import hash_content
+from app.models.content_blob import ContentBlob
+from app.services.project_snapshot_service import project_snapshot_service
+
+
+class TestProjectSnapshotService:
+    """Test snapshot creation and comparison."""
+    
+    def test_snapshot_stores_manifest_and_shared_blobs(self, db: Session, test_project, test_document):
+        """Test that a snapshot maps items to hashes and stores each text once."""
+        first = project_snapshot_service.create_snapshot(
+            db, project_id=test_project.id, name="Draft 1", author_email="test@example.com"
+        )
+        second = project_snapshot_service.create_snapshot(
+            db, project_id=test_project.id, name="Draft 1 bis", author_email="test@example.com"
+        )
+        
+        content_hash = hash_content(test_document.content_raw)
+        assert first.manifest["documents"] == {str(test_document.id): content_hash}
+        assert first.item_count == 1
+        assert second.content_hashes == [content_hash]
+        assert db.query(ContentBlob).filter(ContentBlob.project_id == test_project.id).count() == 1
+        # Blobs referenced by snapshots survive garbage collection
+        assert crud_content_blob.delete_unreferenced(db, limit=100) == (0, 0)
+    
+    def test_diff_only_reports_changed_items(self, db: Session, test_project, test_document):
+        """Test that snapshot diffs skip unchanged items and diff changed ones."""
+        from app.models.document import Document, DocumentType
+        
+        other = Document(
+            project_id=test_project.id,
+            title="Chapter 2",
+            type=DocumentType.DRAFT,
+            content_raw="An untouched chapter.",
+            order_index=1
+        )
+        db.add(other)
+        db.flush()
+        before = project_snapshot_service.create_snapshot(
+            db, project_id=test_project.id, name="Before", author_email="test@example.com"
+        )
+        
+        test_document.content_raw = "This is a revised test document content."
+        db.commit()
+        after = project_snapshot_service.create_snapshot(
+            db, project_id=test_project.id, name="After", author_email="test@example.com"
+        )
+        
+        diff = project_snapshot_service.diff_snapshots(
+            db, snapshot_a_id=before.id, snapshot_b_id=after.id, granularity=DiffGranularity.WORD
+        )
+        
+        assert diff.unchanged == 1
+        assert [(item.item_id, item.status) for item in diff.items] == [(test_document.id, "changed")]
+        assert (diff.additions, diff.deletions) == (1, 0)
+        assert diff.items[0].hunks
@@ -0,0 +1,97 @@
+"""
+Tests for pyramid_generation_service - breadth-first, resumable generation jobs.
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud import pyramid_node as crud_pyramid
+from app.models.pyramid_node import PyramidNode
+from app.models.pyramid_generation_job import PyramidJobStatus
+from app.schemas.pyramid import PyramidGenerationJobCreate
+from app.services.pyramid_generation_service import pyramid_generation_service
+
+
+@pytest.fixture
+def root_node(db: Session, test_project):
+    """Create a synopsis node to expand."""
+    node = PyramidNode(
+        project_id=test_project.id,
+        title="Synopsis",
+        content="A lighthouse keeper finds a message from her missing brother.",
+        level=0,
+        order=0
+    )
+    db.add(node)
+    db.flush()
+    db.refresh(node)
+    return node
+
+
+class TestPyramidGenerationService:
+    """Test pyramid generation jobs."""
+    
+    def _start(self, db: Session, root_node, test_user, depth: int = 2, fan_out: int = 2):
+        job = pyramid_generation_service.create_job(
+            db,
+            job_in=PyramidGenerationJobCreate(root_node_id=root_node.id, depth=depth, fan_out=fan_out),
+            root_node=root_node,
+            user_id=test_user.id
+        )
+        assert pyramid_generation_service.claim_job(db, job=job)
+        return job
+    
+    def test_depth_below_lowest_level_rejected(self, db: Session, root_node, test_user):
+        """Test that a job cannot go deeper than the lowest pyramid level."""
+        root_node.level = 1
+        
+        with pytest.raises(ValueError):
+            pyramid_generation_service.create_job(
+                db,
+                job_in=PyramidGenerationJobCreate(root_node_id=root_node.id, depth=2),
+                root_node=root_node,
+                user_id=test_user.id
+            )
+    
+    def test_run_job_expands_breadth_first(self, db: Session, root_node, test_user, mock_llm_mode):
+        """Test that a job generates every level and reports progress."""
+        job = self._start(db, root_node, test_user)
+        
+        events = list(pyramid_generation_service.run_job(db, job_id=job.id))
+        
+        assert [e["event"] for e in events if e["event"] == "level_completed"] == ["level_completed"] * 2
+        assert events[-1]["event"] == "completed"
+        assert len(crud_pyramid.get_by_level(db, project_id=root_node.project_id, level=1)) == 2
+        assert len(crud_pyramid.get_by_level(db, project_id=root_node.project_id, level=2)) == 4
+        
+        db.refresh(job)
+        assert job.status == PyramidJobStatus.COMPLETED
+        assert job.completed_depth == 2
+        assert job.nodes_created == 6
+    
+    def test_claim_running_job_fails(self, db: Session, root_node, test_user):
+        """Test that a running job cannot be claimed twice."""
+        job = self._start(db, root_node, test_user)
+        
+        assert not pyramid_generation_service.claim_job(db, job=job)
+    
+    def test_interrupted_job_resumes_from_last_level(self, db: Session, root_node, test_user, mock_llm_mode):
+        """Test that an interrupted job keeps completed levels and resumes after them."""
+        job = self._start(db, root_node, test_user)
+        
+        run = pyramid_generation_service.run_job(db, job_id=job.id)
+        for event in run:
+            if event["event"] == "level_completed":
+                break
+        run.close()
+        
+        db.refresh(job)
+        assert job.status == PyramidJobStatus.INTERRUPTED
+        assert job.completed_depth == 1
+        
+        assert pyramid_generation_service.claim_job(db, job=job)
+        events = list(pyramid_generation_service.run_job(db, job_id=job.id))
+        
+        assert events[0]["completed_depth"] == 1
+        assert events[-1]["event"] == "completed"
+        assert len(crud_pyramid.get_by_level(db, project_id=root_node.project_id, level=1)) == 2
+        assert len(crud_pyramid.get_by_level(db, project_id=root_node.project_id, level=2)) == 4
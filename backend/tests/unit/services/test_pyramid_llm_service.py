@@ -0,0 +1,138 @@
+"""
+Unit tests for structured pyramid expansion output.
+"""
+import json
+import pytest
+
+from app.services.llm_providers import build_mock_pyramid_expansion
+from app.services.llm_service import LLMService
+
+
+class TestPyramidExpansionParsing:
+    """Test parsing and validation of structured pyramid expansion output."""
+
+    def test_parse_valid_expansion(self):
+        """Test parsing a well-formed JSON expansion."""
+        response = json.dumps({"children": [
+            {"title": "Act I", "content": "Setup"},
+            {"title": "Act II", "content": "Confrontation"},
+        ]})
+
+        expansion = LLMService._parse_pyramid_expansion(response, 2)
+
+        assert [c.title for c in expansion.children] == ["Act I", "Act II"]
+        assert expansion.children[1].content == "Confrontation"
+
+    def test_parse_code_fenced_expansion(self):
+        """Test that a Markdown code fence around the JSON is tolerated."""
+        response = '```json\n{"children": [{"title": "A", "content": "B"}]}\n```'
+
+        expansion = LLMService._parse_pyramid_expansion(response, 1)
+
+        assert expansion.children[0].title == "A"
+
+    def test_parse_truncates_extra_children(self):
+        """Test that surplus children are dropped."""
+        response = json.dumps({"children": [
+            {"title": f"T{i}", "content": f"C{i}"} for i in range(5)
+        ]})
+
+        expansion = LLMService._parse_pyramid_expansion(response, 3)
+
+        assert len(expansion.children) == 3
+
+    def test_parse_rejects_too_few_children(self):
+        """Test that fewer children than requested is a validation error."""
+        response = json.dumps({"children": [{"title": "Only", "content": "One"}]})
+
+        with pytest.raises(ValueError):
+            LLMService._parse_pyramid_expansion(response, 3)
+
+    def test_parse_rejects_invalid_json(self):
+        """Test that paragraph text instead of JSON is rejected."""
+        with pytest.raises(ValueError):
+            LLMService._parse_pyramid_expansion("Act I\n\nSetup\n\nAct II", 2)
+
+    def test_parse_rejects_empty_title(self):
+        """Test that empty titles are rejected."""
+        response = json.dumps({"children": [{"title": "", "content": "Setup"}]})
+
+        with pytest.raises(ValueError):
+            LLMService._parse_pyramid_expansion(response, 1)
+
+    def test_mock_expansion_is_valid(self):
+        """Test that mock mode produces output that passes validation."""
+        response = build_mock_pyramid_expansion("Synopsis", 4)
+
+        expansion = LLMService._parse_pyramid_expansion(response, 4)
+
+        assert len(expansion.children) == 4
+
+
+class TestCoherenceNeighbourhood:
+    """Test the neighbourhood text and hash driving incremental coherence checks."""
+
+    def _node(self, title, content="Content"):
+        from app.models.pyramid_node import PyramidNode
+        return PyramidNode(title=title, content=content)
+
+    def test_neighbourhood_includes_parent_and_children(self):
+        """Test that the node, its parent and its children are described."""
+        from app.services.pyramid_llm_service import PyramidLLMService
+
+        text = PyramidLLMService._coherence_neighbourhood(
+            self._node("Act I"), self._node("Synopsis"), [self._node("Scene 1"), self._node("Scene 2")]
+        )
+
+        assert "Title: Act I" in text
+        assert "Title: Synopsis" in text
+        assert "1. Scene 1" in text and "2. Scene 2" in text
+
+    def test_hash_changes_only_with_neighbourhood(self):
+        """Test that the hash is stable and reacts to a child change."""
+        from app.services.pyramid_llm_service import PyramidLLMService
+
+        node, parent = self._node("Act I"), self._node("Synopsis")
+        before = PyramidLLMService._context_hash(
+            PyramidLLMService._coherence_neighbourhood(node, parent, [self._node("Scene 1")])
+        )
+        same = PyramidLLMService._context_hash(
+            PyramidLLMService._coherence_neighbourhood(node, parent, [self._node("Scene 1")])
+        )
+        changed = PyramidLLMService._context_hash(
+            PyramidLLMService._coherence_neighbourhood(node, parent, [self._node("Scene 1", "Rewritten")])
+        )
+
+        assert before == same
+        assert before != changed
+
+
+class TestProjectCoherence:
+    """Test project-wide incremental coherence passes."""
+
+    def test_unchanged_nodes_are_cached(self, db, test_project, test_user, mock_llm_mode):
+        """Test that a second pass only rechecks nodes whose neighbourhood changed."""
+        from app.crud import pyramid_node as crud_pyramid
+        from app.schemas.pyramid import PyramidNodeCreate, PyramidNodeUpdate
+        from app.services.pyramid_llm_service import pyramid_llm_service
+
+        root = crud_pyramid.create(db, obj_in=PyramidNodeCreate(
+            project_id=test_project.id, title="Synopsis", content="Story", level=0
+        ))
+        act = crud_pyramid.create(db, obj_in=PyramidNodeCreate(
+            project_id=test_project.id, parent_id=root.id, title="Act I", content="Setup", level=1
+        ))
+        scene = crud_pyramid.create(db, obj_in=PyramidNodeCreate(
+            project_id=test_project.id, parent_id=act.id, title="Scene", content="Opening", level=2
+        ))
+
+        first = pyramid_llm_service.check_project_coherence(db, project_id=test_project.id, user_id=test_user.id)
+        assert (first.checked, first.cached) == (3, 0)
+
+        second = pyramid_llm_service.check_project_coherence(db, project_id=test_project.id, user_id=test_user.id)
+        assert (second.checked, second.cached) == (0, 3)
+
+        # A leaf edit dirties the leaf and its parent, not the root
+        crud_pyramid.update(db, db_obj=scene, obj_in=PyramidNodeUpdate(content="New opening"))
+        third = pyramid_llm_service.check_project_coherence(db, project_id=test_project.id, user_id=test_user.id)
+        assert (third.checked, third.cached) == (2, 1)
@@ -0,0 +1,97 @@
+"""
+Unit tests for nesting pyramid nodes into trees.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from app.models.pyramid_node import PyramidNode
+from app.services.pyramid_tree_service import pyramid_tree_service
+
+
+def _node(title, parent=None, level=0, order=0, project_id=None):
+    now = datetime.utcnow()
+    return PyramidNode(
+        id=uuid4(),
+        project_id=project_id or (parent.project_id if parent else uuid4()),
+        parent_id=parent.id if parent else None,
+        title=title,
+        content=f"{title} content",
+        level=level,
+        order=order,
+        is_generated=False,
+        created_at=now,
+        updated_at=now
+    )
+
+
+class TestBuildTree:
+    """Test building nested trees from flat node lists."""
+
+    def test_nests_children_in_order(self):
+        """Test that children are nested under their parent, sorted by order."""
+        root = _node("Root")
+        second = _node("Second", root, 1, 1)
+        first = _node("First", root, 1, 0)
+        leaf = _node("Leaf", second, 2, 0)
+
+        roots = pyramid_tree_service.build_tree([leaf, second, root, first])
+
+        assert [r.title for r in roots] == ["Root"]
+        assert [c.title for c in roots[0].children] == ["First", "Second"]
+        assert [c.title for c in roots[0].children[1].children] == ["Leaf"]
+
+    def test_descendant_counts(self):
+        """Test that each node reports its number of descendants."""
+        root = _node("Root")
+        a = _node("A", root, 1, 0)
+        b = _node("B", root, 1, 1)
+        a1 = _node("A1", a, 2, 0)
+        a2 = _node("A2", a, 2, 1)
+
+        tree = pyramid_tree_service.build_tree([root, a, b, a1, a2])[0]
+
+        assert tree.descendant_count == 4
+        assert [c.descendant_count for c in tree.children] == [2, 0]
+
+    def test_orphans_become_roots(self):
+        """Test that nodes whose parent is missing are returned as roots (subtrees)."""
+        root = _node("Root")
+        a = _node("A", root, 1, 0)
+        a1 = _node("A1", a, 2, 0)
+
+        roots = pyramid_tree_service.build_tree([a, a1])
+
+        assert [r.title for r in roots] == ["A"]
+        assert roots[0].parent_id == root.id
+        assert roots[0].descendant_count == 1
+
+    def test_empty(self):
+        """Test that an empty pyramid gives no roots."""
+        assert pyramid_tree_service.build_tree([]) == []
+
+
+class TestTreeSnapshotCache:
+    """Test revision-keyed caching of serialized trees."""
+
+    def test_snapshot_reused_until_revision_changes(self, monkeypatch):
+        """Test that a tree is serialized once per revision."""
+        from app.services.pyramid_tree_service import PyramidTreeService
+
+        project_id = uuid4()
+        calls = []
+
+        def fake_tree(db, *, project_id):
+            calls.append(project_id)
+            return pyramid_tree_service.build_tree([_node(f"Root {len(calls)}", project_id=project_id)])
+
+        monkeypatch.setattr(PyramidTreeService, "get_project_tree", staticmethod(fake_tree))
+        PyramidTreeService.clear_snapshots()
+
+        first = pyramid_tree_service.get_project_tree_snapshot(None, project_id=project_id, revision=1)
+        again = pyramid_tree_service.get_project_tree_snapshot(None, project_id=project_id, revision=1)
+        bumped = pyramid_tree_service.get_project_tree_snapshot(None, project_id=project_id, revision=2)
+
+        assert first is again
+        assert b"Root 1" in first
+        assert b"Root 2" in bumped
+        assert len(calls) == 2
@@ -0,0 +1,53 @@
+"""
+Unit tests for output token budgeting.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.llm_request import LLMRequestType
+from app.services import token_budget
+from app.services.token_budget import TokenBudgetCalibrator
+
+
+class TestTokenBudget:
+    """Test max_tokens and stop sequence derivation."""
+
+    def test_max_tokens_scales_with_target_length(self):
+        """Test that a 150-word request gets a much smaller limit than 2000 tokens."""
+        max_tokens = token_budget.compute_max_tokens(150, 1.6)
+
+        assert max_tokens == 312  # 150 * 1.6 * 1.3
+        assert max_tokens < token_budget.compute_max_tokens(1500, 1.6)
+
+    def test_max_tokens_is_clamped(self):
+        """Test lower and upper bounds of the token limit."""
+        assert token_budget.compute_max_tokens(1, 1.3) == token_budget.MIN_MAX_TOKENS
+        assert token_budget.compute_max_tokens(100000, 1.3) == token_budget.MAX_MAX_TOKENS
+
+    def test_stop_sequences_per_request_type(self):
+        """Test that prose requests stop when the prompt is echoed."""
+        assert "\nExisting Text:" in token_budget.get_stop_sequences(LLMRequestType.CONTINUATION)
+        assert token_budget.get_stop_sequences(LLMRequestType.PYRAMID_EXPANSION) is None
+
+    def test_length_ratio(self):
+        """Test overshoot/undershoot ratio computation."""
+        assert token_budget.length_ratio(100, 150) == 1.5
+        assert token_budget.length_ratio(100, 50) == 0.5
+        assert token_budget.length_ratio(0, 50) == 0.0
+
+    def test_calibrator_defaults_without_database(self):
+        """Test that language defaults are used when no data is available."""
+        calibrator = TokenBudgetCalibrator()
+
+        assert calibrator.tokens_per_word(None, "en") == token_budget.DEFAULT_TOKENS_PER_WORD["en"]
+        assert calibrator.tokens_per_word(None, "xx") == token_budget.FALLBACK_TOKENS_PER_WORD
+
+    def test_calibration_failure_keeps_transaction_usable(self, db: Session, monkeypatch):
+        """Test that a failed calibration query does not abort the request's transaction."""
+        calibrator = TokenBudgetCalibrator()
+        monkeypatch.setattr(
+            calibrator, "_estimate", lambda db, language: db.execute(text("SELECT * FROM no_such_table"))
+        )
+
+        assert calibrator.tokens_per_word(db, "fr") == token_budget.DEFAULT_TOKENS_PER_WORD["fr"]
+        assert db.execute(text("SELECT 1")).scalar() == 1
@@ -0,0 +1,79 @@
+"""
+Tests for the version retention policy and compaction.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy.orm import Session
+
+from app.crud import version as crud_version
+from app.models.version import Version
+from app.services.version_retention_service import version_retention_service
+
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+class TestVersionRetentionService:
+    """Test retention planning and compaction."""
+    
+    def test_plan_keeps_commits_recent_and_one_autosave_per_period(self):
+        """Test that old auto-saves are thinned to one per hour, then one per day."""
+        rows = [
+            # Two months old: one per day is kept
+            (uuid4(), NOW - timedelta(days=60, hours=3), True),
+            (uuid4(), NOW - timedelta(days=60, hours=1), True),
+            (uuid4(), NOW - timedelta(days=60, minutes=30), False),
+            # A week old: one per hour is kept
+            (uuid4(), NOW - timedelta(days=7, minutes=80), True),
+            (uuid4(), NOW - timedelta(days=7, minutes=50), True),
+            (uuid4(), NOW - timedelta(days=7, minutes=10), True),
+            # Recent: everything is kept
+            (uuid4(), NOW - timedelta(hours=2), True),
+            (uuid4(), NOW - timedelta(hours=1), True),
+        ]
+        
+        deleted = version_retention_service.plan_deletions(rows, now=NOW)
+        
+        assert deleted == {rows[0][0], rows[4][0]}
+        # The latest version is always kept, however old
+        assert version_retention_service.plan_deletions(rows[:2], now=NOW) == set()
+    
+    def test_compact_entity_rebases_and_relinks(self, db: Session, test_project, test_document):
+        """Test that compaction keeps remaining versions readable and linked."""
+        base_text = " ".join(f"Sentence {i} of the chapter." for i in range(200))
+        contents = [base_text + f" Ending number {i}." for i in range(5)]
+        created = []
+        for i, content in enumerate(contents):
+            created.append(crud_version.create(db, obj_in={
+                "project_id": test_project.id,
+                "document_id": test_document.id,
+                "commit_message": f"Auto-save: {i}",
+                "author_email": "test@example.com",
+                "content_snapshot": content,
+                "is_autosave": True,
+                "parent_version_id": created[-1].id if created else None,
+                "created_at": NOW - timedelta(days=3, minutes=50 - 10 * i)
+            }))
+        ids = [version.id for version in created]
+        
+        stats = version_retention_service.compact_entity(
+            db, kind="document", entity_id=test_document.id, now=NOW
+        )
+        
+        # The latest version and the last auto-save of its hour before it are left
+        assert stats["versions_deleted"] == 3
+        assert stats["versions_rewritten"] == 2
+        db.expire_all()
+        remaining = (
+            db.query(Version)
+            .filter(Version.document_id == test_document.id)
+            .order_by(Version.created_at)
+            .all()
+        )
+        assert [version.id for version in remaining] == ids[3:]
+        assert [version.parent_version_id for version in remaining] == [None, ids[3]]
+        assert crud_version.reconstruct(db, ids[3:]) == dict(zip(ids[3:], contents[3:]))
+        
+        blobs, reclaimed = version_retention_service.collect_blobs(db)
+        assert blobs == 1 and reclaimed > 0
+        assert crud_version.reconstruct(db, ids[3:]) == dict(zip(ids[3:], contents[3:]))
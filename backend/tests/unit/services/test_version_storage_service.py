@@ -0,0 +1,43 @@
+"""
+Tests for converting version histories to delta storage.
+"""
+from sqlalchemy.orm import Session
+
+from app.crud import version as crud_version
+from app.models.version import Version
+from app.services.version_storage_service import version_storage_service
+
+
+class TestVersionStorageService:
+    """Test conversion of full snapshots to deltas and back."""
+    
+    def test_convert_and_expand(self, db: Session, test_project, test_document):
+        """Test that legacy full snapshots convert to deltas without changing content."""
+        base_text = " ".join(f"Sentence {i} of the chapter." for i in range(200))
+        contents = [base_text + f" Ending number {i}." for i in range(4)]
+        # Rows written before delta storage: every version is a keyframe
+        legacy = [
+            Version(
+                project_id=test_project.id,
+                document_id=test_document.id,
+                commit_message=f"Commit {i}",
+                author_email="test@example.com",
+                content_snapshot=content
+            )
+            for i, content in enumerate(contents)
+        ]
+        db.add_all(legacy)
+        db.commit()
+        ids = [version.id for version in legacy]
+        
+        stats = version_storage_service.convert_all(db)
+        
+        # The first snapshot moves to a blob, the others become deltas
+        assert stats["versions_changed"] == 4
+        assert stats["bytes_after"] < stats["bytes_before"]
+        assert crud_version.reconstruct(db, ids) == dict(zip(ids, contents))
+        assert version_storage_service.convert_all(db)["versions_changed"] == 0
+        
+        version_storage_service.convert_all(db, expand=True)
+        assert db.query(Version).filter(Version.document_id == test_document.id, Version.content_snapshot.is_(None)).count() == 0
+        assert crud_version.reconstruct(db, ids) == dict(zip(ids, contents))
@@ -97,6 +97,43 @@ class TestVersioningService:
         assert diff.version_b_id == version2.id
         assert len(diff.diff_text) > 0
     
+    def test_version_diff_word_granularity(self, db: Session, test_project, test_user, test_document):
+        """Test word-level diff stats and that repeated diffs are memoized."""
+        version1 = versioning_service.create_version(
+            db,
+            project_id=test_project.id,
+            author_email=test_user.email,
+            commit_message="Version 1",
+            document_id=test_document.id
+        )
+        test_document.content_raw = "This is a short test document content."
+        db.commit()
+        version2 = versioning_service.create_version(
+            db,
+            project_id=test_project.id,
+            author_email=test_user.email,
+            commit_message="Version 2",
+            document_id=test_document.id
+        )
+        
+        diff = versioning_service.get_version_diff(
+            db,
+            version_a_id=version1.id,
+            version_b_id=version2.id,
+            granularity="word"
+        )
+        
+        assert diff.additions == 1
+        assert diff.deletions == 0
+        assert [segment.op for segment in diff.hunks[0].segments] == ["equal", "insert", "equal"]
+        assert "{+short +}" in diff.diff_text
+        assert versioning_service.get_version_diff(
+            db,
+            version_a_id=version1.id,
+            version_b_id=version2.id,
+            granularity="word"
+        ) is diff
+    
     def test_restore_version(self, db: Session, test_project, test_user, test_document):
         """Test restoring content from a version."""
         original_content = test_document.content_raw
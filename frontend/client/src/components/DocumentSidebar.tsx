@@ -12,12 +12,12 @@ import {
   ContextMenuItem,
   ContextMenuTrigger,
 } from "@/components/ui/context-menu";
-import { Document } from "@/lib/api";
+import { DocumentSummary } from "@/lib/api";
 import { FileText, FolderOpen, Folder, Plus, Trash2, Edit2, ChevronRight, ChevronDown } from "lucide-react";
 import { cn } from "@/lib/utils";
 
 interface DocumentSidebarProps {
-  documents: Document[];
+  documents: DocumentSummary[];
   selectedDocumentId: string | null;
   onSelectDocument: (documentId: string) => void;
   onCreateDocument: (parentId?: string) => void;
@@ -52,7 +52,7 @@ export default function DocumentSidebar({
     setExpandedFolders(newExpanded);
   };
 
-  const startRename = (document: Document) => {
+  const startRename = (document: DocumentSummary) => {
     setEditingDocumentId(document.id);
     setEditingTitle(document.title);
   };
@@ -65,7 +65,7 @@ export default function DocumentSidebar({
     setEditingTitle("");
   };
 
-  const renderDocument = (document: Document, level = 0) => {
+  const renderDocument = (document: DocumentSummary, level = 0) => {
     const children = getChildren(document.id);
     const hasChildren = children.length > 0;
     const isExpanded = expandedFolders.has(document.id);
@@ -44,12 +44,12 @@ export function clearAuthToken(): void {
 }
 
 /**
- * Make an authenticated API request
+ * Send an authenticated API request, throwing an APIError if it fails
  */
-async function apiRequest<T = any>(
+async function fetchAPI(
   endpoint: string,
   options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
   const baseUrl = apiClient.getBaseUrl();
   const url = `${baseUrl}${API_V1_PREFIX}${endpoint}`;
   const token = getAuthToken();
@@ -83,6 +83,18 @@ async function apiRequest<T = any>(
     );
   }
 
+  return response;
+}
+
+/**
+ * Make an authenticated API request
+ */
+async function apiRequest<T = any>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const response = await fetchAPI(endpoint, options);
+
   // Handle 204 No Content
   if (response.status === 204) {
     return null as T;
@@ -91,6 +103,18 @@ async function apiRequest<T = any>(
   return response.json();
 }
 
+/**
+ * Make an authenticated API request, keeping the response's ETag on the result
+ */
+async function apiRequestWithETag<T extends object>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T & { etag?: string }> {
+  const response = await fetchAPI(endpoint, options);
+  const data: T = await response.json();
+  return { ...data, etag: response.headers.get("ETag") ?? undefined };
+}
+
 // ============================================================================
 // Authentication API
 // ============================================================================
@@ -187,16 +211,23 @@ export const projectsAPI = {
 // Documents API
 // ============================================================================
 
-export interface Document {
+// Listed documents come without their content (see documentsAPI.get)
+export interface DocumentSummary {
   id: string;
-  project_id: string;
   title: string;
-  content: string;
   type: string;
   parent_id?: string;
   order_index: number;
-  created_at: string;
   updated_at: string;
+  word_count?: number;
+  revision?: number;
+}
+
+export interface Document extends DocumentSummary {
+  project_id: string;
+  content: string;
+  created_at: string;
+  etag?: string; // Revision loaded, sent back as If-Match when updating
 }
 
 export interface DocumentCreate {
@@ -217,19 +248,21 @@ export interface DocumentUpdate {
 
 export const documentsAPI = {
   list: (projectId: string) =>
-    apiRequest<Document[]>(`/documents?project_id=${projectId}`),
+    apiRequest<DocumentSummary[]>(`/documents?project_id=${projectId}`),
 
-  get: (id: string) => apiRequest<Document>(`/documents/${id}`),
+  get: (id: string) => apiRequestWithETag<Document>(`/documents/${id}`),
 
   create: (projectId: string, data: DocumentCreate) =>
-    apiRequest<Document>(`/documents/?project_id=${projectId}`, {
+    apiRequestWithETag<Document>(`/documents/?project_id=${projectId}`, {
       method: "POST",
       body: JSON.stringify(data),
     }),
 
-  update: (id: string, data: DocumentUpdate) =>
-    apiRequest<Document>(`/documents/${id}`, {
+  // Rejected with 412 if the document changed since the revision of `etag`
+  update: (id: string, data: DocumentUpdate, etag: string) =>
+    apiRequestWithETag<Document>(`/documents/${id}`, {
       method: "PUT",
+      headers: { "If-Match": etag },
       body: JSON.stringify(data),
     }),
 
@@ -2,7 +2,7 @@
  * Main project page with document editor and sidebar
  */
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { useRoute, useLocation } from "wouter";
 import { Button } from "@/components/ui/button";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
@@ -11,7 +11,7 @@ import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { useAuth } from "@/contexts/AuthContext";
-import { projectsAPI, documentsAPI, Project, Document, DocumentCreate } from "@/lib/api";
+import { projectsAPI, documentsAPI, APIError, Project, Document, DocumentSummary, DocumentCreate } from "@/lib/api";
 import { toast } from "sonner";
 import { Loader2, ArrowLeft, Save, BookOpen, FileText, Users, GitBranch, Clock, Sparkles, Menu, X } from "lucide-react";
 import { AUTO_SAVE_DELAY, DOCUMENT_TYPES } from "@/const";
@@ -34,7 +34,7 @@ export default function ProjectPage() {
   const projectId = params?.id;
 
   const [project, setProject] = useState<Project | null>(null);
-  const [documents, setDocuments] = useState<Document[]>([]);
+  const [documents, setDocuments] = useState<DocumentSummary[]>([]);
   const [selectedDocument, setSelectedDocument] = useState<Document | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isSaving, setIsSaving] = useState(false);
@@ -48,6 +48,20 @@ export default function ProjectPage() {
   // Auto-save timer
   const [autoSaveTimer, setAutoSaveTimer] = useState<NodeJS.Timeout | null>(null);
   const [hasUnsavedChanges, setHasUnsavedChanges] = useState(false);
+
+  // ETag of each loaded document, sent as If-Match when saving (a ref, so
+  // the auto-save timer always sees the one from the last save)
+  const etags = useRef(new Map<string, string>());
+
+  const rememberETag = (doc: Document) => {
+    if (doc.etag) {
+      etags.current.set(doc.id, doc.etag);
+    }
+    return doc;
+  };
+
+  const loadDocument = async (documentId: string) =>
+    rememberETag(await documentsAPI.get(documentId));
   
   // Mobile state
   const [isSidebarOpen, setIsSidebarOpen] = useState(false);
@@ -101,7 +115,7 @@ export default function ProjectPage() {
       
       // Select first document if none selected
       if (data.length > 0 && !selectedDocument) {
-        setSelectedDocument(data[0]);
+        setSelectedDocument(await loadDocument(data[0].id));
       }
     } catch (error: any) {
       toast.error("Erreur lors du chargement des documents");
@@ -124,12 +138,12 @@ export default function ProjectPage() {
 
     console.log("[DEBUG] Calling documentsAPI.create");
     try {
-      const newDoc = await documentsAPI.create(projectId!, {
+      const newDoc = rememberETag(await documentsAPI.create(projectId!, {
         title: newDocTitle.trim(),
         type: newDocType,
         parent_id: newDocumentParentId,
         content: "",
-      });
+      }));
 
       setDocuments([...documents, newDoc]);
       setSelectedDocument(newDoc);
@@ -150,10 +164,12 @@ export default function ProjectPage() {
 
     try {
       await documentsAPI.delete(documentId);
+      etags.current.delete(documentId);
       setDocuments(documents.filter((d) => d.id !== documentId));
       
       if (selectedDocument?.id === documentId) {
-        setSelectedDocument(documents.find(d => d.id !== documentId) || null);
+        const next = documents.find(d => d.id !== documentId);
+        setSelectedDocument(next ? await loadDocument(next.id) : null);
       }
       
       toast.success("Document supprimé");
@@ -162,7 +178,7 @@ export default function ProjectPage() {
     }
   };
 
-  const handleSelectDocument = (doc: Document) => {
+  const handleSelectDocument = async (doc: DocumentSummary) => {
     // Save current document before switching
     if (autoSaveTimer) {
       clearTimeout(autoSaveTimer);
@@ -171,13 +187,18 @@ export default function ProjectPage() {
     if (hasUnsavedChanges && selectedDocument) {
       saveDocument();
     }
-    setSelectedDocument(doc);
-    setIsSidebarOpen(false);
+    try {
+      setSelectedDocument(await loadDocument(doc.id));
+      setIsSidebarOpen(false);
+    } catch (error: any) {
+      toast.error("Erreur lors du chargement du document");
+    }
   };
 
   const handleRenameDocument = async (documentId: string, newTitle: string) => {
     try {
-      const updated = await documentsAPI.update(documentId, { title: newTitle });
+      const etag = etags.current.get(documentId) ?? (await loadDocument(documentId)).etag!;
+      const updated = rememberETag(await documentsAPI.update(documentId, { title: newTitle }, etag));
       setDocuments(documents.map((d) => (d.id === documentId ? updated : d)));
       
       if (selectedDocument?.id === documentId) {
@@ -186,6 +207,10 @@ export default function ProjectPage() {
       
       toast.success("Document renommé");
     } catch (error: any) {
+      if (error instanceof APIError && error.status === 412) {
+        toast.error("Le document a été modifié ailleurs : rechargez-le avant de le renommer");
+        return;
+      }
       toast.error("Erreur lors du renommage du document");
     }
   };
@@ -216,12 +241,21 @@ export default function ProjectPage() {
     setIsSaving(true);
     try {
       const contentToSave = content !== undefined ? content : selectedDocument.content;
-      await documentsAPI.update(selectedDocument.id, { content: contentToSave });
+      const etag = etags.current.get(selectedDocument.id) ?? selectedDocument.etag;
+      if (!etag) {
+        throw new Error("Document loaded without its ETag");
+      }
+      // Rejected (412) rather than overwriting a save made from another tab
+      rememberETag(await documentsAPI.update(selectedDocument.id, { content: contentToSave }, etag));
       
       // Update local state with saved content
       setSelectedDocument(prev => prev ? { ...prev, content: contentToSave } : null);
       setHasUnsavedChanges(false);
     } catch (error: any) {
+      if (error instanceof APIError && error.status === 412) {
+        toast.error("Le document a été modifié ailleurs : rechargez-le avant de sauvegarder");
+        return;
+      }
       toast.error("Erreur lors de la sauvegarde");
       console.error('[LiterAI] Save error:', error);
     } finally {
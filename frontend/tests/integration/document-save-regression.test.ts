@@ -13,6 +13,7 @@ describe('Document Save - Regression Tests', () => {
   let accessToken: string;
   let projectId: string;
   let documentId: string;
+  let etag: string; // Sent as If-Match: updates without it are rejected (428)
 
   beforeAll(async () => {
     // Login
@@ -67,6 +68,7 @@ describe('Document Save - Regression Tests', () => {
     expect(docResponse.status).toBe(201);
     const docData = await docResponse.json();
     documentId = docData.id;
+    etag = docResponse.headers.get('ETag')!;
   });
 
   describe('Document Content Persistence', () => {
@@ -80,6 +82,7 @@ describe('Document Save - Regression Tests', () => {
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${accessToken}`,
+          'If-Match': etag,
         },
         body: JSON.stringify({
           content: testContent,
@@ -87,6 +90,7 @@ describe('Document Save - Regression Tests', () => {
         credentials: 'include',
       });
 
+      etag = response.headers.get('ETag') ?? etag;
       console.log('  Response status:', response.status);
       expect(response.status).toBe(200);
       
@@ -125,6 +129,7 @@ describe('Document Save - Regression Tests', () => {
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${accessToken}`,
+          'If-Match': etag,
         },
         body: JSON.stringify({
           content: testContent,
@@ -132,6 +137,7 @@ describe('Document Save - Regression Tests', () => {
         credentials: 'include',
       });
 
+      etag = response.headers.get('ETag') ?? etag;
       console.log('  Response status:', response.status);
       expect(response.status).toBe(200);
       
@@ -151,6 +157,7 @@ describe('Document Save - Regression Tests', () => {
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${accessToken}`,
+          'If-Match': etag,
         },
         body: JSON.stringify({
           content: richContent,
@@ -158,6 +165,7 @@ describe('Document Save - Regression Tests', () => {
         credentials: 'include',
       });
 
+      etag = response.headers.get('ETag') ?? etag;
       console.log('  Response status:', response.status);
       expect(response.status).toBe(200);
       console.log('  OK Rich content handled');
@@ -173,6 +181,7 @@ describe('Document Save - Regression Tests', () => {
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${accessToken}`,
+          'If-Match': etag,
         },
         body: JSON.stringify({
           content: 'Test content',
@@ -180,6 +189,7 @@ describe('Document Save - Regression Tests', () => {
         credentials: 'include',
       });
 
+      etag = response.headers.get('ETag') ?? etag;
       console.log('  Response status:', response.status);
       // Should not return 422 (Unprocessable Entity)
       expect(response.status).not.toBe(422);
@@ -196,6 +206,7 @@ describe('Document Save - Regression Tests', () => {
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${accessToken}`,
+          'If-Match': etag,
         },
         body: JSON.stringify({
           content: testContent,
@@ -203,6 +214,7 @@ describe('Document Save - Regression Tests', () => {
         credentials: 'include',
       });
 
+      etag = response.headers.get('ETag') ?? etag;
       expect(response.status).toBe(200);
       const data = await response.json();
       